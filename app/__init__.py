@@ -1,8 +1,15 @@
 import os
 import sys
 
-from .installation_manager import InstallationManager
-
 execute_dir = os.path.split(os.path.realpath(sys.argv[0]))[0]
 
 __all__ = ["InstallationManager", "execute_dir"]
+
+
+def __getattr__(name):
+    # InstallationManager 依赖 flet，无界面模式不导入
+    if name == "InstallationManager":
+        from .installation_manager import InstallationManager
+
+        return InstallationManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,226 @@
+import asyncio
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+
+# 常见录制格式的MIME类型，系统的mimetypes数据库通常缺少ts/flv/mkv
+MEDIA_TYPES = {
+    ".mp4": "video/mp4",
+    ".m4v": "video/mp4",
+    ".mov": "video/quicktime",
+    ".ts": "video/mp2t",
+    ".flv": "video/x-flv",
+    ".mkv": "video/x-matroska",
+    ".webm": "video/webm",
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4a": "audio/mp4",
+    ".mp3": "audio/mpeg",
+    ".aac": "audio/aac",
+    ".wav": "audio/wav",
+    ".wma": "audio/x-ms-wma",
+}
+
+# 热点缓存按固定大小的块缓存文件内容
+BLOCK_SIZE = 256 * 1024
+# 不经过缓存的大区间每次读取的大小
+STREAM_CHUNK_SIZE = 256 * 1024
+# 只有不超过该长度的区间（拖动进度条时的探测、MP4索引等）才写入缓存
+CACHEABLE_RANGE_BYTES = 4 * 1024 * 1024
+# 单个请求最多允许的区间数，防止大量细碎区间消耗资源
+MAX_RANGES = 16
+
+
+def get_media_type(filename: str) -> str:
+    ext = os.path.splitext(filename)[1].lower()
+    return MEDIA_TYPES.get(ext) or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+class RangeNotSatisfiableError(ValueError):
+    pass
+
+
+def parse_range_header(range_header: str | None, file_size: int) -> list[tuple[int, int]] | None:
+    """解析Range请求头，返回按起始位置排序并合并重叠部分后的闭区间列表
+
+    格式不正确的请求头按规范忽略，返回None并回退到完整响应；
+    所有区间都无法满足时抛出 RangeNotSatisfiableError。
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start_text, sep, end_text = part.partition("-")
+        if not sep:
+            return None
+        start_text, end_text = start_text.strip(), end_text.strip()
+        try:
+            if not start_text:
+                # 后缀区间：最后N个字节
+                suffix_length = int(end_text)
+                if suffix_length <= 0:
+                    continue
+                start, end = max(0, file_size - suffix_length), file_size - 1
+            else:
+                start = int(start_text)
+                end = int(end_text) if end_text else None
+                if end is not None and end < start:
+                    return None
+                end = file_size - 1 if end is None else min(end, file_size - 1)
+        except ValueError:
+            return None
+        if start < 0:
+            return None
+        if start < file_size:
+            ranges.append((start, end))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+    if not ranges:
+        raise RangeNotSatisfiableError(range_header)
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class ByteBudgetLRU:
+    """按字节数而不是条目数限制容量的LRU缓存"""
+
+    def __init__(self, max_bytes: int, max_item_bytes: int | None = None):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes or max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key) -> bytes | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value: bytes):
+        size = len(value)
+        if size > self.max_item_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.total_bytes -= len(old)
+            self._items[key] = value
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.total_bytes = 0
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "items": len(self._items),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _read_at(file, offset: int, size: int) -> bytes:
+    file.seek(offset)
+    return file.read(size)
+
+
+async def iter_file_range(path: str, start: int, end: int, cache: ByteBudgetLRU | None = None,
+                          file_id: tuple | None = None) -> AsyncIterator[bytes]:
+    """按块异步读取文件的 [start, end] 区间，内存占用与区间长度无关
+
+    小区间按对齐的块读取并放入热点缓存，缓存键为 (路径, file_id, 块序号)。file_id 是文件的
+    设备号和inode，文件被替换后旧的缓存块自然失效；正在录制的文件只在末尾追加，完整的块不会
+    再变化，只有末尾不完整的块在需要读取其后新写入的数据时重新读取。
+    """
+    use_cache = cache is not None and file_id is not None and end - start + 1 <= CACHEABLE_RANGE_BYTES
+    file = await asyncio.to_thread(open, path, "rb")
+    try:
+        position = start
+        while position <= end:
+            if use_cache:
+                block_index = position // BLOCK_SIZE
+                key = (path, file_id, block_index)
+                block = cache.get(key)
+                block_start = block_index * BLOCK_SIZE
+                if block is not None and len(block) < BLOCK_SIZE and block_start + len(block) <= end:
+                    # 缓存的末尾块不包含之后新写入的数据
+                    block = None
+                if block is None:
+                    block = await asyncio.to_thread(_read_at, file, block_start, BLOCK_SIZE)
+                    cache.put(key, block)
+                offset = position - block_start
+                chunk = block[offset:offset + end - position + 1]
+            else:
+                chunk = await asyncio.to_thread(_read_at, file, position, min(STREAM_CHUNK_SIZE, end - position + 1))
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(file.close)
+
+
+def build_multipart_parts(ranges: list[tuple[int, int]], file_size: int, media_type: str,
+                          boundary: str) -> tuple[list[tuple[bytes, int, int]], bytes, int]:
+    """生成 multipart/byteranges 各部分的头部，返回 (各部分头部与区间, 结束分隔符, 总长度)"""
+    parts = []
+    content_length = 0
+    for start, end in ranges:
+        header = (
+            f"--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n"
+        ).encode()
+        parts.append((header, start, end))
+        content_length += len(header) + (end - start + 1) + 2
+    closing = f"--{boundary}--\r\n".encode()
+    return parts, closing, content_length + len(closing)
+
+
+async def iter_multipart_ranges(path: str, parts: list[tuple[bytes, int, int]], closing: bytes,
+                                cache: ByteBudgetLRU | None = None,
+                                file_id: tuple | None = None) -> AsyncIterator[bytes]:
+    for header, start, end in parts:
+        yield header
+        async for chunk in iter_file_range(path, start, end, cache, file_id):
+            yield chunk
+        yield b"\r\n"
+    yield closing
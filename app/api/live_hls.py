@@ -0,0 +1,364 @@
+import asyncio
+import math
+import os
+import re
+import time
+from urllib.parse import urlencode
+
+TS_PACKET_SIZE = 188
+TS_SYNC_BYTE = 0x47
+PTS_CLOCK = 90000
+PTS_WRAP = 1 << 33
+
+# 分段录制的文件名形如 "主播_2024-01-01_12-00-00_000.ts"，%03d 为ffmpeg的分段序号占位符
+SEGMENT_FILE_PATTERN = re.compile(r"^(?P<prefix>.*_)(?P<number>\d{3,}|%03d)\.ts$", re.IGNORECASE)
+# 原生HLS录制器在推流中断后写入的后续文件形如 "主播_2024-01-01_12-00-00_part1.ts"
+PART_FILE_PATTERN = re.compile(r"^(?P<stem>.*)_part\d+\.ts$", re.IGNORECASE)
+
+# 视频流类型：MPEG-2、H.264、HEVC
+VIDEO_STREAM_TYPES = {0x01, 0x02, 0x1B, 0x24}
+SDT_PID = 0x11
+
+# 每次增量解析最多读取的字节数，控制内存占用
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+# 首次打开正在录制的大文件时，只解析文件末尾的这部分数据
+INITIAL_TAIL_BYTES = 32 * 1024 * 1024
+
+
+def _pts_delta(start: int, end: int) -> int:
+    """两个PTS之间的差值，处理33位时间戳回绕"""
+    return (end - start) % PTS_WRAP
+
+
+def _parse_pes_pts(payload: bytes) -> int | None:
+    if len(payload) < 14 or payload[0:3] != b"\x00\x00\x01":
+        return None
+    if not payload[7] & 0x80:
+        return None
+    p = payload[9:14]
+    return (((p[0] >> 1) & 0x07) << 30) | (p[1] << 22) | ((p[2] >> 1) << 15) | (p[3] << 7) | (p[4] >> 1)
+
+
+def _psi_section(payload: bytes) -> bytes | None:
+    """去掉指针字段，返回PSI表的section（不含CRC）"""
+    if not payload:
+        return None
+    start = 1 + payload[0]
+    if start + 3 > len(payload):
+        return None
+    section_length = ((payload[start + 1] & 0x0F) << 8) | payload[start + 2]
+    section = payload[start:start + 3 + section_length]
+    if len(section) < 3 + section_length or section_length < 4:
+        return None
+    return section[:-4]
+
+
+class TsFileIndex:
+    """增量解析正在写入的TS文件，按关键帧把文件切成若干字节区间分片
+
+    每次只读取上次解析位置之后新增的完整TS包，解析位置始终按188字节对齐。
+    """
+
+    def __init__(self, path: str, target_duration: float = 4.0, initial_tail_bytes: int = INITIAL_TAIL_BYTES):
+        self.path = path
+        self.target_duration = target_duration
+        self.initial_tail_bytes = initial_tail_bytes
+        self.reset()
+
+    def reset(self):
+        """清空解析状态，下次 update 时重新建立索引"""
+        self.parsed_offset = 0
+        self.file_size = 0
+        self.last_growth = 0.0
+        # 文件开头连续的PAT/PMT等表所在的区间，作为分片的初始化数据
+        self.map_length = 0
+        self.pmt_pid = None
+        self.pcr_pid = None
+        self.video_pid = None
+        self.segments: list[tuple[int, int, float]] = []
+        self._segment_start = None  # (偏移量, PTS)
+        self._last_pts = None
+        self._started = False
+
+    @property
+    def index_pid(self) -> int | None:
+        return self.video_pid if self.video_pid is not None else self.pcr_pid
+
+    def _parse_psi(self, pid: int, payload: bytes):
+        section = _psi_section(payload)
+        if not section:
+            return
+        if pid == 0 and section[0] == 0x00:
+            for i in range(8, len(section) - 3, 4):
+                program_number = (section[i] << 8) | section[i + 1]
+                if program_number != 0:
+                    self.pmt_pid = ((section[i + 2] & 0x1F) << 8) | section[i + 3]
+                    break
+        elif pid == self.pmt_pid and section[0] == 0x02 and len(section) >= 12:
+            self.pcr_pid = ((section[8] & 0x1F) << 8) | section[9]
+            i = 12 + (((section[10] & 0x0F) << 8) | section[11])
+            while i + 5 <= len(section):
+                stream_type = section[i]
+                elementary_pid = ((section[i + 1] & 0x1F) << 8) | section[i + 2]
+                if stream_type in VIDEO_STREAM_TYPES and self.video_pid is None:
+                    self.video_pid = elementary_pid
+                i += 5 + (((section[i + 3] & 0x0F) << 8) | section[i + 4])
+
+    def _on_keyframe(self, offset: int, pts: int):
+        if self._segment_start is None:
+            self._segment_start = (offset, pts)
+            return
+        start_offset, start_pts = self._segment_start
+        duration = _pts_delta(start_pts, pts) / PTS_CLOCK
+        if duration >= self.target_duration:
+            self.segments.append((start_offset, offset - start_offset, duration))
+            self._segment_start = (offset, pts)
+
+    def _parse_packets(self, data: bytes, base_offset: int) -> int:
+        """解析一段数据中的完整TS包，返回已消费的字节数"""
+        position = 0
+        end = len(data) - TS_PACKET_SIZE
+        while position <= end:
+            if data[position] != TS_SYNC_BYTE:
+                # 失去同步时向后查找下一个同步字节
+                next_sync = data.find(bytes([TS_SYNC_BYTE]), position + 1)
+                if next_sync < 0:
+                    return len(data)
+                position = next_sync
+                continue
+
+            packet = data[position:position + TS_PACKET_SIZE]
+            pid = ((packet[1] & 0x1F) << 8) | packet[2]
+            unit_start = packet[1] & 0x40
+            adaptation = (packet[3] >> 4) & 0x03
+            payload_start = 4
+            random_access = False
+            if adaptation & 0x02:
+                adaptation_length = packet[4]
+                if adaptation_length and adaptation_length <= 183:
+                    random_access = bool(packet[5] & 0x40)
+                payload_start = 5 + adaptation_length
+            payload = packet[payload_start:] if adaptation & 0x01 and payload_start < TS_PACKET_SIZE else b""
+            packet_offset = base_offset + position
+
+            is_psi = pid in {0, SDT_PID} or (self.pmt_pid is not None and pid == self.pmt_pid)
+            if is_psi:
+                if unit_start:
+                    self._parse_psi(pid, payload)
+                if not self._started and packet_offset == self.map_length:
+                    self.map_length += TS_PACKET_SIZE
+            elif pid == self.index_pid and unit_start:
+                self._started = True
+                pts = _parse_pes_pts(payload)
+                if pts is not None:
+                    self._last_pts = pts
+                    # 没有视频流（纯音频录制）时每个PES都可以作为切分点
+                    if random_access or self.video_pid is None:
+                        self._on_keyframe(packet_offset, pts)
+            elif pid != 0x1FFF:
+                self._started = True
+            position += TS_PACKET_SIZE
+        return position
+
+    def _read_header(self, file):
+        """从文件开头解析节目表，确定初始化区间和关键帧所在的流"""
+        self._parse_packets(file.read(64 * TS_PACKET_SIZE), 0)
+        # 只使用文件头的节目信息，分片从末尾的起始位置重新统计
+        self.segments.clear()
+        self._segment_start = self._last_pts = None
+
+    def update(self) -> bool:
+        """解析文件新增的内容，返回文件是否有增长（在线程中调用）"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        size = stat.st_size
+        if size < self.parsed_offset:
+            # 文件被截断或替换，重新建立索引
+            self.reset()
+        if size == self.file_size:
+            return False
+        self.file_size = size
+        # 以文件的修改时间为准，打开早已写完的文件时不会被误判为仍在录制
+        self.last_growth = time.monotonic() - max(0.0, time.time() - stat.st_mtime)
+
+        with open(self.path, "rb") as file:
+            if self.parsed_offset == 0 and size > self.initial_tail_bytes:
+                self._read_header(file)
+                start = size - self.initial_tail_bytes
+                self.parsed_offset = start - start % TS_PACKET_SIZE
+                self._started = True
+            file.seek(self.parsed_offset)
+            while self.parsed_offset + TS_PACKET_SIZE <= size:
+                data = file.read(min(READ_CHUNK_SIZE, size - self.parsed_offset))
+                if len(data) < TS_PACKET_SIZE:
+                    break
+                data = data[:len(data) - len(data) % TS_PACKET_SIZE]
+                consumed = self._parse_packets(data, self.parsed_offset)
+                if consumed <= 0:
+                    break
+                self.parsed_offset += consumed
+                file.seek(self.parsed_offset)
+        return True
+
+    def tail_segment(self) -> tuple[int, int, float] | None:
+        """文件写入结束后，最后一个关键帧到文件末尾的剩余分片"""
+        if self._segment_start is None:
+            return None
+        start_offset, start_pts = self._segment_start
+        length = self.parsed_offset - start_offset
+        if length <= 0:
+            return None
+        duration = _pts_delta(start_pts, self._last_pts) / PTS_CLOCK if self._last_pts is not None else 0.0
+        return start_offset, length, max(duration, 0.1)
+
+
+class LivePlaylist:
+    """一个录制任务的滚动HLS播放列表，同一任务的所有观看者共享索引
+
+    分段录制时按文件序号依次跟踪，每次切换文件插入 EXT-X-DISCONTINUITY；
+    超出窗口的旧分片被移除，同时累加媒体序号和不连续序号。
+    """
+
+    def __init__(self, directory: str, prefix: str, suffix: str = ".ts", target_duration: float = 4.0,
+                 window_size: int = 6, idle_timeout: float = 15.0, refresh_interval: float = 0.5):
+        self.directory = directory
+        self.prefix = prefix
+        self.suffix = suffix
+        self.target_duration = target_duration
+        self.window_size = window_size
+        self.idle_timeout = idle_timeout
+        self.refresh_interval = refresh_interval
+        self.files: list[tuple[str, TsFileIndex]] = []
+        self.expired_segments = 0
+        self.expired_discontinuities = 0
+        self.ended = False
+        self.last_refresh = 0.0
+        self._lock = asyncio.Lock()
+
+    def _list_series(self) -> list[str]:
+        """列出同一录制任务的所有分段文件，按序号排序
+
+        未分段的录制包括原始文件和推流中断后续写的 _partN 文件，原始文件序号为0。
+        """
+        segmented = self.prefix.endswith("_")
+        names = []
+        try:
+            entries = os.listdir(self.directory)
+        except OSError:
+            return []
+        for name in entries:
+            if not name.startswith(self.prefix) or not name.lower().endswith(self.suffix):
+                continue
+            number = name[len(self.prefix):-len(self.suffix)]
+            if not segmented:
+                if not number:
+                    names.append((0, name))
+                    continue
+                number = number[len("_part"):] if number.startswith("_part") else ""
+            if number.isdigit():
+                names.append((int(number), name))
+        return [name for _, name in sorted(names)]
+
+    def _file_segments(self, position: int) -> list[tuple[int, int, float]]:
+        _, index = self.files[position]
+        segments = list(index.segments)
+        finished = position < len(self.files) - 1 or self.ended
+        if finished and (tail := index.tail_segment()):
+            segments.append(tail)
+        return segments
+
+    def refresh(self):
+        """跟踪新文件、解析新增数据并移除过期分片（在线程中调用）"""
+        names = self._list_series()
+        known = {name for name, _ in self.files}
+        new_names = [name for name in names if name not in known]
+        if not self.files and new_names:
+            # 首次打开时只从最新的文件开始播放
+            new_names = new_names[-1:]
+        for name in new_names:
+            self.files.append((name, TsFileIndex(os.path.join(self.directory, name), self.target_duration)))
+
+        for _, index in self.files[-2:]:
+            index.update()
+        if self.files:
+            self.ended = time.monotonic() - self.files[-1][1].last_growth > self.idle_timeout
+
+        # 已结束的旧文件的分片全部移出窗口后不再保留其索引
+        total = sum(len(self._file_segments(i)) for i in range(len(self.files)))
+        while len(self.files) > 1:
+            count = len(self._file_segments(0))
+            if total - count < self.window_size:
+                break
+            self.files.pop(0)
+            total -= count
+            self.expired_segments += count
+            self.expired_discontinuities += 1
+        self.last_refresh = time.monotonic()
+
+    async def ensure_fresh(self):
+        """多个观看者同时请求时只刷新一次"""
+        async with self._lock:
+            if time.monotonic() - self.last_refresh >= self.refresh_interval:
+                await asyncio.to_thread(self.refresh)
+
+    def render(self, uri_builder) -> str:
+        """生成播放列表，uri_builder(filename) 返回分片所在文件的地址"""
+        entries = []
+        for position, (name, index) in enumerate(self.files):
+            for number, segment in enumerate(self._file_segments(position)):
+                entries.append((position, name, index, number == 0, segment))
+
+        skipped = max(0, len(entries) - self.window_size)
+        visible = entries[skipped:]
+        discontinuity_sequence = self.expired_discontinuities + sum(
+            1 for position, _, _, first, _ in entries[:skipped] if first and position > 0
+        )
+        max_duration = max((segment[2] for *_, segment in visible), default=self.target_duration)
+
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:6",
+            f"#EXT-X-TARGETDURATION:{max(1, math.ceil(max(max_duration, self.target_duration)))}",
+            f"#EXT-X-MEDIA-SEQUENCE:{self.expired_segments + skipped}",
+            f"#EXT-X-DISCONTINUITY-SEQUENCE:{discontinuity_sequence}",
+        ]
+        current_file = None
+        for position, name, index, first, (offset, length, duration) in visible:
+            uri = uri_builder(name)
+            if name != current_file:
+                if current_file is not None or (first and position > 0):
+                    lines.append("#EXT-X-DISCONTINUITY")
+                if index.map_length:
+                    lines.append(f'#EXT-X-MAP:URI="{uri}",BYTERANGE="{index.map_length}@0"')
+                current_file = name
+            lines.append(f"#EXTINF:{duration:.3f},")
+            lines.append(f"#EXT-X-BYTERANGE:{length}@{offset}")
+            lines.append(uri)
+        if self.ended:
+            lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+
+def split_series_name(filename: str) -> tuple[str, str] | None:
+    """返回 (文件名前缀, 扩展名)，非TS文件返回None
+
+    分段文件的前缀以"_"结尾（不含序号），未分段的TS文件前缀为去掉扩展名的完整文件名，
+    其 _partN 后续文件与原始文件属于同一录制任务。
+    """
+    if match := SEGMENT_FILE_PATTERN.match(filename):
+        return match.group("prefix"), ".ts"
+    if match := PART_FILE_PATTERN.match(filename):
+        return match.group("stem"), ".ts"
+    stem, ext = os.path.splitext(filename)
+    if ext.lower() != ".ts":
+        return None
+    return stem, ".ts"
+
+
+def build_segment_uri(base_path: str, filename: str, subfolder: str | None) -> str:
+    params = {"filename": filename}
+    if subfolder:
+        params["subfolder"] = subfolder
+    return f"{base_path}?{urlencode(params)}"
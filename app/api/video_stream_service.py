@@ -4,17 +4,28 @@ import logging
 import os
 import re
 import sys
+import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 
-import aiofiles
 from cachetools import TTLCache
 from dotenv import find_dotenv, load_dotenv
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import Response, StreamingResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
+from .file_ranges import (
+    ByteBudgetLRU,
+    RangeNotSatisfiableError,
+    build_multipart_parts,
+    get_media_type,
+    iter_file_range,
+    iter_multipart_ranges,
+    parse_range_header,
+)
+from .live_hls import LivePlaylist, build_segment_uri, split_series_name
+
 dotenv_path = find_dotenv()
 load_dotenv(dotenv_path)
 CUSTOM_VIDEO_ROOT_DIR = os.getenv("CUSTOM_VIDEO_ROOT_DIR")
@@ -28,7 +39,13 @@ VIDEO_DIR = Path(CUSTOM_VIDEO_ROOT_DIR or DEFAULT_VIDEO_ROOT_DIR)
 os.makedirs(VIDEO_DIR, exist_ok=True)
 
 VIDEO_META_CACHE = TTLCache(maxsize=50, ttl=300)
-CHUNK_CACHE = TTLCache(maxsize=25, ttl=60)
+# 热点数据块缓存，按字节数限制总内存占用
+HOT_BLOCK_CACHE_BYTES = int(os.getenv("VIDEO_API_CACHE_MB") or 64) * 1024 * 1024
+HOT_BLOCK_CACHE = ByteBudgetLRU(HOT_BLOCK_CACHE_BYTES)
+# 正在录制的直播的滚动播放列表，同一录制任务的所有观看者共享，长时间无人观看后过期
+LIVE_PLAYLISTS = TTLCache(maxsize=100, ttl=600)
+LIVE_SEGMENT_SECONDS = float(os.getenv("VIDEO_API_LIVE_SEGMENT_SECONDS") or 4)
+LIVE_WINDOW_SIZE = int(os.getenv("VIDEO_API_LIVE_WINDOW_SIZE") or 6)
 
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -112,77 +129,98 @@ async def get_video(
         'file_size': file_size
     }
 
-    # Parse Range header
-    range_header = request.headers.get("Range")
-    if range_header:
-        start, end = range_header.replace("bytes=", "").split("-")
-        start = int(start)
-        end = int(end) if end else file_size - 1
+    media_type = get_media_type(video_path.name)
+    # 缓存键使用文件标识而不是修改时间，正在录制的文件增长时已缓存的完整块仍然有效
+    file_id = (stat.st_dev, stat.st_ino)
 
-        if start >= file_size or end >= file_size:
-            logger.error(f"Invalid range request: {range_header}, file size: {file_size}")
-            raise HTTPException(status_code=416, detail="Requested range not satisfiable")
+    # Parse Range header
+    try:
+        ranges = parse_range_header(request.headers.get("Range"), file_size)
+    except RangeNotSatisfiableError:
+        logger.exception(f"Invalid range request: {request.headers.get('Range')}, file size: {file_size}")
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
 
+    if ranges and len(ranges) == 1:
+        start, end = ranges[0]
         headers = {
             "Content-Range": f"bytes {start}-{end}/{file_size}",
             "Accept-Ranges": "bytes",
             "Content-Length": str(end - start + 1),
-            "Content-Type": "video/mp4",
+            "ETag": etag,
+        }
+        return StreamingResponse(
+            iter_file_range(str(video_path), start, end, HOT_BLOCK_CACHE, file_id),
+            status_code=206,
+            headers=headers,
+            media_type=media_type,
+        )
+
+    if ranges:
+        boundary = uuid.uuid4().hex
+        parts, closing, content_length = build_multipart_parts(ranges, file_size, media_type, boundary)
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(content_length),
+            "ETag": etag,
         }
         return StreamingResponse(
-            file_sender_range(video_path, start, end),
+            iter_multipart_ranges(str(video_path), parts, closing, HOT_BLOCK_CACHE, file_id),
             status_code=206,
             headers=headers,
+            media_type=f"multipart/byteranges; boundary={boundary}",
         )
 
     # If no Range header, return the whole file
+    # FileResponse按块发送，ASGI服务器支持零拷贝扩展时直接由服务器发送文件
     headers = {
-        "Content-Length": str(file_size),
-        "Content-Type": "video/mp4",
+        "Accept-Ranges": "bytes",
         "Cache-Control": "public, max-age=300",
         "ETag": etag,
         "Last-Modified": datetime.fromisoformat(last_modified).strftime("%a, %d %b %Y %H:%M:%S GMT")
     }
+    return FileResponse(video_path, headers=headers, media_type=media_type, stat_result=stat)
+
+
+@app.get("/api/live/playlist.m3u8")
+async def get_live_playlist(
+        filename: str = Query(...),
+        subfolder: str | None = None
+):
+    """根据ffmpeg正在写入的TS文件生成滚动HLS播放列表，分片通过 /api/videos 的Range请求读取"""
+    validate_filename(filename)
+    series = split_series_name(filename)
+    if not series:
+        raise HTTPException(status_code=400, detail="Only TS recordings support live playback")
+
+    directory = (VIDEO_DIR / subfolder if subfolder else VIDEO_DIR).resolve()
     try:
-        return StreamingResponse(file_sender(video_path), headers=headers)
-    except Exception:
-        logger.exception("Streaming error")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
-
-
-# Async file sender (full content)
-async def file_sender(video_path: Path):
-    async with aiofiles.open(video_path, "rb") as file:
-        while True:
-            chunk = await file.read(65536)
-            if not chunk:
-                break
-            yield chunk
-
-
-# Async file sender (range content)
-async def file_sender_range(video_path: Path, start: int, end: int):
-    cache_key = f"{video_path.name}-{start}-{end}"
-
-    if cached := CHUNK_CACHE.get(cache_key):
-        yield cached
-        return
-
-    async with aiofiles.open(video_path, "rb") as file:
-        await file.seek(start)
-        chunks = []
-        while start <= end:
-            chunk_size = min(65536, end - start + 1)
-            chunk = await file.read(chunk_size)
-            if not chunk:
-                break
-            chunks.append(chunk)
-            start += len(chunk)
-
-        full_chunk = b"".join(chunks)
-        if len(full_chunk) < 1024 * 1024:
-            CHUNK_CACHE[cache_key] = full_chunk
-        yield full_chunk
+        directory.relative_to(VIDEO_DIR.resolve())
+    except ValueError:
+        logger.exception(f"Path traversal attempt: {directory}")
+        raise HTTPException(status_code=400, detail="Invalid file path")
+
+    prefix, suffix = series
+    cache_key = (str(directory), prefix)
+    playlist = LIVE_PLAYLISTS.get(cache_key)
+    if playlist is None:
+        playlist = LivePlaylist(str(directory), prefix, suffix, LIVE_SEGMENT_SECONDS, LIVE_WINDOW_SIZE)
+    # 每次访问重新放入缓存以延长过期时间
+    LIVE_PLAYLISTS[cache_key] = playlist
+
+    await playlist.ensure_fresh()
+    if not playlist.files:
+        raise HTTPException(status_code=404, detail="Video file not found")
+
+    content = playlist.render(lambda name: build_segment_uri("/api/videos", name, subfolder))
+    return Response(
+        content=content,
+        media_type="application/vnd.apple.mpegurl",
+        headers={"Cache-Control": "no-cache"},
+    )
 
 
 if __name__ == "__main__":
@@ -10,14 +10,17 @@ import flet as ft
 from . import InstallationManager, execute_dir
 from .core.config_manager import ConfigManager
 from .core.config_validator import ConfigValidator
+from .core.disk_space_service import DiskSpaceService
 from .core.language_manager import LanguageManager
 from .core.platform_handlers import PlatformHandler
 from .core.record_manager import RecordingManager
+from .core.recorder_supervisor import RecorderSupervisor
+from .core.transcode_manager import TranscodeManager
 from .core.update_checker import UpdateChecker
+from .messages.message_pusher import MessagePusher
 from .process_manager import AsyncProcessManager
 from .ui.components.recording_card import RecordingCardManager
 from .ui.components.show_snackbar import ShowSnackBar
-from .ui.components.system_tray import SystemTrayManager
 from .ui.components.disk_space_display import DiskSpaceDisplay
 from .ui.navigation.sidebar import LeftNavigationMenu, NavigationSidebar
 from .ui.views.about_view import AboutPage
@@ -25,8 +28,10 @@ from .ui.views.home_view import HomePage
 from .ui.views.settings_view import SettingsPage
 from .ui.views.storage_view import StoragePage
 from .utils import utils
-from .utils.logger import logger
+from .utils.http_client import close_http_clients
+from .utils.logger import logger, memory_logger
 from .utils.thumbnail_manager import ThumbnailManager
+from .utils.translation_service import close_translation_cache
 from .models.platform_logo_cache import PlatformLogoCache
 
 # 定义内存清理阈值，当内存使用率超过这个值时执行更激进的清理
@@ -82,6 +87,7 @@ class App:
         self.dialog_area = ft.Container()
         
         # 创建磁盘空间显示组件
+        self.disk_space_service = DiskSpaceService(self)
         self.disk_space_display = DiskSpaceDisplay(self)
         
         # 创建主内容区域，包含磁盘空间显示和内容区域
@@ -118,6 +124,8 @@ class App:
         
         self.record_card_manager = RecordingCardManager(self)
         self.record_manager = RecordingManager(self)
+        self.recorder_supervisor = RecorderSupervisor(self)
+        self.transcode_manager = TranscodeManager(self)
         self.current_page = None
         self._loading_page = False
         self.recording_enabled = True
@@ -129,6 +137,7 @@ class App:
         self._memory_stats = {"peak": 0, "current": 0, "warning_count": 0}
         self.page.run_task(self.install_manager.check_env)
         self.page.run_task(self.record_manager.check_free_space)
+        self.page.run_task(self.transcode_manager.start)
         self.page.run_task(self._check_for_updates)
         
         # 只有在非web模式下才启动内存清理任务
@@ -137,6 +146,8 @@ class App:
             
             # 初始化系统托盘管理器（仅在非web模式下）
             try:
+                # 托盘依赖图形环境，导入放在这里以便没有显示器时只跳过托盘
+                from .ui.components.system_tray import SystemTrayManager
                 self.tray_manager = SystemTrayManager(self)
             except Exception as e:
                 logger.warning(f"系统托盘管理器初始化失败: {e}")
@@ -325,7 +336,31 @@ class App:
             # 清理系统托盘
             if hasattr(self, 'tray_manager') and self.tray_manager:
                 self.tray_manager.cleanup()
-                
+
+            # 停止直播状态检测调度
+            if hasattr(self, 'record_manager'):
+                await self.record_manager.live_check_scheduler.shutdown()
+                # 写入尚未落盘的录制列表修改
+                await self.record_manager.flush_recordings()
+                self.config_manager.close_recordings_store()
+
+            # 停止录制进程监管循环
+            if hasattr(self, 'recorder_supervisor'):
+                await self.recorder_supervisor.shutdown()
+
+            # 停止转码任务池，未完成的任务会在下次启动时继续
+            if hasattr(self, 'transcode_manager'):
+                await self.transcode_manager.shutdown()
+
+            # 停止推送投递引擎，关闭复用的SMTP连接
+            await MessagePusher.shutdown()
+
+            # 关闭共享的HTTP连接池
+            await close_http_clients()
+
+            # 写入尚未落盘的翻译缓存
+            close_translation_cache()
+
             await self.process_manager.cleanup()
             # 执行更完整的清理
             await self._perform_full_cleanup()
@@ -339,12 +374,12 @@ class App:
             logger.warning("尝试添加空的ffmpeg进程")
             return
             
-        logger.info(f"添加ffmpeg进程: PID={process.pid}")
+        memory_logger.info(f"添加ffmpeg进程: PID={process.pid}")
         await self.process_manager.add_process(process)
         
         # 添加后立即检查活跃进程数
         active_count = await self.process_manager.get_active_processes_count()
-        logger.info(f"添加进程后，当前活跃进程数: {active_count}")
+        memory_logger.info(f"添加进程后，当前活跃进程数: {active_count}")
 
     async def _validate_configs(self):
         """验证配置项并修复无效的配置"""
@@ -399,21 +434,21 @@ class App:
                 
                 # 检查是否需要执行轻量级清理
                 if current_time - self._last_light_cleanup >= LIGHT_CLEANUP_INTERVAL:
-                    logger.info(f"执行轻量级清理任务 - 当前内存使用率: {memory_info['percent']:.1f}%")
+                    memory_logger.info(f"执行轻量级清理任务 - 当前内存使用率: {memory_info['percent']:.1f}%")
                     await self._perform_light_cleanup()
                     self._last_light_cleanup = current_time
                 
                 # 检查是否需要执行完整清理
                 if (current_time - self._last_full_cleanup >= FULL_CLEANUP_INTERVAL or 
                     memory_info["percent"] >= MEMORY_CLEANUP_THRESHOLD):
-                    logger.info(f"执行完整清理任务 - 当前内存使用率: {memory_info['percent']:.1f}%")
+                    memory_logger.info(f"执行完整清理任务 - 当前内存使用率: {memory_info['percent']:.1f}%")
                     await self._perform_full_cleanup()
                     self._last_full_cleanup = current_time
                 
                 # 如果内存使用超过警告阈值，记录警告并提供详细统计
                 if memory_info["percent"] >= MEMORY_WARNING_THRESHOLD:
                     self._memory_stats["warning_count"] += 1
-                    logger.warning(f"内存使用率过高: {memory_info['percent']:.1f}%, "
+                    memory_logger.warning(f"内存使用率过高: {memory_info['percent']:.1f}%, "
                                   f"已使用: {memory_info['used_mb']:.1f}MB, "
                                   f"总计: {memory_info['total_mb']:.1f}MB")
                     logger.warning(f"高内存使用警告计数: {self._memory_stats['warning_count']}, "
@@ -427,12 +462,11 @@ class App:
                     
                     # 记录实例统计信息
                     instance_stats = PlatformHandler.get_instance_stats()
-                    logger.warning(f"平台处理器实例统计: 当前={instance_stats.get('current_count', 0)}, "
-                                  f"不活跃={instance_stats.get('inactive_count', 0)}, "
-                                  f"总创建={instance_stats.get('total_created', 0)}, "
-                                  f"总访问={instance_stats.get('total_accessed', 0)}, "
-                                  f"使用时间记录数={instance_stats.get('usage_records', 0)}, "
-                                  f"强引用实例数={instance_stats.get('strong_refs', 0)}")
+                    memory_logger.warning(f"平台处理器实例统计: 当前={instance_stats.get('current_count', 0)}, "
+                                  f"命中={instance_stats.get('hits', 0)}, "
+                                  f"未命中={instance_stats.get('misses', 0)}, "
+                                  f"淘汰={instance_stats.get('evictions', 0)}, "
+                                  f"过期={instance_stats.get('expirations', 0)}")
                     
             except Exception as e:
                 logger.error(f"定期清理任务出错: {e}")
@@ -440,7 +474,7 @@ class App:
     async def _perform_light_cleanup(self):
         """执行轻量级清理任务，清理未使用的平台处理器实例和触发垃圾回收"""
         before_count = PlatformHandler.get_instances_count()
-        logger.info(f"轻量级清理 - 清理前平台处理器实例数: {before_count}")
+        memory_logger.info(f"轻量级清理 - 清理前平台处理器实例数: {before_count}")
         
         # 清理未使用的平台处理器实例
         PlatformHandler.clear_unused_instances()
@@ -449,12 +483,12 @@ class App:
         collected = gc.collect()
         
         after_count = PlatformHandler.get_instances_count()
-        logger.info(f"轻量级清理 - 清理后平台处理器实例数: {after_count}, "
+        memory_logger.info(f"轻量级清理 - 清理后平台处理器实例数: {after_count}, "
                    f"减少: {before_count - after_count}, 垃圾回收对象数: {collected}")
         
         # 添加系统统计信息
         active_processes = await self.process_manager.get_active_processes_count()
-        logger.info(f"系统统计 - 录制任务数: {len(self.record_manager.recordings)}, "
+        memory_logger.info(f"系统统计 - 录制任务数: {len(self.record_manager.recordings)}, "
                    f"活跃进程数: {active_processes}")
                    
         # 检查系统中的进程
@@ -502,24 +536,25 @@ class App:
         
         # 8. 日志记录清理结果
         memory_change = before_memory["percent"] - after_memory["percent"]
-        logger.info(f"完整清理完成 - 内存使用率: {before_memory['percent']:.1f}% -> {after_memory['percent']:.1f}% "
+        memory_logger.info(f"完整清理完成 - 内存使用率: {before_memory['percent']:.1f}% -> {after_memory['percent']:.1f}% "
                    f"(减少: {memory_change:.1f}%)")
-        logger.info(f"完整清理完成 - 平台处理器实例: {before_instances} -> {after_instances} "
+        memory_logger.info(f"完整清理完成 - 平台处理器实例: {before_instances} -> {after_instances} "
                    f"(减少: {before_instances - after_instances})")
         
         # 添加详细的内存使用信息
-        logger.info(f"内存使用详情 - 已使用: {after_memory['used_mb']:.1f}MB, "
+        memory_logger.info(f"内存使用详情 - 已使用: {after_memory['used_mb']:.1f}MB, "
                    f"总计: {after_memory['total_mb']:.1f}MB, "
                    f"可用: {after_memory['available_mb']:.1f}MB")
         
         # 添加进程和实例统计信息
         active_processes = await self.process_manager.get_active_processes_count()
         instance_stats = PlatformHandler.get_instance_stats()
-        logger.info(f"系统状态 - 录制任务数: {len(self.record_manager.recordings)}, "
+        memory_logger.info(f"系统状态 - 录制任务数: {len(self.record_manager.recordings)}, "
                    f"活跃进程数: {active_processes}, "
                    f"实例数: {instance_stats.get('current_count', 0)}, "
-                   f"强引用实例数: {instance_stats.get('strong_refs', 0)}, "
-                   f"使用时间记录数: {instance_stats.get('usage_records', 0)}")
+                   f"实例缓存命中率: {instance_stats.get('hit_rate', 0.0):.1%}, "
+                   f"淘汰: {instance_stats.get('evictions', 0)}, "
+                   f"过期: {instance_stats.get('expirations', 0)}")
 
     def _get_memory_usage(self):
         """获取当前进程的内存使用情况"""
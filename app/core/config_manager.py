@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import shutil
@@ -6,6 +7,7 @@ from typing import Any
 import aiofiles
 
 from ..utils.logger import logger
+from .recordings_store import RecordingsStore
 
 
 class ConfigManager:
@@ -17,10 +19,15 @@ class ConfigManager:
         self.cookies_config_path = os.path.join(self.config_path, "cookies.json")
         self.about_config_path = os.path.join(self.config_path, "version.json")
         self.recordings_config_path = os.path.join(self.config_path, "recordings.json")
+        self.recordings_db_path = os.path.join(self.config_path, "recordings.db")
         self.accounts_config_path = os.path.join(self.config_path, "accounts.json")
         self.web_auth_config_path = os.path.join(self.config_path, "web_auth.json")
+        self.transcode_queue_config_path = os.path.join(self.config_path, "transcode_queue.json")
+        self.live_history_config_path = os.path.join(self.config_path, "live_history.json")
+        self.translation_cache_db_path = os.path.join(self.config_path, "translation_cache.db")
 
         os.makedirs(os.path.dirname(self.default_config_path), exist_ok=True)
+        self.recordings_store = RecordingsStore(self.recordings_db_path)
         self.init()
 
     def init(self):
@@ -30,8 +37,12 @@ class ConfigManager:
         self.init_accounts_config()
         self.init_recordings_config()
         self.init_web_auth_config()
+        self.init_transcode_queue_config()
+        self.init_live_history_config()
         # 修复缺失或新增的JSON配置项
         self.fix_missing_config_keys()
+        # 旧版recordings.json在修复字段后导入录制数据库
+        self.migrate_recordings_config()
 
     @staticmethod
     def _init_config(config_path, default_config=None):
@@ -64,13 +75,29 @@ class ConfigManager:
         self._init_config(self.accounts_config_path, accounts_config)
 
     def init_recordings_config(self):
-        recordings_config = []
-        self._init_config(self.recordings_config_path, recordings_config)
+        try:
+            self.recordings_store.open()
+        except Exception as e:
+            logger.error(f"Failed to open recordings database {self.recordings_db_path}: {e}")
+
+    def migrate_recordings_config(self):
+        try:
+            self.recordings_store.migrate_from_json(self.recordings_config_path)
+        except Exception as e:
+            logger.error(f"迁移录制配置时发生错误: {e}")
 
     def init_web_auth_config(self):
         web_auth_config = {}
         self._init_config(self.web_auth_config_path, web_auth_config)
 
+    def init_transcode_queue_config(self):
+        transcode_queue_config = []
+        self._init_config(self.transcode_queue_config_path, transcode_queue_config)
+
+    def init_live_history_config(self):
+        live_history_config = {}
+        self._init_config(self.live_history_config_path, live_history_config)
+
     @staticmethod
     def _load_config(config_path, error_message):
         """Load configuration from a JSON file."""
@@ -94,7 +121,11 @@ class ConfigManager:
         return self._load_config(self.user_config_path, "An error occurred while loading user config")
 
     def load_recordings_config(self):
-        return self._load_config(self.recordings_config_path, "An error occurred while loading recordings config")
+        try:
+            return self.recordings_store.load()
+        except Exception as e:
+            logger.error(f"An error occurred while loading recordings config: {e}")
+            return []
 
     def load_accounts_config(self):
         return self._load_config(self.accounts_config_path, "An error occurred while loading accounts config")
@@ -115,23 +146,43 @@ class ConfigManager:
     def load_web_auth_config(self):
         return self._load_config(self.web_auth_config_path, "An error occurred while loading web auth config")
 
+    def load_transcode_queue_config(self):
+        return self._load_config(
+            self.transcode_queue_config_path, "An error occurred while loading transcode queue config"
+        )
+
+    def load_live_history_config(self):
+        return self._load_config(self.live_history_config_path, "An error occurred while loading live history config")
+
     @staticmethod
     async def _save_config(config_path, config, success_message, error_message):
         """Save configuration to a JSON file."""
         try:
-            async with aiofiles.open(config_path, "w", encoding="utf-8") as file:
+            # 先写入临时文件再原子替换，写入中途退出不会损坏原配置
+            temp_path = config_path + ".tmp"
+            async with aiofiles.open(temp_path, "w", encoding="utf-8") as file:
                 await file.write(json.dumps(config, ensure_ascii=False, indent=4))
+            os.replace(temp_path, config_path)
             logger.info(success_message)
         except Exception as e:
             logger.error(f"{error_message}: {e}")
 
-    async def save_recordings_config(self, config):
-        await self._save_config(
-            self.recordings_config_path,
-            config,
-            success_message="Recordings configuration saved.",
-            error_message="An error occurred while saving recordings config",
-        )
+    async def save_recordings_config(self, config, unchanged_ids: set | None = None):
+        """Save recordings to the database, writing only the changed items.
+
+        unchanged_ids 中的录制项自上次保存后没有修改，不再重新序列化比较。返回是否保存成功。
+        """
+        try:
+            changed = await asyncio.to_thread(self.recordings_store.save, config, unchanged_ids)
+            if changed:
+                logger.info(f"Recordings configuration saved ({changed} changed).")
+            return True
+        except Exception as e:
+            logger.error(f"An error occurred while saving recordings config: {e}")
+            return False
+
+    def close_recordings_store(self):
+        self.recordings_store.close()
 
     async def save_accounts_config(self, config):
         await self._save_config(
@@ -165,6 +216,22 @@ class ConfigManager:
             error_message="An error occurred while saving cookies config",
         )
 
+    async def save_transcode_queue_config(self, config):
+        await self._save_config(
+            self.transcode_queue_config_path,
+            config,
+            success_message="Transcode queue configuration saved.",
+            error_message="An error occurred while saving transcode queue config",
+        )
+
+    async def save_live_history_config(self, config):
+        await self._save_config(
+            self.live_history_config_path,
+            config,
+            success_message="Live history configuration saved.",
+            error_message="An error occurred while saving live history config",
+        )
+
     def get_config_value(self, key: str, default: Any = None):
         user_config = self.load_user_config()
         default_config = self.load_default_config()
@@ -220,9 +287,13 @@ class ConfigManager:
             logger.error(f"修复user_settings.json时发生错误: {e}")
 
     def _fix_recordings_config(self):
-        """修复recordings.json中缺失的配置项"""
+        """修复待迁移的recordings.json中缺失的配置项"""
+        if not os.path.exists(self.recordings_config_path):
+            return
         try:
-            recordings_config = self.load_recordings_config()
+            recordings_config = self._load_config(
+                self.recordings_config_path, "An error occurred while loading recordings config"
+            )
             
             # 如果配置为空或不是列表，初始化为空列表
             if not isinstance(recordings_config, list):
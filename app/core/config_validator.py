@@ -139,9 +139,19 @@ class ConfigValidator:
             return
             
         #logger.info("正在更新录制项以使用有效配置...")
-        recordings = self.app.record_manager.recordings
+        if self.fix_recordings(self.app.record_manager.recordings, fixed_items):
+            # 保存更新后的录制项
+            self.app.page.run_task(self.app.record_manager.persist_recordings)
+            #logger.info("已更新录制项以使用有效配置")
+
+    def fix_recordings(self, recordings, fixed_items: List[Tuple[str, str, str]]) -> bool:
+        """
+        把录制项中无效的格式和分段时间改为修复后的配置
+
+        Returns:
+            bool: 是否有录制项被修改
+        """
         updated = False
-        
         for key, _, new_value in fixed_items:
             if key in ("video_format", "audio_format"):
                 media_type = "video" if key == "video_format" else "audio"
@@ -163,11 +173,7 @@ class ConfigValidator:
                     except (ValueError, TypeError):
                         recording.segment_time = new_value
                         updated = True
-        
-        if updated:
-            # 保存更新后的录制项
-            self.app.page.run_task(self.app.record_manager.persist_recordings)
-            #logger.info("已更新录制项以使用有效配置")
+        return updated
             
     async def update_recording_cards(self) -> None:
         """
@@ -179,6 +185,6 @@ class ConfigValidator:
         #logger.info("正在更新所有录制卡片显示...")
         
         for recording in self.app.record_manager.recordings:
-            await self.app.record_card_manager.update_card(recording)
+            self.app.record_card_manager.request_update(recording, force=True)
             
         #logger.info("录制卡片显示更新完成") 
\ No newline at end of file
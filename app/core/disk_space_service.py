@@ -0,0 +1,136 @@
+import asyncio
+import os
+import shutil
+import time
+
+from cachetools import LRUCache
+
+from ..utils.logger import logger
+
+# 同一挂载点两次实际查询磁盘容量之间的最小间隔（秒）
+DEFAULT_PROBE_TTL = 5.0
+# 按路径缓存挂载点的最大条目数，录制文件路径随分段不断变化，超出后淘汰最久未使用的路径
+MOUNT_POINT_CACHE_SIZE = 1024
+
+GB = 1024 ** 3
+
+
+class VolumeStatus:
+    """单个卷的容量快照和当前写入速度"""
+
+    def __init__(self, mount_point: str, total: int, used: int, free: int, write_rate: float):
+        self.mount_point = mount_point
+        self.total = total
+        self.used = used
+        self.free = free
+        self.write_rate = write_rate
+
+    @property
+    def free_gb(self) -> float:
+        return self.free / GB
+
+    @property
+    def total_gb(self) -> float:
+        return self.total / GB
+
+    @property
+    def used_gb(self) -> float:
+        return self.used / GB
+
+    def seconds_until(self, threshold_gb: float) -> float | None:
+        """按当前写入速度预测剩余空间降到阈值所需的秒数，没有写入时返回None"""
+        headroom = self.free - threshold_gb * GB
+        if headroom <= 0:
+            return 0.0
+        if self.write_rate <= 0:
+            return None
+        return headroom / self.write_rate
+
+
+class DiskSpaceService:
+    """磁盘空间服务
+
+    按挂载点缓存容量查询结果，短时间内的重复检查不再访问磁盘；汇总所有ffmpeg录制进程的
+    写入速度，按卷预测剩余空间降到阈值的时间，使录制可以在越过阈值之前暂停。
+    预测只使用当前的写入速度，写入速度下降后预测随之解除。
+    """
+
+    def __init__(self, app, probe_ttl: float = DEFAULT_PROBE_TTL):
+        self.app = app
+        self.probe_ttl = probe_ttl
+        self.mount_points = LRUCache(maxsize=MOUNT_POINT_CACHE_SIZE)
+        self.probes = {}
+        self.writers = {}
+
+    @staticmethod
+    def find_mount_point(path: str) -> str:
+        path = os.path.abspath(path)
+        # 录制目录可能尚未创建，从最近的已存在上级目录开始查找
+        while not os.path.exists(path):
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+        while not os.path.ismount(path):
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+        return path
+
+    def get_mount_point(self, path: str) -> str:
+        """返回目录或文件所在卷的挂载点，结果按路径缓存"""
+        mount_point = self.mount_points.get(path)
+        if mount_point is None:
+            absolute_path = os.path.abspath(path)
+            if not os.path.isdir(absolute_path):
+                absolute_path = os.path.dirname(absolute_path)
+            mount_point = self.find_mount_point(absolute_path)
+            self.mount_points[path] = mount_point
+        return mount_point
+
+    def _cached_usage(self, mount_point: str):
+        cached = self.probes.get(mount_point)
+        if cached and time.monotonic() - cached[0] < self.probe_ttl:
+            return cached[1]
+        return None
+
+    def _probe_usage(self, mount_point: str):
+        usage = shutil.disk_usage(mount_point)
+        self.probes[mount_point] = (time.monotonic(), usage)
+        return usage
+
+    def probe(self, path: str) -> VolumeStatus:
+        mount_point = self.get_mount_point(path)
+        usage = self._cached_usage(mount_point) or self._probe_usage(mount_point)
+        return VolumeStatus(mount_point, usage.total, usage.used, usage.free, self.get_write_rate(mount_point))
+
+    async def probe_async(self, path: str) -> VolumeStatus:
+        """缓存过期时在工作线程中查询，避免网络盘等慢速卷阻塞事件循环"""
+        mount_point = self.get_mount_point(path)
+        usage = self._cached_usage(mount_point)
+        if usage is None:
+            usage = await asyncio.to_thread(self._probe_usage, mount_point)
+        return VolumeStatus(mount_point, usage.total, usage.used, usage.free, self.get_write_rate(mount_point))
+
+    def invalidate(self, path: str | None = None):
+        if path is None:
+            self.probes.clear()
+        else:
+            self.probes.pop(self.get_mount_point(path), None)
+
+    def update_write_rate(self, writer, path: str, bytes_per_sec: float):
+        """记录单个录制进程写入 path 所在卷的速度"""
+        try:
+            mount_point = self.get_mount_point(path)
+        except (OSError, ValueError) as e:
+            logger.debug(f"无法确定录制文件所在的卷: {path}, {e}")
+            return
+        self.writers[writer] = (mount_point, max(0.0, bytes_per_sec))
+
+    def remove_writer(self, writer):
+        self.writers.pop(writer, None)
+
+    def get_write_rate(self, mount_point: str) -> float:
+        """卷的当前写入速度：所有写入该卷的录制进程的速度之和"""
+        return sum(rate for mount, rate in self.writers.values() if mount == mount_point)
@@ -36,6 +36,9 @@ class FFmpegCommandBuilder(abc.ABC):
         full_path: str | None = None,
         headers: str | None = None,
         proxy: str | None = None,
+        snapshot_path: str | None = None,
+        snapshot_interval: int = 60,
+        snapshot_size: tuple[int, int] = (230, 120),
     ):
         """
         Initializes the FFmpegCommandBuilder.
@@ -47,6 +50,9 @@ class FFmpegCommandBuilder(abc.ABC):
         :param full_path: Full path where the output file will be saved.
         :param headers: Additional headers to include in the request.
         :param proxy: Proxy server URL to use for the connection.
+        :param snapshot_path: Path of a JPEG snapshot refreshed periodically as a secondary output (video only).
+        :param snapshot_interval: Seconds between two snapshots.
+        :param snapshot_size: Width and height of the snapshot.
         """
         self.record_url = record_url
         self.is_overseas = is_overseas
@@ -55,6 +61,9 @@ class FFmpegCommandBuilder(abc.ABC):
         self.full_path = full_path or ""
         self.proxy = proxy or ""
         self.headers = headers or ""
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = max(1, int(snapshot_interval))
+        self.snapshot_size = snapshot_size
 
     @abc.abstractmethod
     def build_command(self) -> list[str]:
@@ -101,4 +110,29 @@ class FFmpegCommandBuilder(abc.ABC):
             command.insert(1, "-http_proxy")
             command.insert(2, self.proxy)
 
+        if self.snapshot_path:
+            # Only keyframes are decoded for the snapshot output; stream copy outputs are unaffected
+            input_index = command.index("-i")
+            command[input_index:input_index] = ["-skip_frame", "nokey"]
+
         return command
+
+    def _get_snapshot_output(self) -> list[str]:
+        """
+        Constructs a secondary output that overwrites a low resolution JPEG snapshot periodically.
+        Must be appended after the main output so that its options do not apply to the recording.
+
+        :return: List of strings representing the snapshot output, empty if snapshots are disabled.
+        """
+        if not self.snapshot_path:
+            return []
+        width, height = self.snapshot_size
+        return [
+            "-map", "0:v:0",
+            "-an",
+            "-vf", f"fps=1/{self.snapshot_interval},scale={width}:{height}",
+            "-q:v", "5",
+            "-f", "image2",
+            "-update", "1",
+            self.snapshot_path,
+        ]
@@ -13,4 +13,5 @@ class FLVCommandBuilder(FFmpegCommandBuilder):
             self.full_path,
         ]
         command.extend(additional_commands)
+        command.extend(self._get_snapshot_output())
         return command
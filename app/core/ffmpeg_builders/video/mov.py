@@ -29,4 +29,5 @@ class MOVCommandBuilder(FFmpegCommandBuilder):
             ]
 
         command.extend(additional_commands)
+        command.extend(self._get_snapshot_output())
         return command
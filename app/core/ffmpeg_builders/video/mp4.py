@@ -27,4 +27,5 @@ class MP4CommandBuilder(FFmpegCommandBuilder):
             ]
 
         command.extend(additional_commands)
+        command.extend(self._get_snapshot_output())
         return command
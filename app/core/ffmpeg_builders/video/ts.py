@@ -25,4 +25,5 @@ class TSCommandBuilder(FFmpegCommandBuilder):
             ]
 
         command.extend(additional_commands)
+        command.extend(self._get_snapshot_output())
         return command
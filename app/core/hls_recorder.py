@@ -0,0 +1,362 @@
+import asyncio
+import itertools
+import os
+import time
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from ..utils.http_client import get_http_client
+from ..utils.logger import logger
+
+# 原生录制支持直接写入的格式，mp4 先录制为 ts，结束后再用 ffmpeg 转封装
+NATIVE_FORMATS = ("ts", "mp4")
+# 直播列表首次拉取时从倒数第几个分片开始录制，与 ffmpeg 的 live_start_index 默认值一致
+LIVE_START_SEGMENTS = 3
+# 每个直播间同时下载的分片数
+SEGMENT_CONCURRENCY = 3
+# 单个分片下载失败后的重试次数，重试时从已收到的字节处续传
+SEGMENT_RETRIES = 3
+# 播放列表拉取失败后的重试间隔（秒）
+PLAYLIST_RETRY_INTERVAL = 2
+# 播放列表持续不可用多久后认为直播已结束（秒），与 ffmpeg 的 -reconnect_delay_max 一致
+PLAYLIST_GIVE_UP_AFTER = 60
+# 录制正常结束和被中断时的退出码，与 ffmpeg 相同
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_INTERRUPTED = 255
+
+
+class HlsUnsupportedError(Exception):
+    """播放列表使用了原生录制不支持的特性，需要改用 ffmpeg 录制"""
+
+
+class HlsSegment:
+    __slots__ = ("sequence", "uri", "duration", "discontinuity")
+
+    def __init__(self, sequence: int, uri: str, duration: float, discontinuity: bool = False):
+        self.sequence = sequence
+        self.uri = uri
+        self.duration = duration
+        self.discontinuity = discontinuity
+
+
+class HlsPlaylist:
+    """m3u8 播放列表，只解析录制需要的标签"""
+
+    def __init__(self):
+        self.target_duration = 6.0
+        self.media_sequence = 0
+        self.segments = []
+        self.variants = []
+        self.ended = False
+        self.unsupported = None
+
+    @classmethod
+    def parse(cls, text: str, base_url: str) -> "HlsPlaylist":
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if not lines or not lines[0].startswith("#EXTM3U"):
+            raise ValueError("不是有效的m3u8播放列表")
+
+        playlist = cls()
+        duration = None
+        bandwidth = None
+        discontinuity = False
+        for line in lines[1:]:
+            if not line.startswith("#"):
+                uri = urljoin(base_url, line)
+                if bandwidth is not None:
+                    playlist.variants.append((bandwidth, uri))
+                    bandwidth = None
+                elif duration is not None:
+                    sequence = playlist.media_sequence + len(playlist.segments)
+                    playlist.segments.append(HlsSegment(sequence, uri, duration, discontinuity))
+                    duration = None
+                    discontinuity = False
+                continue
+
+            tag, _, value = line.partition(":")
+            if tag == "#EXTINF":
+                duration = float(value.split(",", 1)[0] or 0)
+            elif tag == "#EXT-X-STREAM-INF":
+                bandwidth = cls._get_attribute(value, "BANDWIDTH")
+                bandwidth = int(bandwidth) if bandwidth and bandwidth.isdigit() else 0
+            elif tag == "#EXT-X-TARGETDURATION":
+                playlist.target_duration = float(value)
+            elif tag == "#EXT-X-MEDIA-SEQUENCE":
+                playlist.media_sequence = int(value)
+            elif tag == "#EXT-X-DISCONTINUITY":
+                discontinuity = True
+            elif tag == "#EXT-X-ENDLIST":
+                playlist.ended = True
+            elif tag == "#EXT-X-KEY" and cls._get_attribute(value, "METHOD") != "NONE":
+                playlist.unsupported = "加密分片"
+            elif tag == "#EXT-X-MAP":
+                playlist.unsupported = "fMP4分片"
+            elif tag == "#EXT-X-BYTERANGE":
+                playlist.unsupported = "字节范围分片"
+        return playlist
+
+    @staticmethod
+    def _get_attribute(value: str, name: str) -> str | None:
+        for item in value.split(","):
+            key, _, attribute = item.partition("=")
+            if key.strip() == name:
+                return attribute.strip().strip('"')
+        return None
+
+    def best_variant(self) -> str:
+        return max(self.variants, key=lambda variant: variant[0])[1]
+
+
+def is_hls_url(url: str) -> bool:
+    return urlsplit(url).path.lower().endswith(".m3u8")
+
+
+def parse_ffmpeg_headers(headers: str | None) -> dict:
+    """把 ffmpeg -headers 参数格式的请求头转换为字典"""
+    result = {}
+    for line in (headers or "").replace("\r", "\n").split("\n"):
+        key, _, value = line.partition(":")
+        if key.strip() and value.strip():
+            result[key.strip()] = value.strip()
+    return result
+
+
+class HlsRecorder:
+    """
+    进程内的 HLS 录制器
+
+    轮询 m3u8 播放列表，通过共享连接池并发下载新分片并按顺序直接写入磁盘，
+    不再为每个直播间启动一个只做数据拷贝的 ffmpeg 进程。对外提供与
+    asyncio.subprocess.Process 相同的 pid、returncode、wait、terminate、kill、communicate，
+    录制流程和录制监管器可以像对待 ffmpeg 进程一样处理它。
+
+    遇到 EXT-X-DISCONTINUITY 或媒体序号回退（推流重新开始）时切换到新文件，
+    避免时间戳跳变导致转封装失败；播放列表暂时不可用时保留已录制位置，恢复后继续录制。
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        record_url: str,
+        save_path: str,
+        headers: dict | None = None,
+        proxy: str | None = None,
+        segment_record: bool = False,
+        segment_time: str | int | None = None,
+        client: httpx.AsyncClient | None = None,
+    ):
+        """
+        :param record_url: m3u8 地址
+        :param save_path: 输出路径，分段录制时包含 %03d 占位符
+        :param headers: 请求头
+        :param proxy: 代理地址
+        :param segment_record: 是否按时长分段保存
+        :param segment_time: 每段的时长（秒）
+        :param client: 使用的 HTTP 客户端，默认使用按代理共享的客户端
+        """
+        self.pid = f"hls-{next(self._ids)}"
+        self.stdin = None
+        self.returncode = None
+        self.record_url = record_url
+        self.save_path = save_path
+        self.headers = headers or {}
+        self.proxy = proxy
+        self.segment_record = segment_record and "%" in save_path
+        self.segment_time = float(segment_time or 1800)
+        self.client = client
+        self.files = []
+        self.bytes_written = 0
+        self.missed_segments = 0
+        self.error = None
+        self._path = None
+        self._file_duration = 0.0
+        self._stop_event = asyncio.Event()
+        self._task = None
+
+    async def start(self):
+        """拉取第一份播放列表确认可以原生录制后开始录制，不支持时抛出 HlsUnsupportedError"""
+        client = self.client or get_http_client(self.proxy)
+        url, playlist = await self._resolve_playlist(client, self.record_url)
+        self._task = asyncio.create_task(self._run(client, url, playlist))
+
+    async def _resolve_playlist(self, client: httpx.AsyncClient, url: str) -> tuple[str, HlsPlaylist]:
+        playlist = await self._fetch_playlist(client, url)
+        if playlist.variants:
+            url = playlist.best_variant()
+            playlist = await self._fetch_playlist(client, url)
+        if playlist.unsupported:
+            raise HlsUnsupportedError(playlist.unsupported)
+        return url, playlist
+
+    async def _fetch_playlist(self, client: httpx.AsyncClient, url: str) -> HlsPlaylist:
+        response = await client.get(url, headers=self.headers, follow_redirects=True)
+        response.raise_for_status()
+        return HlsPlaylist.parse(response.text, str(response.url))
+
+    async def wait(self) -> int:
+        try:
+            await asyncio.shield(self._task)
+        except asyncio.CancelledError:
+            if not self._task.cancelled():
+                raise
+        return self.returncode
+
+    def terminate(self):
+        """写完正在下载的分片后停止"""
+        self._stop_event.set()
+
+    def kill(self):
+        self._stop_event.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def communicate(self) -> tuple[bytes, bytes]:
+        await self.wait()
+        return b"", (self.error or "").encode()
+
+    async def _run(self, client: httpx.AsyncClient, url: str, playlist: HlsPlaylist):
+        try:
+            await self._record(client, url, playlist)
+            self.returncode = EXIT_OK
+        except asyncio.CancelledError:
+            self.returncode = EXIT_INTERRUPTED
+            raise
+        except Exception as e:
+            self.error = str(e)
+            self.returncode = EXIT_ERROR
+        finally:
+            if self.missed_segments:
+                logger.warning(f"HLS录制跳过了 {self.missed_segments} 个无法下载的分片: {self.record_url}")
+
+    async def _record(self, client: httpx.AsyncClient, url: str, playlist: HlsPlaylist):
+        last_sequence = None
+        last_success = time.monotonic()
+        while True:
+            segments = playlist.segments
+            if last_sequence is None:
+                new_segments = segments if playlist.ended else segments[-LIVE_START_SEGMENTS:]
+            elif segments and segments[-1].sequence < last_sequence:
+                # 序号回退说明推流重新开始，时间戳不再连续
+                new_segments = segments
+                new_segments[0].discontinuity = True
+            else:
+                new_segments = [segment for segment in segments if segment.sequence > last_sequence]
+                if new_segments and new_segments[0].sequence > last_sequence + 1:
+                    self.missed_segments += new_segments[0].sequence - last_sequence - 1
+
+            if new_segments:
+                await self._download(client, new_segments)
+                last_sequence = new_segments[-1].sequence
+            if playlist.ended or self._stop_event.is_set():
+                return
+
+            # 有新分片时按目标时长刷新，否则半个目标时长后再试
+            delay = playlist.target_duration if new_segments else playlist.target_duration / 2
+            while True:
+                if await self._sleep(delay):
+                    return
+                try:
+                    playlist = await self._fetch_playlist(client, url)
+                    if playlist.unsupported:
+                        raise HlsUnsupportedError(playlist.unsupported)
+                    last_success = time.monotonic()
+                    break
+                except (httpx.HTTPError, ValueError) as e:
+                    if time.monotonic() - last_success > PLAYLIST_GIVE_UP_AFTER:
+                        logger.info(f"HLS播放列表持续不可用，结束录制: {e}")
+                        return
+                    delay = PLAYLIST_RETRY_INTERVAL
+
+    async def _sleep(self, delay: float) -> bool:
+        """等待指定时间，期间收到停止请求时返回 True"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _download(self, client: httpx.AsyncClient, segments: list[HlsSegment]):
+        semaphore = asyncio.Semaphore(SEGMENT_CONCURRENCY)
+
+        async def fetch(segment):
+            async with semaphore:
+                return await self._fetch_segment(client, segment)
+
+        tasks = [asyncio.create_task(fetch(segment)) for segment in segments]
+        try:
+            # 并发下载，按顺序写入
+            for segment, task in zip(segments, tasks):
+                data = await task
+                if data is None:
+                    self.missed_segments += 1
+                    continue
+                await self._write(segment, data)
+                if self._stop_event.is_set():
+                    return
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_segment(self, client: httpx.AsyncClient, segment: HlsSegment) -> bytes | None:
+        data = bytearray()
+        for attempt in range(SEGMENT_RETRIES + 1):
+            headers = dict(self.headers)
+            if data:
+                headers["Range"] = f"bytes={len(data)}-"
+            try:
+                async with client.stream("GET", segment.uri, headers=headers, follow_redirects=True) as response:
+                    response.raise_for_status()
+                    if data and response.status_code != 206:
+                        # 服务器不支持续传，重新下载整个分片
+                        data.clear()
+                    async for chunk in response.aiter_bytes():
+                        data.extend(chunk)
+                return bytes(data)
+            except httpx.HTTPError as e:
+                logger.debug(f"下载HLS分片失败（第{attempt + 1}次）: {segment.uri}, {e}")
+                if attempt < SEGMENT_RETRIES:
+                    await asyncio.sleep(0.5 * (attempt + 1))
+        return None
+
+    async def _write(self, segment: HlsSegment, data: bytes):
+        if (
+            self._path is None
+            or (segment.discontinuity and self._file_duration > 0)
+            or (self.segment_record and self._file_duration >= self.segment_time)
+        ):
+            await self._start_next_file()
+        await asyncio.to_thread(self._append, self._path, data)
+        self.bytes_written += len(data)
+        self._file_duration += segment.duration
+
+    def _next_path(self) -> str:
+        index = len(self.files)
+        if self.segment_record:
+            return self.save_path % index
+        if index == 0:
+            return self.save_path
+        root, ext = os.path.splitext(self.save_path)
+        return f"{root}_part{index}{ext}"
+
+    async def _start_next_file(self):
+        path = self._next_path()
+        await asyncio.to_thread(self._create, path)
+        self._path = path
+        self._file_duration = 0.0
+        self.files.append(path)
+
+    @staticmethod
+    def _create(path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # 新文件从空文件开始，之后的分片追加写入
+        with open(path, "wb"):
+            pass
+
+    @staticmethod
+    def _append(path: str, data: bytes):
+        # 每个分片写入时单独打开文件，录制任务被取消或出错时不会遗留打开的文件句柄
+        with open(path, "ab") as file:
+            file.write(data)
@@ -0,0 +1,357 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+
+from ..utils.logger import logger
+from .platform_handlers import get_recording_platform_info
+
+# 全局同时进行的直播状态检测数量上限
+DEFAULT_MAX_CONCURRENCY = 8
+# 每个平台每秒允许发起的检测次数及突发容量
+DEFAULT_PLATFORM_RATE = 2.0
+DEFAULT_PLATFORM_BURST = 4
+# 对频率限制较严格的平台单独限速
+PLATFORM_RATE_OVERRIDES = {
+    "douyin": (1.0, 2),
+    "huya": (1.0, 2),
+    "kuaishou": (0.5, 2),
+}
+# 周期检测时在 loop_time_seconds 基础上上下浮动的比例
+RESCHEDULE_JITTER_RATIO = 0.1
+# 批量查询时可提前合并的房间的到期时间范围（秒）
+BATCH_LOOKAHEAD_SECONDS = 30
+# 统计延迟时保留的样本数量
+LATENCY_SAMPLES = 200
+
+
+class TokenBucket:
+    """简单的令牌桶，用于限制单个平台的请求频率"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> float:
+        """获取一个令牌，成功返回0，否则返回需要等待的秒数"""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class LiveCheckScheduler:
+    """直播状态检测调度器
+
+    所有检测请求进入按到期时间排序的优先队列，由单个调度协程按平台令牌桶和全局并发上限
+    依次派发，避免周期检测时同时发出大量请求。支持批量查询的平台会把同时到期的房间合并为
+    一次状态查询，只有开播的房间才执行完整检测。检测完成后根据房间的检测间隔
+    自动安排下一次检测，并加入随机抖动使检测分散在整个周期内。
+    """
+
+    def __init__(self, record_manager):
+        self.record_manager = record_manager
+        self.app = record_manager.app
+        self._heap = []
+        # 可批量查询的房间另按平台各建一个堆，合并查询时不必扫描整个队列
+        self._platform_heaps = {}
+        self._due = {}
+        self._requested_due = {}
+        self._recordings = {}
+        self._platform_keys = {}
+        self._full_check = set()
+        self._buckets = {}
+        self._counter = itertools.count()
+        self._in_flight = set()
+        self._wakeup = None
+        self._slot_released = None
+        self._active_checks = 0
+        self._dispatcher_task = None
+        self._schedule_latency = deque(maxlen=LATENCY_SAMPLES)
+        self._check_duration = deque(maxlen=LATENCY_SAMPLES)
+        self._stats = {
+            "submitted": 0, "dispatched": 0, "throttled": 0, "failed": 0, "batches": 0, "batched_rooms": 0
+        }
+
+    @property
+    def max_concurrency(self) -> int:
+        try:
+            value = int(self.app.settings.user_config.get("live_check_max_concurrency", DEFAULT_MAX_CONCURRENCY))
+        except (TypeError, ValueError):
+            value = DEFAULT_MAX_CONCURRENCY
+        return max(1, value)
+
+    @property
+    def loop_time_seconds(self) -> int:
+        return self.record_manager.loop_time_seconds or 300
+
+    def _get_bucket(self, platform_key: str | None) -> TokenBucket:
+        key = platform_key or "unknown"
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, capacity = PLATFORM_RATE_OVERRIDES.get(key, (DEFAULT_PLATFORM_RATE, DEFAULT_PLATFORM_BURST))
+            bucket = self._buckets[key] = TokenBucket(rate, capacity)
+        return bucket
+
+    def _ensure_started(self):
+        if self._dispatcher_task is None or self._dispatcher_task.done():
+            self._wakeup = asyncio.Event()
+            self._slot_released = asyncio.Event()
+            self._dispatcher_task = asyncio.create_task(self._dispatch_loop())
+
+    def submit(self, recording, delay: float = 0.0, spread: bool = False, full_check: bool = False):
+        """提交检测请求
+
+        :param delay: 延迟多少秒后检测，0 表示尽快检测
+        :param spread: 为 True 时在 loop_time_seconds 周期内随机选择检测时间，用于批量检测
+        :param full_check: 为 True 时跳过批量状态查询，直接执行完整检测
+        """
+        if spread:
+            delay = random.uniform(0, self.loop_time_seconds)
+
+        rec_id = recording.rec_id
+        due_at = time.monotonic() + max(0.0, delay)
+        current_due = self._due.get(rec_id)
+        if rec_id in self._in_flight or (current_due is not None and current_due <= due_at):
+            if full_check and current_due is not None:
+                self._full_check.add(rec_id)
+            return
+
+        if full_check:
+            self._full_check.add(rec_id)
+        self._due[rec_id] = due_at
+        self._requested_due[rec_id] = due_at
+        self._recordings[rec_id] = recording
+        self._platform_keys[rec_id] = get_recording_platform_info(recording)[1]
+        self._push(rec_id, due_at, batchable=self.record_manager.get_live_check_batch_size(recording) > 1)
+        self._stats["submitted"] += 1
+        self._ensure_started()
+        self._wakeup.set()
+
+    def _push(self, rec_id: str, due_at: float, batchable: bool):
+        entry = (due_at, next(self._counter), rec_id)
+        heapq.heappush(self._heap, entry)
+        if batchable:
+            heapq.heappush(self._platform_heaps.setdefault(self._platform_keys.get(rec_id), []), entry)
+
+    async def _acquire_slot(self):
+        # 每次都读取当前的并发上限，修改设置后立即生效
+        while self._active_checks >= self.max_concurrency:
+            self._slot_released.clear()
+            await self._slot_released.wait()
+        self._active_checks += 1
+
+    def _release_slot(self):
+        self._active_checks -= 1
+        self._slot_released.set()
+
+    def is_scheduled(self, recording) -> bool:
+        return recording.rec_id in self._due or recording.rec_id in self._in_flight
+
+    def _reschedule(self, recording):
+        if not recording.monitor_status or recording.recording:
+            return
+        if self.record_manager.find_recording_by_id(recording.rec_id) is None:
+            return
+        loop_time = self.record_manager.get_poll_interval(recording)
+        jitter = loop_time * RESCHEDULE_JITTER_RATIO
+        self.submit(recording, delay=loop_time + random.uniform(-jitter, jitter))
+
+    async def _dispatch_loop(self):
+        while True:
+            try:
+                await self._dispatch_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"直播检测调度出错: {e}")
+                await asyncio.sleep(1)
+
+    def _peek(self):
+        # 丢弃已被取消或被更早的到期时间覆盖的旧条目
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    async def _dispatch_next(self):
+        entry = self._peek()
+        if entry is None:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+            return
+
+        wait_time = entry[0] - time.monotonic()
+        if wait_time > 0:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait_time)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        if not self.app.recording_enabled:
+            await asyncio.sleep(1)
+            return
+
+        await self._acquire_slot()
+        dispatched = False
+        try:
+            # 等待并发名额期间队列可能已变化，重新取队首
+            entry = self._peek()
+            if entry is None or entry[0] > time.monotonic():
+                return
+            due_at, _, rec_id = entry
+
+            recording = self._recordings.get(rec_id)
+            platform_key = self._platform_keys.get(rec_id)
+            retry_after = self._get_bucket(platform_key).try_acquire()
+            if retry_after > 0:
+                # 平台令牌不足，推迟到令牌恢复后再检测
+                self._stats["throttled"] += 1
+                new_due = time.monotonic() + retry_after
+                self._due[rec_id] = new_due
+                heapq.heappop(self._heap)
+                batchable = recording is not None and self.record_manager.get_live_check_batch_size(recording) > 1
+                self._push(rec_id, new_due, batchable=batchable)
+                return
+
+            heapq.heappop(self._heap)
+            if recording is None:
+                self._pop_entry(rec_id)
+                return
+
+            batch = [recording]
+            batch_size = 0
+            if rec_id not in self._full_check:
+                batch_size = self.record_manager.get_live_check_batch_size(recording)
+            if batch_size > 1:
+                batch.extend(self._collect_batch(platform_key, batch_size - 1, exclude=rec_id))
+
+            for batch_recording in batch:
+                self._pop_entry(batch_recording.rec_id)
+                self._in_flight.add(batch_recording.rec_id)
+            self._stats["dispatched"] += len(batch)
+
+            if batch_size > 1:
+                self._stats["batches"] += 1
+                self._stats["batched_rooms"] += len(batch)
+                asyncio.create_task(self._run_batch(batch))
+            else:
+                asyncio.create_task(self._run_check(recording))
+            dispatched = True
+        finally:
+            if not dispatched:
+                self._release_slot()
+
+    def _pop_entry(self, rec_id: str):
+        """从队列中移除条目并记录调度延迟"""
+        self._due.pop(rec_id, None)
+        self._recordings.pop(rec_id, None)
+        self._platform_keys.pop(rec_id, None)
+        self._full_check.discard(rec_id)
+        requested_due = self._requested_due.pop(rec_id, None)
+        if requested_due is not None:
+            # 延迟从最初期望的检测时间算起，包含因限速而推迟的时间
+            self._schedule_latency.append(max(0.0, time.monotonic() - requested_due))
+
+    def _collect_batch(self, platform_key: str | None, limit: int, exclude: str) -> list:
+        """收集同一平台即将到期、可以合并查询的其他房间"""
+        heap = self._platform_heaps.get(platform_key)
+        if not heap:
+            return []
+        deadline = time.monotonic() + BATCH_LOOKAHEAD_SECONDS
+        batch = []
+        while heap and len(batch) < limit and heap[0][0] <= deadline:
+            due_at, _, rec_id = heapq.heappop(heap)
+            # 跳过过期条目、队首房间和需要完整检测的房间，它们仍留在主队列中
+            if rec_id == exclude or self._due.get(rec_id) != due_at or rec_id in self._full_check:
+                continue
+            recording = self._recordings.get(rec_id)
+            if recording is not None and self.record_manager.get_live_check_batch_size(recording):
+                batch.append(recording)
+        return batch
+
+    async def _run_batch(self, recordings: list):
+        started_at = time.monotonic()
+        need_full_check = recordings
+        try:
+            need_full_check = await self.record_manager.check_if_live_batch(recordings)
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.error(f"批量直播状态检测失败: {e}")
+        finally:
+            self._check_duration.append(time.monotonic() - started_at)
+            for recording in recordings:
+                self._in_flight.discard(recording.rec_id)
+            self._release_slot()
+
+        full_check_ids = {recording.rec_id for recording in need_full_check}
+        for recording in recordings:
+            if recording.rec_id in full_check_ids:
+                self.submit(recording, full_check=True)
+            else:
+                self._reschedule(recording)
+
+    async def _run_check(self, recording):
+        started_at = time.monotonic()
+        try:
+            await self.record_manager.check_if_live(recording)
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.error(f"直播状态检测失败: {recording.url}, {e}")
+        finally:
+            self._check_duration.append(time.monotonic() - started_at)
+            self._in_flight.discard(recording.rec_id)
+            self._release_slot()
+            self._reschedule(recording)
+
+    def remove(self, recording):
+        """取消尚未执行的检测"""
+        self._due.pop(recording.rec_id, None)
+        self._requested_due.pop(recording.rec_id, None)
+        self._recordings.pop(recording.rec_id, None)
+        self._platform_keys.pop(recording.rec_id, None)
+        self._full_check.discard(recording.rec_id)
+
+    @staticmethod
+    def _summarize(samples) -> dict:
+        if not samples:
+            return {"avg": 0.0, "max": 0.0, "p95": 0.0}
+        ordered = sorted(samples)
+        return {
+            "avg": round(sum(ordered) / len(ordered), 3),
+            "max": round(ordered[-1], 3),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        }
+
+    def get_metrics(self) -> dict:
+        now = time.monotonic()
+        overdue = sum(1 for due_at in self._due.values() if due_at <= now)
+        return {
+            **self._stats,
+            "queue_depth": len(self._due),
+            "overdue": overdue,
+            "in_flight": len(self._in_flight),
+            "max_concurrency": self.max_concurrency,
+            "schedule_latency": self._summarize(self._schedule_latency),
+            "check_duration": self._summarize(self._check_duration),
+        }
+
+    async def shutdown(self):
+        if self._dispatcher_task and not self._dispatcher_task.done():
+            self._dispatcher_task.cancel()
+            try:
+                await self._dispatcher_task
+            except asyncio.CancelledError:
+                pass
+        self._dispatcher_task = None
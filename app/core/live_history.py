@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+HOURS_PER_WEEK = 7 * 24
+# 开播记录少于该数量时不调整检测间隔
+MIN_HISTORY_EVENTS = 3
+# 单个房间累计记录超过该数量时整体减半，让旧的开播规律逐渐淡出
+MAX_HISTORY_EVENTS = 200
+# 当前时段开播次数占比达到该比例时视为常规开播时段
+HOT_SLOT_RATIO = 0.1
+# 默认的最短与最长检测间隔（秒）
+DEFAULT_MIN_INTERVAL = 20
+DEFAULT_MAX_INTERVAL = 1800
+# 冷门时段检测间隔相对于基础间隔的倍数
+COLD_INTERVAL_FACTOR = 4
+
+
+class LiveHistoryManager:
+    """根据主播历史开播时间调整检测间隔
+
+    每个房间按 星期×小时 记录开播次数，临近常规开播时间时缩短检测间隔，
+    在从未开播过的时段延长检测间隔，历史记录不足时保持原有的 loop_time_seconds。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.settings = app.settings
+        self.histograms = {}
+        self.load()
+
+    def load(self):
+        history_config = self.app.config_manager.load_live_history_config()
+        if not isinstance(history_config, dict):
+            return
+        for rec_id, histogram in history_config.items():
+            if isinstance(histogram, list) and len(histogram) == HOURS_PER_WEEK:
+                self.histograms[rec_id] = [int(count) for count in histogram]
+
+    async def save(self):
+        await self.app.config_manager.save_live_history_config(self.histograms)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.settings.user_config.get("adaptive_polling_enabled", True))
+
+    def _get_interval_setting(self, key: str, default: int) -> int:
+        try:
+            return max(1, int(self.settings.user_config.get(key, default)))
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def _slot(moment: datetime) -> int:
+        return moment.weekday() * 24 + moment.hour
+
+    def record_live_start(self, recording, start_time: datetime | None = None):
+        """记录一次开播"""
+        start_time = start_time or datetime.now()
+        histogram = self.histograms.setdefault(recording.rec_id, [0] * HOURS_PER_WEEK)
+        histogram[self._slot(start_time)] += 1
+
+        if sum(histogram) > MAX_HISTORY_EVENTS:
+            self.histograms[recording.rec_id] = [count // 2 for count in histogram]
+
+        self.app.page.run_task(self.save)
+
+    def remove(self, rec_id: str):
+        if self.histograms.pop(rec_id, None) is not None:
+            self.app.page.run_task(self.save)
+
+    def get_poll_interval(self, recording, base_interval: int, now: datetime | None = None) -> int:
+        """返回当前时段该房间应使用的检测间隔"""
+        # 已开播的房间只需确认是否下播，保持原有间隔
+        if not self.enabled or recording.is_live:
+            return base_interval
+
+        histogram = self.histograms.get(recording.rec_id)
+        total = sum(histogram) if histogram else 0
+        if total < MIN_HISTORY_EVENTS:
+            return base_interval
+
+        now = now or datetime.now()
+        current_slot = self._slot(now)
+        next_slot = self._slot(now + timedelta(hours=1))
+
+        # 同一星期同一时段（含下一小时）的开播次数
+        weekly_score = histogram[current_slot] + histogram[next_slot]
+        # 不区分星期的同一时段开播次数，适用于每天固定时间开播的主播
+        hours = {now.hour, (now + timedelta(hours=1)).hour}
+        daily_score = sum(histogram[day * 24 + hour] for day in range(7) for hour in hours)
+
+        if weekly_score / total >= HOT_SLOT_RATIO or daily_score / total >= HOT_SLOT_RATIO * 3:
+            min_interval = self._get_interval_setting("adaptive_poll_min_seconds", DEFAULT_MIN_INTERVAL)
+            return min(base_interval, min_interval)
+
+        nearby_hours = hours | {(now - timedelta(hours=1)).hour}
+        nearby_score = sum(histogram[day * 24 + hour] for day in range(7) for hour in nearby_hours)
+        if nearby_score == 0:
+            max_interval = self._get_interval_setting("adaptive_poll_max_seconds", DEFAULT_MAX_INTERVAL)
+            return max(base_interval, min(base_interval * COLD_INTERVAL_FACTOR, max_interval))
+
+        return base_interval
+
+    def get_stats(self, rec_id: str) -> dict:
+        histogram = self.histograms.get(rec_id)
+        if not histogram:
+            return {"events": 0, "top_slots": []}
+        top_slots = sorted(
+            ((count, slot) for slot, count in enumerate(histogram) if count), reverse=True
+        )[:5]
+        return {
+            "events": sum(histogram),
+            "top_slots": [{"weekday": slot // 24, "hour": slot % 24, "count": count} for count, slot in top_slots],
+        }
@@ -1,3 +1,6 @@
+import functools
+import re
+
 from ...utils.logger import logger
 from .base import PlatformHandler, StreamData
 from .handlers import (
@@ -68,66 +71,107 @@ def get_platform_handler(
     return None
 
 
+# URL特征 -> (平台名称, 平台代码)，按优先级排列，URL中包含特征字符串即视为匹配
+PLATFORM_RULES: tuple[tuple[str, str, str], ...] = (
+    ("douyin.com/", "抖音直播", "douyin"),
+    ("https://www.tiktok.com/", "TikTok直播", "tiktok"),
+    ("https://live.kuaishou.com/", "快手直播", "kuaishou"),
+    ("https://www.huya.com/", "虎牙直播", "huya"),
+    ("https://www.douyu.com/", "斗鱼直播", "douyu"),
+    ("https://www.yy.com/", "YY直播", "yy"),
+    ("https://live.bilibili.com/", "B站直播", "bilibili"),
+    ("https://www.xiaohongshu.com/", "小红书直播", "xiaohongshu"),
+    ("xhslink.com/", "小红书直播", "xhs"),
+    ("https://www.bigo.tv/", "Bigo直播", "bigo"),
+    ("https://app.blued.cn/", "Blued直播", "blued"),
+    ("sooplive.co.kr/", "SOOP", "soop"),
+    ("cc.163.com/", "网易CC直播", "netease"),
+    ("qiandurebo.com/", "千度热播", "qiandurebo"),
+    ("pandalive.co.kr/", "PandaTV", "pandalive"),
+    ("fm.missevan.com/", "猫耳FM直播", "maoerfm"),
+    ("winktv.co.kr/", "WinkTV", "winktv"),
+    ("ttinglive.com/", "TtingLive", "ttinglive"),
+    ("look.163.com/", "Look直播", "look"),
+    ("popkontv.com/", "PopkonTV", "popkontv"),
+    ("twitcasting.tv/", "TwitCasting", "twitcasting"),
+    ("live.baidu.com/", "百度直播", "baidu"),
+    ("weibo.com/", "微博直播", "weibo"),
+    ("kugou.com/", "酷狗直播", "kugou"),
+    ("twitch.tv/", "TwitchTV", "twitch"),
+    ("liveme.com/", "LiveMe", "liveme"),
+    ("huajiao.com/", "花椒直播", "huajiao"),
+    ("7u66.com/", "流星直播", "liuxing"),
+    ("showroom-live.com/", "ShowRoom", "showroom"),
+    ("live.acfun.cn/", "Acfun", "acfun"),
+    ("tlclw.com/", "畅聊直播", "changliao"),
+    ("ybw1666.com/", "音播直播", "yingbo"),
+    ("inke.cn/", "映客直播", "inke"),
+    ("zhihu.com/", "知乎直播", "zhihu"),
+    ("chzzk.naver.com/", "CHZZK", "chzzk"),
+    ("haixiutv.com/", "嗨秀直播", "haixiu"),
+    ("vvxqiu.com/", "VV星球", "vvxq"),
+    ("17.live/", "17Live", "17live"),
+    ("lang.live/", "浪Live", "lang"),
+    ("m.pp.weimipopo.com/", "漂漂直播", "piaopiao"),
+    (".6.cn/", "六间房直播", "6room"),
+    ("lehaitv.com/", "乐嗨直播", "lehai"),
+    ("h.catshow168.com/", "花猫直播", "catshow"),
+    ("live.shopee", "shopee", "shopee"),
+    (".shp.", "shopee", "shopee"),
+    ("youtube.com/", "Youtube", "youtube"),
+    ("tb.cn", "淘宝直播", "taobao"),
+    ("3.cn", "京东直播", "jd"),
+    ("faceit.com", "faceit", "faceit"),
+    (".m3u8", "自定义录制直播", "custom"),
+    (".flv", "自定义录制直播", "custom"),
+)
+_PLATFORM_KEYS = tuple(rule[0] for rule in PLATFORM_RULES)
+_PLATFORM_KEY_INDEX = {key: index for index, key in enumerate(_PLATFORM_KEYS)}
+_PLATFORM_REGEX = re.compile("|".join(re.escape(key) for key in _PLATFORM_KEYS))
+
+
+def _match_platform_rule(record_url: str) -> int | None:
+    """返回URL命中的优先级最高的平台规则下标"""
+    matched = _PLATFORM_REGEX.findall(record_url)
+    if not matched:
+        return None
+    best = min(_PLATFORM_KEY_INDEX[key] for key in matched)
+    # findall 的结果互不重叠，与已匹配片段重叠的更高优先级特征需要单独确认
+    for index in range(best):
+        if _PLATFORM_KEYS[index] in record_url:
+            return index
+    return best
+
+
+@functools.lru_cache(maxsize=16384)
+def _resolve_platform(record_url: str, registry_version: int) -> tuple:
+    index = _match_platform_rule(record_url)
+    platform, platform_key = PLATFORM_RULES[index][1:] if index is not None else (None, None)
+    return platform, platform_key, PlatformHandler._get_handler_class(record_url)
+
+
+def resolve_platform(record_url: str) -> tuple:
+    """
+    一次解析返回 (平台名称, 平台代码, 处理器类)，结果按URL缓存
+    """
+    if not record_url:
+        return None, None, None
+    return _resolve_platform(record_url, PlatformHandler.get_registry_version())
+
+
 def get_platform_info(record_url: str) -> tuple:
-    platform_map = {
-        "douyin.com/": ("抖音直播", "douyin"),
-        "https://www.tiktok.com/": ("TikTok直播", "tiktok"),
-        "https://live.kuaishou.com/": ("快手直播", "kuaishou"),
-        "https://www.huya.com/": ("虎牙直播", "huya"),
-        "https://www.douyu.com/": ("斗鱼直播", "douyu"),
-        "https://www.yy.com/": ("YY直播", "yy"),
-        "https://live.bilibili.com/": ("B站直播", "bilibili"),
-        "https://www.xiaohongshu.com/": ("小红书直播", "xiaohongshu"),
-        "xhslink.com/": ("小红书直播", "xhs"),
-        "https://www.bigo.tv/": ("Bigo直播", "bigo"),
-        "https://app.blued.cn/": ("Blued直播", "blued"),
-        "sooplive.co.kr/": ("SOOP", "soop"),
-        "cc.163.com/": ("网易CC直播", "netease"),
-        "qiandurebo.com/": ("千度热播", "qiandurebo"),
-        "pandalive.co.kr/": ("PandaTV", "pandalive"),
-        "fm.missevan.com/": ("猫耳FM直播", "maoerfm"),
-        "winktv.co.kr/": ("WinkTV", "winktv"),
-        "ttinglive.com/": ("TtingLive", "ttinglive"),
-        "look.163.com/": ("Look直播", "look"),
-        "popkontv.com/": ("PopkonTV", "popkontv"),
-        "twitcasting.tv/": ("TwitCasting", "twitcasting"),
-        "live.baidu.com/": ("百度直播", "baidu"),
-        "weibo.com/": ("微博直播", "weibo"),
-        "kugou.com/": ("酷狗直播", "kugou"),
-        "twitch.tv/": ("TwitchTV", "twitch"),
-        "liveme.com/": ("LiveMe", "liveme"),
-        "huajiao.com/": ("花椒直播", "huajiao"),
-        "7u66.com/": ("流星直播", "liuxing"),
-        "showroom-live.com/": ("ShowRoom", "showroom"),
-        "live.acfun.cn/": ("Acfun", "acfun"),
-        "tlclw.com/": ("畅聊直播", "changliao"),
-        "ybw1666.com/": ("音播直播", "yingbo"),
-        "inke.cn/": ("映客直播", "inke"),
-        "zhihu.com/": ("知乎直播", "zhihu"),
-        "chzzk.naver.com/": ("CHZZK", "chzzk"),
-        "haixiutv.com/": ("嗨秀直播", "haixiu"),
-        "vvxqiu.com/": ("VV星球", "vvxq"),
-        "17.live/": ("17Live", "17live"),
-        "lang.live/": ("浪Live", "lang"),
-        "m.pp.weimipopo.com/": ("漂漂直播", "piaopiao"),
-        ".6.cn/": ("六间房直播", "6room"),
-        "lehaitv.com/": ("乐嗨直播", "lehai"),
-        "h.catshow168.com/": ("花猫直播", "catshow"),
-        "live.shopee": ("shopee", "shopee"),
-        ".shp.": ("shopee", "shopee"),
-        "youtube.com/": ("Youtube", "youtube"),
-        "tb.cn": ("淘宝直播", "taobao"),
-        "3.cn": ("京东直播", "jd"),
-        "faceit.com": ("faceit", "faceit"),
-        ".m3u8": ("自定义录制直播", "custom"),
-        ".flv": ("自定义录制直播", "custom"),
-    }
-
-    for key, value in platform_map.items():
-        if key in record_url:
-            return value[0], value[1]
-
-    return None, None
+    return resolve_platform(record_url)[:2]
+
+
+def get_recording_platform_info(recording) -> tuple:
+    """
+    获取录制项的 (平台名称, 平台代码)，解析结果缓存在录制项上，URL变化时自动失效
+    """
+    resolution = getattr(recording, "platform_resolution", None)
+    if resolution is None:
+        resolution = resolve_platform(recording.url)
+        recording.platform_resolution = resolution
+    return resolution[:2]
 
 
 __all__ = [
@@ -142,6 +186,7 @@ __all__ = [
     "FaceitHandler",
     "get_platform_handler",
     "get_platform_info",
+    "get_recording_platform_info",
     "HaixiuHandler",
     "HuajiaoHandler",
     "HuamaoHandler",
@@ -160,8 +205,10 @@ __all__ = [
     "PiaopiaoHandler",
     "PlatformHandler",
     "PopkonTVHandler",
+    "PLATFORM_RULES",
     "QiandureboHandler",
     "RedNoteHandler",
+    "resolve_platform",
     "ShopeeHandler",
     "ShowRoomHandlerHandler",
     "SixRoomHandler",
@@ -1,14 +1,15 @@
 import abc
+import asyncio
 import inspect
 import re
 import threading
-import weakref
-import gc
 import time
+from collections import OrderedDict
 from typing import Any, Optional, TypeVar
 
 from streamget import StreamData as OriginalStreamData
-from ...utils.logger import logger
+from ...utils.http_client import get_http_client
+from ...utils.logger import logger, memory_logger
 
 # 扩展StreamData类，添加get方法以避免'str' object has no attribute 'get'错误
 class StreamData(OriginalStreamData):
@@ -19,18 +20,92 @@ class StreamData(OriginalStreamData):
         return default
 
 T = TypeVar("T", bound="PlatformHandler")
-InstanceKey = tuple[str | None, tuple[tuple[str, str], ...] | None, str, str | None]
+InstanceKey = tuple[type, str | None, str | None, str | None, str | None]
+
+
+class HandlerInstanceCache:
+    """
+    平台处理器实例的LRU缓存，同时按最后访问时间过期。
+
+    命中时只需将条目移动到末尾（O(1)），超出容量时淘汰最久未使用的实例，
+    过期条目总是位于队首，清理时从队首依次弹出即可，无需遍历全部实例，也不依赖垃圾回收。
+    """
+
+    def __init__(self, max_size: int = 128, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[InstanceKey, list] = OrderedDict()  # key -> [实例, 最后访问时间]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0    # 因容量不足被淘汰的实例数
+        self.expirations = 0  # 因长时间未使用被移除的实例数
+
+    def get_or_create(self, key: InstanceKey, factory):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    entry[1] = now
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self.expirations += 1
+
+            self.misses += 1
+            instance = factory()
+            self._entries[key] = [instance, now]
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return instance
+
+    def purge_expired(self) -> int:
+        """移除所有过期实例，返回移除数量"""
+        deadline = time.monotonic() - self.ttl
+        removed = 0
+        with self._lock:
+            while self._entries:
+                key, entry = next(iter(self._entries.items()))
+                if entry[1] >= deadline:
+                    break
+                del self._entries[key]
+                removed += 1
+            self.expirations += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "current_count": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
 
 
 class PlatformHandler(abc.ABC):
     _registry: dict[str, type["PlatformHandler"]] = {}
-    _instances: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
-    _instance_last_used: dict[InstanceKey, float] = {}  # 记录实例最后使用时间
+    _registry_version = 0
+    _compiled_patterns: list[tuple[Any, type["PlatformHandler"]]] | None = None
     _lock: threading.Lock = threading.Lock()
-    _instance_creation_count = 0  # 跟踪创建的实例总数
-    _instance_access_count = 0    # 跟踪访问实例的次数
-    _INACTIVE_THRESHOLD = 300    # 5分钟不活跃的实例将被标记为可清理
-    _active_instances = {}       # 强引用字典，防止实例被过早回收
+    _INSTANCE_CACHE_SIZE = 128    # 最多缓存的处理器实例数
+    _INACTIVE_THRESHOLD = 300    # 5分钟未使用的实例将被移除
+    _instance_cache = HandlerInstanceCache(_INSTANCE_CACHE_SIZE, _INACTIVE_THRESHOLD)
 
     def __init__(
         self,
@@ -61,6 +136,67 @@ class PlatformHandler(abc.ABC):
         """
         pass
 
+    # 支持批量查询开播状态的平台将 supports_batch 设为 True 并重写 get_stream_info_batch
+    supports_batch: bool = False
+    batch_size: int = 50
+    BATCH_USER_AGENT = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/91.0.4472.124 Safari/537.36"
+    )
+
+    async def get_stream_info_batch(self, live_urls: list[str]) -> dict[str, StreamData]:
+        """
+        批量获取多个直播间的开播状态。
+
+        返回的StreamData只保证is_live准确（可能附带主播名和标题），不包含录制地址，
+        开播的直播间仍需调用get_stream_info获取完整信息。无法判断状态的直播间不会出现在结果中。
+        默认实现逐个调用get_stream_info。
+        """
+        results = {}
+        for live_url in live_urls:
+            stream_info = await self.get_stream_info(live_url)
+            if stream_info is not None:
+                results[live_url] = stream_info
+        return results
+
+    async def _gather_probes(self, live_urls: list[str], probe, concurrency: int = 5) -> dict[str, StreamData]:
+        """
+        并发执行单个直播间的轻量状态查询，用于没有多房间接口的平台
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_probe(client, live_url):
+            async with semaphore:
+                try:
+                    return live_url, await probe(client, live_url)
+                except Exception as e:
+                    logger.debug(f"批量状态查询失败: {live_url}, {type(e).__name__}: {e}")
+                    return live_url, None
+
+        client = get_http_client(self.proxy)
+        results = await asyncio.gather(*(run_probe(client, live_url) for live_url in live_urls))
+        return {live_url: stream_info for live_url, stream_info in results if stream_info is not None}
+
+    def _create_probe_stream_data(
+        self, is_live: bool, anchor_name: str | None = None, title: str | None = None
+    ) -> StreamData:
+        """
+        创建批量状态查询使用的StreamData对象，只包含开播状态等基础信息
+        """
+        return StreamData(
+            platform=self.platform,
+            anchor_name=anchor_name,
+            is_live=is_live,
+            title=title,
+            quality=None,
+            m3u8_url=None,
+            flv_url=None,
+            record_url=None,
+            new_cookies=None,
+            new_token=None,
+            extra=None
+        )
+
     def _create_offline_stream_data(self, live_url: str) -> StreamData:
         """
         创建表示未开播状态的StreamData对象
@@ -96,8 +232,15 @@ class PlatformHandler(abc.ABC):
         with cls._lock:
             for pattern in patterns:
                 cls._registry[pattern] = cls
+            # 注册表变化后重新编译匹配表达式
+            PlatformHandler._compiled_patterns = None
+            PlatformHandler._registry_version += 1
         return cls
 
+    @classmethod
+    def get_registry_version(cls) -> int:
+        return PlatformHandler._registry_version
+
     @classmethod
     def get_registered_patterns(cls) -> dict[str, type["PlatformHandler"]]:
         """
@@ -108,24 +251,54 @@ class PlatformHandler(abc.ABC):
 
     @classmethod
     def _get_instance_key(
-        cls, proxy: str | None, cookies: str | None, record_quality: str, platform: str | None
+        cls,
+        handler_class: type["PlatformHandler"],
+        proxy: str | None,
+        cookies: str | None,
+        record_quality: str | None,
+        platform: str | None,
     ) -> InstanceKey:
         """
-        Generate a unique key for each instance based on the provided parameters.
+        Generate a unique key for each instance based on the handler class and the provided parameters.
         """
-        return proxy, cookies, record_quality, platform
+        return handler_class, proxy, cookies, record_quality, platform
 
     @classmethod
     def _get_handler_class(cls, live_url: str) -> type["PlatformHandler"] | None:
         """
         Find the appropriate handler class based on the live URL.
         """
-        registered_patterns = cls.get_registered_patterns()
-        for pattern, handler_class in registered_patterns.items():
-            if re.search(pattern, live_url):
+        compiled_patterns = PlatformHandler._compiled_patterns
+        if compiled_patterns is None:
+            with cls._lock:
+                compiled_patterns = [
+                    (re.compile(cls._strip_leading_wildcard(pattern)).search, handler_class)
+                    for pattern, handler_class in cls._registry.items()
+                ]
+                PlatformHandler._compiled_patterns = compiled_patterns
+
+        for search, handler_class in compiled_patterns:
+            if search(live_url):
                 return handler_class
         return None
 
+    @staticmethod
+    def _strip_leading_wildcard(pattern: str) -> str:
+        # 对 search 而言开头的 ".*" 不影响是否匹配，去掉后避免每次都回溯扫描到字符串末尾
+        while pattern.startswith(".*"):
+            pattern = pattern[2:]
+        return pattern
+
+    @classmethod
+    def get_batch_size(cls, live_url: str) -> int:
+        """
+        Return how many rooms of this URL's platform can be probed in one batch, 0 if batching is unsupported.
+        """
+        handler_class = cls._get_handler_class(live_url)
+        if handler_class is None or not handler_class.supports_batch:
+            return 0
+        return handler_class.batch_size
+
     @classmethod
     def get_handler_instance(
         cls,
@@ -141,28 +314,12 @@ class PlatformHandler(abc.ABC):
         """
         Get or create an instance of a platform handler based on the live URL and other parameters.
         """
-        with cls._lock:
-            cls._instance_access_count += 1
-        
         handler_class = cls._get_handler_class(live_url)
         if not handler_class:
-            logger.warning(f"实例管理 - 未找到匹配的处理器类: {live_url}")
+            memory_logger.warning(f"实例管理 - 未找到匹配的处理器类: {live_url}")
             return None
 
-        instance_key = cls._get_instance_key(proxy, cookies, record_quality, platform)
-        instance_exists = instance_key in cls._instances
-        
-        if instance_exists:
-            # logger.info(f"实例管理 - 复用现有实例: {platform or 'unknown'}-{record_quality or 'default'}")
-            # 更新最后使用时间
-            with cls._lock:
-                cls._instance_last_used[instance_key] = time.time()
-                instance = cls._instances[instance_key]
-                instance._last_accessed = time.time()
-                # 确保实例在强引用字典中
-                cls._active_instances[instance_key] = instance
-        
-        if not instance_exists:
+        def create_instance():
             init_signature = inspect.signature(handler_class.__init__)
             handler_kwargs: dict[str, Any] = {
                 "proxy": proxy,
@@ -174,125 +331,28 @@ class PlatformHandler(abc.ABC):
                 "account_type": account_type,
             }
             filtered_kwargs = {k: v for k, v in handler_kwargs.items() if k in init_signature.parameters}
-            with cls._lock:
-                if instance_key not in cls._instances:
-                    cls._instance_creation_count += 1
-                    instance = handler_class(**filtered_kwargs)
-                    cls._instances[instance_key] = instance
-                    # 同时在强引用字典中保存一份
-                    cls._active_instances[instance_key] = instance
-                    cls._instance_last_used[instance_key] = time.time()
-                    # logger.info(f"实例管理 - 创建新实例: {platform or 'unknown'}-{record_quality or 'default'}, "
-                    #                f"总创建数: {cls._instance_creation_count}, 当前缓存数: {len(cls._instances)}")
-
-        return cls._instances[instance_key]
-    
+            return handler_class(**filtered_kwargs)
+
+        instance_key = cls._get_instance_key(handler_class, proxy, cookies, record_quality, platform)
+        return cls._instance_cache.get_or_create(instance_key, create_instance)
+
     @classmethod
-    def clear_unused_instances(cls):
+    def clear_unused_instances(cls) -> int:
         """
-        清理未使用的实例缓存，主动移除长时间未使用的实例和已不再被引用的实例
+        移除长时间未使用的实例，返回移除数量
         """
-        with cls._lock:
-            before_count = len(cls._instances)
-            current_time = time.time()
-            
-            # 首先，移除长时间未使用的实例引用
-            inactive_keys = [
-                key for key, last_used in cls._instance_last_used.items()
-                if current_time - last_used > cls._INACTIVE_THRESHOLD
-            ]
-            
-            # 计算要清理的实例总数
-            total_to_clean = len(inactive_keys)
-            if total_to_clean > 10:
-                # 如果需要清理的实例过多，分批处理以避免阻塞
-                # logger.info(f"实例清理 - 发现大量需要清理的实例({total_to_clean})，将分批处理")
-                
-                # 每批处理的实例数
-                batch_size = 10
-                batches = [inactive_keys[i:i+batch_size] for i in range(0, len(inactive_keys), batch_size)]
-                
-                cleaned_count = 0
-                for batch in batches:
-                    # 处理当前批次
-                    for key in batch:
-                        if key in cls._instances:
-                            # 从WeakValueDictionary中移除引用，允许GC回收
-                            del cls._instances[key]
-                            # 同时从强引用字典中移除
-                            if key in cls._active_instances:
-                                del cls._active_instances[key]
-                        
-                        # 从使用时间记录中移除
-                        if key in cls._instance_last_used:
-                            del cls._instance_last_used[key]
-                    
-                    cleaned_count += len(batch)
-                    # 每批处理后记录进度
-                    if len(batches) > 1:
-                        # logger.debug(f"实例清理进度: {cleaned_count}/{total_to_clean} ({(cleaned_count/total_to_clean)*100:.1f}%)")
-                        pass
-                    
-                    # 每批次处理后短暂暂停，避免长时间阻塞
-                    if len(batches) > 1:
-                        time.sleep(0.01)
-            else:
-                # 实例数量不多，直接清理
-                for key in inactive_keys:
-                    if key in cls._instances:
-                        # 从WeakValueDictionary中移除引用，允许GC回收
-                        del cls._instances[key]
-                        # 同时从强引用字典中移除
-                        if key in cls._active_instances:
-                            del cls._active_instances[key]
-                    
-                    # 从使用时间记录中移除
-                    if key in cls._instance_last_used:
-                        del cls._instance_last_used[key]
-            
-            # 清理_instance_last_used中不存在于_instances的键
-            orphaned_keys = [key for key in list(cls._instance_last_used.keys()) if key not in cls._instances]
-            for key in orphaned_keys:
-                del cls._instance_last_used[key]
-                if key in cls._active_instances:
-                    del cls._active_instances[key]
-            
-            # 手动触发垃圾回收
-            gc.collect()
-            
-            after_count = len(cls._instances)
-            # logger.info(f"实例清理 - 清理前: {before_count}, 清理后: {after_count}, "
-            #            f"减少: {before_count - after_count}, 主动清理: {len(inactive_keys)}")
-            # logger.info(f"实例统计 - 总创建数: {cls._instance_creation_count}, "
-            #            f"总访问数: {cls._instance_access_count}, "
-            #            f"使用时间记录数: {len(cls._instance_last_used)}, "
-            #            f"强引用实例数: {len(cls._active_instances)}")
-            
+        return cls._instance_cache.purge_expired()
+
     @classmethod
     def get_instances_count(cls) -> int:
         """
         获取当前缓存的实例数量，用于监控
         """
-        return len(cls._instances)
-        
+        return len(cls._instance_cache)
+
     @classmethod
     def get_instance_stats(cls) -> dict:
         """
-        获取实例统计信息
+        获取实例缓存统计信息（命中、未命中、淘汰与过期次数）
         """
-        inactive_count = 0
-        current_time = time.time()
-        
-        with cls._lock:
-            for key, last_used in cls._instance_last_used.items():
-                if current_time - last_used > cls._INACTIVE_THRESHOLD:
-                    inactive_count += 1
-        
-        return {
-            "current_count": len(cls._instances),
-            "inactive_count": inactive_count,
-            "total_created": cls._instance_creation_count,
-            "total_accessed": cls._instance_access_count,
-            "usage_records": len(cls._instance_last_used),
-            "strong_refs": len(cls._active_instances)
-        }
+        return cls._instance_cache.get_stats()
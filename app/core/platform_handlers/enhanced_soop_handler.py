@@ -11,6 +11,7 @@ from typing import Optional
 import streamget
 import httpx
 from .base import PlatformHandler, StreamData
+from ...utils.http_client import get_http_client
 from ...utils.logger import logger
 from ...utils.utils import trace_error_decorator
 
@@ -149,83 +150,83 @@ class EnhancedSoopHandler(PlatformHandler):
             if self.cookies:
                 headers['Cookie'] = self.cookies
             
-            async with httpx.AsyncClient(timeout=10.0, proxy=self.proxy) as client:
-                response = await client.get(live_url, headers=headers)
-                response.raise_for_status()
-                
-                html_content = response.text
-                
-                # 使用多种方法提取title
-                title_candidates = []
-                
-                # 方法1: 从HTML title标签提取
-                title_match = re.search(r'<title[^>]*>([^<]+)</title>', html_content, re.IGNORECASE)
-                if title_match:
-                    title_candidates.append({
-                        'title': title_match.group(1).strip(),
-                        'method': 'html_title',
-                        'priority': 1
-                    })
-                
-                # 方法2: 从meta标签提取
-                meta_patterns = [
-                    r'<meta[^>]*property=["\']og:title["\'][^>]*content=["\']([^"\']+)["\']',
-                    r'<meta[^>]*name=["\']title["\'][^>]*content=["\']([^"\']+)["\']',
-                    r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']',
-                ]
-                
-                for pattern in meta_patterns:
-                    matches = re.findall(pattern, html_content, re.IGNORECASE)
-                    for match in matches:
-                        if match.strip():
-                            title_candidates.append({
-                                'title': match.strip(),
-                                'method': 'meta_tag',
-                                'priority': 2
-                            })
-                
-                # 方法3: 从JavaScript变量中提取
-                js_patterns = [
-                    r'["\']title["\']\s*:\s*["\']([^"\']+)["\']',
-                    r'["\']roomTitle["\']\s*:\s*["\']([^"\']+)["\']',
-                    r'["\']liveTitle["\']\s*:\s*["\']([^"\']+)["\']',
-                    r'roomTitle\s*=\s*["\']([^"\']+)["\']',
-                    r'liveTitle\s*=\s*["\']([^"\']+)["\']',
-                ]
-                
-                for pattern in js_patterns:
-                    matches = re.findall(pattern, html_content, re.IGNORECASE)
-                    for match in matches:
-                        if match.strip():
-                            title_candidates.append({
-                                'title': match.strip(),
-                                'method': 'javascript',
-                                'priority': 3
-                            })
-                
-                # 选择最佳title
-                if title_candidates:
-                    # 按优先级排序
-                    title_candidates.sort(key=lambda x: x['priority'])
-                    
-                    # 过滤掉明显不是title的内容
-                    filtered_candidates = []
-                    for candidate in title_candidates:
-                        title = candidate['title']
-                        # 使用统一的过滤条件
-                        if self._is_valid_title(title):
-                            filtered_candidates.append(candidate)
-                    
-                    if filtered_candidates:
-                        best_candidate = filtered_candidates[0]
-                        # 解码HTML实体编码
-                        decoded_title = self._decode_html_entities(best_candidate['title'])
-                        #logger.debug(f"从网页提取到title: '{decoded_title}' (方法: {best_candidate['method']})")
-                        return decoded_title
+            client = get_http_client(self.proxy)
+            response = await client.get(live_url, headers=headers, timeout=10.0)
+            response.raise_for_status()
+            
+            html_content = response.text
+            
+            # 使用多种方法提取title
+            title_candidates = []
+            
+            # 方法1: 从HTML title标签提取
+            title_match = re.search(r'<title[^>]*>([^<]+)</title>', html_content, re.IGNORECASE)
+            if title_match:
+                title_candidates.append({
+                    'title': title_match.group(1).strip(),
+                    'method': 'html_title',
+                    'priority': 1
+                })
+            
+            # 方法2: 从meta标签提取
+            meta_patterns = [
+                r'<meta[^>]*property=["\']og:title["\'][^>]*content=["\']([^"\']+)["\']',
+                r'<meta[^>]*name=["\']title["\'][^>]*content=["\']([^"\']+)["\']',
+                r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']',
+            ]
+            
+            for pattern in meta_patterns:
+                matches = re.findall(pattern, html_content, re.IGNORECASE)
+                for match in matches:
+                    if match.strip():
+                        title_candidates.append({
+                            'title': match.strip(),
+                            'method': 'meta_tag',
+                            'priority': 2
+                        })
+            
+            # 方法3: 从JavaScript变量中提取
+            js_patterns = [
+                r'["\']title["\']\s*:\s*["\']([^"\']+)["\']',
+                r'["\']roomTitle["\']\s*:\s*["\']([^"\']+)["\']',
+                r'["\']liveTitle["\']\s*:\s*["\']([^"\']+)["\']',
+                r'roomTitle\s*=\s*["\']([^"\']+)["\']',
+                r'liveTitle\s*=\s*["\']([^"\']+)["\']',
+            ]
+            
+            for pattern in js_patterns:
+                matches = re.findall(pattern, html_content, re.IGNORECASE)
+                for match in matches:
+                    if match.strip():
+                        title_candidates.append({
+                            'title': match.strip(),
+                            'method': 'javascript',
+                            'priority': 3
+                        })
+            
+            # 选择最佳title
+            if title_candidates:
+                # 按优先级排序
+                title_candidates.sort(key=lambda x: x['priority'])
                 
-                #logger.debug(f"未能从网页中提取到有效的title: {live_url}")
-                return None
+                # 过滤掉明显不是title的内容
+                filtered_candidates = []
+                for candidate in title_candidates:
+                    title = candidate['title']
+                    # 使用统一的过滤条件
+                    if self._is_valid_title(title):
+                        filtered_candidates.append(candidate)
                 
+                if filtered_candidates:
+                    best_candidate = filtered_candidates[0]
+                    # 解码HTML实体编码
+                    decoded_title = self._decode_html_entities(best_candidate['title'])
+                    #logger.debug(f"从网页提取到title: '{decoded_title}' (方法: {best_candidate['method']})")
+                    return decoded_title
+            
+            #logger.debug(f"未能从网页中提取到有效的title: {live_url}")
+            return None
+            
         except httpx.TimeoutException as e:
             logger.warning(f"网页抓取超时: {e}")
             return None
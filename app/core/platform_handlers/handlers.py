@@ -1,5 +1,9 @@
+import json
+import re
+
 import streamget
 
+from ...utils.http_client import get_http_client
 from ...utils.utils import trace_error_decorator
 from ...utils.logger import logger
 from .base import PlatformHandler, StreamData
@@ -95,6 +99,9 @@ class KuaishouHandler(PlatformHandler):
 
 class HuyaHandler(PlatformHandler):
     platform = "huya"
+    supports_batch = True
+    batch_size = 10
+    batch_status_api = "https://mp.huya.com/cache.php"
 
     def __init__(
         self,
@@ -119,9 +126,36 @@ class HuyaHandler(PlatformHandler):
         
         return await self.live_stream.fetch_stream_url(json_data, self.record_quality)
 
+    # 虎牙没有公开的多房间状态接口，使用轻量的房间资料接口并发查询
+    async def get_stream_info_batch(self, live_urls: list[str]) -> dict[str, StreamData]:
+        async def probe(client, live_url):
+            match = re.search(r"huya\.com/(\d+)", live_url)
+            if not match:
+                # 自定义域名的房间号需要完整解析
+                return None
+            response = await client.get(
+                self.batch_status_api,
+                params={"m": "Live", "do": "profileRoom", "roomid": match.group(1)},
+                headers={"User-Agent": self.BATCH_USER_AGENT},
+            )
+            data = response.json().get("data") or {}
+            live_status = data.get("liveStatus")
+            if live_status is None:
+                return None
+            profile = data.get("profileInfo") or {}
+            live_data = data.get("liveData") or {}
+            return self._create_probe_stream_data(
+                live_status == "ON", profile.get("nick"), live_data.get("introduction")
+            )
+
+        return await self._gather_probes(live_urls, probe, concurrency=3)
+
 
 class DouyuHandler(PlatformHandler):
     platform = "douyu"
+    supports_batch = True
+    batch_size = 10
+    batch_status_api = "https://open.douyucdn.cn/api/RoomApi/room"
 
     def __init__(
         self,
@@ -146,6 +180,25 @@ class DouyuHandler(PlatformHandler):
         
         return await self.live_stream.fetch_stream_url(json_data, self.record_quality)
 
+    # 斗鱼没有公开的多房间状态接口，使用开放平台的房间接口并发查询
+    async def get_stream_info_batch(self, live_urls: list[str]) -> dict[str, StreamData]:
+        async def probe(client, live_url):
+            match = re.search(r"douyu\.com/(?:.*[?&]rid=)?(\d+)", live_url)
+            if not match:
+                return None
+            response = await client.get(
+                f"{self.batch_status_api}/{match.group(1)}", headers={"User-Agent": self.BATCH_USER_AGENT}
+            )
+            json_data = response.json()
+            data = json_data.get("data")
+            if json_data.get("error") != 0 or not isinstance(data, dict):
+                return None
+            return self._create_probe_stream_data(
+                str(data.get("room_status")) == "1", data.get("owner_name"), data.get("room_name")
+            )
+
+        return await self._gather_probes(live_urls, probe, concurrency=3)
+
 
 class YYHandler(PlatformHandler):
     platform = "YY"
@@ -176,6 +229,8 @@ class YYHandler(PlatformHandler):
 
 class BilibiliHandler(PlatformHandler):
     platform = "bilibili"
+    supports_batch = True
+    batch_status_api = "https://api.live.bilibili.com/xlive/web-room/v1/index/getRoomBaseInfo"
 
     def __init__(
         self,
@@ -200,6 +255,37 @@ class BilibiliHandler(PlatformHandler):
         
         return await self.live_stream.fetch_stream_url(json_data, self.record_quality)
 
+    @trace_error_decorator
+    async def get_stream_info_batch(self, live_urls: list[str]) -> dict[str, StreamData]:
+        url_by_room_id = {}
+        for live_url in live_urls:
+            match = re.search(r"live\.bilibili\.com/(?:h5/)?(\d+)", live_url)
+            if match:
+                url_by_room_id.setdefault(match.group(1), []).append(live_url)
+        if not url_by_room_id:
+            return {}
+
+        params = [("req_biz", "web_room_componet")] + [("room_ids", room_id) for room_id in url_by_room_id]
+        headers = {"User-Agent": self.BATCH_USER_AGENT, "Referer": "https://live.bilibili.com/"}
+        client = get_http_client(self.proxy)
+        response = await client.get(self.batch_status_api, params=params, headers=headers)
+        json_data = response.json()
+        if json_data.get("code") != 0:
+            logger.debug(f"B站批量状态查询失败: {json_data.get('message')}")
+            return {}
+
+        results = {}
+        rooms = (json_data.get("data") or {}).get("by_room_ids") or {}
+        for room in rooms.values():
+            stream_info = self._create_probe_stream_data(
+                room.get("live_status") == 1, room.get("uname"), room.get("title")
+            )
+            # 短号房间在返回结果中以长号为键，需要同时匹配两种房间号
+            for room_id in (room.get("room_id"), room.get("short_id")):
+                for live_url in url_by_room_id.get(str(room_id), []):
+                    results[live_url] = stream_info
+        return results
+
 
 class RedNoteHandler(PlatformHandler):
     platform = "rednote"
@@ -624,6 +710,10 @@ class KugouHandler(PlatformHandler):
 
 class TwitchHandler(PlatformHandler):
     platform = "twitch"
+    supports_batch = True
+    batch_size = 35
+    batch_status_api = "https://gql.twitch.tv/gql"
+    gql_client_id = "kimne78kx3ncx6brgo4mv6wki5h1ko"
 
     def __init__(
         self,
@@ -648,6 +738,35 @@ class TwitchHandler(PlatformHandler):
         
         return await self.live_stream.fetch_stream_url(json_data, self.record_quality)
 
+    @trace_error_decorator
+    async def get_stream_info_batch(self, live_urls: list[str]) -> dict[str, StreamData]:
+        url_by_login = {}
+        for live_url in live_urls:
+            match = re.search(r"twitch\.tv/([A-Za-z0-9_]+)", live_url)
+            if match:
+                url_by_login.setdefault(match.group(1).lower(), []).append(live_url)
+        if not url_by_login:
+            return {}
+
+        logins = json.dumps(list(url_by_login))
+        query = f"query {{ users(logins: {logins}) {{ login displayName stream {{ id title }} }} }}"
+        headers = {"Client-ID": self.gql_client_id, "User-Agent": self.BATCH_USER_AGENT}
+        client = get_http_client(self.proxy)
+        response = await client.post(self.batch_status_api, json={"query": query}, headers=headers)
+        users = ((response.json().get("data") or {}).get("users")) or []
+
+        results = {}
+        for user in users:
+            if not user:
+                continue
+            stream = user.get("stream")
+            stream_info = self._create_probe_stream_data(
+                bool(stream), user.get("displayName"), (stream or {}).get("title")
+            )
+            for live_url in url_by_login.get(str(user.get("login", "")).lower(), []):
+                results[live_url] = stream_info
+        return results
+
 
 class LivemeHandler(PlatformHandler):
     platform = "liveme"
@@ -5,13 +5,17 @@ from datetime import datetime, timedelta
 from typing import Any, Callable
 import time
 import sys
+import urllib.parse
 
 from ..messages.message_pusher import MessagePusher
 from ..models.recording_model import Recording
 from ..models.recording_status_model import RecordingStatus
 from ..utils import utils
 from ..utils.logger import logger
-from .platform_handlers import get_platform_info
+from ..utils.room_checker import RoomIndex
+from .live_check_scheduler import LiveCheckScheduler
+from .live_history import LiveHistoryManager
+from .platform_handlers import PlatformHandler, get_recording_platform_info
 from .stream_manager import LiveStreamRecorder
 
 
@@ -26,8 +30,15 @@ class RecordingManager:
         self.settings = app.settings
         self.periodic_task_started = False
         self.loop_time_seconds = None
+        self.live_check_scheduler = LiveCheckScheduler(self)
+        self.live_history = LiveHistoryManager(app)
+        self._persist_waiter = None
+        self._persist_task = None
+        # 单独设置录制目录且空间不足的卷
+        self.low_space_volumes = set()
         self.app.language_manager.add_observer(self)
         self.load_recordings()
+        self.room_index = RoomIndex.from_recordings(self.recordings)
         self._ = {}
         self.load()
         self.initialize_dynamic_state()
@@ -63,35 +74,81 @@ class RecordingManager:
     async def add_recording(self, recording):
         with GlobalRecordingState.lock:
             GlobalRecordingState.recordings.append(recording)
-            await self.persist_recordings()
+            self.room_index.add(recording)
 
-            # 如果缩略图功能已开启，且直播间处于直播或录制状态，启动缩略图捕获任务
-            if self.app.settings.user_config.get("show_live_thumbnail", False) and hasattr(self.app, 'thumbnail_manager'):
-                if recording.is_live or recording.recording:
-                    # logger.info(f"为新添加的直播间 {recording.streamer_name} 启动缩略图捕获任务")
-                    self.app.page.run_task(self.app.thumbnail_manager.start_thumbnail_capture, recording)
-            
-            return recording
+        # 保存时会让出事件循环，不能在持有线程锁期间等待
+        await self.persist_recordings()
+
+        # 如果缩略图功能已开启，且直播间处于直播或录制状态，启动缩略图捕获任务
+        if self.app.settings.user_config.get("show_live_thumbnail", False) and hasattr(self.app, 'thumbnail_manager'):
+            if recording.is_live or recording.recording:
+                # logger.info(f"为新添加的直播间 {recording.streamer_name} 启动缩略图捕获任务")
+                self.app.page.run_task(self.app.thumbnail_manager.start_thumbnail_capture, recording)
+
+        return recording
 
     async def remove_recording(self, recording: Recording):
         with GlobalRecordingState.lock:
             GlobalRecordingState.recordings.remove(recording)
-            await self.persist_recordings()
+            self.room_index.remove(recording.rec_id)
+            self.live_check_scheduler.remove(recording)
+            self.live_history.remove(recording.rec_id)
+        await self.persist_recordings()
 
     async def clear_all_recordings(self):
         with GlobalRecordingState.lock:
             GlobalRecordingState.recordings.clear()
-            await self.persist_recordings()
+            self.room_index.clear()
+        await self.persist_recordings()
 
     async def persist_recordings(self):
-        """Persist recordings to a JSON file."""
-        data_to_save = [rec.to_dict() for rec in self.recordings]
-        await self.app.config_manager.save_recordings_config(data_to_save)
+        """Persist recordings to the recordings store.
+
+        保存正在进行时到达的请求会合并为其后的一次保存，连续多次调用只产生少量写入，
+        等待返回时调用前的修改均已落盘。
+        """
+        if self._persist_waiter is None:
+            self._persist_waiter = asyncio.get_running_loop().create_future()
+            if self._persist_task is None or self._persist_task.done():
+                self._persist_task = asyncio.create_task(self._persist_loop())
+        await asyncio.shield(self._persist_waiter)
+
+    async def _persist_loop(self):
+        while self._persist_waiter is not None:
+            waiter, self._persist_waiter = self._persist_waiter, None
+            changed = []
+            saved = False
+            try:
+                data_to_save = []
+                unchanged_ids = set()
+                for rec in self.recordings:
+                    data, is_changed = rec.snapshot()
+                    data_to_save.append(data)
+                    if is_changed:
+                        changed.append(rec)
+                    else:
+                        unchanged_ids.add(rec.rec_id)
+                saved = await self.app.config_manager.save_recordings_config(data_to_save, unchanged_ids)
+            except Exception as e:
+                logger.error(f"保存录制列表时出错: {e}")
+            finally:
+                if not saved:
+                    # 下次保存时重新写入本次修改过的录制项
+                    for rec in changed:
+                        rec.discard_snapshot()
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    async def flush_recordings(self):
+        """等待尚未完成的保存，应用退出时调用"""
+        if self._persist_task is not None and not self._persist_task.done():
+            await self._persist_task
 
     async def update_recording_card(self, recording: Recording, updated_info: dict):
         """Update an existing recording object and persist changes to a JSON file."""
         if recording:
             recording.update(updated_info)
+            self.room_index.add(recording)
             self.app.page.run_task(self.persist_recordings)
 
     @staticmethod
@@ -125,9 +182,9 @@ class RecordingManager:
                 status_info=RecordingStatus.MONITORING,
                 selected=False,
             )
-            self.app.page.run_task(self.check_if_live, recording)
-            self.app.page.run_task(self.app.record_card_manager.update_card, recording)
-            self.app.page.pubsub.send_others_on_topic("update", recording)
+            self.request_live_check(recording)
+            # 合并刷新卡片，并在当前页面是主页时重新应用筛选条件
+            self.app.record_card_manager.request_update(recording, refilter=True, broadcast=True)
             
             # 如果启用了缩略图功能，开始捕获缩略图
             if self.app.settings.user_config.get("show_live_thumbnail", False) and hasattr(self.app, 'thumbnail_manager'):
@@ -139,10 +196,6 @@ class RecordingManager:
                     # logger.info(f"直播间 {recording.streamer_name} 的缩略图功能已关闭，跳过启动缩略图捕获")
                     pass
             
-            # 确保在当前页面是主页时重新应用筛选条件
-            if hasattr(self.app, 'current_page') and hasattr(self.app.current_page, 'apply_filter'):
-                self.app.page.run_task(self.app.current_page.apply_filter)
-                
             if auto_save:
                 self.app.page.run_task(self.persist_recordings)
             return True
@@ -174,13 +227,9 @@ class RecordingManager:
             if hasattr(self.app, 'thumbnail_manager'):
                 self.app.page.run_task(self.app.thumbnail_manager.stop_thumbnail_capture, recording)
             
-            self.app.page.run_task(self.app.record_card_manager.update_card, recording)
-            self.app.page.pubsub.send_others_on_topic("update", recording)
+            # 合并刷新卡片，并在当前页面是主页时重新应用筛选条件
+            self.app.record_card_manager.request_update(recording, refilter=True, broadcast=True)
             
-            # 确保在当前页面是主页时重新应用筛选条件
-            if hasattr(self.app, 'current_page') and hasattr(self.app.current_page, 'apply_filter'):
-                self.app.page.run_task(self.app.current_page.apply_filter)
-                
             if auto_save:
                 self.app.page.run_task(self.persist_recordings)
 
@@ -239,13 +288,27 @@ class RecordingManager:
                 return rec
         return None
 
+    def get_poll_interval(self, recording: Recording) -> int:
+        """Return the check interval for the recording, adjusted by its go-live history."""
+        base_interval = recording.loop_time_seconds or self.loop_time_seconds
+        return self.live_history.get_poll_interval(recording, base_interval)
+
+    def request_live_check(self, recording: Recording, delay: float = 0.0, spread: bool = False):
+        """Queue a live status check through the scheduler instead of running it directly."""
+        self.live_check_scheduler.submit(recording, delay=delay, spread=spread)
+
     async def check_all_live_status(self):
         """Check the live status of all recordings and update their display titles."""
         for recording in self.recordings:
             if recording.monitor_status and not recording.recording:
-                is_exceeded = utils.is_time_interval_exceeded(recording.detection_time, recording.loop_time_seconds)
+                if self.live_check_scheduler.is_scheduled(recording):
+                    continue
+                is_exceeded = utils.is_time_interval_exceeded(
+                    recording.detection_time, self.get_poll_interval(recording)
+                )
                 if not recording.detection_time or is_exceeded:
-                    self.app.page.run_task(self.check_if_live, recording)
+                    # 将到期的检测分散到整个检测周期内，避免同时发出大量请求
+                    self.request_live_check(recording, spread=True)
 
     async def setup_periodic_live_check(self, interval: int = 300): # 5分钟检查一次磁盘空间
         """Set up a periodic task to check live status."""
@@ -256,11 +319,53 @@ class RecordingManager:
                 await self.check_free_space()
                 if self.app.recording_enabled:
                     await self.check_all_live_status()
+                logger.debug(f"直播检测调度状态: {self.live_check_scheduler.get_metrics()}")
 
         if not self.periodic_task_started:
             self.periodic_task_started = True
             await periodic_check()
 
+    @staticmethod
+    def get_live_check_batch_size(recording: Recording) -> int:
+        """Return how many rooms may share one batch probe with this recording, 0 if it needs a full check."""
+        if recording.recording or recording.is_live or recording.is_checking or not recording.monitor_status:
+            return 0
+        # 定时监控的房间需要判断监控时段，仍走完整检测
+        if recording.scheduled_recording:
+            return 0
+        return PlatformHandler.get_batch_size(recording.url)
+
+    async def check_if_live_batch(self, recordings: list[Recording]) -> list[Recording]:
+        """Probe several rooms of one platform at once.
+
+        Rooms confirmed offline are updated in place; the returned rooms are live or unknown
+        and still need the full check_if_live.
+        """
+        platform, platform_key = get_recording_platform_info(recordings[0])
+        recording_info = {
+            "platform": platform,
+            "platform_key": platform_key,
+            "live_url": recordings[0].url,
+            "output_dir": self.settings.get_video_save_path(),
+            "quality": recordings[0].quality,
+        }
+        recorder = LiveStreamRecorder(self.app, recordings[0], recording_info)
+        probe_results = await recorder.probe_live_status([recording.url for recording in recordings])
+
+        need_full_check = []
+        for recording in recordings:
+            stream_info = probe_results.get(recording.url)
+            if stream_info is None or stream_info.is_live or recording.is_live or recording.recording:
+                need_full_check.append(recording)
+                continue
+            recording.detection_time = datetime.now().time()
+            recording.status_info = RecordingStatus.STATUS_CHECKING
+
+        logger.debug(
+            f"批量检测 {platform_key}: 共 {len(recordings)} 个房间, {len(need_full_check)} 个需要完整检测"
+        )
+        return need_full_check
+
     async def check_if_live(self, recording: Recording):
         """Check if the live stream is available, fetch stream data and update is_live status."""
 
@@ -273,6 +378,7 @@ class RecordingManager:
 
         elif not recording.is_checking:
             recording.status_info = RecordingStatus.STATUS_CHECKING
+            last_detection_time = recording.detection_time
             recording.detection_time = datetime.now().time()
             if recording.scheduled_recording and recording.scheduled_start_time and recording.monitor_hours:
                 scheduled_time_range = await self.get_scheduled_time_range(
@@ -285,14 +391,16 @@ class RecordingManager:
                     return
 
             recording.is_checking = True
-            platform, platform_key = get_platform_info(recording.url)
+            platform, platform_key = get_recording_platform_info(recording)
 
             if self.settings.user_config["language"] != "zh_CN":
                 platform = platform_key
 
             output_dir = self.settings.get_video_save_path()
-            await self.check_free_space(output_dir)
-            if not self.app.recording_enabled:
+            has_space = await self.check_free_space(output_dir)
+            if recording.recording_dir:
+                has_space = await self.check_free_space(recording.recording_dir)
+            if not self.app.recording_enabled or not has_space:
                 recording.is_checking = False
                 recording.status_info = RecordingStatus.NOT_RECORDING_SPACE
                 return
@@ -325,13 +433,9 @@ class RecordingManager:
                     recording.status_info = RecordingStatus.MONITORING
                     if recording.recording:
                         self.stop_recording(recording, manually_stopped=False)
-                    # 更新UI
-                    self.app.page.run_task(self.app.record_card_manager.update_card, recording)
-                    self.app.page.pubsub.send_others_on_topic("update", recording)
+                    # 更新UI，并在当前页面是主页时重新应用筛选条件
+                    self.app.record_card_manager.request_update(recording, refilter=True, broadcast=True)
                     
-                    # 确保在当前页面是主页时重新应用筛选条件
-                    if hasattr(self.app, 'current_page') and hasattr(self.app.current_page, 'apply_filter'):
-                        self.app.page.run_task(self.app.current_page.apply_filter)
                 return
             
             if not stream_info.anchor_name:
@@ -350,6 +454,9 @@ class RecordingManager:
             # 如果直播状态从离线变为在线，重置end_notification_sent标志
             if not was_live and recording.is_live:
                 recording.end_notification_sent = False
+                # 只记录本次运行中观察到的下播->开播转换，程序启动时已在直播的房间不计入
+                if last_detection_time:
+                    self.live_history.record_live_start(recording)
                 # 重置直播标题缓存，确保新开播时能重新翻译
                 recording.last_live_title = None
                 # logger.info(f"主播开播，重置关播通知状态: {recording.streamer_name}")
@@ -382,13 +489,8 @@ class RecordingManager:
                 # 如果正在录制，停止录制
                 if recording.recording:
                     self.stop_recording(recording, manually_stopped=False)
-                # 更新UI
-                self.app.page.run_task(self.app.record_card_manager.update_card, recording)
-                self.app.page.pubsub.send_others_on_topic("update", recording)
-                
-                # 确保在当前页面是主页时重新应用筛选条件
-                if hasattr(self.app, 'current_page') and hasattr(self.app.current_page, 'apply_filter'):
-                    self.app.page.run_task(self.app.current_page.apply_filter)
+                # 更新UI，并在当前页面是主页时重新应用筛选条件
+                self.app.record_card_manager.request_update(recording, refilter=True, broadcast=True)
                 
                 # 修改：无论是否之前处于录制状态，只要状态从"直播中"变为"未开播"，就发送直播结束通知
                 # 这样可以确保从"直播中（未录制）"状态变为"未开播"状态时也会发送通知
@@ -432,7 +534,7 @@ class RecordingManager:
                             # 优化: 只在Windows系统且启用Windows通知时才获取平台代码
                             if self.settings.user_config.get("windows_notify_enabled") and sys.platform == "win32":
                                 # 获取平台代码用于显示对应图标
-                                _, platform_code = get_platform_info(recording.url)
+                                _, platform_code = get_recording_platform_info(recording)
                                 self.app.page.run_task(msg_manager.push_messages, msg_title, push_content, platform_code)
                             else:
                                 # 其他情况不传递平台代码
@@ -454,6 +556,7 @@ class RecordingManager:
                 # 先获取主播信息，确保主播名称是最新的
                 if not recording.streamer_name or recording.streamer_name.strip() == self._["live_room"]:
                     recording.streamer_name = stream_info.anchor_name
+                    self.room_index.add(recording)
                 
                 # 然后获取直播标题
                 recording.live_title = getattr(stream_info, "title", None)
@@ -530,7 +633,7 @@ class RecordingManager:
                             # 优化: 只在Windows系统且启用Windows通知时才获取平台代码
                             if self.settings.user_config.get("windows_notify_enabled") and sys.platform == "win32":
                                 # 获取平台代码用于显示对应图标
-                                _, platform_code = get_platform_info(recording.url)
+                                _, platform_code = get_recording_platform_info(recording)
                                 self.app.page.run_task(msg_manager.push_messages, msg_title, push_content, platform_code)
                             else:
                                 # 其他情况不传递平台代码
@@ -549,12 +652,9 @@ class RecordingManager:
                         self.start_update(recording)
                         self.app.page.run_task(recorder.start_recording, stream_info)
 
-                    self.app.page.run_task(self.app.record_card_manager.update_card, recording)
-                    self.app.page.pubsub.send_others_on_topic("update", recording)
+                    # 合并刷新卡片，并在当前页面是主页时重新应用筛选条件
+                    self.app.record_card_manager.request_update(recording, refilter=True, broadcast=True)
                     
-                    # 确保在当前页面是主页时重新应用筛选条件
-                    if hasattr(self.app, 'current_page') and hasattr(self.app.current_page, 'apply_filter'):
-                        self.app.page.run_task(self.app.current_page.apply_filter)
                 else:
                     # 手动录制模式下，设置状态为"直播中（未录制）"
                     recording.status_info = RecordingStatus.NOT_RECORDING
@@ -607,7 +707,7 @@ class RecordingManager:
                             # 优化: 只在Windows系统且启用Windows通知时才获取平台代码
                             if self.settings.user_config.get("windows_notify_enabled") and sys.platform == "win32":
                                 # 获取平台代码用于显示对应图标
-                                _, platform_code = get_platform_info(recording.url)
+                                _, platform_code = get_recording_platform_info(recording)
                                 self.app.page.run_task(msg_manager.push_messages, msg_title, push_content, platform_code)
                             else:
                                 # 其他情况不传递平台代码
@@ -631,12 +731,8 @@ class RecordingManager:
                     # 重置was_recording标志
                     recording.was_recording = False
                     
-                    self.app.page.run_task(self.app.record_card_manager.update_card, recording)
-                    self.app.page.pubsub.send_others_on_topic("update", recording)
-                    
-                    # 确保在当前页面是主页时重新应用筛选条件
-                    if hasattr(self.app, 'current_page') and hasattr(self.app.current_page, 'apply_filter'):
-                        self.app.page.run_task(self.app.current_page.apply_filter)
+                    # 合并刷新卡片，并在当前页面是主页时重新应用筛选条件
+                    self.app.record_card_manager.request_update(recording, refilter=True, broadcast=True)
 
     @staticmethod
     def start_update(recording: Recording):
@@ -653,8 +749,7 @@ class RecordingManager:
             )
             # logger.info(f"Started recording for {recording.title}")
 
-    @staticmethod
-    def stop_recording(recording: Recording, manually_stopped: bool = True):
+    def stop_recording(self, recording: Recording, manually_stopped: bool = True):
         """Stop the recording process."""
         if recording.recording:
             if recording.start_time is not None:
@@ -666,6 +761,8 @@ class RecordingManager:
             recording.start_time = None
             recording.recording = False
             recording.manually_stopped = manually_stopped
+            # 直接通知录制监管器结束对应的录制进程
+            self.app.recorder_supervisor.request_stop(recording)
             # logger.info(f"Stopped recording for {recording.title}")
             
             # 当直播结束时（而不是仅仅停止录制时），重置notification_sent标志
@@ -712,7 +809,7 @@ class RecordingManager:
             # 检查是否还有当前平台的录制项
             remaining_items = False
             for recording in self.recordings:
-                _, platform_key = get_platform_info(recording.url)
+                _, platform_key = get_recording_platform_info(recording)
                 if platform_key == current_platform:
                     remaining_items = True
                     break
@@ -733,11 +830,43 @@ class RecordingManager:
 
     async def check_free_space(self, output_dir: str | None = None):
         disk_space_limit = float(self.settings.user_config.get("recording_space_threshold"))
-        output_dir = output_dir or self.settings.get_video_save_path()
-        free_space = utils.check_disk_capacity(output_dir)
+        forecast_seconds = float(self.settings.user_config.get("disk_space_forecast_minutes", 10)) * 60
+        default_dir = self.settings.get_video_save_path()
+        output_dir = output_dir or default_dir
+        disk_space_service = self.app.disk_space_service
+        status = await disk_space_service.probe_async(output_dir)
+        free_space = status.free_gb
+        # 按当前写入速度预测剩余空间将在设定时间内降到阈值以下时提前暂停录制
+        seconds_left = status.seconds_until(disk_space_limit)
+        will_fill = free_space >= disk_space_limit and seconds_left is not None and seconds_left < forecast_seconds
+
+        is_default_volume = status.mount_point == disk_space_service.get_mount_point(default_dir)
+        if will_fill or (not is_default_volume and free_space < disk_space_limit):
+            # 只暂停写入该卷的录制，不改变全局录制状态
+            if status.mount_point not in self.low_space_volumes:
+                self.low_space_volumes.add(status.mount_point)
+                if will_fill:
+                    self._notify_disk_space_forecast(status, disk_space_limit, seconds_left)
+                else:
+                    logger.error(
+                        f"Disk space of {status.mount_point} is {free_space:.2f} GB, "
+                        f"recordings writing to it are paused (threshold {disk_space_limit} GB)"
+                    )
+            if is_default_volume and not self.app.recording_enabled:
+                # 剩余空间已回到阈值以上，恢复全局录制状态，由写入速度预测控制该卷的录制
+                self.app.recording_enabled = True
+                if hasattr(self.app, 'disk_space_display'):
+                    self.app.disk_space_display.update_recording_status()
+            return False
+
+        self.low_space_volumes.discard(status.mount_point)
+        if not is_default_volume:
+            return True
+
         if free_space < disk_space_limit:
             # 设置录制状态为禁用
             self.app.recording_enabled = False
+            self.app.recorder_supervisor.request_stop_all()
             logger.error(
                 f"Disk space remaining is below {disk_space_limit} GB. Recording function disabled"
             )
@@ -767,6 +896,27 @@ class RecordingManager:
             
             return True
 
+    def _notify_disk_space_forecast(self, status, threshold: float, seconds_left: float):
+        """卷的剩余空间预计将在设定时间内降到阈值以下时提示预计剩余时间"""
+        minutes_left = f"{seconds_left / 60:.1f}"
+        logger.error(
+            f"Disk space of {status.mount_point} is predicted to fall below {threshold} GB "
+            f"in {minutes_left} minutes at {status.write_rate / 1024 / 1024:.1f} MB/s, "
+            f"recordings writing to it are paused"
+        )
+        message = (
+            self._["disk_space_forecast_tip"]
+            .replace("[mount_point]", status.mount_point)
+            .replace("[minutes]", minutes_left)
+        )
+        self.app.page.run_task(self.app.snack_bar.show_snack_bar, message, duration=10000, show_close_icon=True)
+
+    def pause_recording_for_disk_space(self, recording: Recording):
+        """录制所在的卷空间不足或即将不足时暂停该录制，空间恢复后由直播检测重新开始录制"""
+        self.stop_recording(recording, manually_stopped=False)
+        recording.status_info = RecordingStatus.NOT_RECORDING_SPACE
+        self.app.record_card_manager.request_update(recording, refilter=True, broadcast=True)
+
     async def send_disk_space_notification(self, threshold: float, free_space: float):
         """发送磁盘空间不足的消息推送和显示对话框"""
         try:
@@ -882,7 +1032,8 @@ class RecordingManager:
                 
                 # 翻译标题为多种语言
                 multi_lang_results = await translate_live_title_to_multiple_languages(
-                    recording.live_title, target_languages, self.app.config_manager
+                    recording.live_title, target_languages, self.app.config_manager,
+                    user_config=self.settings.user_config
                 )
                 
                 # 保存多语言翻译结果
@@ -940,6 +1091,27 @@ class RecordingManager:
             scheduled_time_range = f"{scheduled_start_time}~{end_time}"
             return scheduled_time_range
 
+    def get_local_live_url(self, recording: Recording) -> str | None:
+        """正在录制TS文件且配置了视频接口时，返回视频接口提供的本地直播播放列表地址
+
+        观看者从本地录制文件读取数据，不再额外拉取一路直播源。
+        """
+        api_url = os.getenv("VIDEO_API_EXTERNAL_URL")
+        file_path = recording.live_file_path
+        if not api_url or not recording.recording or not file_path or not file_path.lower().endswith(".ts"):
+            return None
+        try:
+            relative_path = os.path.relpath(file_path, self.settings.get_video_save_path())
+        except ValueError:
+            return None
+        if relative_path.startswith(".."):
+            return None
+        subfolder = os.path.dirname(relative_path).replace("\\", "/")
+        params = {"filename": os.path.basename(file_path)}
+        if subfolder:
+            params["subfolder"] = subfolder
+        return f"{api_url.rstrip('/')}/api/live/playlist.m3u8?{urllib.parse.urlencode(params)}"
+
     async def get_stream_url(self, recording: Recording):
         """
         获取直播源地址，仅在已开始监控状态下可用。
@@ -956,7 +1128,7 @@ class RecordingManager:
         
         # 如果没有缓存的直播源地址，则重新获取
         # logger.debug(f"监控系统未获取到直播源地址，重新获取: {recording.url}")
-        platform, platform_key = get_platform_info(recording.url)
+        platform, platform_key = get_recording_platform_info(recording)
         output_dir = self.settings.get_video_save_path()
         recording_info = {
             "platform": platform,
@@ -0,0 +1,222 @@
+import asyncio
+import os
+import time
+
+import psutil
+
+from ..utils.logger import logger
+
+# 统一采样间隔（秒）
+SAMPLE_INTERVAL = 1.0
+# 录制卡片速度刷新的最小间隔（秒）
+UI_UPDATE_INTERVAL = 3.0
+# 按写入速度预测录制卷剩余空间的间隔（秒）
+DISK_CHECK_INTERVAL = 10.0
+
+
+def format_speed(bytes_per_sec: float) -> str:
+    if bytes_per_sec >= 1024 * 1024:
+        return f"{bytes_per_sec / (1024 * 1024):.1f} MB/s"
+    elif bytes_per_sec >= 1024:
+        return f"{bytes_per_sec / 1024:.1f} KB/s"
+    return f"{bytes_per_sec:.1f} B/s"
+
+
+class SupervisedRecorder:
+    """单个被监管的录制进程，或进程内的原生HLS录制器"""
+
+    def __init__(self, process, recording):
+        self.process = process
+        self.recording = recording
+        self.stop_event = asyncio.Event()
+        # 录制结束并从监管器移除后触发
+        self.exited = asyncio.Event()
+        self.proc = None
+        self.last_write_bytes = None
+        self.last_sample_time = None
+
+        # 原生录制器自行统计写入字节数
+        if hasattr(process, "bytes_written"):
+            return
+        try:
+            self.proc = psutil.Process(process.pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+
+
+class RecorderSupervisor:
+    """所有ffmpeg录制进程共用的监管循环
+
+    进程退出通过 process.wait() 等待，停止录制或停用录制时直接触发对应的停止事件，
+    都不需要轮询；IO速度采样和卡片刷新由一个协程统一完成，没有录制时该协程处于等待状态，
+    不产生任何唤醒。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.recorders = {}
+        self._has_recorders = asyncio.Event()
+        self._task = None
+        self._last_ui_update = 0
+        self._last_disk_check = 0
+
+    def register(self, process, recording) -> asyncio.Event:
+        """登记录制进程，返回在需要停止录制时被触发的事件"""
+        recorder = SupervisedRecorder(process, recording)
+        self.recorders[process.pid] = recorder
+        recording.speed = "0 KB/s"
+        # 登记前已经请求停止的录制不会再收到通知，直接触发
+        if not recording.recording or not self.app.recording_enabled:
+            recorder.stop_event.set()
+        self._has_recorders.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return recorder.stop_event
+
+    def unregister(self, process):
+        recorder = self.recorders.pop(process.pid, None)
+        if recorder:
+            recorder.recording.speed = "0 KB/s"
+            recorder.exited.set()
+        self.app.disk_space_service.remove_writer(process.pid)
+        if not self.recorders:
+            self._has_recorders.clear()
+
+    def request_stop(self, recording):
+        """立即通知指定录制停止，无需等待下一次采样"""
+        for recorder in list(self.recorders.values()):
+            if recorder.recording is recording:
+                recorder.stop_event.set()
+
+    async def wait_stopped(self, recording, timeout: float = 15.0):
+        """等待指定录制的进程全部退出监管，超时后放弃等待"""
+        exits = [recorder.exited.wait() for recorder in self.recorders.values() if recorder.recording is recording]
+        if not exits:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*exits), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"等待录制进程退出超时: {recording.rec_id}")
+
+    def request_stop_all(self):
+        """停用录制时通知所有录制停止"""
+        for recorder in list(self.recorders.values()):
+            recorder.stop_event.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await self._has_recorders.wait()
+                # 写入速度同时用于磁盘剩余空间预测，因此始终采样
+                await self._sample_io()
+                await self._check_disk_space()
+                await asyncio.sleep(SAMPLE_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"录制进程监管循环出错: {e}")
+                await asyncio.sleep(SAMPLE_INTERVAL)
+
+    @staticmethod
+    def _read_io_counters(recorders) -> dict:
+        """在工作线程中一次性读取所有进程的IO计数"""
+        now = time.monotonic()
+        results = {}
+        for pid, recorder in recorders:
+            bytes_written = getattr(recorder.process, "bytes_written", None)
+            if bytes_written is not None:
+                results[pid] = (bytes_written, now)
+                continue
+            if recorder.proc is None:
+                continue
+            try:
+                results[pid] = (recorder.proc.io_counters().write_bytes, now)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, AttributeError):
+                results[pid] = None
+            except Exception as e:
+                logger.debug(f"监测进程IO出错: {str(e)}")
+                results[pid] = None
+        return results
+
+    async def _sample_io(self):
+        recorders = list(self.recorders.items())
+        samples = await asyncio.to_thread(self._read_io_counters, recorders)
+
+        changed = []
+        for pid, sample in samples.items():
+            recorder = self.recorders.get(pid)
+            if recorder is None or sample is None:
+                continue
+            write_bytes, sample_time = sample
+            if recorder.last_write_bytes is not None and sample_time > recorder.last_sample_time:
+                bytes_per_sec = (write_bytes - recorder.last_write_bytes) / (sample_time - recorder.last_sample_time)
+                if recorder.recording.live_file_path:
+                    self.app.disk_space_service.update_write_rate(
+                        pid, os.path.dirname(recorder.recording.live_file_path), bytes_per_sec
+                    )
+                speed = format_speed(max(0.0, bytes_per_sec))
+                if speed != recorder.recording.speed:
+                    recorder.recording.speed = speed
+                    changed.append(recorder.recording)
+            recorder.last_write_bytes = write_bytes
+            recorder.last_sample_time = sample_time
+
+        if self.app.settings.user_config.get("show_recording_speed", True):
+            self._publish(changed)
+
+    async def _check_disk_space(self):
+        """按写入速度检查各录制卷，预计空间将降到阈值以下时提前暂停写入该卷的录制"""
+        current_time = time.monotonic()
+        if current_time - self._last_disk_check < DISK_CHECK_INTERVAL:
+            return
+        self._last_disk_check = current_time
+
+        record_manager = self.app.record_manager
+        disk_space_service = self.app.disk_space_service
+        volumes = {}
+        for recorder in self.recorders.values():
+            file_path = recorder.recording.live_file_path
+            if recorder.recording.recording and file_path:
+                output_dir = os.path.dirname(file_path)
+                volumes.setdefault(disk_space_service.get_mount_point(output_dir), (output_dir, []))[1].append(
+                    recorder.recording
+                )
+
+        for output_dir, recordings in volumes.values():
+            # 默认录制目录所在卷低于阈值时 check_free_space 会停用全部录制，预计写满时只暂停写入该卷的录制
+            if not await record_manager.check_free_space(output_dir) and self.app.recording_enabled:
+                for recording in recordings:
+                    record_manager.pause_recording_for_disk_space(recording)
+
+    def _publish(self, recordings):
+        current_time = time.time()
+        if not recordings or current_time - self._last_ui_update < UI_UPDATE_INTERVAL:
+            return
+        if not hasattr(self.app, "record_card_manager"):
+            return
+
+        # 为避免循环导入，使用延迟导入方式获取HomePage类
+        from ..ui.views.home_view import HomePage
+
+        if not isinstance(self.app.current_page, HomePage):
+            return
+        self._last_ui_update = current_time
+        for recording in recordings:
+            try:
+                self.app.record_card_manager.request_update(recording)
+            except Exception as e:
+                logger.debug(f"更新录制卡片速度时出错: {str(e)}")
+
+    def get_active_count(self) -> int:
+        return len(self.recorders)
+
+    async def shutdown(self):
+        for recorder in self.recorders.values():
+            recorder.stop_event.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
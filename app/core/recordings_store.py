@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import threading
+
+from ..utils.logger import logger
+
+
+class RecordingsStore:
+    """基于SQLite（WAL模式）的录制列表存储
+
+    每个录制项单独保存为一行，保存时与上次写入的内容逐项比较，只写入新增、修改和删除的
+    录制项，并在同一个事务中提交，进程崩溃或断电时不会留下写了一半的文件。
+    首次打开时如果数据库为空，会从旧版的 recordings.json 导入数据。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        # rec_id -> (position, 已写入的JSON文本)
+        self._saved: dict[str, tuple[int, str]] = {}
+
+    def open(self):
+        with self._lock:
+            if self._conn is not None:
+                return
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS recordings ("
+                "rec_id TEXT PRIMARY KEY, position INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+            self._conn = conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
+
+    def count(self) -> int:
+        self.open()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
+
+    def load(self) -> list[dict]:
+        """按保存顺序读取全部录制项"""
+        self.open()
+        records = []
+        with self._lock:
+            self._saved.clear()
+            rows = self._conn.execute("SELECT rec_id, position, data FROM recordings ORDER BY position").fetchall()
+            for rec_id, position, data in rows:
+                try:
+                    records.append(json.loads(data))
+                except json.JSONDecodeError:
+                    logger.error(f"录制项数据损坏，已跳过: {rec_id}")
+                    continue
+                self._saved[rec_id] = (position, data)
+        return records
+
+    def save(self, records: list[dict], unchanged_ids: set | None = None) -> int:
+        """保存完整的录制列表，只写入发生变化的行，返回写入和删除的行数
+
+        unchanged_ids 为调用方确认自上次保存后没有修改的录制项，直接沿用已写入的内容，
+        这些录制项在 records 中可以只包含 rec_id。
+        """
+        self.open()
+        with self._lock:
+            upserts = []
+            seen = set()
+            last_position = -1
+            for record in records:
+                rec_id = record.get("rec_id")
+                if not rec_id or rec_id in seen:
+                    logger.warning(f"录制项ID为空或重复，已跳过: {rec_id}")
+                    continue
+                seen.add(rec_id)
+
+                saved = self._saved.get(rec_id)
+                if unchanged_ids and rec_id in unchanged_ids:
+                    if saved is None:
+                        # 未修改的录制项只传入 rec_id，没有已写入的内容可以沿用
+                        logger.warning(f"录制项尚未保存，无法沿用原有内容，已跳过: {rec_id}")
+                        continue
+                    data = saved[1]
+                else:
+                    data = json.dumps(record, ensure_ascii=False)
+                # 已有录制项沿用原位置，只有新增或顺序变化时才分配新位置
+                if saved is not None and saved[0] > last_position:
+                    position = saved[0]
+                else:
+                    position = last_position + 1
+                last_position = position
+                if saved != (position, data):
+                    upserts.append((rec_id, position, data))
+
+            deletes = [(rec_id,) for rec_id in self._saved if rec_id not in seen]
+            if not upserts and not deletes:
+                return 0
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 先删除再写入，避免新分配的位置与待删除行冲突时出现重复排序
+                self._conn.executemany("DELETE FROM recordings WHERE rec_id = ?", deletes)
+                self._conn.executemany(
+                    "INSERT INTO recordings (rec_id, position, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT(rec_id) DO UPDATE SET position = excluded.position, data = excluded.data",
+                    upserts,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            for (rec_id,) in deletes:
+                self._saved.pop(rec_id, None)
+            for rec_id, position, data in upserts:
+                self._saved[rec_id] = (position, data)
+            return len(upserts) + len(deletes)
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """数据库为空时导入旧版 recordings.json，导入后将原文件重命名保留作为备份"""
+        if not os.path.exists(json_path):
+            return 0
+        if self.count() > 0:
+            logger.warning(f"录制数据库已有数据，忽略旧版录制配置文件: {json_path}")
+            return 0
+
+        try:
+            with open(json_path, encoding="utf-8") as file:
+                records = json.load(file)
+        except Exception as e:
+            logger.error(f"读取旧版录制配置文件失败: {e}")
+            return 0
+        if not isinstance(records, list):
+            records = []
+
+        records = [record for record in records if isinstance(record, dict)]
+        self.load()
+        self.save(records)
+        os.replace(json_path, json_path + ".migrated")
+        logger.info(f"已将 {len(records)} 个录制项从 {json_path} 迁移到 {self.db_path}")
+        return len(records)
@@ -1,23 +1,21 @@
 import asyncio
 import os
 import re
-import shutil
-import subprocess
 import time
-import psutil
 from datetime import datetime
 from typing import Any, Optional
 import sys
 
 from ..messages.message_pusher import MessagePusher
 from ..models.recording_status_model import RecordingStatus
+from ..models.video_format_model import VideoFormat
 from ..models.video_quality_model import VideoQuality
-from ..process_manager import BackgroundService
 from ..utils import utils
-from ..utils.logger import logger
-from ..ui.views.home_view import HomePage
+from ..utils.logger import logger, memory_logger
 from . import ffmpeg_builders, platform_handlers
-from .platform_handlers import StreamData, get_platform_info
+from .ffmpeg_builders.base import FFMPEG_USER_AGENT
+from .hls_recorder import NATIVE_FORMATS, HlsRecorder, HlsUnsupportedError, is_hls_url, parse_ffmpeg_headers
+from .platform_handlers import StreamData, get_recording_platform_info
 
 
 class LiveStreamRecorder:
@@ -455,19 +453,36 @@ class LiveStreamRecorder:
             if self.recording is not None:
                 self.recording.is_checking = False
 
+    def _get_handler(self):
+        return platform_handlers.get_platform_handler(
+            live_url=self.live_url,
+            proxy=self.proxy,
+            cookies=self.cookies,
+            record_quality=self.quality,
+            platform=self.platform,
+            username=self.account_config.get(self.platform_key, {}).get("username"),
+            password=self.account_config.get(self.platform_key, {}).get("password"),
+            account_type=self.account_config.get(self.platform_key, {}).get("account_type")
+        )
+
+    async def probe_live_status(self, live_urls: list[str]) -> dict[str, StreamData]:
+        """批量查询同一平台多个直播间的开播状态，平台不支持或查询失败时返回空字典"""
+        handler = self._get_handler()
+        if handler is None or not handler.supports_batch:
+            return {}
+        try:
+            results = await asyncio.wait_for(handler.get_stream_info_batch(live_urls), timeout=15.0)
+            return results or {}
+        except asyncio.TimeoutError:
+            logger.error(f"批量查询开播状态超时: platform={self.platform_key}, proxy={self.proxy}")
+        except Exception as e:
+            logger.error(f"批量查询开播状态失败: {type(e).__name__}, {e}")
+        return {}
+
     async def _try_fetch_stream(self) -> StreamData:
         """尝试获取直播流信息的内部方法"""
         try:
-            handler = platform_handlers.get_platform_handler(
-                live_url=self.live_url,
-                proxy=self.proxy,
-                cookies=self.cookies,
-                record_quality=self.quality,
-                platform=self.platform,
-                username=self.account_config.get(self.platform_key, {}).get("username"),
-                password=self.account_config.get(self.platform_key, {}).get("password"),
-                account_type=self.account_config.get(self.platform_key, {}).get("account_type")
-            )
+            handler = self._get_handler()
             
             if handler is None:
                 lang_code = getattr(self.app, "language_code", "zh_CN").lower()
@@ -508,6 +523,7 @@ class LiveStreamRecorder:
         save_path = self._get_save_path(filename)
         logger.info(f"Save Path: {save_path}")
         self.recording.recording_dir = os.path.dirname(save_path)
+        self.recording.live_file_path = save_path
         os.makedirs(self.recording.recording_dir, exist_ok=True)
         record_url = self._get_record_url(stream_info.record_url)
 
@@ -518,7 +534,8 @@ class LiveStreamRecorder:
             segment_record=self.segment_record,
             segment_time=self.segment_time,
             full_path=save_path,
-            headers=self.get_headers_params(record_url, self.platform_key)
+            headers=self.get_headers_params(record_url, self.platform_key),
+            **self._get_snapshot_options()
         )
         ffmpeg_command = ffmpeg_builder.build_command()
         self.app.page.run_task(
@@ -528,9 +545,55 @@ class LiveStreamRecorder:
             stream_info.record_url,
             ffmpeg_command,
             self.save_format,
-            self.user_config.get("custom_script_command")
+            self.user_config.get("custom_script_command"),
+            save_path,
+            self._create_native_recorder(record_url, save_path)
         )
 
+    def _create_native_recorder(self, record_url: str, save_path: str) -> HlsRecorder | None:
+        """直播间使用原生录制且直播流为m3u8时，返回进程内的HLS录制器，否则返回None使用ffmpeg录制"""
+        engine = self.recording.get_recorder_engine(self.user_config.get("recorder_engine", "ffmpeg"))
+        if engine != "native":
+            return None
+        if not is_hls_url(record_url):
+            logger.debug(f"直播流不是m3u8，使用FFmpeg录制: {self.live_url}")
+            return None
+        if self.save_format not in NATIVE_FORMATS:
+            logger.debug(f"原生录制不支持 {self.save_format} 格式，使用FFmpeg录制: {self.live_url}")
+            return None
+
+        # mp4 先录制为 ts，录制结束后转封装
+        native_save_path = save_path.rsplit(".", maxsplit=1)[0] + ".ts"
+        headers = {"User-Agent": FFMPEG_USER_AGENT}
+        headers.update(parse_ffmpeg_headers(self.get_headers_params(record_url, self.platform_key)))
+        return HlsRecorder(
+            record_url,
+            native_save_path,
+            headers=headers,
+            proxy=self.proxy,
+            segment_record=self.segment_record,
+            segment_time=self.segment_time,
+        )
+
+    def _get_snapshot_options(self) -> dict:
+        """录制视频且开启缩略图时，由录制进程顺带输出缩略图，避免再单独拉取一次直播流"""
+        self.recording.live_snapshot_path = None
+        thumbnail_manager = getattr(self.app, "thumbnail_manager", None)
+        if (
+            thumbnail_manager is None
+            or not self.user_config.get("thumbnail_from_recorder", True)
+            or self.save_format.upper() not in VideoFormat.get_formats()
+            or not self.recording.is_thumbnail_enabled(self.user_config.get("show_live_thumbnail", False))
+        ):
+            return {}
+        snapshot_path = thumbnail_manager.get_live_snapshot_path(self.recording)
+        self.recording.live_snapshot_path = snapshot_path
+        return {
+            "snapshot_path": snapshot_path,
+            "snapshot_interval": thumbnail_manager.update_interval,
+            "snapshot_size": (thumbnail_manager.thumbnail_width, thumbnail_manager.thumbnail_height),
+        }
+
     async def start_ffmpeg(
         self,
         record_name: str,
@@ -538,64 +601,72 @@ class LiveStreamRecorder:
         record_url: str,
         ffmpeg_command: list,
         save_type: str,
-        script_command: str | None = None
+        script_command: str | None = None,
+        save_file_path: str | None = None,
+        native_recorder: HlsRecorder | None = None
     ) -> bool:
         """
-        The child process executes ffmpeg for recording
+        The child process executes ffmpeg for recording, or the in-process HLS recorder when given
         """
 
         try:
-            save_file_path = ffmpeg_command[-1]
+            # 命令末尾可能是缩略图输出，优先使用传入的录制文件路径
+            save_file_path = save_file_path or ffmpeg_command[-1]
+
+            process = None
+            if native_recorder is not None:
+                try:
+                    await native_recorder.start()
+                    process = native_recorder
+                    save_file_path = native_recorder.save_path
+                    # 原生录制不输出缩略图，由缩略图管理器自行截取
+                    self.recording.live_snapshot_path = None
+                    self.recording.live_file_path = save_file_path
+                    memory_logger.info(f"原生HLS录制已启动: {native_recorder.pid}")
+                except HlsUnsupportedError as e:
+                    logger.info(f"直播流包含{e}，改用FFmpeg录制: {live_url}")
+                    native_recorder = None
+                except Exception as e:
+                    logger.warning(f"原生HLS录制启动失败，改用FFmpeg录制: {e}")
+                    native_recorder = None
 
-            logger.info(f"准备启动FFmpeg进程: {ffmpeg_command[0]}")
-            process = await asyncio.create_subprocess_exec(
-                *ffmpeg_command,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                startupinfo=self.subprocess_start_info
-            )
-            
             if process is None:
-                logger.error("FFmpeg进程创建失败，返回None")
-                return False
-                
-            logger.info(f"FFmpeg进程已创建: PID={process.pid}")
+                memory_logger.info(f"准备启动FFmpeg进程: {ffmpeg_command[0]}")
+                process = await asyncio.create_subprocess_exec(
+                    *ffmpeg_command,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    startupinfo=self.subprocess_start_info
+                )
+
+                if process is None:
+                    logger.error("FFmpeg进程创建失败，返回None")
+                    return False
+
+                memory_logger.info(f"FFmpeg进程已创建: PID={process.pid}")
 
+            # 原生录制器与ffmpeg进程一样登记到进程管理器，退出时统一停止
             await self.app.add_ffmpeg_process(process)
             self.recording.status_info = RecordingStatus.RECORDING
             self.recording.record_url = record_url
             logger.info(f"Recording in Progress: {live_url}")
             logger.log("STREAM", f"Recording Stream URL: {record_url}")
             
-            # 启动速度监测任务
-            speed_monitor_task = None
+            # 进程退出和停止请求都由统一的录制监管器处理，不再逐进程轮询
+            stop_event = self.app.recorder_supervisor.register(process, self.recording)
             try:
-                speed_monitor_task = asyncio.create_task(
-                    self.update_recording_speed(process)
-                )
-                speed_monitor_task.set_name(f"speed_monitor_{process.pid}")
-            except Exception as e:
-                logger.error(f"创建速度监测任务失败: {e}")
-            
-            # 验证进程是否真正在运行
-            try:
-                if psutil.pid_exists(process.pid):
-                    proc = psutil.Process(process.pid)
-                    logger.info(f"FFmpeg进程状态验证: PID={process.pid}, 名称={proc.name()}, 状态={proc.status()}")
-                else:
-                    logger.warning(f"FFmpeg进程不存在于系统中: PID={process.pid}")
-            except Exception as e:
-                logger.error(f"验证FFmpeg进程状态时出错: {e}")
-            
-            while True:
-                if not self.recording.recording or not self.app.recording_enabled:
+                wait_task = asyncio.create_task(process.wait())
+                stop_task = asyncio.create_task(stop_event.wait())
+                await asyncio.wait({wait_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+                stop_task.cancel()
+
+                if not wait_task.done():
                     logger.info(f"Preparing to End Recording: {live_url}")
 
-                    if os.name == "nt":
-                        if process.stdin:
-                            process.stdin.write(b"q")
-                            await process.stdin.drain()
+                    if os.name == "nt" and process.stdin:
+                        process.stdin.write(b"q")
+                        await process.stdin.drain()
                     else:
                         # import signal
                         # process.send_signal(signal.SIGINT)
@@ -605,41 +676,14 @@ class LiveStreamRecorder:
                         process.stdin.close()
 
                     try:
-                        await asyncio.wait_for(process.wait(), timeout=10.0)
+                        await asyncio.wait_for(asyncio.shield(wait_task), timeout=10.0)
                     except asyncio.TimeoutError:
                         process.kill()
-                        await process.wait()
-
-                if process.returncode is not None:
-                    logger.info(f"Exit loop recording (normal 0 | abnormal 1): code={process.returncode}, {live_url}")
-                    break
+                        await wait_task
 
-                # 定期检查进程状态
-                try:
-                    if not psutil.pid_exists(process.pid):
-                        logger.warning(f"FFmpeg进程已不存在于系统中: PID={process.pid}")
-                        break
-                except Exception:
-                    pass
-
-                await asyncio.sleep(1)
-            
-            # 取消速度监测任务
-            if speed_monitor_task and not speed_monitor_task.done():
-                try:
-                    # 先设置标志位，让任务快速结束
-                    self.recording._speed_monitor_active = False
-                    # 然后取消任务
-                    speed_monitor_task.cancel()
-                    # 等待任务完成，但设置较短的超时时间
-                    await asyncio.wait_for(asyncio.shield(speed_monitor_task), timeout=1.0)
-                except (asyncio.CancelledError, asyncio.TimeoutError):
-                    logger.debug(f"速度监测任务已取消: PID={process.pid}")
-                except Exception as e:
-                    logger.error(f"取消速度监测任务时出错: {e}")
-                finally:
-                    # 确保标志位被重置
-                    self.recording._speed_monitor_active = False
+                logger.info(f"Exit loop recording (normal 0 | abnormal 1): code={process.returncode}, {live_url}")
+            finally:
+                self.app.recorder_supervisor.unregister(process)
 
             return_code = process.returncode
             safe_return_code = [0, 255]
@@ -651,12 +695,9 @@ class LiveStreamRecorder:
                 try:
                     self.app.record_manager.stop_recording(self.recording)
                     # 检查当前页面是否为主页面，只有在主页面时才更新UI
-                    if isinstance(self.app.current_page, HomePage):
-                        await self.app.record_card_manager.update_card(self.recording)
-                        self.app.page.pubsub.send_others_on_topic("update", self.recording)
-                        # 确保重新应用筛选条件
-                        if hasattr(self.app.current_page, 'apply_filter'):
-                            await self.app.current_page.apply_filter()
+                    if getattr(self.app.current_page, "page_name", None) == "home":
+                        # 合并刷新卡片并重新应用筛选条件
+                        self.app.record_card_manager.request_update(self.recording, refilter=True, broadcast=True)
                     await self.app.snack_bar.show_snack_bar(
                         record_name + " " + self._["record_stream_error"], duration=2000
                     )
@@ -703,7 +744,7 @@ class LiveStreamRecorder:
                         # 优化: 只在Windows系统且启用Windows通知时才获取平台代码
                         if self.settings.user_config.get("windows_notify_enabled") and sys.platform == "win32":
                             # 获取平台代码用于显示对应图标
-                            _, platform_code = get_platform_info(self.recording.url)
+                            _, platform_code = get_recording_platform_info(self.recording)
                             self.app.page.run_task(msg_manager.push_messages, msg_title, push_content, platform_code)
                         else:
                             # 其他情况不传递平台代码
@@ -714,20 +755,25 @@ class LiveStreamRecorder:
                 try:
                     self.recording.update({"display_title": display_title})
                     # 检查当前页面是否为主页面，只有在主页面时才更新UI
-                    if isinstance(self.app.current_page, HomePage):
-                        await self.app.record_card_manager.update_card(self.recording)
-                        self.app.page.pubsub.send_others_on_topic("update", self.recording)
-                        # 确保重新应用筛选条件
-                        if hasattr(self.app.current_page, 'apply_filter'):
-                            await self.app.current_page.apply_filter()
-                    if self.app.recording_enabled and process in self.app.process_manager.ffmpeg_processes:
-                        self.app.page.run_task(self.app.record_manager.check_if_live, self.recording)
+                    if getattr(self.app.current_page, "page_name", None) == "home":
+                        # 合并刷新卡片并重新应用筛选条件
+                        self.app.record_card_manager.request_update(self.recording, refilter=True, broadcast=True)
+                    # 退出清理时进程会被移出进程管理器，此时不再重新检测
+                    is_tracked = process in self.app.process_manager.ffmpeg_processes
+                    if self.app.recording_enabled and is_tracked:
+                        self.app.record_manager.request_live_check(self.recording)
                     else:
                         self.recording.status_info = RecordingStatus.NOT_RECORDING_SPACE
                 except Exception as e:
                     logger.debug(f"Failed to update UI: {e}")
 
-                if self.user_config.get("convert_to_mp4") and self.save_format == "ts":
+                if native_recorder is not None:
+                    # 原生录制写出的都是ts文件，mp4格式需要转封装，ts格式按转换设置处理
+                    if self.save_format == "mp4" or self.user_config.get("convert_to_mp4"):
+                        delete_original = self.save_format == "mp4" or self.user_config["delete_original"]
+                        for path in native_recorder.files:
+                            self.app.page.run_task(self.converts_mp4, path, delete_original)
+                elif self.user_config.get("convert_to_mp4") and self.save_format == "ts":
                     if self.segment_record:
                         file_paths = utils.get_file_paths(os.path.dirname(save_file_path))
                         prefix = os.path.basename(save_file_path).rsplit("_", maxsplit=1)[0]
@@ -782,70 +828,8 @@ class LiveStreamRecorder:
         return True
 
     async def converts_mp4(self, converts_file_path: str, is_original_delete: bool = True) -> None:
-        """Asynchronous transcoding method, can be added to the background service to continue execution"""
-        if not self.app.recording_enabled:
-            logger.info(f"Application is closing, adding transcoding task to background service: {converts_file_path}")
-            BackgroundService.get_instance().add_task(
-                self.converts_mp4_sync, converts_file_path, is_original_delete
-            )
-            return
-            
-        # Otherwise, execute transcoding normally
-        await self._do_converts_mp4(converts_file_path, is_original_delete)
-    
-    def converts_mp4_sync(self, converts_file_path: str, is_original_delete: bool = True) -> None:
-        """Synchronous version of the transcoding method, used for background service"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self._do_converts_mp4(converts_file_path, is_original_delete))
-        finally:
-            loop.close()
-    
-    async def _do_converts_mp4(self, converts_file_path: str, is_original_delete: bool = True) -> None:
-        """Actual execution method for transcoding"""
-        converts_success = False
-        save_path = None
-        try:
-            converts_file_path = converts_file_path.replace("\\", "/")
-            if os.path.exists(converts_file_path) and os.path.getsize(converts_file_path) > 0:
-                save_path = converts_file_path.rsplit(".", maxsplit=1)[0] + ".mp4"
-                _output = subprocess.check_output(
-                    [
-                        "ffmpeg",
-                        "-i", converts_file_path,
-                        "-c:v", "copy",
-                        "-c:a", "copy",
-                        "-f", "mp4",
-                        save_path
-                    ],
-                    stderr=subprocess.STDOUT,
-                    startupinfo=self.subprocess_start_info,
-                )
-
-                converts_success = True
-                logger.info(f"Video transcoding completed: {save_path}")
-
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Video transcoding failed! Error message: {e.output.decode()}")
-
-        try:
-            if converts_success:
-                if is_original_delete:
-                    time.sleep(1)
-                    if os.path.exists(converts_file_path):
-                        os.remove(converts_file_path)
-                    logger.info(f"Delete Original File: {converts_file_path}")
-                else:
-                    converts_dir = f"{os.path.dirname(save_path)}/original"
-                    os.makedirs(converts_dir, exist_ok=True)
-                    shutil.move(converts_file_path, converts_dir)
-                    logger.info(f"Move Transcoding Files: {converts_file_path}")
-
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error occurred during conversion: {e}")
-        except Exception as e:
-            logger.error(f"An unknown error occurred: {e}")
+        """Submit the file to the transcode worker pool, the queue is persisted and resumed on restart"""
+        await self.app.transcode_manager.submit(converts_file_path, is_original_delete)
 
     async def custom_script_execute(
         self,
@@ -959,7 +943,7 @@ class LiveStreamRecorder:
             if not recording.record_format or recording.record_format.lower() not in self.VALID_SAVE_FORMATS:
                 recording.record_format = default_format
                 # 更新卡片显示
-                await self.app.record_card_manager.update_card(recording)
+                self.app.record_card_manager.request_update(recording)
                 
         # 保存更新后的录制项
         self.app.page.run_task(self.app.record_manager.persist_recordings)
@@ -994,11 +978,11 @@ class LiveStreamRecorder:
                 if time_value <= 0:
                     recording.segment_time = default_segment_time
                     # 更新卡片显示
-                    await self.app.record_card_manager.update_card(recording)
+                    self.app.record_card_manager.request_update(recording)
             except (ValueError, TypeError):
                 recording.segment_time = default_segment_time
                 # 更新卡片显示
-                await self.app.record_card_manager.update_card(recording)
+                self.app.record_card_manager.request_update(recording)
                 
         # 保存更新后的录制项
         self.app.page.run_task(self.app.record_manager.persist_recordings)
@@ -1009,112 +993,6 @@ class LiveStreamRecorder:
             
         logger.info(f"已更新所有录制卡片的默认分段时间为: {default_segment_time}")
 
-    async def update_recording_speed(self, process, interval=1.0):
-        """
-        更新录制速度信息，使用进程IO监测方法
-        
-        Args:
-            process: ffmpeg进程
-            interval: 更新间隔（秒）
-        """
-        try:
-            pid = process.pid
-            #logger.debug(f"开始监测录制速度，进程ID: {pid}")
-            
-            # 初始化速度
-            self.recording.speed = "0 KB/s"
-            last_update_time = 0
-            
-            # 添加一个标志位，用于快速响应取消请求
-            self.recording._speed_monitor_active = True
-            
-            # 为避免循环导入，使用延迟导入方式获取HomePage类
-            from ..ui.views.home_view import HomePage
-            
-            while process.returncode is None and self.recording.recording and getattr(self.recording, '_speed_monitor_active', True):
-                # 检查用户是否启用了录制速度监控
-                show_recording_speed = self.app.settings.user_config.get("show_recording_speed", True)
-                
-                # 如果禁用了速度监控，则降低监控频率，每5秒检查一次配置变化
-                if not show_recording_speed:
-                    await asyncio.sleep(5)
-                    continue
-                
-                # 启用速度监控时，计算速度
-                speed = await self._get_current_speed(process, interval)
-                
-                if speed:
-                    self.recording.speed = speed
-                    # 每3秒更新一次UI，减少UI更新频率
-                    current_time = time.time()
-                    if current_time - last_update_time >= 3:
-                        if hasattr(self.app, 'record_card_manager'):
-                            # 检查当前页面是否为主页面，只有在主页面时才更新UI
-                            if isinstance(self.app.current_page, HomePage):
-                                try:
-                                    self.app.page.run_task(self.app.record_card_manager.update_card, self.recording)
-                                    last_update_time = current_time
-                                except Exception as e:
-                                    logger.debug(f"更新录制卡片速度时出错: {str(e)}")
-            
-                await asyncio.sleep(interval)
-        except asyncio.CancelledError:
-            logger.debug(f"录制速度监测任务被取消，进程ID: {pid}")
-        except Exception as e:
-            logger.error(f"录制速度监测出错: {str(e)}")
-        finally:
-            # 重置速度监控状态
-            self.recording._speed_monitor_active = False
-            self.recording.speed = "0 KB/s"
-            logger.debug(f"录制速度监测结束，进程ID: {pid}")
-    
-    async def _get_current_speed(self, process, interval=1.0):
-        """
-        获取当前录制速度，使用psutil监测进程IO
-        
-        Args:
-            process: ffmpeg进程
-            interval: 监测间隔（秒）
-            
-        Returns:
-            格式化的速度字符串，例如 "1.2 MB/s"
-        """
-        speed = "0 KB/s"
-        try:
-            # 检查进程是否存在
-            if not psutil.pid_exists(process.pid):
-                return speed
-                
-            proc = psutil.Process(process.pid)
-            # 获取初始IO计数
-            initial_io = proc.io_counters()
-            # 等待指定间隔
-            await asyncio.sleep(interval)
-            # 再次检查进程是否存在
-            if not psutil.pid_exists(process.pid):
-                return speed
-                
-            # 获取当前IO计数
-            current_io = proc.io_counters()
-            # 计算写入速度 (bytes per second)
-            write_bytes = current_io.write_bytes - initial_io.write_bytes
-            bytes_per_sec = write_bytes / interval
-            
-            # 转换为合适的单位
-            if bytes_per_sec >= 1024 * 1024:
-                speed = f"{bytes_per_sec / (1024 * 1024):.1f} MB/s"
-            elif bytes_per_sec >= 1024:
-                speed = f"{bytes_per_sec / 1024:.1f} KB/s"
-            else:
-                speed = f"{bytes_per_sec:.1f} B/s"
-                
-            #logger.debug(f"进程IO - 速度: {speed}, 进程ID: {process.pid}")
-            return speed
-        except Exception as e:
-            # 只记录调试级别日志，避免大量错误日志
-            logger.debug(f"监测进程IO出错: {str(e)}")
-            return speed
-
     async def get_room_id_from_short_url(self, short_url: str) -> Optional[str]:
         """
         从短链接中获取真实房间ID
@@ -0,0 +1,286 @@
+import asyncio
+import os
+import shutil
+import time
+import uuid
+
+from ..utils.logger import logger
+
+# 默认的并发转码任务数
+DEFAULT_MAX_WORKERS = 2
+# 内存中保留的已结束任务数量，供界面查询
+MAX_FINISHED_JOBS = 100
+# 删除原文件时等待文件句柄释放的重试次数和间隔（秒）
+REMOVE_RETRIES = 10
+REMOVE_RETRY_INTERVAL = 0.2
+
+
+class TranscodeStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class TranscodeManager:
+    """TS转MP4转码任务池
+
+    转码任务进入队列后由固定数量的工作协程依次处理，ffmpeg以异步子进程运行，
+    不会阻塞事件循环。未完成的任务会持久化到配置目录，程序重启后自动恢复。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.config_manager = app.config_manager
+        self.jobs = {}
+        self.queue = asyncio.Queue()
+        self.workers = []
+        self.running_processes = {}
+        self.is_running = False
+        self._save_lock = asyncio.Lock()
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "restored": 0}
+        self._restore_jobs()
+
+    @property
+    def max_workers(self) -> int:
+        try:
+            value = int(self.app.settings.user_config.get("transcode_max_workers", DEFAULT_MAX_WORKERS))
+        except (TypeError, ValueError):
+            value = DEFAULT_MAX_WORKERS
+        return max(1, value)
+
+    def _restore_jobs(self):
+        """从持久化队列中恢复未完成的转码任务"""
+        saved_jobs = self.config_manager.load_transcode_queue_config()
+        if not isinstance(saved_jobs, list):
+            return
+
+        for job in saved_jobs:
+            if not isinstance(job, dict) or not job.get("source"):
+                continue
+            if job.get("status") not in (TranscodeStatus.PENDING, TranscodeStatus.RUNNING):
+                continue
+            # 上次退出时仍在执行的任务重新排队，ffmpeg使用 -y 覆盖不完整的输出
+            job["status"] = TranscodeStatus.PENDING
+            job["progress"] = 0.0
+            self.jobs[job["id"]] = job
+            self.queue.put_nowait(job["id"])
+            self._stats["restored"] += 1
+
+        if self._stats["restored"]:
+            logger.info(f"恢复了 {self._stats['restored']} 个未完成的转码任务")
+
+    async def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        for index in range(self.max_workers):
+            self.workers.append(asyncio.create_task(self._worker(index)))
+        logger.info(f"转码任务池已启动，并发数: {len(self.workers)}")
+
+    async def submit(self, source_path: str, delete_original: bool = True) -> str | None:
+        """提交一个转码任务，返回任务ID"""
+        source_path = source_path.replace("\\", "/")
+        for job in self.jobs.values():
+            if job["source"] == source_path and job["status"] in (TranscodeStatus.PENDING, TranscodeStatus.RUNNING):
+                logger.debug(f"转码任务已在队列中: {source_path}")
+                return job["id"]
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "source": source_path,
+            "target": source_path.rsplit(".", maxsplit=1)[0] + ".mp4",
+            "delete_original": bool(delete_original),
+            "status": TranscodeStatus.PENDING,
+            "progress": 0.0,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self.jobs[job["id"]] = job
+        self._stats["submitted"] += 1
+        await self.queue.put(job["id"])
+        await self.persist_queue()
+        logger.info(f"添加转码任务: {source_path}")
+        return job["id"]
+
+    def get_job(self, job_id: str) -> dict | None:
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    def get_jobs(self) -> list[dict]:
+        return [dict(job) for job in self.jobs.values()]
+
+    def get_stats(self) -> dict:
+        status_count = {
+            TranscodeStatus.PENDING: 0,
+            TranscodeStatus.RUNNING: 0,
+            TranscodeStatus.COMPLETED: 0,
+            TranscodeStatus.FAILED: 0,
+        }
+        for job in self.jobs.values():
+            status_count[job["status"]] = status_count.get(job["status"], 0) + 1
+        return {**self._stats, **status_count, "workers": len(self.workers)}
+
+    async def persist_queue(self):
+        """只持久化尚未完成的任务"""
+        async with self._save_lock:
+            pending_jobs = [
+                job for job in self.jobs.values()
+                if job["status"] in (TranscodeStatus.PENDING, TranscodeStatus.RUNNING)
+            ]
+            await self.config_manager.save_transcode_queue_config(pending_jobs)
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                job = self.jobs.get(job_id)
+                if job and job["status"] == TranscodeStatus.PENDING:
+                    await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"转码工作协程 {index} 处理任务时出错: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, job: dict):
+        source_path = job["source"]
+        if not os.path.exists(source_path) or os.path.getsize(source_path) == 0:
+            self._finish_job(job, TranscodeStatus.FAILED, "source file missing or empty")
+            await self.persist_queue()
+            return
+
+        job["status"] = TranscodeStatus.RUNNING
+        job["started_at"] = time.time()
+        await self.persist_queue()
+
+        try:
+            converts_success = await self._convert(job)
+        except OSError as e:
+            job["error"] = str(e)
+            logger.error(f"Video transcoding failed! Error message: {e}")
+            converts_success = False
+
+        if converts_success:
+            logger.info(f"Video transcoding completed: {job['target']}")
+            await self._handle_original(job)
+            self._finish_job(job, TranscodeStatus.COMPLETED)
+        elif job["status"] == TranscodeStatus.RUNNING:
+            self._finish_job(job, TranscodeStatus.FAILED, job.get("error"))
+        await self.persist_queue()
+
+    async def _convert(self, job: dict) -> bool:
+        source_size = os.path.getsize(job["source"])
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-y",
+            "-i", job["source"],
+            "-c:v", "copy",
+            "-c:a", "copy",
+            "-f", "mp4",
+            "-progress", "pipe:1",
+            "-nostats",
+            job["target"],
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            startupinfo=self.app.subprocess_start_up_info,
+        )
+        self.running_processes[job["id"]] = process
+        stderr_task = asyncio.create_task(process.stderr.read())
+        try:
+            async for raw_line in process.stdout:
+                key, _, value = raw_line.decode(errors="ignore").strip().partition("=")
+                if key == "total_size" and value.isdigit() and source_size > 0:
+                    job["progress"] = min(int(value) / source_size, 0.99)
+                elif key == "progress" and value == "end":
+                    job["progress"] = 1.0
+            await process.wait()
+            stderr_output = await stderr_task
+        finally:
+            self.running_processes.pop(job["id"], None)
+
+        if process.returncode != 0:
+            if job["status"] != TranscodeStatus.RUNNING:
+                return False
+            job["error"] = stderr_output.decode(errors="ignore")[-2000:]
+            logger.error(f"Video transcoding failed! Error message: {job['error']}")
+            return False
+        return True
+
+    @staticmethod
+    async def _handle_original(job: dict):
+        source_path = job["source"]
+        try:
+            if job["delete_original"]:
+                await TranscodeManager._remove_when_released(source_path)
+                logger.info(f"Delete Original File: {source_path}")
+            else:
+                converts_dir = f"{os.path.dirname(job['target'])}/original"
+                await asyncio.to_thread(os.makedirs, converts_dir, exist_ok=True)
+                await asyncio.to_thread(shutil.move, source_path, converts_dir)
+                logger.info(f"Move Transcoding Files: {source_path}")
+        except Exception as e:
+            logger.error(f"An unknown error occurred: {e}")
+
+    @staticmethod
+    async def _remove_when_released(path: str):
+        """删除原文件，文件仍被占用时（Windows下转码进程刚退出）稍后重试"""
+        for attempt in range(REMOVE_RETRIES):
+            try:
+                await asyncio.to_thread(os.remove, path)
+            except FileNotFoundError:
+                return
+            except PermissionError:
+                if attempt == REMOVE_RETRIES - 1:
+                    raise
+                await asyncio.sleep(REMOVE_RETRY_INTERVAL)
+            else:
+                return
+
+    def _finish_job(self, job: dict, status: str, error: str | None = None):
+        job["status"] = status
+        job["error"] = error
+        job["finished_at"] = time.time()
+        if status == TranscodeStatus.COMPLETED:
+            job["progress"] = 1.0
+            self._stats["completed"] += 1
+        else:
+            self._stats["failed"] += 1
+        self._trim_finished_jobs()
+
+    def _trim_finished_jobs(self):
+        finished = [
+            job for job in self.jobs.values()
+            if job["status"] in (TranscodeStatus.COMPLETED, TranscodeStatus.FAILED)
+        ]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            self.jobs.pop(job["id"], None)
+
+    async def shutdown(self):
+        """停止工作协程，正在执行的任务标记为待处理，下次启动时继续"""
+        if not self.is_running:
+            return
+        self.is_running = False
+
+        for job_id, process in list(self.running_processes.items()):
+            job = self.jobs.get(job_id)
+            if job:
+                job["status"] = TranscodeStatus.PENDING
+                job["progress"] = 0.0
+            try:
+                if process.returncode is None:
+                    process.terminate()
+                    await asyncio.wait_for(process.wait(), timeout=5)
+            except (ProcessLookupError, asyncio.TimeoutError):
+                pass
+            except Exception as e:
+                logger.error(f"终止转码进程时出错: {e}")
+
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+        await self.persist_queue()
+        logger.info("转码任务池已停止")
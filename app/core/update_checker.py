@@ -11,6 +11,7 @@ import subprocess
 import flet as ft
 import httpx
 
+from ..utils.http_client import get_http_client
 from ..utils.logger import logger
 
 
@@ -137,52 +138,52 @@ class UpdateChecker:
                 # 获取代理设置
                 proxy = self._get_proxy_settings()
                 
-                async with httpx.AsyncClient(timeout=timeout, proxy=proxy) as client:
-                    url = f"https://api.github.com/repos/{source['repo']}/releases/latest"
-                    
-                    response = await client.get(url, headers=headers)
-                    logger.info(f"GitHub API响应状态码: {response.status_code}")
+                client = get_http_client(proxy)
+                url = f"https://api.github.com/repos/{source['repo']}/releases/latest"
+                
+                response = await client.get(url, headers=headers, timeout=timeout)
+                logger.info(f"GitHub API响应状态码: {response.status_code}")
 
-                    if response.status_code == 200:
-                        latest_release = response.json()
-                        latest_version = latest_release["tag_name"].lstrip("v")
-                        
-                        comparison_result = self._compare_versions(latest_version, self.current_version)
+                if response.status_code == 200:
+                    latest_release = response.json()
+                    latest_version = latest_release["tag_name"].lstrip("v")
+                    
+                    comparison_result = self._compare_versions(latest_version, self.current_version)
+                    
+                    if comparison_result > 0:
+                        download_urls = {}
+                        for asset in latest_release.get("assets", []):
+                            name = asset["name"].lower()
+                            if ("win" in name or "windows" in name) and "console" not in name:
+                                download_urls["windows"] = asset["browser_download_url"]
+                            elif "mac" in name or "macos" in name:
+                                download_urls["macos"] = asset["browser_download_url"]
+                            elif "linux" in name:
+                                download_urls["linux"] = asset["browser_download_url"]
                         
-                        if comparison_result > 0:
-                            download_urls = {}
-                            for asset in latest_release.get("assets", []):
-                                name = asset["name"].lower()
-                                if ("win" in name or "windows" in name) and "console" not in name:
-                                    download_urls["windows"] = asset["browser_download_url"]
-                                elif "mac" in name or "macos" in name:
-                                    download_urls["macos"] = asset["browser_download_url"]
-                                elif "linux" in name:
-                                    download_urls["linux"] = asset["browser_download_url"]
-                            
-                            return {
-                                "has_update": True,
-                                "latest_version": latest_version,
-                                "current_version": self.current_version,
-                                "release_notes": latest_release["body"],
-                                "download_url": latest_release["html_url"],
-                                "download_urls": download_urls,
-                                "source": source["name"]
-                            }
-                    elif response.status_code == 403:
-                        logger.error("GitHub API访问受限，可能需要认证或已达到访问限制")
-                        return {"has_update": False, "error": "GitHub API访问受限，请稍后重试", "source": source["name"]}
-                    elif response.status_code == 404:
-                        logger.error(f"GitHub仓库未找到: {source['repo']}")
-                        return {"has_update": False, "error": "GitHub仓库未找到", "source": source["name"]}
-                    else:
-                        logger.error(f"GitHub API请求失败，状态码: {response.status_code}")
-                        if attempt < max_retries - 1:
-                            #logger.info(f"将在{retry_delay}秒后重试...")
-                            await asyncio.sleep(retry_delay)
-                            continue
-                        return {"has_update": False, "error": f"GitHub API请求失败: {response.status_code}", "source": source["name"]}
-                    return {"has_update": False, "source": source["name"]}
+                        return {
+                            "has_update": True,
+                            "latest_version": latest_version,
+                            "current_version": self.current_version,
+                            "release_notes": latest_release["body"],
+                            "download_url": latest_release["html_url"],
+                            "download_urls": download_urls,
+                            "source": source["name"]
+                        }
+                elif response.status_code == 403:
+                    logger.error("GitHub API访问受限，可能需要认证或已达到访问限制")
+                    return {"has_update": False, "error": "GitHub API访问受限，请稍后重试", "source": source["name"]}
+                elif response.status_code == 404:
+                    logger.error(f"GitHub仓库未找到: {source['repo']}")
+                    return {"has_update": False, "error": "GitHub仓库未找到", "source": source["name"]}
+                else:
+                    logger.error(f"GitHub API请求失败，状态码: {response.status_code}")
+                    if attempt < max_retries - 1:
+                        #logger.info(f"将在{retry_delay}秒后重试...")
+                        await asyncio.sleep(retry_delay)
+                        continue
+                    return {"has_update": False, "error": f"GitHub API请求失败: {response.status_code}", "source": source["name"]}
+                return {"has_update": False, "source": source["name"]}
             except httpx.ConnectTimeout:
                 logger.error("连接GitHub超时")
                 if attempt < max_retries - 1:
@@ -229,21 +230,22 @@ class UpdateChecker:
             # 获取代理设置
             proxy = self._get_proxy_settings()
             
-            async with httpx.AsyncClient(timeout=timeout, proxy=proxy) as client:
-                response = await client.get(
-                    source["url"],
-                    params={"current_version": self.current_version}
-                )
-                if response.status_code == 200:
-                    update_info = response.json()
-                    if update_info.get("has_update", False):
-                        return {
-                            **update_info,
-                            "source": source["name"]
-                        }
-                    return {"has_update": False, "source": source["name"]}
-                return {"has_update": False, "error": f"API returned status code: {response.status_code}",
-                        "source": source["name"]}
+            client = get_http_client(proxy)
+            response = await client.get(
+                source["url"],
+                params={"current_version": self.current_version},
+                timeout=timeout,
+            )
+            if response.status_code == 200:
+                update_info = response.json()
+                if update_info.get("has_update", False):
+                    return {
+                        **update_info,
+                        "source": source["name"]
+                    }
+                return {"has_update": False, "source": source["name"]}
+            return {"has_update": False, "error": f"API returned status code: {response.status_code}",
+                    "source": source["name"]}
         except Exception as e:
             logger.error(f"Failed to check update from custom source: {e}")
             return {"has_update": False, "error": str(e), "source": source["name"]}
@@ -0,0 +1,273 @@
+import asyncio
+import os
+import signal
+
+from . import execute_dir
+from .core.config_manager import ConfigManager
+from .core.config_validator import ConfigValidator
+from .core.disk_space_service import DiskSpaceService
+from .core.language_manager import LanguageManager
+from .core.platform_handlers import PlatformHandler
+from .core.record_manager import RecordingManager
+from .core.recorder_supervisor import RecorderSupervisor
+from .core.transcode_manager import TranscodeManager
+from .messages.message_pusher import MessagePusher
+from .models.recording_status_model import RecordingStatus
+from .process_manager import AsyncProcessManager
+from .utils import utils
+from .utils.http_client import close_http_clients
+from .utils.logger import logger
+from .utils.translation_service import close_translation_cache
+
+# 定期清理平台处理器缓存的间隔（秒）
+HANDLER_CLEANUP_INTERVAL = 35 * 60
+
+
+class LocalPubSub:
+    """进程内的发布订阅，接口与 Flet 的 page.pubsub 一致，前端可以按主题订阅录制状态变化"""
+
+    def __init__(self, host: "HeadlessPage"):
+        self.host = host
+        self.subscribers = {}
+
+    def subscribe_topic(self, topic: str, handler):
+        self.subscribers.setdefault(topic, []).append(handler)
+
+    def unsubscribe_topic(self, topic: str, handler=None):
+        if handler is None:
+            self.subscribers.pop(topic, None)
+        elif handler in self.subscribers.get(topic, []):
+            self.subscribers[topic].remove(handler)
+
+    def unsubscribe_all(self):
+        self.subscribers.clear()
+
+    def send_all_on_topic(self, topic: str, message):
+        for handler in list(self.subscribers.get(topic, [])):
+            if asyncio.iscoroutinefunction(handler):
+                self.host.run_task(handler, topic, message)
+            else:
+                try:
+                    handler(topic, message)
+                except Exception as e:
+                    logger.error(f"处理 {topic} 消息时出错: {e}")
+
+    def send_others_on_topic(self, topic: str, message):
+        # 无界面模式下没有发送方会话，所有订阅者都是“其他”订阅者
+        self.send_all_on_topic(topic, message)
+
+
+class HeadlessPage:
+    """无界面模式下代替 Flet Page 的任务宿主，只提供录制核心用到的 run_task 和 pubsub"""
+
+    web = False
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.pubsub = LocalPubSub(self)
+        self.tasks = set()
+
+    def run_task(self, handler, *args, **kwargs):
+        task = self.loop.create_task(self._run(handler, *args, **kwargs))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    @staticmethod
+    async def _run(handler, *args, **kwargs):
+        try:
+            return await handler(*args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"后台任务 {getattr(handler, '__name__', handler)} 出错: {e}")
+
+
+class HeadlessSettings:
+    """无界面模式下的设置，提供与设置页相同的配置读取接口"""
+
+    def __init__(self, app):
+        self.app = app
+        self.config_manager = app.config_manager
+        self.user_config = self.config_manager.load_user_config()
+        self.default_config = self.config_manager.load_default_config()
+        self.cookies_config = self.config_manager.load_cookies_config()
+        self.accounts_config = self.config_manager.load_accounts_config()
+        language_option = self.config_manager.load_language_config()
+        _, default_language_code = list(language_option.items())[0]
+        self.language_code = language_option.get(self.user_config.get("language"), default_language_code)
+
+    def get_config_value(self, key, default=None):
+        return self.user_config.get(key, self.default_config.get(key, default))
+
+    def get_video_save_path(self):
+        live_save_path = self.get_config_value("live_save_path")
+        if not live_save_path:
+            live_save_path = os.path.join(self.app.run_path, 'downloads')
+        return live_save_path
+
+
+class RecordingEventRelay:
+    """
+    代替录制卡片管理器接收录制核心的刷新请求
+
+    不创建任何控件，只把状态变化转发为 pubsub 消息，Web 等前端可以按需订阅
+    update、delete 主题；没有订阅者时消息直接丢弃。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def request_update(self, recording, refilter: bool = False, broadcast: bool = False, force: bool = False):
+        self.app.page.pubsub.send_all_on_topic("update", recording)
+
+    async def remove_recording_card(self, recordings):
+        # 删除消息已由 RecordingManager 通过 send_others_on_topic 发出
+        pass
+
+
+class LogSnackBar:
+    """把原本显示在界面上的提示写入日志"""
+
+    @staticmethod
+    async def show_snack_bar(message, bgcolor=None, duration=1500, action=None, emoji=None, show_close_icon=False):
+        logger.info(f"{emoji} {message}" if emoji else message)
+
+
+class HeadlessApp:
+    """
+    无界面的录制引擎
+
+    与 App 提供相同的核心接口（config_manager、settings、record_manager、page.run_task 等），
+    在普通的 asyncio 事件循环上运行直播检测、录制和转码，不创建任何 Flet 控件，
+    适合部署在服务器上。
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop | None = None,
+        run_path: str | None = None,
+        config_manager: ConfigManager | None = None,
+        validate_configs: bool = True,
+    ):
+        self.page = HeadlessPage(loop or asyncio.get_running_loop())
+        self.run_path = run_path or execute_dir
+        self.assets_dir = os.path.join(self.run_path, "assets")
+        self.is_web_mode = False
+        self.is_headless = True
+        self.current_page = None
+        self.recording_enabled = True
+        self.disk_space_notification_sent = False
+        self.disk_space_last_notification_time = 0
+        self.stop_event = asyncio.Event()
+        # 多进程模式下由协调进程统一检查和修复配置，工作进程不写入用户配置文件
+        self.validate_configs = validate_configs
+
+        self.process_manager = AsyncProcessManager()
+        self.config_manager = config_manager or ConfigManager(self.run_path)
+        self.settings = HeadlessSettings(self)
+        self.language_code = self.settings.language_code
+        self.language_manager = LanguageManager(self)
+        self._ = self.language_manager.language
+        self.snack_bar = LogSnackBar()
+        self.subprocess_start_up_info = utils.get_startup_info()
+
+        self.disk_space_service = DiskSpaceService(self)
+        self.record_card_manager = RecordingEventRelay(self)
+        self.record_manager = RecordingManager(self)
+        self.recorder_supervisor = RecorderSupervisor(self)
+        self.transcode_manager = TranscodeManager(self)
+        self.config_validator = ConfigValidator(self)
+
+    def load(self):
+        self._ = self.language_manager.language
+
+    async def start(self):
+        """启动转码任务池，检查配置和磁盘空间，并为所有监控中的直播间安排首次检测"""
+        await self.transcode_manager.start()
+        if self.validate_configs:
+            fixed_items = await self.config_validator.validate_all_configs()
+            if fixed_items:
+                await self.config_validator.update_recordings_with_valid_config(fixed_items)
+        await self.record_manager.check_free_space()
+
+        record_manager = self.record_manager
+        for recording in record_manager.recordings:
+            recording.scheduled_time_range = await record_manager.get_scheduled_time_range(
+                recording.scheduled_start_time, recording.monitor_hours
+            )
+            if self.recording_enabled:
+                record_manager.request_live_check(recording)
+            else:
+                recording.status_info = RecordingStatus.NOT_RECORDING_SPACE
+
+        self.page.run_task(record_manager.setup_periodic_live_check, record_manager.loop_time_seconds)
+        self.page.run_task(self._periodic_cleanup)
+        monitoring = sum(1 for recording in record_manager.recordings if recording.monitor_status)
+        logger.info(f"无界面模式已启动，共 {len(record_manager.recordings)} 个直播间，{monitoring} 个正在监控")
+
+    async def run(self):
+        """运行到收到退出信号为止，然后停止录制并清理资源"""
+        self._install_signal_handlers()
+        await self.start()
+        await self.stop_event.wait()
+        logger.info("收到退出信号，正在停止录制...")
+        await self.cleanup()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _install_signal_handlers(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.page.loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows 的事件循环不支持信号处理器，Ctrl+C 由 asyncio.run 转换为 KeyboardInterrupt
+                pass
+
+    async def _periodic_cleanup(self):
+        while True:
+            await asyncio.sleep(HANDLER_CLEANUP_INTERVAL)
+            PlatformHandler.clear_unused_instances()
+
+    async def add_ffmpeg_process(self, process):
+        if process is None:
+            logger.warning("尝试添加空的ffmpeg进程")
+            return
+        await self.process_manager.add_process(process)
+
+    async def show_disk_space_warning_dialog(self, threshold: float, free_space: float):
+        logger.warning(f"磁盘空间不足: 剩余 {free_space:.2f} GB，低于阈值 {threshold} GB，已暂停录制")
+
+    async def show_suggestion_message(self, title: str, message: str):
+        logger.warning(f"{title}: {message}")
+
+    async def cleanup(self):
+        self.recording_enabled = False
+        try:
+            await self.record_manager.live_check_scheduler.shutdown()
+            for recording in self.record_manager.recordings:
+                if recording.recording:
+                    self.record_manager.stop_recording(recording, manually_stopped=False)
+            await self.record_manager.flush_recordings()
+            self.config_manager.close_recordings_store()
+            await self.recorder_supervisor.shutdown()
+            await self.transcode_manager.shutdown()
+            await MessagePusher.shutdown()
+            await close_http_clients()
+            close_translation_cache()
+            await self.process_manager.cleanup()
+        except Exception as e:
+            logger.error(f"清理过程中发生错误: {e}")
+
+        # 取消仍在运行的后台任务
+        tasks = [task for task in self.page.tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run_headless():
+    """无界面模式入口"""
+    app = HeadlessApp()
+    await app.run()
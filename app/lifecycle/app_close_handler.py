@@ -48,6 +48,7 @@ async def handle_app_close(page: ft.Page, app, save_progress_overlay) -> None:
 
     async def close_dialog_dismissed(e):
         app.recording_enabled = False
+        app.recorder_supervisor.request_stop_all()
         
         # 保存当前窗口大小到用户配置
         try:
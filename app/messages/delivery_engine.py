@@ -0,0 +1,173 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from ..utils.logger import logger
+
+SendCallable = Callable[[str, str], Awaitable[dict[str, Any]]]
+
+# 开播提醒合并推送时每条内容之间的分隔
+DIGEST_SEPARATOR = "\n"
+CANCELLED_RESULT = {"success": [], "error": ["cancelled"]}
+
+
+class ChannelPolicy:
+    """单个推送渠道的限速与重试策略"""
+
+    def __init__(self, min_interval: float = 0.0, max_retries: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 30.0):
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def get_retry_delay(self, attempt: int) -> float:
+        return min(self.base_delay * (2 ** attempt), self.max_delay)
+
+
+# 参考各平台接口的频率限制设置两次发送之间的最小间隔
+DEFAULT_CHANNEL_POLICIES = {
+    "dingtalk": ChannelPolicy(min_interval=3.0),
+    "wechat": ChannelPolicy(min_interval=1.0),
+    "serverchan": ChannelPolicy(min_interval=1.0),
+    "bark": ChannelPolicy(min_interval=0.2),
+    "ntfy": ChannelPolicy(min_interval=0.5),
+    "telegram": ChannelPolicy(min_interval=1.0),
+    "email": ChannelPolicy(min_interval=2.0, max_retries=2, base_delay=5.0),
+    "windows": ChannelPolicy(min_interval=1.0, max_retries=0),
+}
+
+
+class DeliveryJob:
+    def __init__(self, send: SendCallable, title: str, content: str, digest_window: float = 0.0):
+        self.send = send
+        self.title = title
+        self.content = content
+        self.digest_window = digest_window
+        self.futures = [asyncio.get_running_loop().create_future()]
+
+    def set_result(self, result: dict[str, Any]):
+        for future in self.futures:
+            if not future.done():
+                future.set_result(result)
+
+
+class NotificationDeliveryEngine:
+    """消息推送投递引擎
+
+    每个推送渠道拥有独立的队列和工作协程，渠道之间并发发送、互不阻塞；同一渠道内按最小间隔限速，
+    发送失败时按指数退避重试。开启合并推送时，窗口期内到达同一渠道的多条通知会合并为一条发送。
+    """
+
+    def __init__(self, policies: dict[str, ChannelPolicy] | None = None):
+        self.policies = dict(DEFAULT_CHANNEL_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self.loop = asyncio.get_running_loop()
+        self._queues: dict[str, asyncio.Queue] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        self._last_sent: dict[str, float] = {}
+        self._stats = {"submitted": 0, "delivered": 0, "failed": 0, "retried": 0, "digested": 0}
+
+    def get_policy(self, channel: str) -> ChannelPolicy:
+        return self.policies.get(channel) or ChannelPolicy()
+
+    def submit(self, channel: str, send: SendCallable, title: str, content: str,
+               digest_window: float = 0.0) -> asyncio.Future:
+        """提交一条推送，返回在发送完成后得到渠道结果的Future"""
+        job = DeliveryJob(send, title, content, digest_window)
+        queue = self._queues.get(channel)
+        if queue is None:
+            queue = self._queues[channel] = asyncio.Queue()
+        worker = self._workers.get(channel)
+        if worker is None or worker.done():
+            self._workers[channel] = asyncio.create_task(self._run_channel(channel, queue))
+        queue.put_nowait(job)
+        self._stats["submitted"] += 1
+        return job.futures[0]
+
+    async def _run_channel(self, channel: str, queue: asyncio.Queue):
+        while True:
+            job = await queue.get()
+            jobs = [job]
+            try:
+                if job.digest_window > 0:
+                    # 等待合并窗口结束，收集期间到达的通知
+                    await asyncio.sleep(job.digest_window)
+                    while not queue.empty():
+                        jobs.append(queue.get_nowait())
+
+                for batch in self._fold_jobs(jobs):
+                    await self._wait_rate_limit(channel)
+                    result = await self._send_with_retry(channel, batch)
+                    batch.set_result(result)
+            except asyncio.CancelledError:
+                for pending in jobs:
+                    pending.set_result(CANCELLED_RESULT)
+                raise
+
+    def _fold_jobs(self, jobs: list[DeliveryJob]) -> list[DeliveryJob]:
+        """把标题相同、允许合并的通知折叠为一条，其余保持原有顺序"""
+        folded: list[DeliveryJob] = []
+        groups: dict[str, DeliveryJob] = {}
+        for job in jobs:
+            group = groups.get(job.title) if job.digest_window > 0 else None
+            if group is None:
+                folded.append(job)
+                if job.digest_window > 0:
+                    groups[job.title] = job
+                continue
+            group.content = f"{group.content}{DIGEST_SEPARATOR}{job.content}"
+            group.send = job.send
+            group.futures.extend(job.futures)
+            self._stats["digested"] += 1
+        return folded
+
+    async def _wait_rate_limit(self, channel: str):
+        min_interval = self.get_policy(channel).min_interval
+        last_sent = self._last_sent.get(channel)
+        if last_sent is not None and min_interval > 0:
+            wait = last_sent + min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        self._last_sent[channel] = time.monotonic()
+
+    async def _send_with_retry(self, channel: str, job: DeliveryJob) -> dict[str, Any]:
+        policy = self.get_policy(channel)
+        result: dict[str, Any] = {"success": [], "error": []}
+        for attempt in range(policy.max_retries + 1):
+            try:
+                result = await job.send(job.title, job.content) or {"success": [], "error": []}
+            except Exception as e:
+                result = {"success": [], "error": [str(e)]}
+
+            # 部分目标成功时不再重试，避免重复推送给已成功的目标
+            if result.get("success") or not result.get("error"):
+                self._stats["delivered"] += 1
+                return result
+
+            if attempt < policy.max_retries:
+                delay = policy.get_retry_delay(attempt)
+                logger.warning(f"{channel} 推送失败，{delay:.1f}秒后重试 ({attempt + 1}/{policy.max_retries})")
+                self._stats["retried"] += 1
+                await asyncio.sleep(delay)
+
+        self._stats["failed"] += 1
+        logger.error(f"{channel} 推送失败，已放弃: {result.get('error')}")
+        return result
+
+    def get_stats(self) -> dict[str, int]:
+        stats = dict(self._stats)
+        stats["pending"] = sum(queue.qsize() for queue in self._queues.values())
+        return stats
+
+    async def close(self):
+        workers = list(self._workers.values())
+        self._workers.clear()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for queue in self._queues.values():
+            while not queue.empty():
+                queue.get_nowait().set_result(CANCELLED_RESULT)
+        self._queues.clear()
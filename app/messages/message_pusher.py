@@ -1,19 +1,21 @@
-from asyncio import create_task, Queue, Task, sleep as asyncio_sleep
+import asyncio
 import time
-from typing import Dict, List, Tuple
+from typing import Dict
 import sys
 import os
 from pathlib import Path
 
 from ..utils.logger import logger
-from .notification_service import NotificationService
+from .delivery_engine import NotificationDeliveryEngine
+from .notification_service import NotificationService, smtp_pool
+
+# 合并推送的默认窗口（秒）
+DEFAULT_DIGEST_WINDOW = 30
 
 
 class MessagePusher:
-    # 静态队列用于存储待发送的消息
-    _message_queue: Queue = Queue()
-    # 标记队列处理是否已启动
-    _queue_processing: bool = False
+    # 全局共享的推送投递引擎，按事件循环懒加载
+    _engine: NotificationDeliveryEngine | None = None
     # 跟踪已发送的消息，避免重复发送
     # 键为 "标题+内容" 的哈希，值为发送时间戳
     _sent_messages: Dict[str, float] = {}
@@ -49,35 +51,32 @@ class MessagePusher:
         return f"{title}:{content}"
 
     @classmethod
-    async def _process_message_queue(cls):
-        """处理消息队列中的所有消息"""
-        if cls._queue_processing:
-            return
-        
-        cls._queue_processing = True
-        # logger.info("开始处理消息队列")
-        
+    def get_engine(cls) -> NotificationDeliveryEngine:
+        engine = cls._engine
+        if engine is None or engine.loop is not asyncio.get_running_loop() or engine.loop.is_closed():
+            engine = cls._engine = NotificationDeliveryEngine()
+        return engine
+
+    @classmethod
+    async def shutdown(cls):
+        """停止投递引擎并关闭复用的SMTP连接，应用退出时调用"""
+        engine, cls._engine = cls._engine, None
+        if engine is not None and engine.loop is asyncio.get_running_loop():
+            await engine.close()
+        await asyncio.to_thread(smtp_pool.close_all)
+
+    def get_digest_window(self, platform_code: str = None) -> float:
+        """开启合并推送时返回合并窗口，系统类通知不参与合并"""
+        user_config = self.settings.user_config
+        if platform_code == "system" or not user_config.get("push_digest_enabled", False):
+            return 0.0
         try:
-            while not cls._message_queue.empty():
-                msg_data = await cls._message_queue.get()
-                pusher, msg_title, push_content, platform_code = msg_data
-                
-                # 执行实际的消息推送
-                await pusher._push_messages_impl(msg_title, push_content, platform_code)
-                
-                # 标记任务完成
-                cls._message_queue.task_done()
-                
-                # 短暂延迟，避免过快发送消息
-                await asyncio_sleep(0.5)
-        except Exception as e:
-            logger.error(f"处理消息队列时出错: {str(e)}")
-        finally:
-            cls._queue_processing = False
-            # logger.info("消息队列处理完毕")
+            return max(0.0, float(user_config.get("push_digest_window", DEFAULT_DIGEST_WINDOW)))
+        except (TypeError, ValueError):
+            return float(DEFAULT_DIGEST_WINDOW)
 
     async def push_messages(self, msg_title: str, push_content: str, platform_code: str = None):
-        """将消息加入队列进行推送
+        """将消息提交给投递引擎，各渠道并发推送
         
         Args:
             msg_title: 消息标题
@@ -103,39 +102,43 @@ class MessagePusher:
         
         # 记录此消息已请求发送
         self._sent_messages[msg_hash] = current_time
-        
-        # 将消息放入队列
-        await self._message_queue.put((self, msg_title, push_content, platform_code))
-        
-        # 启动队列处理（如果尚未启动）
-        if not self._queue_processing:
-            create_task(self._process_message_queue())
-            
-        # 返回一个空任务列表，因为实际任务会在队列处理中创建
-        # 这是为了保持API兼容性
-        return []
+
+        # 不等待发送完成，返回各渠道结果的Future
+        return self.submit_messages(msg_title, push_content, platform_code)
+
+    def submit_messages(self, msg_title: str, push_content: str, platform_code: str = None) -> list[asyncio.Future]:
+        """把消息提交到所有已启用的渠道"""
+        engine = self.get_engine()
+        digest_window = self.get_digest_window(platform_code)
+        futures = [
+            engine.submit(channel, send, msg_title, push_content, digest_window)
+            for channel, send in self._get_channel_senders(platform_code)
+        ]
+        if not futures:
+            #logger.warning("没有创建任何推送任务，可能是因为所有渠道都未启用或配置不正确")
+            pass
+        return futures
 
     async def _push_messages_impl(self, msg_title: str, push_content: str, platform_code: str = None):
-        """实际执行消息推送的内部方法"""
-        # logger.info(f"开始推送消息: {msg_title}, 平台: {platform_code or '未指定'}")
-        
+        """推送消息并等待所有渠道发送完成"""
+        results = await asyncio.gather(*self.submit_messages(msg_title, push_content, platform_code))
+        # logger.info(f"消息 '{msg_title}' 推送完成")
+        return list(results)
+
+    def _get_channel_senders(self, platform_code: str = None) -> list[tuple]:
+        """根据当前配置返回已启用渠道的 (渠道名, 发送函数) 列表，发送函数接收标题和内容"""
         user_config = self.settings.user_config
-        tasks = []
+        senders = []
         
         if user_config.get("dingtalk_enabled"):
             webhook_url = user_config.get("dingtalk_webhook_url", "")
             if webhook_url.strip():
-                # logger.info("准备推送钉钉消息")
-                task = create_task(
-                    self.notifier.send_to_dingtalk(
-                        url=webhook_url,
-                        content=push_content,
-                        number=user_config.get("dingtalk_at_objects"),
-                        is_atall=user_config.get("dingtalk_at_all"),
-                    )
-                )
-                tasks.append(task)
-                # logger.info("钉钉消息推送任务已创建")
+                senders.append(("dingtalk", lambda title, content: self.notifier.send_to_dingtalk(
+                    url=webhook_url,
+                    content=content,
+                    number=user_config.get("dingtalk_at_objects"),
+                    is_atall=user_config.get("dingtalk_at_all"),
+                )))
             else:
                 #logger.warning("钉钉推送已启用，但未配置Webhook URL")
                 pass
@@ -143,14 +146,9 @@ class MessagePusher:
         if user_config.get("wechat_enabled"):
             webhook_url = user_config.get("wechat_webhook_url", "")
             if webhook_url.strip():
-                # logger.info("准备推送微信消息")
-                task = create_task(
-                    self.notifier.send_to_wechat(
-                        url=webhook_url, title=msg_title, content=push_content
-                    )
-                )
-                tasks.append(task)
-                # logger.info("微信消息推送任务已创建")
+                senders.append(("wechat", lambda title, content: self.notifier.send_to_wechat(
+                    url=webhook_url, title=title, content=content
+                )))
             else:
                 #logger.warning("微信推送已启用，但未配置Webhook URL")
                 pass
@@ -158,18 +156,13 @@ class MessagePusher:
         if user_config.get("bark_enabled"):
             bark_url = user_config.get("bark_webhook_url", "")
             if bark_url.strip():
-                # logger.info(f"准备推送Bark消息，URL: {bark_url}")
-                task = create_task(
-                    self.notifier.send_to_bark(
-                        api=bark_url,
-                        title=msg_title,
-                        content=push_content,
-                        level=user_config.get("bark_interrupt_level"),
-                        sound=user_config.get("bark_sound"),
-                    )
-                )
-                tasks.append(task)
-                # logger.info("Bark消息推送任务已创建")
+                senders.append(("bark", lambda title, content: self.notifier.send_to_bark(
+                    api=bark_url,
+                    title=title,
+                    content=content,
+                    level=user_config.get("bark_interrupt_level"),
+                    sound=user_config.get("bark_sound"),
+                )))
             else:
                 #logger.warning("Bark推送已启用，但未配置Webhook URL")
                 pass
@@ -177,19 +170,14 @@ class MessagePusher:
         if user_config.get("ntfy_enabled"):
             ntfy_url = user_config.get("ntfy_server_url", "")
             if ntfy_url.strip():
-                # logger.info("准备推送Ntfy消息")
-                task = create_task(
-                    self.notifier.send_to_ntfy(
-                        api=ntfy_url,
-                        title=msg_title,
-                        content=push_content,
-                        tags=user_config.get("ntfy_tags"),
-                        action_url=user_config.get("ntfy_action_url"),
-                        email=user_config.get("ntfy_email"),
-                    )
-                )
-                tasks.append(task)
-                # logger.info("Ntfy消息推送任务已创建")
+                senders.append(("ntfy", lambda title, content: self.notifier.send_to_ntfy(
+                    api=ntfy_url,
+                    title=title,
+                    content=content,
+                    tags=user_config.get("ntfy_tags"),
+                    action_url=user_config.get("ntfy_action_url"),
+                    email=user_config.get("ntfy_email"),
+                )))
             else:
                 #logger.warning("Ntfy推送已启用，但未配置Server URL")
                 pass
@@ -198,16 +186,11 @@ class MessagePusher:
             chat_id = user_config.get("telegram_chat_id")
             token = user_config.get("telegram_api_token", "")
             if chat_id and token.strip():
-                # logger.info("准备推送Telegram消息")
-                task = create_task(
-                    self.notifier.send_to_telegram(
-                        chat_id=chat_id,
-                        token=token,
-                        content=push_content,
-                    )
-                )
-                tasks.append(task)
-                # logger.info("Telegram消息推送任务已创建")
+                senders.append(("telegram", lambda title, content: self.notifier.send_to_telegram(
+                    chat_id=chat_id,
+                    token=token,
+                    content=content,
+                )))
             else:
                 #logger.warning("Telegram推送已启用，但未配置完整的Chat ID或API Token")
                 pass
@@ -220,21 +203,16 @@ class MessagePusher:
             to_email = user_config.get("recipient_email", "")
             
             if email_host.strip() and login_email.strip() and password.strip() and sender_email.strip() and to_email.strip():
-                # logger.info("准备推送Email消息")
-                task = create_task(
-                    self.notifier.send_to_email(
-                        email_host=email_host,
-                        login_email=login_email,
-                        password=password,
-                        sender_email=sender_email,
-                        sender_name=user_config.get("sender_name", "StreamCap"),
-                        to_email=to_email,
-                        title=msg_title,
-                        content=push_content,
-                    )
-                )
-                tasks.append(task)
-                # logger.info("Email消息推送任务已创建")
+                senders.append(("email", lambda title, content: self.notifier.send_to_email(
+                    email_host=email_host,
+                    login_email=login_email,
+                    password=password,
+                    sender_email=sender_email,
+                    sender_name=user_config.get("sender_name", "StreamCap"),
+                    to_email=to_email,
+                    title=title,
+                    content=content,
+                )))
             else:
                 #logger.warning("Email推送已启用，但配置不完整")
                 pass
@@ -242,41 +220,22 @@ class MessagePusher:
         if user_config.get("serverchan_enabled"):
             sendkey = user_config.get("serverchan_sendkey", "")
             if sendkey.strip():
-                # logger.info("准备推送ServerChan消息")
-                task = create_task(
-                    self.notifier.send_to_serverchan(
-                        sendkey=sendkey,
-                        title=msg_title,
-                        content=push_content,
-                    )
-                )
-                tasks.append(task)
-                # logger.info("ServerChan消息推送任务已创建")
+                senders.append(("serverchan", lambda title, content: self.notifier.send_to_serverchan(
+                    sendkey=sendkey,
+                    title=title,
+                    content=content,
+                )))
             else:
                 #logger.warning("ServerChan推送已启用，但未配置SendKey")
                 pass
         
         # 添加Windows系统通知渠道
         if user_config.get("windows_notify_enabled") and sys.platform == "win32":
-            # logger.info("准备推送Windows系统通知")
-            # Windows通知是同步操作，但我们使用create_task让它在异步环境中运行
-            task = create_task(self._send_windows_notification(msg_title, push_content, platform_code))
-            tasks.append(task)
-            # logger.info("Windows系统通知任务已创建")
-        
-        if not tasks:
-            #logger.warning("没有创建任何推送任务，可能是因为所有渠道都未启用或配置不正确")
-            pass
-            
-        # 等待所有推送任务完成
-        for task in tasks:
-            try:
-                await task
-            except Exception as e:
-                logger.error(f"执行推送任务时发生错误: {str(e)}")
-        
-        # logger.info(f"消息 '{msg_title}' 推送完成")
-        return tasks
+            senders.append(("windows", lambda title, content: self._send_windows_notification(
+                title, content, platform_code
+            )))
+
+        return senders
         
     async def _send_windows_notification(self, title: str, content: str, platform_code: str = None):
         """发送Windows系统通知的辅助方法"""
@@ -324,16 +283,14 @@ class MessagePusher:
             
             # logger.info(f"准备Windows系统通知 - 标题: '{title}', 平台: {platform_code or '未指定'}, 图标路径: {icon_path or '无'}")
             
-            # 调用NotificationService中的方法发送Windows通知
-            result = self.notifier.send_to_windows(
+            # Windows通知是同步调用，在线程中执行；通知之间的间隔由投递引擎的渠道限速保证
+            result = await asyncio.to_thread(
+                self.notifier.send_to_windows,
                 title=title,
                 content=content,
                 icon_path=icon_path
             )
             
-            # 添加短暂延迟，确保多个通知不会重叠
-            await asyncio_sleep(1.0)  # 1秒延迟，避免通知重叠
-            
             if result.get("success"):
                 # logger.info(f"Windows系统通知发送成功: {result.get('success')}")
                 pass
@@ -1,6 +1,9 @@
+import asyncio
 import base64
 import re
 import smtplib
+import threading
+import time
 from email.header import Header
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -11,6 +14,7 @@ from pathlib import Path
 
 import httpx
 
+from ..utils.http_client import get_http_client
 from ..utils.logger import logger
 
 # 根据系统判断是否导入winotify
@@ -26,6 +30,74 @@ if sys.platform == "win32":
         logger.error(f"导入winotify库时出错: {str(e)}")
 
 
+class SmtpConnectionPool:
+    """按服务器和账号复用SMTP连接
+
+    连续发送多封邮件时复用已登录的连接，省去重复的TCP/TLS握手和登录；空闲超过
+    idle_timeout 的连接在下次使用前重新建立。所有方法都是阻塞调用，需要在线程中执行。
+    """
+
+    def __init__(self, idle_timeout: float = 60.0, timeout: float = 15.0):
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._connections: dict[tuple, tuple[smtplib.SMTP, float]] = {}
+        self._lock = threading.Lock()
+        self.connects = 0
+
+    def _connect(self, host: str, port: int, use_ssl: bool, login_email: str, password: str) -> smtplib.SMTP:
+        if use_ssl:
+            smtp_obj = smtplib.SMTP_SSL(host, port, timeout=self.timeout)
+        else:
+            smtp_obj = smtplib.SMTP(host, port, timeout=self.timeout)
+        try:
+            smtp_obj.login(login_email, password)
+        except Exception:
+            self._close(smtp_obj)
+            raise
+        self.connects += 1
+        return smtp_obj
+
+    @staticmethod
+    def _close(smtp_obj: smtplib.SMTP):
+        try:
+            smtp_obj.quit()
+        except Exception:
+            smtp_obj.close()
+
+    def send(self, host: str, port: int, use_ssl: bool, login_email: str, password: str,
+             sender_email: str, receivers: list[str], message: str):
+        key = (host, port, use_ssl, login_email, password)
+        with self._lock:
+            entry = self._connections.pop(key, None)
+            smtp_obj = None
+            if entry is not None:
+                if time.monotonic() - entry[1] < self.idle_timeout:
+                    smtp_obj = entry[0]
+                else:
+                    self._close(entry[0])
+
+            if smtp_obj is None:
+                smtp_obj = self._connect(host, port, use_ssl, login_email, password)
+                smtp_obj.sendmail(sender_email, receivers, message)
+            else:
+                try:
+                    smtp_obj.sendmail(sender_email, receivers, message)
+                except smtplib.SMTPServerDisconnected:
+                    # 服务器已关闭空闲连接，重新连接后再发送一次
+                    smtp_obj = self._connect(host, port, use_ssl, login_email, password)
+                    smtp_obj.sendmail(sender_email, receivers, message)
+            self._connections[key] = (smtp_obj, time.monotonic())
+
+    def close_all(self):
+        with self._lock:
+            for smtp_obj, _ in self._connections.values():
+                self._close(smtp_obj)
+            self._connections.clear()
+
+
+smtp_pool = SmtpConnectionPool()
+
+
 class NotificationService:
     def __init__(self):
         self.headers = {"Content-Type": "application/json"}
@@ -52,20 +124,20 @@ class NotificationService:
             #logger.info(f"请求头: {self.headers}")
             #logger.info(f"请求数据: {json_data}")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=json_data, headers=self.headers)
-                status_code = response.status_code
-                logger.info(f"响应状态码: {status_code}")
-                
-                try:
-                    response_json = response.json()
-                    #logger.info(f"响应内容: {response_json}")
-                    return response_json
-                except Exception as json_error:
-                    logger.error(f"解析响应JSON失败: {str(json_error)}")
-                    response_text = response.text
-                    #logger.info(f"响应文本: {response_text}")
-                    return {"error": f"解析JSON失败: {str(json_error)}", "text": response_text}
+            client = get_http_client()
+            response = await client.post(url, json=json_data, headers=self.headers)
+            status_code = response.status_code
+            logger.info(f"响应状态码: {status_code}")
+
+            try:
+                response_json = response.json()
+                #logger.info(f"响应内容: {response_json}")
+                return response_json
+            except Exception as json_error:
+                logger.error(f"解析响应JSON失败: {str(json_error)}")
+                response_text = response.text
+                #logger.info(f"响应文本: {response_text}")
+                return {"error": f"解析JSON失败: {str(json_error)}", "text": response_text}
         except httpx.RequestError as req_error:
             error_msg = f"请求错误: {str(req_error)}"
             logger.error(error_msg)
@@ -132,16 +204,14 @@ class NotificationService:
             t_apart = MIMEText(content, "plain", "utf-8")
             message.attach(t_apart)
 
-            if open_ssl:
-                smtp_port = smtp_port or 465
-                smtp_obj = smtplib.SMTP_SSL(email_host, int(smtp_port))
-            else:
-                smtp_port = smtp_port or 25
-                smtp_obj = smtplib.SMTP(email_host, int(smtp_port))
-            smtp_obj.login(login_email, password)
-            smtp_obj.sendmail(sender_email, receivers, message.as_string())
+            smtp_port = int(smtp_port or (465 if open_ssl else 25))
+            # smtplib是阻塞调用，放到线程中执行以免卡住事件循环
+            await asyncio.to_thread(
+                smtp_pool.send, email_host, smtp_port, open_ssl, login_email, password,
+                sender_email, receivers, message.as_string(),
+            )
             return {"success": receivers, "error": []}
-        except smtplib.SMTPException as e:
+        except (smtplib.SMTPException, OSError) as e:
             logger.info(f"Email push failed, push email: {to_email},  Error message: {e}")
             return {"success": [], "error": receivers}
 
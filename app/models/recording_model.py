@@ -2,8 +2,46 @@ from datetime import timedelta
 from .video_format_model import VideoFormat
 from .audio_format_model import AudioFormat
 
+# 保存到录制数据库的字段
+PERSISTED_FIELDS = frozenset({
+    "rec_id", "media_type", "url", "streamer_name", "record_format", "quality", "segment_record",
+    "segment_time", "monitor_status", "scheduled_recording", "scheduled_start_time", "monitor_hours",
+    "recording_dir", "enabled_message_push", "record_mode", "remark", "thumbnail_enabled",
+    "translation_enabled", "live_title", "translated_title", "last_live_title", "cached_translated_title",
+    "multi_language_titles", "recorder_engine",
+})
+
+# 只在运行期间存在的状态，不保存
+RUNTIME_FIELDS = frozenset({
+    "scheduled_time_range", "title", "speed", "is_live", "recording", "start_time", "manually_stopped",
+    "cumulative_duration", "last_duration", "display_title", "selected", "is_checking", "status_info",
+    "detection_time", "loop_time_seconds", "use_proxy", "record_url", "live_file_path", "live_snapshot_path",
+    "notification_sent", "end_notification_sent", "was_recording", "platform_resolution",
+})
+
+TRACKED_FIELDS = PERSISTED_FIELDS | RUNTIME_FIELDS
+
+# url、media_type、record_format 通过属性读写，实际值保存在对应的下划线字段中
+_PROPERTY_FIELDS = ("url", "media_type", "record_format")
+
+_MISSING = object()
+
 
 class Recording:
+    """录制项
+
+    使用 __slots__ 存储字段，大量直播间时比每个实例一个 __dict__ 占用更少的内存。
+    字段分为需要保存的配置字段（PERSISTED_FIELDS）和运行时状态（RUNTIME_FIELDS），
+    赋值时只有值真正变化才会记录：保存的字段加入 dirty_fields，供增量保存时跳过未修改的
+    录制项；任何字段变化都会增加 revision，界面据此跳过没有变化的卡片刷新。
+    """
+
+    __slots__ = (
+        tuple(sorted(TRACKED_FIELDS - set(_PROPERTY_FIELDS)))
+        + tuple(f"_{name}" for name in _PROPERTY_FIELDS)
+        + ("revision", "dirty_fields", "_persisted")
+    )
+
     def __init__(
         self,
         rec_id: str,
@@ -23,7 +61,8 @@ class Recording:
         record_mode="auto",
         remark: str = None,  # 新增备注参数
         thumbnail_enabled: bool = None,  # 新增单个房间缩略图开关
-        translation_enabled: bool = None  # 新增单个房间翻译开关
+        translation_enabled: bool = None,  # 新增单个房间翻译开关
+        recorder_engine: str = None,
     ):
         """
         Initialize a recording object.
@@ -46,7 +85,11 @@ class Recording:
         :param remark: Remark for the recording task, limited to 20 Chinese characters.
         :param thumbnail_enabled: Whether to enable thumbnail for this specific room (None means use global setting).
         :param translation_enabled: Whether to enable translation for this specific room (None means use global setting).
+        :param recorder_engine: Recorder used for this room, 'ffmpeg' or 'native' (None means use global setting).
         """
+        object.__setattr__(self, "revision", 0)
+        object.__setattr__(self, "dirty_fields", set())
+        object.__setattr__(self, "_persisted", False)
 
         self.rec_id = rec_id
         self.url = url
@@ -86,8 +129,13 @@ class Recording:
         self.loop_time_seconds = None
         self.use_proxy = None
         self.record_url = None
+        self.live_file_path = None  # ffmpeg当前写入的文件路径（分段录制时含%03d占位符）
+        self.live_snapshot_path = None  # 录制进程输出的缩略图路径
         # 用于跟踪是否已经发送过直播状态通知
         self.notification_sent = False
+        self.end_notification_sent = False
+        # 监控停止前是否正在录制，用于决定直播结束时的通知
+        self.was_recording = False
         
         # 设置媒体类型和录制格式
         self.media_type = media_type
@@ -100,6 +148,45 @@ class Recording:
         # 单个房间翻译开关（None表示使用全局设置）
         self.translation_enabled = translation_enabled
 
+        # 单个房间录制引擎（None表示使用全局设置）
+        self.recorder_engine = recorder_engine
+
+    def __setattr__(self, name, value):
+        if name not in TRACKED_FIELDS:
+            object.__setattr__(self, name, value)
+            return
+        old_value = getattr(self, name, _MISSING)
+        object.__setattr__(self, name, value)
+        # __init__ 中的首次赋值不算修改，新建的录制项在首次保存时总会写入
+        if old_value is _MISSING:
+            return
+        if name in _PROPERTY_FIELDS:
+            value = getattr(self, name)
+        if old_value != value:
+            self.mark_dirty(name)
+
+    def mark_dirty(self, *fields: str):
+        """记录字段已修改，原地修改可变字段（如 multi_language_titles）后需要手动调用"""
+        object.__setattr__(self, "revision", self.revision + 1)
+        self.dirty_fields.update(field for field in fields if field in PERSISTED_FIELDS)
+
+    def snapshot(self) -> tuple[dict, bool]:
+        """
+        返回用于保存的字典，以及它是否在上次保存后发生了变化
+
+        保存的字段没有修改时不再生成完整的字典，只返回 rec_id，由存储沿用上次写入的内容，
+        录制项本身不保留上次保存的数据。
+        """
+        if self._persisted and not self.dirty_fields:
+            return {"rec_id": self.rec_id}, False
+        object.__setattr__(self, "_persisted", True)
+        self.dirty_fields.clear()
+        return self.to_dict(), True
+
+    def discard_snapshot(self):
+        """保存失败时调用，下次保存时重新生成完整的字典并写入"""
+        object.__setattr__(self, "_persisted", False)
+
     def to_dict(self):
         """Convert the Recording instance to a dictionary for saving."""
         return {
@@ -125,7 +212,8 @@ class Recording:
             "translated_title": self.translated_title,  # 添加翻译标题到保存数据中
             "last_live_title": self.last_live_title,  # 添加上次直播标题缓存到保存数据中
             "cached_translated_title": self.cached_translated_title,  # 添加缓存的翻译标题到保存数据中
-            "multi_language_titles": self.multi_language_titles,  # 添加多语言标题缓存到保存数据中
+            "multi_language_titles": dict(self.multi_language_titles),  # 添加多语言标题缓存到保存数据中
+            "recorder_engine": self.recorder_engine,
         }
 
     @classmethod
@@ -150,12 +238,13 @@ class Recording:
             data.get("remark"),  # 从数据中读取备注
             data.get("thumbnail_enabled"),  # 从数据中读取单个房间缩略图开关
             data.get("translation_enabled"),  # 从数据中读取单个房间翻译开关
+            data.get("recorder_engine"),
         )
         recording.title = data.get("title", recording.title)
         recording.display_title = data.get("display_title", recording.title)
-        recording.last_duration_str = data.get("last_duration")
-        if recording.last_duration_str is not None:
-            recording.last_duration = timedelta(seconds=float(recording.last_duration_str))
+        last_duration = data.get("last_duration")
+        if last_duration is not None:
+            recording.last_duration = timedelta(seconds=float(last_duration))
         
         # 从保存的数据中恢复标题相关字段
         recording.live_title = data.get("live_title")
@@ -179,6 +268,17 @@ class Recording:
         if "record_mode" in updated_info:
             self.record_mode = updated_info["record_mode"]
 
+    @property
+    def url(self) -> str:
+        """获取直播间地址"""
+        return self._url
+
+    @url.setter
+    def url(self, value: str):
+        """设置直播间地址，同时使缓存的平台解析结果失效"""
+        self._url = value
+        self.platform_resolution = None
+
     @property
     def media_type(self) -> str:
         """获取媒体类型"""
@@ -245,6 +345,10 @@ class Recording:
         # 否则使用全局设置
         return global_thumbnail_enabled
     
+    def get_recorder_engine(self, global_recorder_engine: str) -> str:
+        """获取实际使用的录制引擎，单个房间没有设置时使用全局设置"""
+        return self.recorder_engine or global_recorder_engine or "ffmpeg"
+
     def is_translation_enabled(self, global_translation_enabled: bool) -> bool:
         """
         判断是否应该启用翻译
@@ -282,10 +386,15 @@ class Recording:
             translated_title: 翻译后的标题
         """
         if translated_title and translated_title.strip():
-            self.multi_language_titles[language_code] = translated_title.strip()
+            translated_title = translated_title.strip()
+            if self.multi_language_titles.get(language_code) != translated_title:
+                self.multi_language_titles[language_code] = translated_title
+                self.mark_dirty("multi_language_titles")
     
     def clear_translated_titles(self):
         """清除所有翻译标题缓存"""
-        self.multi_language_titles.clear()
+        if self.multi_language_titles:
+            self.multi_language_titles.clear()
+            self.mark_dirty("multi_language_titles")
         self.translated_title = None
         self.cached_translated_title = None
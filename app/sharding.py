@@ -0,0 +1,614 @@
+import asyncio
+import bisect
+import hashlib
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import threading
+from functools import partial
+
+from . import execute_dir
+from .core.config_manager import ConfigManager
+from .core.config_validator import ConfigValidator
+from .headless import HeadlessApp, HeadlessPage, HeadlessSettings
+from .models.recording_model import Recording
+from .utils.logger import logger
+
+# 每个工作进程在哈希环上的虚拟节点数，越多分布越均匀
+VIRTUAL_NODES = 160
+# 工作进程上报运行状态的间隔（秒）
+STATE_REPORT_INTERVAL = 1.0
+# 协调进程合并保存录制列表的等待时间（秒）
+PERSIST_DELAY = 0.5
+# 工作进程异常退出后重新启动前的等待时间（秒）
+WORKER_RESTART_DELAY = 5
+# 退出时等待工作进程停止录制的时间（秒）
+WORKER_STOP_TIMEOUT = 30
+
+# 工作进程上报给协调进程的运行时状态，配置字段通过 save 消息同步
+STATE_FIELDS = (
+    "title", "display_title", "status_info", "is_live", "recording", "is_checking", "speed",
+    "start_time", "detection_time", "cumulative_duration",
+)
+
+
+class ShardRing:
+    """一致性哈希环，把直播间按 rec_id 分配给工作进程，增加进程时只有少量直播间需要迁移"""
+
+    def __init__(self, replicas: int = VIRTUAL_NODES):
+        self.replicas = replicas
+        self.keys = []
+        self.nodes = {}
+        self.workers = set()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def add_worker(self, worker_id: int):
+        if worker_id in self.workers:
+            return
+        self.workers.add(worker_id)
+        for i in range(self.replicas):
+            key = self._hash(f"shard-{worker_id}#{i}")
+            self.nodes[key] = worker_id
+            bisect.insort(self.keys, key)
+
+    def remove_worker(self, worker_id: int):
+        if worker_id not in self.workers:
+            return
+        self.workers.discard(worker_id)
+        self.keys = [key for key in self.keys if self.nodes[key] != worker_id]
+        self.nodes = {key: self.nodes[key] for key in self.keys}
+
+    def get_worker(self, rec_id: str) -> int | None:
+        if not self.keys:
+            return None
+        index = bisect.bisect(self.keys, self._hash(rec_id)) % len(self.keys)
+        return self.nodes[self.keys[index]]
+
+
+class ShardChannel:
+    """
+    协调进程与工作进程之间的双向消息通道
+
+    基于 multiprocessing 的 Pipe，消息为 (类型, 内容) 元组。接收端注册到事件循环，
+    发送由后台线程完成，双方同时发送大量消息时不会互相阻塞事件循环。
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.outbox = queue.SimpleQueue()
+        self.sender = threading.Thread(target=self._send_loop, name="ShardChannelSender", daemon=True)
+        self.sender.start()
+        self.loop = None
+        self.on_message = None
+        self.on_close = None
+        self.closed = False
+
+    def start(self, loop: asyncio.AbstractEventLoop, on_message, on_close=None):
+        self.loop = loop
+        self.on_message = on_message
+        self.on_close = on_close
+        try:
+            loop.add_reader(self.conn.fileno(), self._on_readable)
+        except NotImplementedError:
+            # Windows 的 Proactor 事件循环不支持 add_reader，改用线程接收
+            threading.Thread(target=self._receive_loop, name="ShardChannelReceiver", daemon=True).start()
+
+    def send(self, kind: str, payload=None):
+        if not self.closed:
+            self.outbox.put((kind, payload))
+
+    def _send_loop(self):
+        while True:
+            message = self.outbox.get()
+            if message is None:
+                break
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError, ValueError):
+                break
+            except Exception as e:
+                logger.error(f"发送 {message[0]} 消息失败: {e}")
+
+    def _on_readable(self):
+        try:
+            while self.conn.poll():
+                self._dispatch(self.conn.recv())
+        except (EOFError, OSError):
+            self._handle_close()
+
+    def drain(self):
+        """处理已经到达但尚未读取的消息"""
+        if not self.closed:
+            self._on_readable()
+
+    def _receive_loop(self):
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                self.loop.call_soon_threadsafe(self._handle_close)
+                break
+            self.loop.call_soon_threadsafe(self._dispatch, message)
+
+    def _dispatch(self, message):
+        kind, payload = message
+        try:
+            self.on_message(kind, payload)
+        except Exception as e:
+            logger.error(f"处理 {kind} 消息时出错: {e}")
+
+    def _handle_close(self):
+        if self.closed:
+            return
+        self._stop()
+        if self.on_close:
+            self.on_close()
+
+    def _stop(self):
+        self.closed = True
+        try:
+            self.loop.remove_reader(self.conn.fileno())
+        except (NotImplementedError, OSError, ValueError, AttributeError):
+            pass
+
+    def close(self, timeout: float = 5):
+        """发送完队列中的消息后关闭通道"""
+        if not self.closed:
+            self._stop()
+        self.outbox.put(None)
+        self.sender.join(timeout)
+        self.conn.close()
+
+
+class ShardConfigManager(ConfigManager):
+    """
+    工作进程的配置管理器
+
+    录制列表只读取本进程负责的直播间，保存时把修改过的录制项发给协调进程，
+    由协调进程统一写入录制数据库；用户配置同样交给协调进程写入；开播历史、转码队列
+    和翻译缓存每个工作进程各用一个文件。
+    """
+
+    def __init__(self, run_path, shard_id: int, channel: ShardChannel, rec_ids):
+        self.shard_id = shard_id
+        self.channel = channel
+        self.owned_ids = set(rec_ids)
+        super().__init__(run_path)
+        shared_history_path = self.live_history_config_path
+        self.live_history_config_path = os.path.join(self.config_path, f"live_history.shard{shard_id}.json")
+        self.transcode_queue_config_path = os.path.join(self.config_path, f"transcode_queue.shard{shard_id}.json")
+        self.translation_cache_db_path = os.path.join(self.config_path, f"translation_cache.shard{shard_id}.db")
+        if not os.path.exists(self.live_history_config_path) and os.path.exists(shared_history_path):
+            # 首次分片运行时沿用单进程模式积累的开播历史
+            shutil.copy(shared_history_path, self.live_history_config_path)
+        self.init_transcode_queue_config()
+        self.init_live_history_config()
+
+    def init(self):
+        # 共享的配置文件由协调进程在启动工作进程前创建和修复，工作进程只读取
+        self.init_recordings_config()
+
+    def load_recordings_config(self):
+        return [record for record in super().load_recordings_config() if record.get("rec_id") in self.owned_ids]
+
+    async def save_recordings_config(self, config, unchanged_ids: set | None = None):
+        unchanged_ids = unchanged_ids or set()
+        changed = [record for record in config if record.get("rec_id") not in unchanged_ids]
+        if changed:
+            self.channel.send("save", changed)
+        return True
+
+    async def save_user_config(self, config):
+        self.channel.send("user_config", dict(config))
+
+
+class ShardWorker:
+    """工作进程：用无界面引擎监控和录制分配给本进程的直播间，并执行协调进程发来的命令"""
+
+    def __init__(self, shard_id: int, conn, rec_ids, run_path: str):
+        self.shard_id = shard_id
+        self.channel = ShardChannel(conn)
+        self.rec_ids = rec_ids
+        self.run_path = run_path
+        self.app = None
+        self.reported = {}
+
+    async def run(self):
+        config_manager = ShardConfigManager(self.run_path, self.shard_id, self.channel, self.rec_ids)
+        self.app = HeadlessApp(run_path=self.run_path, config_manager=config_manager, validate_configs=False)
+        # 协调进程退出时通道关闭，工作进程随之停止
+        self.channel.start(self.app.page.loop, self.on_message, self.app.stop)
+        await self.app.start()
+        self.app.page.run_task(self._report_loop)
+        self.channel.send("ready", len(self.app.record_manager.recordings))
+
+        await self.app.stop_event.wait()
+        await self.app.cleanup()
+        self.report_state()
+        self.channel.send("stopped")
+        self.channel.close()
+
+    def on_message(self, kind: str, payload):
+        page = self.app.page
+        if kind == "add":
+            page.run_task(self.add_recordings, payload)
+        elif kind == "release":
+            page.run_task(self.release_recordings, payload)
+        elif kind == "monitor":
+            page.run_task(self.set_monitor, *payload)
+        elif kind == "update":
+            page.run_task(self.update_recording, *payload)
+        elif kind == "shutdown":
+            self.app.stop()
+        else:
+            logger.warning(f"分片 {self.shard_id} 收到未知消息: {kind}")
+
+    async def add_recordings(self, records: list[dict]):
+        record_manager = self.app.record_manager
+        for data in records:
+            if record_manager.find_recording_by_id(data["rec_id"]):
+                continue
+            recording = Recording.from_dict(data)
+            recording.loop_time_seconds = record_manager.loop_time_seconds
+            recording.update_title(record_manager._[recording.quality])
+            recording.scheduled_time_range = await record_manager.get_scheduled_time_range(
+                recording.scheduled_start_time, recording.monitor_hours
+            )
+            self.app.config_manager.owned_ids.add(recording.rec_id)
+            await record_manager.add_recording(recording)
+            if self.app.recording_enabled:
+                record_manager.request_live_check(recording, spread=True)
+
+    async def release_recordings(self, rec_ids: list[str]):
+        """停止并移除直播间，把最新的配置交回协调进程后再确认释放"""
+        record_manager = self.app.record_manager
+        for rec_id in rec_ids:
+            recording = record_manager.find_recording_by_id(rec_id)
+            if recording is None:
+                continue
+            if recording.recording:
+                record_manager.stop_recording(recording, manually_stopped=False)
+            # 录制进程退出后才交回配置，避免新的工作进程在旧进程收尾时重复录制
+            await self.app.recorder_supervisor.wait_stopped(recording)
+            self.channel.send("save", [recording.to_dict()])
+            await record_manager.remove_recording(recording)
+            self.app.config_manager.owned_ids.discard(rec_id)
+            self.reported.pop(rec_id, None)
+        self.channel.send("released", list(rec_ids))
+
+    async def set_monitor(self, rec_id: str, enabled: bool):
+        recording = self.app.record_manager.find_recording_by_id(rec_id)
+        if recording is None:
+            logger.warning(f"分片 {self.shard_id} 中没有直播间 {rec_id}")
+        elif enabled:
+            await self.app.record_manager.start_monitor_recording(recording)
+        else:
+            await self.app.record_manager.stop_monitor_recording(recording)
+
+    async def update_recording(self, rec_id: str, updated_info: dict):
+        recording = self.app.record_manager.find_recording_by_id(rec_id)
+        if recording is None:
+            logger.warning(f"分片 {self.shard_id} 中没有直播间 {rec_id}")
+            return
+        await self.app.record_manager.update_recording_card(recording, updated_info)
+
+    def report_state(self):
+        """只上报 revision 变化过的直播间"""
+        changes = {}
+        for recording in self.app.record_manager.recordings:
+            if self.reported.get(recording.rec_id) != recording.revision:
+                self.reported[recording.rec_id] = recording.revision
+                changes[recording.rec_id] = {field: getattr(recording, field) for field in STATE_FIELDS}
+        if changes:
+            self.channel.send("state", changes)
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(STATE_REPORT_INTERVAL)
+            self.report_state()
+
+
+def run_shard_worker(shard_id: int, conn, rec_ids, run_path: str):
+    """工作进程入口"""
+    # Ctrl+C 会发给整个进程组，由协调进程统一通知工作进程退出
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        asyncio.run(ShardWorker(shard_id, conn, rec_ids, run_path).run())
+    except Exception as e:
+        logger.error(f"分片 {shard_id} 运行出错: {e}")
+
+
+class ShardProcess:
+    def __init__(self, shard_id: int, process, channel: ShardChannel):
+        self.shard_id = shard_id
+        self.process = process
+        self.channel = channel
+        self.ready = False
+
+
+class ShardCoordinator:
+    """
+    多进程录制的协调进程
+
+    按 rec_id 的一致性哈希把直播间分给多个工作进程，每个工作进程运行各自的无界面录制引擎。
+    协调进程汇总各进程上报的状态并通过 page.pubsub 发布 update、delete 消息，
+    是录制数据库唯一的写入者；添加、删除、监控等命令转发给负责该直播间的工作进程。
+    增加工作进程时只迁移哈希环上归属变化的直播间。
+    """
+
+    def __init__(self, worker_count: int, loop: asyncio.AbstractEventLoop | None = None, run_path: str | None = None):
+        self.page = HeadlessPage(loop or asyncio.get_running_loop())
+        self.run_path = run_path or execute_dir
+        self.worker_count = max(1, worker_count)
+        self.config_manager = ConfigManager(self.run_path)
+        self.settings = HeadlessSettings(self)
+        self.config_validator = ConfigValidator(self)
+        self.user_config_lock = asyncio.Lock()
+        self.context = multiprocessing.get_context("spawn")
+        self.ring = ShardRing()
+        self.workers = {}
+        self.recordings = {}
+        self.owners = {}
+        self.moving = {}
+        self.persist_pending = False
+        self.stopping = False
+        self.stop_event = asyncio.Event()
+
+    async def start(self):
+        for data in self.config_manager.load_recordings_config():
+            recording = Recording.from_dict(data)
+            recording.snapshot()
+            self.recordings[recording.rec_id] = recording
+
+        # 工作进程启动前检查和修复配置，工作进程直接读取修复后的用户配置和录制列表
+        fixed_items = await self.config_validator.validate_all_configs()
+        if fixed_items and self.config_validator.fix_recordings(self.recordings.values(), fixed_items):
+            await self.persist()
+
+        assignments = {}
+        for shard_id in range(self.worker_count):
+            self.ring.add_worker(shard_id)
+            assignments[shard_id] = []
+        for rec_id in self.recordings:
+            owner = self.ring.get_worker(rec_id)
+            self.owners[rec_id] = owner
+            assignments[owner].append(rec_id)
+        for shard_id, rec_ids in assignments.items():
+            self.spawn_worker(shard_id, rec_ids)
+        logger.info(f"多进程录制已启动，共 {len(self.recordings)} 个直播间，{self.worker_count} 个工作进程")
+
+    def _spawn_process(self, shard_id: int, rec_ids: list[str]):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=run_shard_worker,
+            args=(shard_id, child_conn, rec_ids, self.run_path),
+            name=f"StreamCap-shard-{shard_id}",
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def spawn_worker(self, shard_id: int, rec_ids: list[str]):
+        process, conn = self._spawn_process(shard_id, rec_ids)
+        channel = ShardChannel(conn)
+        self.workers[shard_id] = ShardProcess(shard_id, process, channel)
+        channel.start(self.page.loop, partial(self.on_message, shard_id), partial(self.on_worker_exit, shard_id))
+
+    def add_worker(self) -> int:
+        """增加一个工作进程，并把哈希环上改归新进程的直播间从原进程迁移过去"""
+        shard_id = max(self.workers, default=-1) + 1
+        self.ring.add_worker(shard_id)
+        self.spawn_worker(shard_id, [])
+
+        releases = {}
+        for rec_id, owner in self.owners.items():
+            target = self.ring.get_worker(rec_id)
+            if target != owner:
+                self.moving[rec_id] = target
+                releases.setdefault(owner, []).append(rec_id)
+        for owner, rec_ids in releases.items():
+            self.workers[owner].channel.send("release", rec_ids)
+        logger.info(f"已增加工作进程 {shard_id}，迁移 {len(self.moving)} 个直播间")
+        return shard_id
+
+    def on_message(self, shard_id: int, kind: str, payload):
+        if kind == "save":
+            self.apply_saved(payload)
+        elif kind == "state":
+            self.apply_state(payload)
+        elif kind == "released":
+            self.on_released(payload)
+        elif kind == "user_config":
+            self.page.run_task(self.save_user_config, payload)
+        elif kind == "ready":
+            self.workers[shard_id].ready = True
+            logger.info(f"工作进程 {shard_id} 已就绪，负责 {payload} 个直播间")
+        elif kind != "stopped":
+            logger.warning(f"收到工作进程 {shard_id} 的未知消息: {kind}")
+
+    def apply_saved(self, records: list[dict]):
+        for data in records:
+            current = self.recordings.get(data.get("rec_id"))
+            if current is None:
+                # 已删除的直播间
+                continue
+            recording = Recording.from_dict(data)
+            for field in STATE_FIELDS:
+                setattr(recording, field, getattr(current, field))
+            self.recordings[recording.rec_id] = recording
+        self.schedule_persist()
+
+    async def save_user_config(self, config: dict):
+        """写入工作进程修改后的用户配置，多个工作进程同时修改时依次写入"""
+        async with self.user_config_lock:
+            self.settings.user_config.update(config)
+            await self.config_manager.save_user_config(self.settings.user_config)
+
+    def apply_state(self, changes: dict):
+        for rec_id, fields in changes.items():
+            recording = self.recordings.get(rec_id)
+            if recording is None:
+                continue
+            for field, value in fields.items():
+                setattr(recording, field, value)
+            self.page.pubsub.send_all_on_topic("update", recording)
+
+    def on_released(self, rec_ids: list[str]):
+        additions = {}
+        for rec_id in rec_ids:
+            target = self.moving.pop(rec_id, None)
+            if target is None or rec_id not in self.recordings:
+                continue
+            self.owners[rec_id] = target
+            additions.setdefault(target, []).append(self.recordings[rec_id].to_dict())
+        for target, records in additions.items():
+            self.workers[target].channel.send("add", records)
+
+    def on_worker_exit(self, shard_id: int):
+        if self.stopping:
+            return
+        logger.error(f"工作进程 {shard_id} 异常退出，{WORKER_RESTART_DELAY} 秒后重新启动")
+        self.page.run_task(self._restart_worker, shard_id)
+
+    async def _restart_worker(self, shard_id: int):
+        worker = self.workers[shard_id]
+        await asyncio.to_thread(worker.process.join, WORKER_STOP_TIMEOUT)
+        worker.channel.close()
+        # 正在迁出的直播间不会再收到释放确认，直接交给新的负责进程
+        self.on_released([rec_id for rec_id in self.moving if self.owners.get(rec_id) == shard_id])
+        await asyncio.sleep(WORKER_RESTART_DELAY)
+        if self.stopping:
+            return
+        rec_ids = [rec_id for rec_id, owner in self.owners.items() if owner == shard_id]
+        self.spawn_worker(shard_id, rec_ids)
+
+    def _send_to_owner(self, rec_id: str, kind: str, payload):
+        owner = self.owners.get(rec_id)
+        if owner is not None and owner in self.workers:
+            self.workers[owner].channel.send(kind, payload)
+
+    def add_recording(self, recording: Recording):
+        self.recordings[recording.rec_id] = recording
+        owner = self.ring.get_worker(recording.rec_id)
+        self.owners[recording.rec_id] = owner
+        self.workers[owner].channel.send("add", [recording.to_dict()])
+        self.schedule_persist()
+
+    def remove_recording(self, rec_id: str):
+        recording = self.recordings.pop(rec_id, None)
+        if recording is None:
+            return
+        self.moving.pop(rec_id, None)
+        self._send_to_owner(rec_id, "release", [rec_id])
+        self.owners.pop(rec_id, None)
+        self.page.pubsub.send_all_on_topic("delete", [recording])
+        self.schedule_persist()
+
+    def set_monitor(self, rec_id: str, enabled: bool):
+        recording = self.recordings.get(rec_id)
+        if recording is None:
+            return
+        if rec_id in self.moving:
+            # 迁移中的直播间在加入新进程时带上最新配置
+            recording.monitor_status = enabled
+            self.schedule_persist()
+        else:
+            self._send_to_owner(rec_id, "monitor", (rec_id, enabled))
+
+    def update_recording(self, rec_id: str, updated_info: dict):
+        recording = self.recordings.get(rec_id)
+        if recording is None:
+            return
+        if rec_id in self.moving:
+            recording.update(updated_info)
+            self.schedule_persist()
+        else:
+            self._send_to_owner(rec_id, "update", (rec_id, updated_info))
+
+    def get_stats(self) -> dict:
+        stats = {}
+        for shard_id, worker in self.workers.items():
+            rec_ids = [rec_id for rec_id, owner in self.owners.items() if owner == shard_id]
+            stats[shard_id] = {
+                "ready": worker.ready,
+                "recordings": len(rec_ids),
+                "recording": sum(1 for rec_id in rec_ids if self.recordings[rec_id].recording),
+            }
+        return stats
+
+    def schedule_persist(self):
+        if not self.persist_pending:
+            self.persist_pending = True
+            self.page.run_task(self._persist_later)
+
+    async def _persist_later(self):
+        await asyncio.sleep(PERSIST_DELAY)
+        await self.persist()
+
+    async def persist(self):
+        """把录制列表写入数据库，只重新序列化修改过的录制项"""
+        self.persist_pending = False
+        records = []
+        unchanged_ids = set()
+        changed = []
+        for recording in list(self.recordings.values()):
+            data, is_changed = recording.snapshot()
+            records.append(data)
+            if is_changed:
+                changed.append(recording)
+            else:
+                unchanged_ids.add(recording.rec_id)
+        if not await self.config_manager.save_recordings_config(records, unchanged_ids):
+            for recording in changed:
+                recording.discard_snapshot()
+
+    async def run(self):
+        """运行到收到退出信号为止；Linux 下收到 SIGUSR1 时增加一个工作进程"""
+        loop = self.page.loop
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        if hasattr(signal, "SIGUSR1"):
+            loop.add_signal_handler(signal.SIGUSR1, self.add_worker)
+        await self.start()
+        await self.stop_event.wait()
+        logger.info("收到退出信号，正在停止所有工作进程...")
+        await self.shutdown()
+
+    async def shutdown(self):
+        self.stopping = True
+        workers = list(self.workers.values())
+        for worker in workers:
+            worker.channel.send("shutdown")
+        # 等待期间事件循环继续接收工作进程最后上报的配置
+        await asyncio.gather(*(asyncio.to_thread(worker.process.join, WORKER_STOP_TIMEOUT) for worker in workers))
+        for worker in workers:
+            if worker.process.is_alive():
+                logger.warning(f"工作进程 {worker.shard_id} 未能按时退出，强制结束")
+                worker.process.terminate()
+            worker.channel.drain()
+            worker.channel.close()
+
+        try:
+            await self.persist()
+            self.config_manager.close_recordings_store()
+        except Exception as e:
+            logger.error(f"清理过程中发生错误: {e}")
+
+        tasks = [task for task in self.page.tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run_sharded(worker_count: int):
+    """多进程无界面模式入口"""
+    coordinator = ShardCoordinator(worker_count)
+    await coordinator.run()
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+from ...utils.logger import logger
+
+# 每秒最多刷新卡片的次数
+DEFAULT_MAX_FLUSHES_PER_SECOND = 4
+
+
+class CardUpdateBus:
+    """录制卡片的合并刷新总线
+
+    状态变化只把卡片标记为待刷新，同一张卡片在一个刷新周期内的多次变化合并为一次；
+    不在当前页的卡片直接跳过，重新挂载时再同步状态；录制项的 revision 与卡片上次刷新时
+    相同（字段没有实际变化）的卡片也会跳过。每个周期最多重新筛选一次、
+    广播一次并执行一次 page.update，刷新频率不超过 max_flushes_per_second。
+    """
+
+    def __init__(self, app, max_flushes_per_second: float | None = None):
+        self.app = app
+        if max_flushes_per_second is None:
+            max_flushes_per_second = app.settings.user_config.get(
+                "card_update_max_fps", DEFAULT_MAX_FLUSHES_PER_SECOND
+            )
+        self.flush_interval = 1 / max(float(max_flushes_per_second), 0.1)
+        self.dirty = {}
+        self.broadcast = {}
+        self.forced = set()
+        self.refilter = False
+        self.flush_scheduled = False
+        self.last_flush = 0.0
+        self.stats = {
+            "requested": 0,  # 收到的刷新请求
+            "coalesced": 0,  # 与同一周期内已有请求合并的次数
+            "sent": 0,  # 实际刷新的卡片数
+            "skipped": 0,  # 不在当前页而跳过的卡片数
+            "unchanged": 0,  # 录制项没有变化而跳过的卡片数
+            "broadcast": 0,  # 发给其他客户端的更新数
+            "flushes": 0,  # 批量刷新次数
+        }
+
+    def mark_dirty(self, recording, refilter: bool = False, broadcast: bool = False, force: bool = False):
+        """
+        标记卡片需要刷新，refilter 表示状态变化可能影响筛选结果，broadcast 表示需要同步给其他客户端，
+        force 表示即使录制项没有变化也要刷新（如显示相关的设置发生了变化）
+        """
+        self.stats["requested"] += 1
+        if recording.rec_id in self.dirty:
+            self.stats["coalesced"] += 1
+        self.dirty[recording.rec_id] = recording
+        if force:
+            self.forced.add(recording.rec_id)
+        if broadcast:
+            self.broadcast[recording.rec_id] = recording
+        self.refilter = self.refilter or refilter
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.app.page.run_task(self._flush_later)
+
+    async def _flush_later(self):
+        delay = self.last_flush + self.flush_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"批量刷新录制卡片时出错: {e}")
+        finally:
+            self.flush_scheduled = False
+            # 刷新期间又有新的变化时安排下一次刷新
+            if self.dirty or self.refilter:
+                self._schedule_flush()
+
+    async def flush(self):
+        dirty, self.dirty = self.dirty, {}
+        broadcast, self.broadcast = self.broadcast, {}
+        forced, self.forced = self.forced, set()
+        refilter, self.refilter = self.refilter, False
+        self.last_flush = time.monotonic()
+        self.stats["flushes"] += 1
+
+        for recording in broadcast.values():
+            self.app.page.pubsub.send_others_on_topic("update", recording)
+        self.stats["broadcast"] += len(broadcast)
+
+        card_manager = self.app.record_card_manager
+        mounted = []
+        for recording in dirty.values():
+            card_data = card_manager.cards_obj.get(recording.rec_id)
+            if card_data is None:
+                self.stats["skipped"] += 1
+            elif (recording.rec_id not in forced and
+                  card_data.get("revision", -1) == getattr(recording, "revision", None)):
+                self.stats["unchanged"] += 1
+            else:
+                mounted.append(recording)
+        for recording in mounted:
+            await card_manager.update_card(recording, push_update=False)
+        self.stats["sent"] += len(mounted)
+
+        current_page = getattr(self.app, "current_page", None)
+        if refilter and hasattr(current_page, "apply_filter"):
+            await current_page.apply_filter()
+        if mounted:
+            self.app.page.update()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "pending": len(self.dirty)}
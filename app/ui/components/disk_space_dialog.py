@@ -146,5 +146,6 @@ class DiskSpaceDialog(ft.AlertDialog):
         self.open = False
         self.update()
         
-        # 立即检查空间是否已恢复
+        # 立即检查空间是否已恢复，清理后的容量不能使用缓存结果
+        self.app.disk_space_service.invalidate()
         await self.app.record_manager.check_free_space() 
\ No newline at end of file
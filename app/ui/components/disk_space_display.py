@@ -1,10 +1,8 @@
 import flet as ft
 import asyncio
 import os
-import shutil
 from pathlib import Path
 from ...utils.logger import logger
-from ...utils import utils
 
 
 class DiskSpaceDisplay(ft.Container):
@@ -147,23 +145,15 @@ class DiskSpaceDisplay(ft.Container):
             # 使用与录制管理器相同的路径获取方法
             save_path = self.app.settings.get_video_save_path()
             
-            # 使用与录制管理器相同的磁盘检查方法
-            free_space_gb = utils.check_disk_capacity(save_path)
-            
-            # 获取完整的磁盘使用信息（用于显示总容量和已用空间）
-            absolute_path = os.path.abspath(save_path)
-            directory = os.path.dirname(absolute_path)
-            disk_usage = shutil.disk_usage(directory)
+            # 使用与录制管理器相同的磁盘空间服务，短时间内重复刷新直接使用缓存结果
+            volume = self.app.disk_space_service.probe(save_path)
             
             # 获取驱动器盘符
-            drive_letter = Path(directory).anchor.rstrip('\\/')
-            
-            # 转换为GB
-            total_gb = disk_usage.total / (1024**3)
-            used_gb = disk_usage.used / (1024**3)
+            drive_letter = Path(os.path.abspath(save_path)).anchor.rstrip('\\/')
             
-            # 使用录制管理器检查的剩余空间（更准确）
-            free_gb = free_space_gb
+            total_gb = volume.total_gb
+            used_gb = volume.used_gb
+            free_gb = volume.free_gb
             
             # 计算使用比例
             usage_ratio = used_gb / total_gb if total_gb > 0 else 0
@@ -235,6 +225,8 @@ class DiskSpaceDisplay(ft.Container):
     
     def _on_refresh_click(self, e):
         """刷新按钮点击事件"""
+        # 手动刷新时跳过缓存，重新查询磁盘容量
+        self.app.disk_space_service.invalidate()
         self.update_disk_space()
     
     
@@ -0,0 +1,63 @@
+import asyncio
+
+from ...utils.logger import logger
+
+
+class DurationTicker:
+    """所有录制卡片共用的时长刷新器
+
+    每秒只遍历当前页已挂载且正在录制的卡片，重新计算时长文本，并把变化的标签放在一次
+    page.update 中推送。窗口最小化到托盘时完全暂停，恢复窗口后立即刷新一次再继续。
+    """
+
+    def __init__(self, app, interval: float = 1.0):
+        self.app = app
+        self.interval = interval
+        self.task = None
+        self.loop = None
+        self.paused = False
+        self.wake_event = asyncio.Event()
+
+    def start(self):
+        if self.task is None:
+            self.task = self.app.page.run_task(self.run)
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        """恢复刷新，可以在托盘线程中调用"""
+        if not self.paused:
+            return
+        self.paused = False
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.wake_event.set)
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        while True:
+            while self.paused:
+                await self.wake_event.wait()
+                self.wake_event.clear()
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"刷新录制时长时出错: {e}")
+            await asyncio.sleep(self.interval)
+
+    def tick(self) -> int:
+        """刷新正在录制的已挂载卡片的时长，返回发生变化的标签数量"""
+        record_manager = self.app.record_manager
+        changed = []
+        for card_data in self.app.record_card_manager.cards_obj.values():
+            recording = card_data.get("recording")
+            duration_label = card_data.get("duration_label")
+            if recording is None or duration_label is None or not recording.recording:
+                continue
+            duration = record_manager.get_duration(recording)
+            if duration_label.value != duration:
+                duration_label.value = duration
+                changed.append(duration_label)
+        if changed:
+            self.app.page.update(*changed)
+        return len(changed)
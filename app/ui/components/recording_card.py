@@ -7,7 +7,7 @@ import os
 
 import flet as ft
 
-from ...core.platform_handlers import get_platform_info
+from ...core.platform_handlers import get_recording_platform_info
 from ...core.stream_manager import LiveStreamRecorder
 from ...messages.message_pusher import MessagePusher
 from ...models.recording_model import Recording
@@ -16,6 +16,8 @@ from ...utils import utils
 from ...utils.logger import logger
 from ..views.storage_view import StoragePage
 from .card_dialog import CardDialog
+from .card_update_bus import CardUpdateBus
+from .duration_ticker import DurationTicker
 from .recording_dialog import RecordingDialog
 from .video_player import VideoPlayer
 
@@ -23,9 +25,13 @@ from .video_player import VideoPlayer
 class RecordingCardManager:
     def __init__(self, app):
         self.app = app
+        # cards_obj 只保存当前页已挂载的卡片，离开当前页的卡片进入回收池
         self.cards_obj = {}
-        self.update_duration_tasks = {}
+        self.card_pool = {}
+        self.registered_ids = set()
         self.selected_cards = {}
+        self.update_bus = CardUpdateBus(app)
+        self.duration_ticker = DurationTicker(app)
         self.app.language_manager.add_observer(self)
         self._ = {}
         self.load()
@@ -40,18 +46,67 @@ class RecordingCardManager:
         self.app.page.pubsub.subscribe_topic("update", self.subscribe_update_card)
         self.app.page.pubsub.subscribe_topic("delete", self.subscribe_remove_cards)
 
-    async def create_card(self, recording: Recording):
-        """Create a card for a given recording."""
-        rec_id = recording.rec_id
-        if not self.cards_obj.get(rec_id):
+    def register_recordings(self, recordings: list[Recording]) -> list[Recording]:
+        """登记直播间并触发首次直播状态检查，返回本次新登记的录制项
+
+        卡片控件不在这里创建，翻到对应页面时才由 mount_page_cards 生成。
+        """
+        new_recordings = []
+        for recording in recordings:
+            if recording.rec_id in self.registered_ids:
+                continue
+            self.registered_ids.add(recording.rec_id)
             if self.app.recording_enabled:
-                self.app.page.run_task(self.app.record_manager.check_if_live, recording)
+                self.app.record_manager.request_live_check(recording)
             else:
                 recording.status_info = RecordingStatus.NOT_RECORDING_SPACE
-        card_data = self._create_card_components(recording)
-        self.cards_obj[rec_id] = card_data
-        self.start_update_task(recording)
-        return card_data["card"]
+            new_recordings.append(recording)
+        return new_recordings
+
+    def mount_page_cards(self, recordings: list[Recording], pool_size: int):
+        """只为当前页的直播间挂载卡片控件
+
+        离开当前页的卡片放入回收池，翻页回来时直接复用；回收池超出容量时丢弃最早离开页面的卡片。
+        返回当前页的卡片列表，以及从回收池取回、挂载后需要刷新状态的录制项。
+        """
+        page_ids = {recording.rec_id for recording in recordings}
+        for rec_id in [rec_id for rec_id in self.cards_obj if rec_id not in page_ids]:
+            self.card_pool[rec_id] = self.cards_obj.pop(rec_id)
+
+        cards = []
+        reused = []
+        for recording in recordings:
+            rec_id = recording.rec_id
+            card_data = self.cards_obj.get(rec_id)
+            if card_data is None:
+                card_data = self.card_pool.pop(rec_id, None)
+                if card_data is None:
+                    card_data = self._create_card_components(recording)
+                else:
+                    reused.append(recording)
+                self.cards_obj[rec_id] = card_data
+            cards.append(card_data["card"])
+        self.duration_ticker.start()
+
+        while len(self.card_pool) > pool_size:
+            self.card_pool.pop(next(iter(self.card_pool)))
+        return cards, reused
+
+    def request_update(self, recording: Recording, refilter: bool = False, broadcast: bool = False,
+                       force: bool = False):
+        """通过刷新总线合并刷新卡片，后台状态变化应使用此方法而不是直接调用 update_card"""
+        self.update_bus.mark_dirty(recording, refilter=refilter, broadcast=broadcast, force=force)
+
+    def release_cards(self):
+        """页面卸载时把已挂载的卡片全部放回回收池"""
+        for rec_id, card_data in self.cards_obj.items():
+            self.card_pool[rec_id] = card_data
+        self.cards_obj = {}
+
+    def clear_cards(self):
+        self.cards_obj = {}
+        self.card_pool = {}
+        self.registered_ids = set()
 
     def _create_card_components(self, recording: Recording):
         """create card components."""
@@ -238,7 +293,7 @@ class RecordingCardManager:
         )
         
         # 获取平台logo路径
-        _, platform_key = get_platform_info(recording.url)
+        _, platform_key = get_recording_platform_info(recording)
         logo_path = self.app.platform_logo_cache.get_logo_path(recording.rec_id, platform_key)
         
         # 获取缩略图设置并设置初始可见状态
@@ -411,6 +466,8 @@ class RecordingCardManager:
 
         return {
             "card": card,
+            "recording": recording,
+            "revision": recording.revision,
             "display_title_label": display_title_label,
             "live_title_label": live_title_label,
             "translated_title_label": translated_title_label,
@@ -510,12 +567,17 @@ class RecordingCardManager:
             )
         return None
 
-    async def update_card(self, recording):
-        """Update the card display based on the recording's state."""
+    async def update_card(self, recording, push_update: bool = True):
+        """Update the card display based on the recording's state.
+
+        push_update 为 False 时只修改控件属性，由调用方统一执行 page.update。
+        """
         try:
             recording_card = self.cards_obj.get(recording.rec_id)
             if not recording_card:
                 return
+            # 记录本次刷新对应的录制项版本，刷新总线据此跳过没有变化的卡片
+            recording_card["revision"] = recording.revision
 
             # 获取速度监控设置
             show_recording_speed = self.app.settings.user_config.get("show_recording_speed", True)
@@ -725,17 +787,22 @@ class RecordingCardManager:
 
             # 更新缩略图开关按钮状态
             if recording_card.get("thumbnail_switch_button"):
-                await self._update_thumbnail_switch_button(recording, recording.is_thumbnail_enabled(show_live_thumbnail))
+                await self._update_thumbnail_switch_button(
+                    recording, recording.is_thumbnail_enabled(show_live_thumbnail), push_update
+                )
 
             # 更新翻译开关按钮状态
             if recording_card.get("translation_switch_button"):
                 global_translation_enabled = self.app.settings.user_config.get("enable_title_translation", False)
-                await self._update_translation_switch_button(recording, recording.is_translation_enabled(global_translation_enabled))
+                await self._update_translation_switch_button(
+                    recording, recording.is_translation_enabled(global_translation_enabled), push_update
+                )
 
             if recording_card["card"] and recording_card["card"].content:
                 recording_card["card"].content.bgcolor = self.get_card_background_color(recording)
                 recording_card["card"].content.border = ft.border.all(2, self.get_card_border_color(recording))
-                recording_card["card"].update()
+                if push_update:
+                    recording_card["card"].update()
         except Exception as e:
             logger.error(f"Error updating card: {str(e)}", exc_info=True)
 
@@ -777,7 +844,7 @@ class RecordingCardManager:
                     "display_title": f"{recording.title}",
                 }
             )
-            self.app.page.run_task(self.app.record_manager.check_if_live, recording)
+            self.app.record_manager.request_live_check(recording)
             self.app.page.run_task(self.app.snack_bar.show_snack_bar, self._["start_monitor_tip"], ft.Colors.GREEN)
 
         await self.update_card(recording)
@@ -841,7 +908,7 @@ class RecordingCardManager:
                     return
                 
                 # 复用自动录制参数构建方式，保证平台识别一致
-                platform, platform_key = get_platform_info(recording.url)
+                platform, platform_key = get_recording_platform_info(recording)
                 if not platform or not platform_key:
                     await self.app.snack_bar.show_snack_bar(
                         self._["platform_not_supported_tip"], bgcolor=ft.Colors.RED
@@ -866,6 +933,7 @@ class RecordingCardManager:
                     # 新增：手动模式下也赋值主播id、标题等
                     # 先获取主播信息，确保主播名称是最新的
                     recording.streamer_name = getattr(stream_info, "anchor_name", recording.streamer_name)
+                    self.app.record_manager.room_index.add(recording)
                     
                     # 然后获取直播标题
                     recording.live_title = getattr(stream_info, "title", None)
@@ -942,7 +1010,7 @@ class RecordingCardManager:
                                     # 优化: 只在Windows系统且启用Windows通知时才获取平台代码
                                     if self.app.settings.user_config.get("windows_notify_enabled") and sys.platform == "win32":
                                         # 获取平台代码用于显示对应图标
-                                        _, platform_code = get_platform_info(recording.url)
+                                        _, platform_code = get_recording_platform_info(recording)
                                         # 直接在当前任务中执行推送
                                         self.app.page.run_task(msg_manager.push_messages, msg_title, push_content, platform_code)
                                     else:
@@ -989,7 +1057,7 @@ class RecordingCardManager:
             if hasattr(home_page, "current_platform_filter") and home_page.current_platform_filter != "all":
                 # 获取当前平台
                 current_platform = home_page.current_platform_filter
-                _, recording_platform = get_platform_info(recording.url)
+                _, recording_platform = get_recording_platform_info(recording)
                 
                 # 如果要删除的是当前筛选平台的录制项
                 if recording_platform == current_platform:
@@ -997,7 +1065,7 @@ class RecordingCardManager:
                     remaining_items = 0
                     for rec in self.app.record_manager.recordings:
                         if rec.rec_id != recording.rec_id:  # 排除当前要删除的项
-                            _, platform_key = get_platform_info(rec.url)
+                            _, platform_key = get_recording_platform_info(rec)
                             if platform_key == current_platform:
                                 remaining_items += 1
                     
@@ -1055,6 +1123,11 @@ class RecordingCardManager:
             k: v for k, v in self.cards_obj.items()
             if k in keep_ids
         }
+        self.card_pool = {
+            k: v for k, v in self.card_pool.items()
+            if k in keep_ids
+        }
+        self.registered_ids &= keep_ids
         home_page.recording_card_area.update()
         
         # 删除卡片后更新筛选区域
@@ -1067,7 +1140,7 @@ class RecordingCardManager:
                 
                 # 检查是否还有当前平台的录制项
                 for recording in self.app.record_manager.recordings:
-                    _, platform_key = get_platform_info(recording.url)
+                    _, platform_key = get_recording_platform_info(recording)
                     if platform_key == current_platform:
                         remaining_items = True
                         break
@@ -1113,22 +1186,6 @@ class RecordingCardManager:
     def get_tip_for_monitor_state(self, recording: Recording):
         return self._["stop_monitor"] if recording.monitor_status else self._["start_monitor"]
 
-    async def update_duration(self, recording: Recording):
-        """Update the duration text periodically."""
-        while True:
-            await asyncio.sleep(1)  # Update every second
-            if not recording or recording.rec_id not in self.cards_obj:  # Stop task if card is removed
-                break
-
-            if recording.recording:
-                duration_label = self.cards_obj[recording.rec_id]["duration_label"]
-                duration_label.value = self.app.record_manager.get_duration(recording)
-                duration_label.update()
-
-    def start_update_task(self, recording: Recording):
-        """Start a background task to update the duration text."""
-        self.update_duration_tasks[recording.rec_id] = self.app.page.run_task(self.update_duration, recording)
-
     async def on_card_click(self, recording: Recording):
         """Handle card click events."""
         recording.selected = not recording.selected
@@ -1227,11 +1284,8 @@ class RecordingCardManager:
         await self.on_card_click(recording)
 
     async def subscribe_update_card(self, _, recording: Recording):
-        await self.update_card(recording)
-        
         # 重新应用筛选条件，确保卡片在状态变更后显示在正确的分类中
-        if hasattr(self.app, 'current_page') and hasattr(self.app.current_page, 'apply_filter'):
-            await self.app.current_page.apply_filter()
+        self.request_update(recording, refilter=True)
 
     async def subscribe_remove_cards(self, _, recordings: list[Recording]):
         await self.remove_recording_card(recordings)
@@ -1247,6 +1301,12 @@ class RecordingCardManager:
         else:
             await self.app.snack_bar.show_snack_bar(err or self._["no_stream_url"], bgcolor=ft.Colors.RED)
 
+    async def _get_play_url(self, recording: Recording):
+        """优先播放视频接口提供的本地录制文件，避免每个观看者重复拉取直播源"""
+        if local_url := self.app.record_manager.get_local_live_url(recording):
+            return local_url, None
+        return await self.app.record_manager.get_stream_url(recording)
+
     async def play_stream_on_click(self, _, recording: Recording):
         if not recording.monitor_status:
             await self.app.snack_bar.show_snack_bar(self._["please_start_monitor"], bgcolor=ft.Colors.RED)
@@ -1281,7 +1341,7 @@ class RecordingCardManager:
             await self.app.snack_bar.show_snack_bar(not_set_message, bgcolor=ft.Colors.RED)
             return
             
-        stream_url, err = await self.app.record_manager.get_stream_url(recording)
+        stream_url, err = await self._get_play_url(recording)
         if stream_url:
             import subprocess
             try:
@@ -1304,7 +1364,7 @@ class RecordingCardManager:
             await self.app.snack_bar.show_snack_bar(self._["m3u8_player_url_not_set"], bgcolor=ft.Colors.RED)
             return
         
-        stream_url, err = await self.app.record_manager.get_stream_url(recording)
+        stream_url, err = await self._get_play_url(recording)
         if stream_url:
             try:
                 import webbrowser
@@ -1421,7 +1481,8 @@ class RecordingCardManager:
             logger.error(f"切换房间缩略图设置时发生错误: {e}")
             await self.app.snack_bar.show_snack_bar(f"切换缩略图设置失败: {e}", ft.Colors.RED)
     
-    async def _update_thumbnail_switch_button(self, recording: Recording, thumbnail_enabled: bool):
+    async def _update_thumbnail_switch_button(self, recording: Recording, thumbnail_enabled: bool,
+                                              push_update: bool = True):
         """更新缩略图开关按钮的状态"""
         try:
             rec_id = recording.rec_id
@@ -1463,7 +1524,8 @@ class RecordingCardManager:
                     thumbnail_switch_button.tooltip = self._["thumbnail_switch_tip_off"]
             
             # 更新UI
-            thumbnail_switch_button.update()
+            if push_update:
+                thumbnail_switch_button.update()
             
         except Exception as e:
             logger.error(f"更新缩略图开关按钮状态时发生错误: {e}")
@@ -1524,7 +1586,8 @@ class RecordingCardManager:
             logger.error(f"切换房间翻译设置时发生错误: {e}")
             await self.app.snack_bar.show_snack_bar(f"切换翻译设置失败: {e}", ft.Colors.RED)
     
-    async def _update_translation_switch_button(self, recording: Recording, translation_enabled: bool):
+    async def _update_translation_switch_button(self, recording: Recording, translation_enabled: bool,
+                                                push_update: bool = True):
         """更新翻译开关按钮的状态"""
         try:
             rec_id = recording.rec_id
@@ -1582,7 +1645,8 @@ class RecordingCardManager:
                     )
             
             # 更新UI
-            translation_switch_button.update()
+            if push_update:
+                translation_switch_button.update()
             
         except Exception as e:
             logger.error(f"更新翻译开关按钮状态时发生错误: {e}")
@@ -1614,7 +1678,8 @@ class RecordingCardManager:
                 
                 # 翻译标题为多种语言
                 multi_lang_results = await translate_live_title_to_multiple_languages(
-                    recording.live_title, target_languages, self.app.config_manager
+                    recording.live_title, target_languages, self.app.config_manager,
+                    user_config=self.app.settings.user_config
                 )
                 
                 # 保存多语言翻译结果
@@ -104,6 +104,18 @@ class RecordingDialog:
 
         format_row = ft.Row([media_type_dropdown, record_format_field], expand=True)
 
+        recorder_engine_dropdown = ft.Dropdown(
+            label=self._["recorder_engine"],
+            options=[
+                ft.dropdown.Option("global", self._["recorder_engine_global"]),
+                ft.dropdown.Option("ffmpeg", self._["recorder_engine_ffmpeg"]),
+                ft.dropdown.Option("native", self._["recorder_engine_native"]),
+            ],
+            value=initial_values.get("recorder_engine") or "global",
+            tooltip=self._["recorder_engine_tip"],
+            width=500,
+        )
+
         recording_dir_field = ft.TextField(
             label=self._["input_save_path"],
             hint_text=self._["default_input"],
@@ -305,6 +317,7 @@ class RecordingDialog:
                                 url_field,
                                 streamer_name_field,
                                 format_row,
+                                recorder_engine_dropdown,
                                 quality_dropdown,
                                 record_mode_dropdown,
                                 recording_dir_field,
@@ -521,6 +534,9 @@ class RecordingDialog:
                             "recording_dir": recording_dir_field.value,
                             "enabled_message_push": message_push_dropdown.value == "true",
                             "record_mode": record_mode_dropdown.value,
+                            "recorder_engine": (
+                                None if recorder_engine_dropdown.value == "global" else recorder_engine_dropdown.value
+                            ),
                             "live_title": real_title,
                             "translation_enabled": translation_switch.value,  # 新增翻译开关值
                             "remark": remark_field.value.strip() if remark_field.value and remark_field.value.strip() else None  # 修改备注处理逻辑
@@ -149,8 +149,8 @@ class SearchDialog(ft.AlertDialog):
         # 获取平台名称显示
         platform_name = ""
         try:
-            from app.core.platform_handlers import get_platform_info
-            _, platform_key = get_platform_info(recording.url)
+            from app.core.platform_handlers import get_recording_platform_info
+            _, platform_key = get_recording_platform_info(recording)
             lang = getattr(self.home_page.app, 'language_code', 'zh_CN')
             platform_name = get_platform_display_name(platform_key, lang)
         except:
@@ -241,8 +241,8 @@ class SearchDialog(ft.AlertDialog):
         """导航到指定的直播间记录"""
         # 1. 切换到对应平台的筛选条件
         try:
-            from app.core.platform_handlers import get_platform_info
-            _, platform_key = get_platform_info(recording.url)
+            from app.core.platform_handlers import get_recording_platform_info
+            _, platform_key = get_recording_platform_info(recording)
             # 设置平台筛选为直播间所属平台
             self.home_page.current_platform_filter = platform_key
         except:
@@ -266,7 +266,8 @@ class SearchDialog(ft.AlertDialog):
         else:
             await self.home_page.filter_all_on_click(None)
             
-        # 3. 找到并突出显示该卡片
+        # 3. 翻到该卡片所在的页面，找到并突出显示该卡片
+        await self.home_page.go_to_recording_page(recording.rec_id)
         card_info = self.home_page.app.record_card_manager.cards_obj.get(recording.rec_id)
         if card_info and card_info.get("card"):
             card = card_info["card"]
@@ -315,8 +316,8 @@ class SearchDialog(ft.AlertDialog):
             
             # 获取平台名称并标准化
             try:
-                from app.core.platform_handlers import get_platform_info
-                _, platform_key = get_platform_info(recording.url)
+                from app.core.platform_handlers import get_recording_platform_info
+                _, platform_key = get_recording_platform_info(recording)
                 lang = getattr(self.home_page.app, 'language_code', 'zh_CN')
                 platform_name = get_platform_display_name(platform_key, lang)
                 normalized_platform_name = self.normalize_text(platform_name)
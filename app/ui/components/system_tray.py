@@ -112,6 +112,7 @@ class SystemTrayManager:
             self.create_tray()
             
             self.is_minimized = True
+            self._set_card_ticker_paused(True)
             
         except Exception as e:
             logger.error(f"最小化到托盘时出错: {e}")
@@ -176,6 +177,7 @@ class SystemTrayManager:
         try:
             # 首先设置状态
             self.is_minimized = False
+            self._set_card_ticker_paused(False)
             
             if self.tray_icon:
                 self.tray_icon.stop()
@@ -194,6 +196,16 @@ class SystemTrayManager:
             # 确保状态被重置，即使出现错误
             self.is_minimized = False
     
+    def _set_card_ticker_paused(self, paused: bool):
+        """窗口隐藏在托盘时不需要刷新录制卡片的时长"""
+        record_card_manager = getattr(self.app, "record_card_manager", None)
+        if not record_card_manager:
+            return
+        if paused:
+            record_card_manager.duration_ticker.pause()
+        else:
+            record_card_manager.duration_ticker.resume()
+
     def restore_window(self):
         """恢复窗口显示"""
         try:
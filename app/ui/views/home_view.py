@@ -3,7 +3,7 @@ import uuid
 
 import flet as ft
 
-from ...core.platform_handlers import get_platform_info
+from ...core.platform_handlers import get_recording_platform_info
 from ...models.recording_model import Recording
 from ...models.recording_status_model import RecordingStatus
 from ...utils.logger import logger
@@ -35,6 +35,8 @@ class HomePage(PageBase):
         self.pagination_controls = None
         self.page_info_text = None
         self.visible_cards = []
+        # 回收池最多保留的页数，翻回最近浏览过的页面时直接复用卡片控件
+        self.card_pool_pages = 2
         
         self.init()
 
@@ -348,20 +350,38 @@ class HomePage(PageBase):
             
             self.pagination_controls.update()
         
-        # 隐藏所有卡片
-        cards_obj = self.app.record_card_manager.cards_obj
-        for card_info in cards_obj.values():
-            card_info["card"].visible = False
-        
-        # 只显示当前页的卡片
-        for i in range(start_idx, end_idx):
-            if i < len(self.visible_cards):
-                card_id = self.visible_cards[i]
-                if card_id in cards_obj:
-                    cards_obj[card_id]["card"].visible = True
+        await self.render_page_cards(self.visible_cards[start_idx:end_idx])
+
+    async def render_page_cards(self, page_ids):
+        """卡片区域只挂载当前页的卡片，其余直播间不创建控件"""
+        recordings_by_id = {recording.rec_id: recording for recording in self.app.record_manager.recordings}
+        page_recordings = [recordings_by_id[rec_id] for rec_id in page_ids if rec_id in recordings_by_id]
+        record_card_manager = self.app.record_card_manager
+        cards, reused = record_card_manager.mount_page_cards(
+            page_recordings, self.items_per_page * self.card_pool_pages
+        )
         
-        # 更新卡片区域
+        # 保留空结果提示
+        empty_tips = [
+            control for control in self.recording_card_area.content.controls
+            if getattr(control, 'key', None) == 'empty_filter_tip'
+        ]
+        self.recording_card_area.content.controls = cards + empty_tips
         self.recording_card_area.content.update()
+        
+        # 回收池中的卡片离开页面期间没有刷新，挂载后同步一次状态
+        for recording in reused:
+            await record_card_manager.update_card(recording)
+
+    async def go_to_recording_page(self, rec_id):
+        """跳转到指定直播间所在的页面"""
+        if rec_id not in self.visible_cards:
+            return False
+        page_number = self.visible_cards.index(rec_id) // self.items_per_page + 1
+        if page_number != self.current_page:
+            self.current_page = page_number
+            await self.update_page_display()
+        return True
 
     async def load(self):
         """Load the home page content."""
@@ -645,7 +665,7 @@ class HomePage(PageBase):
         
         for recording in recordings:
             if hasattr(recording, 'url') and recording.url:
-                platform_name, platform_key = get_platform_info(recording.url)
+                platform_name, platform_key = get_recording_platform_info(recording)
                 if platform_name and platform_key:
                     platforms.add((platform_name, platform_key))
         
@@ -734,19 +754,12 @@ class HomePage(PageBase):
                 return True
         return False
 
-    async def reset_cards_visibility(self):
-        cards_obj = self.app.record_card_manager.cards_obj
-        for card_info in cards_obj.values():
-            if not card_info["card"].visible:
-                card_info["card"].visible = True
-                card_info["card"].update()
-
     @staticmethod
     def should_show_recording(filter_type, recording, platform_filter="all"):
         """检查录制项是否应该显示在当前筛选条件下"""
         # 先检查平台筛选
         if platform_filter != "all":
-            _, platform_key = get_platform_info(recording.url)
+            _, platform_key = get_recording_platform_info(recording)
             if platform_key != platform_filter:
                 return False
         
@@ -767,22 +780,12 @@ class HomePage(PageBase):
     async def apply_filter(self):
         self.content_area.controls[1] = self.create_filter_area()
         
-        cards_obj = self.app.record_card_manager.cards_obj
-        recordings = self.app.record_manager.recordings
-        
-        # 重置可见卡片列表
-        self.visible_cards = []
-        
-        for recording in recordings:
-            card_info = cards_obj.get(recording.rec_id)
-            if not card_info:
-                continue
-                
-            visible = self.should_show_recording(self.current_filter, recording, self.current_platform_filter)
-            card_info["card"].visible = False  # 先设置所有卡片为不可见
-            
-            if visible:
-                self.visible_cards.append(recording.rec_id)
+        # 只根据录制项状态计算可见列表，不接触卡片控件
+        self.visible_cards = [
+            recording.rec_id
+            for recording in self.app.record_manager.recordings
+            if self.should_show_recording(self.current_filter, recording, self.current_platform_filter)
+        ]
         
         # 计算总页数
         self.total_pages = max(1, (len(self.visible_cards) + self.items_per_page - 1) // self.items_per_page)
@@ -812,21 +815,12 @@ class HomePage(PageBase):
             query: 搜索关键词
             use_current_filter: 是否使用当前筛选条件。如果为False，将忽略当前筛选，在所有直播间中搜索
         """
-        cards_obj = self.app.record_card_manager.cards_obj
         recordings = self.app.record_manager.recordings
         
         # 重置可见卡片列表
         self.visible_cards = []
         
-        # 首先重置所有卡片可见性
-        if not use_current_filter:
-            await self.reset_cards_visibility()
-        
         for recording in recordings:
-            card_info = cards_obj.get(recording.rec_id)
-            if not card_info:
-                continue
-                
             # 搜索匹配
             match_query = True
             if query:
@@ -839,9 +833,9 @@ class HomePage(PageBase):
                 
                 # 添加平台名称搜索支持
                 try:
-                    from app.core.platform_handlers import get_platform_info
+                    from app.core.platform_handlers import get_recording_platform_info
                     from app.core.platform_handlers.platform_map import get_platform_display_name
-                    _, platform_key = get_platform_info(recording.url)
+                    _, platform_key = get_recording_platform_info(recording)
                     lang = getattr(self.app, 'language_code', 'zh_CN')
                     platform_name = get_platform_display_name(platform_key, lang)
                     # 支持中英文平台名称匹配，忽略大小写
@@ -855,7 +849,7 @@ class HomePage(PageBase):
             if use_current_filter:
                 match_platform = True
                 if self.current_platform_filter != "all":
-                    _, platform_key = get_platform_info(recording.url)
+                    _, platform_key = get_recording_platform_info(recording)
                     match_platform = (platform_key == self.current_platform_filter)
                     
                 match_status = self.should_show_recording(self.current_filter, recording)
@@ -863,7 +857,6 @@ class HomePage(PageBase):
                 
             # 确定最终可见性
             visible = match_query and (not use_current_filter or match_filter)
-            card_info["card"].visible = False  # 先设置所有卡片为不可见
             
             if visible:
                 self.visible_cards.append(recording.rec_id)
@@ -907,72 +900,16 @@ class HomePage(PageBase):
         self.loading_indicator.visible = True
         self.loading_indicator.update()
 
-        cards_to_create = []
-        existing_cards = []
+        record_card_manager = self.app.record_card_manager
+        # 上次离开主页时挂载的卡片已随页面卸载，放回回收池等待复用
+        record_card_manager.release_cards()
         
-        for recording in self.app.record_manager.recordings:
-            if recording.rec_id not in self.app.record_card_manager.cards_obj:
-                cards_to_create.append(recording)
-            else:
-                existing_card = self.app.record_card_manager.cards_obj[recording.rec_id]["card"]
-                existing_card.visible = False  # 初始设置为不可见，由分页控制显示
-                existing_cards.append(existing_card)
-        
-        async def create_card_with_time_range(_recording: Recording):
-            _card = await self.app.record_card_manager.create_card(_recording)
-            _recording.scheduled_time_range = await self.app.record_manager.get_scheduled_time_range(
-                _recording.scheduled_start_time, _recording.monitor_hours
+        # 只登记新的直播间，卡片控件在翻到对应页面时才创建
+        new_recordings = record_card_manager.register_recordings(self.app.record_manager.recordings)
+        for recording in new_recordings:
+            recording.scheduled_time_range = await self.app.record_manager.get_scheduled_time_range(
+                recording.scheduled_start_time, recording.monitor_hours
             )
-            return _card, _recording
-        
-        if cards_to_create:
-            # 批量加载卡片，每批最多加载10个
-            batch_size = 10
-            total_batches = (len(cards_to_create) + batch_size - 1) // batch_size
-            
-            #logger.info(f"开始批量加载录制卡片，共 {len(cards_to_create)} 个，分 {total_batches} 批处理")
-            
-            for batch_index in range(total_batches):
-                start_idx = batch_index * batch_size
-                end_idx = min(start_idx + batch_size, len(cards_to_create))
-                batch_recordings = cards_to_create[start_idx:end_idx]
-                
-                #logger.debug(f"加载第 {batch_index+1}/{total_batches} 批卡片，{len(batch_recordings)} 个")
-                
-                # 处理当前批次
-                results = await asyncio.gather(*[
-                    create_card_with_time_range(recording)
-                    for recording in batch_recordings
-                ])
-                
-                for card, recording in results:
-                    card.visible = False  # 初始设置为不可见，由分页控制显示
-                    self.recording_card_area.content.controls.append(card)
-                    self.app.record_card_manager.cards_obj[recording.rec_id]["card"] = card
-                
-                # 更新UI，显示当前批次的卡片
-                self.recording_card_area.update()
-                
-                # 如果不是最后一批，添加短暂延迟让UI有时间响应
-                if batch_index < total_batches - 1:
-                    await asyncio.sleep(0.05)
-        
-        if existing_cards:
-            # 批量添加现有卡片，每批最多添加20个
-            batch_size = 20
-            total_batches = (len(existing_cards) + batch_size - 1) // batch_size
-            
-            for batch_index in range(total_batches):
-                start_idx = batch_index * batch_size
-                end_idx = min(start_idx + batch_size, len(existing_cards))
-                batch_cards = existing_cards[start_idx:end_idx]
-                
-                self.recording_card_area.content.controls.extend(batch_cards)
-                
-                # 更新UI，显示当前批次的卡片
-                if batch_index < total_batches - 1:
-                    self.recording_card_area.update()
-                    await asyncio.sleep(0.02)
 
         self.loading_indicator.visible = False
         self.loading_indicator.update()
@@ -987,11 +924,6 @@ class HomePage(PageBase):
         await self.apply_filter()
 
     async def show_all_cards(self):
-        cards_obj = self.app.record_card_manager.cards_obj
-        for card in cards_obj.values():
-            card["card"].visible = True
-        self.recording_card_area.update()
-        
         await self.apply_filter()
 
     async def add_recording(self, recordings_info):
@@ -1021,7 +953,8 @@ class HomePage(PageBase):
                     enabled_message_push=recording_info["enabled_message_push"],
                     record_mode=recording_info.get("record_mode", "auto"),
                     remark=recording_info.get("remark"),
-                    translation_enabled=recording_info.get("translation_enabled")
+                    translation_enabled=recording_info.get("translation_enabled"),
+                    recorder_engine=recording_info.get("recorder_engine"),
                 )
             else:
                 recording = Recording(
@@ -1040,7 +973,8 @@ class HomePage(PageBase):
                     enabled_message_push=True,
                     record_mode=recording_info.get("record_mode", user_config.get("record_mode", "auto")),
                     remark=recording_info.get("remark"),
-                    translation_enabled=recording_info.get("translation_enabled")
+                    translation_enabled=recording_info.get("translation_enabled"),
+                    recorder_engine=recording_info.get("recorder_engine"),
                 )
             recording.live_title = live_title
             if title:
@@ -1057,22 +991,12 @@ class HomePage(PageBase):
             new_recordings.append(recording)
 
         if new_recordings:
-            async def create_card_with_time_range(rec):
-                _card = await self.app.record_card_manager.create_card(rec)
-                rec.scheduled_time_range = await self.app.record_manager.get_scheduled_time_range(
-                    rec.scheduled_start_time, rec.monitor_hours
-                )
-                return _card, rec
+            self.app.record_card_manager.register_recordings(new_recordings)
 
-            results = await asyncio.gather(*[
-                create_card_with_time_range(rec)
-                for rec in new_recordings
-            ])
-
-            for card, recording in results:
-                card.visible = False  # 初始设置为不可见，由分页控制显示
-                self.recording_card_area.content.controls.append(card)
-                self.app.record_card_manager.cards_obj[recording.rec_id]["card"] = card
+            for recording in new_recordings:
+                recording.scheduled_time_range = await self.app.record_manager.get_scheduled_time_range(
+                    recording.scheduled_start_time, recording.monitor_hours
+                )
                 self.app.page.pubsub.send_others_on_topic("add", recording)
                 
                 # 将新添加的卡片添加到可见卡片列表
@@ -1081,7 +1005,7 @@ class HomePage(PageBase):
                 
                 # 如果监控状态已开启，立即检查直播状态
                 if recording.monitor_status:
-                    self.app.page.run_task(self.app.record_manager.check_if_live, recording)
+                    self.app.record_manager.request_live_check(recording)
 
             # 重新计算总页数
             self.total_pages = max(1, (len(self.visible_cards) + self.items_per_page - 1) // self.items_per_page)
@@ -1115,30 +1039,25 @@ class HomePage(PageBase):
 
         self.app.record_card_manager.load()
 
-        cards_obj = self.app.record_card_manager.cards_obj
+        record_card_manager = self.app.record_card_manager
+        cards_obj = record_card_manager.cards_obj
         recordings = self.app.record_manager.recordings
-        selected_cards = self.app.record_card_manager.selected_cards
+        selected_cards = record_card_manager.selected_cards
         new_ids = {rec.rec_id for rec in recordings}
-        to_remove = []
-        for card_id, card in cards_obj.items():
-            if card_id not in new_ids:
-                to_remove.append(card)
-                continue
-            if card_id in selected_cards:
-                selected_cards[card_id].selected = False
-                card["card"].content.bgcolor = None
-                card["card"].update()
-
-        for card in to_remove:
-            card_key = card["card"].key
-            cards_obj.pop(card_key, None)
-            self.recording_card_area.controls.remove(card["card"])
-            
-            # 从可见卡片列表中移除
-            if card_key in self.visible_cards:
-                self.visible_cards.remove(card_key)
-
-        # 批量更新卡片，每批最多更新15个
+        for card_id, recording in selected_cards.items():
+            recording.selected = False
+            if card_id in cards_obj:
+                cards_obj[card_id]["card"].content.bgcolor = None
+                cards_obj[card_id]["card"].update()
+
+        # 已删除直播间的卡片由 apply_filter 重新挂载当前页时移出卡片区域
+        record_card_manager.card_pool = {
+            rec_id: card_data for rec_id, card_data in record_card_manager.card_pool.items() if rec_id in new_ids
+        }
+        record_card_manager.register_recordings(recordings)
+
+        # 只需刷新当前页已挂载的卡片，每批最多更新15个
+        recordings = [recording for recording in recordings if recording.rec_id in cards_obj]
         batch_size = 15
         total_recordings = len(recordings)
         total_batches = (total_recordings + batch_size - 1) // batch_size
@@ -1250,7 +1169,7 @@ class HomePage(PageBase):
     async def delete_all_recording_cards(self):
         self.recording_card_area.content.controls.clear()
         self.recording_card_area.update()
-        self.app.record_card_manager.cards_obj = {}
+        self.app.record_card_manager.clear_cards()
         
         # 重置分页相关状态
         self.visible_cards = []
@@ -1291,16 +1210,11 @@ class HomePage(PageBase):
         self.loading_indicator.visible = True
         self.loading_indicator.update()
         
-        if recording.rec_id not in self.app.record_card_manager.cards_obj:
-            card = await self.app.record_card_manager.create_card(recording)
+        if self.app.record_card_manager.register_recordings([recording]):
             recording.scheduled_time_range = await self.app.record_manager.get_scheduled_time_range(
                 recording.scheduled_start_time, recording.monitor_hours
             )
             
-            card.visible = False  # 初始设置为不可见，由分页控制显示
-            self.recording_card_area.content.controls.append(card)
-            self.app.record_card_manager.cards_obj[recording.rec_id]["card"] = card
-            
             # 将新添加的卡片添加到可见卡片列表
             if self.should_show_recording(self.current_filter, recording, self.current_platform_filter):
                 self.visible_cards.append(recording.rec_id)
@@ -1381,6 +1295,9 @@ class HomePage(PageBase):
                 overlay_item.update()
                 #logger.debug("分页控件已隐藏")
         
+        # 卡片控件随页面卸载，放回回收池，避免后台刷新未挂载的控件
+        self.app.record_card_manager.release_cards()
+        
         # 移除事件处理器
         self.page.on_keyboard_event = None
         self.page.on_resized = None
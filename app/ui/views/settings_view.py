@@ -552,6 +552,14 @@ class SettingsPage(PageBase):
                             ),
                         ),
                         thumbnail_interval_row,
+                        self.create_setting_row(
+                            self._.get("thumbnail_from_recorder", "Thumbnails From Recorder"),
+                            ft.Switch(
+                                value=self.get_config_value("thumbnail_from_recorder", True),
+                                on_change=self.on_change,
+                                data="thumbnail_from_recorder",
+                            ),
+                        ),
                         self.create_setting_row(
                             self._["enable_title_translation"],
                             ft.Switch(
@@ -651,6 +659,20 @@ class SettingsPage(PageBase):
                                 tooltip=self._["switch_audio_format"],
                             ),
                         ),
+                        self.create_setting_row(
+                            self._["recorder_engine"],
+                            ft.Dropdown(
+                                options=[
+                                    ft.dropdown.Option("ffmpeg", text=self._["recorder_engine_ffmpeg"]),
+                                    ft.dropdown.Option("native", text=self._["recorder_engine_native"]),
+                                ],
+                                value=self.get_config_value("recorder_engine", "ffmpeg"),
+                                width=200,
+                                data="recorder_engine",
+                                on_change=self.on_change,
+                                tooltip=self._["recorder_engine_tip"],
+                            ),
+                        ),
                         self.create_setting_row(
                             self._["recording_quality"],
                             ft.Dropdown(
@@ -710,6 +732,15 @@ class SettingsPage(PageBase):
                                 on_change=self.on_change,
                             ),
                         ),
+                        self.create_setting_row(
+                            self._["disk_space_forecast_minutes"],
+                            ft.TextField(
+                                value=self.get_config_value("disk_space_forecast_minutes"),
+                                width=100,
+                                data="disk_space_forecast_minutes",
+                                on_change=self.on_change,
+                            ),
+                        ),
                         self.create_setting_row(
                             self._["segment_time"],
                             ft.TextField(
@@ -820,6 +851,23 @@ class SettingsPage(PageBase):
                                 on_change=self.on_change,
                             ),
                         ),
+                        self.create_setting_row(
+                            self._["push_digest_enabled"],
+                            ft.Switch(
+                                value=self.get_config_value("push_digest_enabled"),
+                                data="push_digest_enabled",
+                                on_change=self.on_change,
+                            ),
+                        ),
+                        self.create_setting_row(
+                            self._["push_digest_window"],
+                            ft.TextField(
+                                value=self.get_config_value("push_digest_window"),
+                                width=300,
+                                data="push_digest_window",
+                                on_change=self.on_change,
+                            ),
+                        ),
                     ],
                 ),
                 self.create_setting_group(
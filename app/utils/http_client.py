@@ -0,0 +1,82 @@
+import asyncio
+import importlib.util
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+import httpx
+
+from .logger import logger
+
+# 安装了 h2 时启用HTTP/2
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 连接池限制，同一代理下的所有请求共享
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0)
+
+
+def create_http_client(proxy: str | None = None, verify=True) -> httpx.AsyncClient:
+    """按统一的连接池和HTTP/2配置创建客户端
+
+    客户端由各平台共用，不保存响应设置的Cookie，避免一个平台的Cookie被带到其他平台的请求中，
+    需要Cookie的请求通过请求头单独传入。
+    """
+    return httpx.AsyncClient(
+        proxy=proxy or None,
+        http2=HTTP2_AVAILABLE,
+        limits=DEFAULT_LIMITS,
+        timeout=DEFAULT_TIMEOUT,
+        verify=verify,
+        cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+    )
+
+
+class HttpClientRegistry:
+    """全局共享的HTTP客户端注册表
+
+    同一事件循环中相同代理设置的请求复用同一个客户端，避免每次请求重新进行DNS解析、
+    TCP连接和TLS握手。超时、请求头等参数在每次请求时单独传入。
+    """
+
+    _clients: dict[tuple[str | None, int], tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+    @classmethod
+    def get_client(cls, proxy: str | None = None) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        key = (proxy or None, id(loop))
+        entry = cls._clients.get(key)
+        if entry is not None and entry[0] is loop and not entry[1].is_closed:
+            return entry[1]
+
+        # 清理已关闭事件循环遗留的客户端
+        for stale_key, (stale_loop, _) in list(cls._clients.items()):
+            if stale_loop.is_closed():
+                cls._clients.pop(stale_key, None)
+
+        client = create_http_client(proxy)
+        cls._clients[key] = (loop, client)
+        return client
+
+    @classmethod
+    def get_client_count(cls) -> int:
+        return len(cls._clients)
+
+    @classmethod
+    async def close_all(cls):
+        """关闭当前事件循环中的所有客户端，应用退出时调用"""
+        loop = asyncio.get_running_loop()
+        for key, (client_loop, client) in list(cls._clients.items()):
+            if client_loop is not loop:
+                continue
+            cls._clients.pop(key, None)
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"关闭HTTP客户端时出错: {e}")
+
+
+def get_http_client(proxy: str | None = None) -> httpx.AsyncClient:
+    return HttpClientRegistry.get_client(proxy)
+
+
+async def close_http_clients():
+    await HttpClientRegistry.close_all()
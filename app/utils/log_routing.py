@@ -0,0 +1,88 @@
+import re
+
+# 日志分类，通过 logger.bind(category=...) 标记
+MEMORY_LOG_CATEGORY = "memory"
+GENERAL_LOG_CATEGORY = "general"
+
+# 未标记分类的旧日志按消息内容识别为内存清理日志
+MEMORY_CLEANUP_PATTERNS = (
+    "执行轻量级清理任务",
+    "执行完整清理任务",
+    "轻量级清理",
+    "完整清理",
+    "内存使用率过高",
+    "内存使用详情",
+    "系统统计",
+    "系统状态",
+    "开始执行完整清理",
+    "内存使用率:",
+    "实例清理",
+    "实例统计",
+    "实例管理",
+    "平台处理器实例统计",
+    "进程管理 -",
+    "添加ffmpeg进程",
+    "添加进程后",
+    "当前活跃进程数",
+    "当前所有进程PID列表",
+    "检测到已终止的进程",
+    "开始清理所有进程",
+    "进程管理器初始化完成",
+    "系统信息:",
+    "系统进程验证通过",
+    "进程状态验证",
+    "开始验证所有进程状态",
+    "打包环境中检测到进程不存在",
+    "进程不存在于系统中",
+    "进程在系统中不存在",
+    "在打包环境中，手动将进程标记为已终止",
+    "验证进程时出错",
+    "验证进程状态时出错",
+    "准备启动FFmpeg进程",
+    "FFmpeg进程已创建",
+    "FFmpeg进程状态验证",
+    "FFmpeg进程不存在于系统中",
+    "FFmpeg进程已不存在于系统中",
+    "验证FFmpeg进程状态时出错",
+    "开始检查系统中的所有进程",
+    "发现FFmpeg进程",
+    r"系统中发现.*个FFmpeg进程",
+    r"系统中发现.*个Python进程",
+    "我们的进程列表中PID=",
+    "检查系统进程时出错",
+    # 测试脚本中使用的内存相关日志模式
+    "开始内存测试",
+    "内存状态",
+    "创建实例",
+    "内存测试总结",
+    "主动触发垃圾回收",
+    "显式清理未使用的实例",
+    r"等待.*秒让自动清理机制工作",
+    "清理实例后",
+    "开始内存优化测试",
+)
+
+# 所有模式合并为一个预编译的表达式，每条日志只扫描一次
+_MEMORY_CLEANUP_REGEX = re.compile("|".join(MEMORY_CLEANUP_PATTERNS))
+
+
+def get_log_category(record) -> str:
+    """返回日志分类，未标记的日志按消息内容判断后写回，供其他输出处理器直接复用"""
+    extra = record["extra"]
+    category = extra.get("category")
+    if category is None:
+        if _MEMORY_CLEANUP_REGEX.search(record["message"]):
+            category = MEMORY_LOG_CATEGORY
+        else:
+            category = GENERAL_LOG_CATEGORY
+        extra["category"] = category
+    return category
+
+
+def is_memory_cleanup_log(record) -> bool:
+    """检查是否为内存清理相关的日志"""
+    return get_log_category(record) == MEMORY_LOG_CATEGORY
+
+
+def not_memory_cleanup_log(record) -> bool:
+    return get_log_category(record) != MEMORY_LOG_CATEGORY
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import re
 import threading
@@ -31,6 +32,9 @@ class RoomChecker:
     # 短链接缓存大小限制
     MAX_SHORT_URL_CACHE_SIZE = 500
     
+    # 批量检查时联网查询（主播名称、短链接）的最大并发数
+    NETWORK_LOOKUP_CONCURRENCY = 5
+    
     # 短链接平台配置
     SHORT_URL_PLATFORMS = {
         "v.douyin.com": "douyin",
@@ -719,12 +723,13 @@ class RoomChecker:
 
             # logger.info(f"识别到平台: {platform} ({platform_key})")
 
+            index = RoomChecker._get_room_index(app, existing_recordings)
+
             # 2. 按优先级顺序检查重复
             # 2.1 最高优先级：检查URL是否完全相同（可以早期退出）
-            for recording in existing_recordings:
-                if recording.url == live_url:
-                    # logger.info("发现重复: URL完全相同")
-                    return True, "duplicate_reason_identical_url"
+            if index.contains_url(live_url):
+                # logger.info("发现重复: URL完全相同")
+                return True, "duplicate_reason_identical_url"
             
             # 2.2 次优先级：检查主播ID（主播名称）
             real_anchor_name = await RoomChecker._get_real_anchor_name(
@@ -732,27 +737,13 @@ class RoomChecker:
             )
             
             # 只有在有主播名称时才进行主播名称检查
-            if real_anchor_name:
-                duplicate_found = RoomChecker._check_streamer_name_duplicate(
-                    real_anchor_name, platform_key, existing_recordings
-                )
-                if duplicate_found:
-                    return True, "duplicate_reason_same_streamer"
-            
-            # 2.3 最低优先级：检查房间号
-            room_id = RoomChecker.extract_room_id(live_url)
-            
-            # 如果是短链接且没有提取到房间ID，尝试从缓存或网络获取
-            if not room_id and any(short_url in live_url for short_url in RoomChecker.SHORT_URL_PLATFORMS.keys()):
-                room_id = await RoomChecker._resolve_short_url_room_id(app, live_url, platform, platform_key)
+            if real_anchor_name and index.has_streamer(platform_key, real_anchor_name):
+                return True, "duplicate_reason_same_streamer"
             
-            # 检查房间ID（最低优先级，仅限同平台）
-            if room_id:
-                duplicate_found = RoomChecker._check_room_id_duplicate(
-                    room_id, platform_key, existing_recordings
-                )
-                if duplicate_found:
-                    return True, "duplicate_reason_same_room_id"
+            # 2.3 最低优先级：检查房间号（仅限同平台）
+            room_id = await RoomChecker._get_room_id(app, live_url, platform, platform_key)
+            if room_id and index.has_room_id(platform_key, room_id):
+                return True, "duplicate_reason_same_room_id"
 
             # logger.info("未发现重复直播间")
             return False, None
@@ -761,6 +752,24 @@ class RoomChecker:
             logger.error(f"检查重复直播间失败: {e}")
             return False, None
 
+    @staticmethod
+    def _get_room_index(app, existing_recordings: list[Recording]) -> "RoomIndex":
+        """获取现有录制列表的去重索引，默认录制列表直接复用录制管理器维护的索引"""
+        record_manager = getattr(app, "record_manager", None)
+        index = getattr(record_manager, "room_index", None)
+        if isinstance(index, RoomIndex) and existing_recordings is record_manager.recordings:
+            # 索引在添加、删除录制项和主播名称变化时已同步更新，直接使用
+            return index
+        return RoomIndex.from_recordings(existing_recordings)
+
+    @staticmethod
+    async def _get_room_id(app, live_url: str, platform: str, platform_key: str) -> Optional[str]:
+        """提取房间ID，短链接无法直接提取时尝试从缓存或网络获取"""
+        room_id = RoomChecker.extract_room_id(live_url)
+        if not room_id and any(short_url in live_url for short_url in RoomChecker.SHORT_URL_PLATFORMS.keys()):
+            room_id = await RoomChecker._resolve_short_url_room_id(app, live_url, platform, platform_key)
+        return room_id
+
     @staticmethod
     async def _resolve_short_url_room_id(
         app, live_url: str, platform: str, platform_key: str
@@ -821,49 +830,6 @@ class RoomChecker:
             logger.error(f"获取直播间信息失败: {e}")
             return None
 
-    @staticmethod
-    def _check_room_id_duplicate(
-        room_id: str, platform_key: str, existing_recordings: list[Recording]
-    ) -> bool:
-        """检查房间ID是否重复（最低优先级检查）"""
-        for recording in existing_recordings:
-            # 获取现有录制项的平台信息
-            existing_platform, existing_platform_key = RoomChecker._get_cached_platform_info(recording.url)
-            if not existing_platform:
-                logger.warning(f"无法识别现有录制项的平台: {recording.url}")
-                continue
-            
-            # 只检查同平台的房间ID
-            if platform_key == existing_platform_key:
-                existing_room_id = RoomChecker.extract_room_id(recording.url)
-                if existing_room_id and existing_room_id == room_id:
-                    # logger.info(f"现有录制项房间ID: {existing_room_id}")
-                    # logger.info(f"发现重复: 同平台房间ID相同 ({room_id})")
-                    return True
-        
-        return False
-
-    @staticmethod
-    def _check_streamer_name_duplicate(
-        real_anchor_name: str, platform_key: str, existing_recordings: list[Recording]
-    ) -> bool:
-        """检查主播名称是否重复（次优先级检查）"""
-        for recording in existing_recordings:
-            # 获取现有录制项的平台信息
-            existing_platform, existing_platform_key = RoomChecker._get_cached_platform_info(recording.url)
-            if not existing_platform:
-                logger.warning(f"无法识别现有录制项的平台: {recording.url}")
-                continue
-            
-            # 只检查同平台的主播名称
-            if platform_key == existing_platform_key and recording.streamer_name == real_anchor_name:
-                # logger.info(f"主播名称匹配: {real_anchor_name}")
-                # logger.info(f"平台匹配: {platform_key}")
-                # logger.info(f"发现重复: 同平台同名主播 ({real_anchor_name})")
-                return True
-        
-        return False
-
     @staticmethod
     def _create_recording_info_dict(app, platform: str, platform_key: str, live_url: str) -> dict:
         """创建录制信息字典（避免重复代码）"""
@@ -911,72 +877,48 @@ class RoomChecker:
         if existing_recordings is None:
             existing_recordings = app.record_manager.recordings
         
-        # 如果现有录制列表为空，需要对输入的直播间列表内部进行去重检查
-        if not existing_recordings:
-            # logger.info("现有录制列表为空，将对输入的直播间列表内部进行去重检查")
-            # 创建一个临时的去重检查机制
-            processed_urls = set()
-            processed_streamer_names = {}  # platform_key -> set(streamer_names)
-            processed_room_ids = {}  # platform_key -> set(room_ids)
+        # 在索引副本上检查，通过检查的URL会加入副本，同一批次内部的重复也会被过滤
+        index = RoomChecker._get_room_index(app, existing_recordings).copy()
+        # 现有录制列表为空时只需在批次内部去重，不联网获取主播名称
+        fetch_anchor_names = bool(existing_recordings)
+        
+        candidates = []
+        for url, streamer_name in zip(live_urls, streamer_names):
+            platform, platform_key = RoomChecker._get_cached_platform_info(url)
+            candidates.append((url, streamer_name, platform, platform_key))
+        
+        # 所有需要联网的查询并发完成，避免逐个串行等待
+        semaphore = asyncio.Semaphore(RoomChecker.NETWORK_LOOKUP_CONCURRENCY)
+        
+        async def lookup(url, streamer_name, platform, platform_key):
+            if not platform or index.contains_url(url):
+                return None, None
+            async with semaphore:
+                anchor_name = streamer_name
+                if fetch_anchor_names:
+                    anchor_name = await RoomChecker._get_real_anchor_name(
+                        app, url, platform, platform_key, streamer_name
+                    )
+                room_id = await RoomChecker._get_room_id(app, url, platform, platform_key)
+            return anchor_name, room_id
+        
+        lookups = await asyncio.gather(*(lookup(*candidate) for candidate in candidates))
+        
+        # 按输入顺序依次检查，保证同一批次内先出现的直播间优先保留
+        for i, (candidate, (anchor_name, room_id)) in enumerate(zip(candidates, lookups)):
+            url, _, platform, platform_key = candidate
+            if not platform:
+                logger.warning(f"无法识别平台: {url}")
+                filtered_urls.append((url, "platform_not_supported_tip"))
+                continue
             
-            for i, (url, streamer_name) in enumerate(zip(live_urls, streamer_names)):
-                # 1. 最高优先级：检查URL是否完全相同
-                if url in processed_urls:
-                    filtered_urls.append((url, "duplicate_reason_identical_url"))
-                    continue
-                
-                # 2. 获取平台信息
-                platform, platform_key = RoomChecker._get_cached_platform_info(url)
-                if not platform:
-                    logger.warning(f"无法识别平台: {url}")
-                    # 修改: 将不支持的平台URL加入到filtered_urls而不是valid_urls
-                    filtered_urls.append((url, "platform_not_supported_tip"))
-                    continue
-                
-                # 3. 次优先级：检查主播名称是否重复（同平台内）
-                if streamer_name:
-                    if platform_key not in processed_streamer_names:
-                        processed_streamer_names[platform_key] = set()
-                    if streamer_name in processed_streamer_names[platform_key]:
-                        filtered_urls.append((url, "duplicate_reason_same_streamer"))
-                        continue
-                    processed_streamer_names[platform_key].add(streamer_name)
-                
-                # 4. 最低优先级：检查房间ID是否重复（同平台内）
-                room_id = RoomChecker.extract_room_id(url)
-                if not room_id and any(short_url in url for short_url in RoomChecker.SHORT_URL_PLATFORMS.keys()):
-                    room_id = await RoomChecker._resolve_short_url_room_id(app, url, platform, platform_key)
-                
-                if room_id:
-                    if platform_key not in processed_room_ids:
-                        processed_room_ids[platform_key] = set()
-                    if room_id in processed_room_ids[platform_key]:
-                        filtered_urls.append((url, "duplicate_reason_same_room_id"))
-                        continue
-                    processed_room_ids[platform_key].add(room_id)
-                
-                # 通过所有检查，添加到有效列表
-                valid_urls.append(url)
-                processed_urls.add(url)
-        else:
-            # 现有录制列表不为空，使用原有的批量检查逻辑
-            for url, streamer_name in zip(live_urls, streamer_names):
-                # 首先检查平台是否支持
-                platform, platform_key = RoomChecker._get_cached_platform_info(url)
-                if not platform:
-                    logger.warning(f"无法识别平台: {url}")
-                    filtered_urls.append((url, "platform_not_supported_tip"))
-                    continue
-                    
-                # 然后检查是否重复
-                is_duplicate, reason = await RoomChecker.check_duplicate_room(
-                    app, url, streamer_name, existing_recordings
-                )
-                
-                if is_duplicate:
-                    filtered_urls.append((url, reason))
-                else:
-                    valid_urls.append(url)
+            reason = index.find_duplicate(url, platform_key, anchor_name, room_id)
+            if reason:
+                filtered_urls.append((url, reason))
+                continue
+            
+            valid_urls.append(url)
+            index.add_entry(f"batch_{i}", url, platform_key, anchor_name, room_id)
         
         # 记录过滤信息
         if filtered_urls:
@@ -1036,4 +978,120 @@ class RoomChecker:
         except Exception as e:
             error_msg = str(e)
             logger.error(f"获取过滤文件路径失败: {error_msg}")
-            return None, error_msg 
\ No newline at end of file
+            return None, error_msg 
+
+
+class RoomIndex:
+    """
+    直播间去重索引
+
+    维护 URL、(平台代码, 房间号)、(平台代码, 主播名称) 到 rec_id 的映射，去重检查只需常数次查询，
+    房间号在录制项加入索引时提取一次。由 RecordingManager 在添加、删除录制项和主播名称变化时
+    同步更新，去重检查时不再遍历录制列表。
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, Optional[str], Optional[str], Optional[str]]] = {}
+        self._urls: Dict[str, Set[str]] = {}
+        self._room_ids: Dict[Tuple[str, str], Set[str]] = {}
+        self._streamers: Dict[Tuple[str, str], Set[str]] = {}
+
+    @classmethod
+    def from_recordings(cls, recordings: list[Recording]) -> "RoomIndex":
+        index = cls()
+        index.sync(recordings)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _link(mapping: dict, key, entry_id: str):
+        mapping.setdefault(key, set()).add(entry_id)
+
+    @staticmethod
+    def _unlink(mapping: dict, key, entry_id: str):
+        entry_ids = mapping.get(key)
+        if entry_ids is not None:
+            entry_ids.discard(entry_id)
+            if not entry_ids:
+                del mapping[key]
+
+    def add(self, recording: Recording):
+        """加入或刷新录制项，无法识别平台的录制项只参与URL去重"""
+        platform, platform_key = RoomChecker._get_cached_platform_info(recording.url)
+        if not platform:
+            platform_key = None
+        room_id = RoomChecker.extract_room_id(recording.url) if platform_key else None
+        self.add_entry(recording.rec_id, recording.url, platform_key, recording.streamer_name, room_id)
+
+    def add_entry(
+        self, entry_id: str, url: str, platform_key: Optional[str], streamer_name: Optional[str], room_id: Optional[str]
+    ):
+        self.remove(entry_id)
+        self._entries[entry_id] = (url, platform_key, streamer_name, room_id)
+        self._link(self._urls, url, entry_id)
+        if platform_key:
+            if streamer_name:
+                self._link(self._streamers, (platform_key, streamer_name), entry_id)
+            if room_id:
+                self._link(self._room_ids, (platform_key, room_id), entry_id)
+
+    def remove(self, entry_id: str):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        url, platform_key, streamer_name, room_id = entry
+        self._unlink(self._urls, url, entry_id)
+        if platform_key:
+            if streamer_name:
+                self._unlink(self._streamers, (platform_key, streamer_name), entry_id)
+            if room_id:
+                self._unlink(self._room_ids, (platform_key, room_id), entry_id)
+
+    def clear(self):
+        self._entries.clear()
+        self._urls.clear()
+        self._room_ids.clear()
+        self._streamers.clear()
+
+    def sync(self, recordings: list[Recording]):
+        """与录制列表对齐，只有URL或主播名称变化的录制项会被重新索引"""
+        rec_ids = set()
+        for recording in recordings:
+            rec_ids.add(recording.rec_id)
+            entry = self._entries.get(recording.rec_id)
+            if entry is None or entry[0] != recording.url or entry[2] != recording.streamer_name:
+                self.add(recording)
+        if len(rec_ids) != len(self._entries):
+            for entry_id in [entry_id for entry_id in self._entries if entry_id not in rec_ids]:
+                self.remove(entry_id)
+
+    def copy(self) -> "RoomIndex":
+        index = RoomIndex()
+        index._entries = self._entries.copy()
+        index._urls = {key: set(value) for key, value in self._urls.items()}
+        index._room_ids = {key: set(value) for key, value in self._room_ids.items()}
+        index._streamers = {key: set(value) for key, value in self._streamers.items()}
+        return index
+
+    def contains_url(self, url: str) -> bool:
+        return url in self._urls
+
+    def has_streamer(self, platform_key: str, streamer_name: str) -> bool:
+        return (platform_key, streamer_name) in self._streamers
+
+    def has_room_id(self, platform_key: str, room_id: str) -> bool:
+        return (platform_key, room_id) in self._room_ids
+
+    def find_duplicate(
+        self, url: str, platform_key: str, streamer_name: Optional[str], room_id: Optional[str]
+    ) -> Optional[str]:
+        """按 URL > 主播名称 > 房间号 的优先级返回重复原因，没有重复时返回None"""
+        if self.contains_url(url):
+            return "duplicate_reason_identical_url"
+        if streamer_name and self.has_streamer(platform_key, streamer_name):
+            return "duplicate_reason_same_streamer"
+        if room_id and self.has_room_id(platform_key, room_id):
+            return "duplicate_reason_same_room_id"
+        return None
@@ -9,7 +9,8 @@ import threading
 import random
 import sys
 import platform as sys_platform
-from typing import Dict, List, Optional, Tuple
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
 
 from ..models.recording_model import Recording
 from .logger import logger
@@ -59,9 +60,16 @@ class ThumbnailManager:
         
         self.thumbnail_dir = os.path.join(base_path, "Live preview image")
         os.makedirs(self.thumbnail_dir, exist_ok=True)
+        # 录制进程持续覆盖写入的缩略图，与历史缩略图分开存放，避免被清理逻辑误删
+        self.live_snapshot_dir = os.path.join(self.thumbnail_dir, "live")
+        os.makedirs(self.live_snapshot_dir, exist_ok=True)
         
-        # 目录锁，用于保护目录扫描操作
+        # 目录锁，用于保护缩略图索引
         self.dir_lock = threading.Lock()
+        # 每个直播间最近的缩略图索引 rec_id -> deque[(时间戳, 路径)]，按时间从旧到新排列
+        self.thumbnail_index: Dict[str, Deque[Tuple[int, str]]] = {}
+        # 挤出索引、等待批量删除的旧缩略图
+        self.pending_deletes: List[str] = []
         
         # 每个直播间的缩略图捕获任务
         self.thumbnail_tasks: Dict[str, asyncio.Task] = {}
@@ -92,11 +100,27 @@ class ThumbnailManager:
         # 重试配置
         self.max_retry_attempts = 3  # 最大重试次数
         self.retry_base_delay = 2.0  # 基础重试延迟(秒)
+
+        # 未录制的直播间通过共享的捕获池拉流截图，限制同时运行的ffmpeg进程数
+        try:
+            max_concurrent = int(self.user_config.get("thumbnail_max_concurrent_captures", 4))
+        except (ValueError, TypeError):
+            max_concurrent = 4
+        self.max_concurrent_captures = max(1, max_concurrent)
+        self.capture_semaphore = asyncio.Semaphore(self.max_concurrent_captures)
+
+        # 录制进程输出缩略图的开始时间和最近一次采集的修改时间
+        self.snapshot_started: Dict[str, float] = {}
+        self.snapshot_collected: Dict[str, float] = {}
+        # 录制开始后等待第一张缩略图的时间，超时后回退到拉流截图
+        self.snapshot_grace_period = 30
         
         # 设置配置变更监听器
         if hasattr(self.settings, 'add_config_change_listener'):
             self.settings.add_config_change_listener('show_live_thumbnail', self._on_thumbnail_switch_changed)
         
+        self._build_index()
+        
         logger.info(f"缩略图管理器初始化完成，存储目录: {self.thumbnail_dir}")
     
     async def _on_thumbnail_switch_changed(self, key, value):
@@ -206,6 +230,16 @@ class ThumbnailManager:
                     logger.error(f"解析缩略图更新间隔时出错: {e}，使用默认值60秒")
                     self.update_interval = 60
                 
+                # 正在录制的直播间直接使用录制进程输出的缩略图
+                if recording.recording and recording.live_snapshot_path:
+                    thumbnail_path, pending = await self._collect_recorder_snapshot(recording)
+                    if thumbnail_path:
+                        await self._cleanup_old_thumbnails(recording)
+                        await self._update_ui_thumbnail(recording, thumbnail_path)
+                    if thumbnail_path or pending:
+                        await asyncio.sleep(self.update_interval)
+                        continue
+
                 # 获取直播流URL
                 stream_url = None
                 try:
@@ -243,6 +277,73 @@ class ThumbnailManager:
                 logger.error(f"缩略图捕获过程中发生错误: {e}")
                 await asyncio.sleep(self.update_interval)
     
+    def get_live_snapshot_path(self, recording: Recording) -> str:
+        """返回录制进程输出缩略图的路径，并清除上次录制遗留的文件"""
+        rec_id = recording.rec_id
+        snapshot_path = os.path.join(self.live_snapshot_dir, f"{rec_id}.jpg")
+        try:
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+        except OSError as e:
+            logger.warning(f"删除旧的录制缩略图失败: {e}")
+        self.snapshot_started[rec_id] = time.time()
+        self.snapshot_collected.pop(rec_id, None)
+        return snapshot_path.replace("\\", "/")
+
+    @staticmethod
+    def _read_complete_jpeg(path: str) -> Optional[bytes]:
+        """读取JPEG文件，ffmpeg尚未写完（缺少结束标记）时返回None"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < 4 or not data.startswith(b"\xff\xd8") or not data.rstrip(b"\x00").endswith(b"\xff\xd9"):
+            return None
+        return data
+
+    async def _collect_recorder_snapshot(self, recording: Recording) -> Tuple[Optional[str], bool]:
+        """采集录制进程输出的缩略图
+
+        Returns:
+            Tuple[Optional[str], bool]: (新的缩略图路径, 是否仍在等待录制进程输出)
+        """
+        rec_id = recording.rec_id
+        snapshot_path = recording.live_snapshot_path
+        try:
+            mtime = os.path.getmtime(snapshot_path)
+        except OSError:
+            # 录制刚开始时还没有输出缩略图，超过等待时间后回退到拉流截图
+            started = self.snapshot_started.get(rec_id, 0)
+            return None, time.time() - started < self.snapshot_grace_period
+
+        # 缩略图长时间没有更新，说明录制进程未能输出缩略图（例如纯音频流）
+        if time.time() - mtime > self.update_interval * 2 + self.snapshot_grace_period:
+            return None, False
+        if mtime <= self.snapshot_collected.get(rec_id, 0):
+            return None, True
+
+        data = await asyncio.to_thread(self._read_complete_jpeg, snapshot_path)
+        if not data:
+            return None, True
+
+        thumbnail_path = os.path.join(self.thumbnail_dir, f"{rec_id}_{int(time.time())}.jpg")
+        try:
+            with FileLock.acquire(thumbnail_path):
+                await asyncio.to_thread(self._write_file, thumbnail_path, data)
+        except OSError as e:
+            logger.error(f"保存录制缩略图失败: {e}")
+            return None, True
+        self.snapshot_collected[rec_id] = mtime
+        self._register_thumbnail(rec_id, thumbnail_path)
+        logger.debug(f"使用录制进程输出的缩略图: {recording.streamer_name}")
+        return thumbnail_path, True
+
+    @staticmethod
+    def _write_file(path: str, data: bytes):
+        with open(path, "wb") as f:
+            f.write(data)
+
     async def _capture_thumbnail_with_retry(self, stream_url: str, recording: Recording) -> Tuple[Optional[str], bool]:
         """使用重试机制捕获缩略图
         
@@ -273,8 +374,9 @@ class ThumbnailManager:
                 # 等待一段时间后重试
                 await asyncio.sleep(delay)
             
-            # 尝试捕获缩略图
-            thumbnail_path = await self._capture_thumbnail(stream_url, recording)
+            # 尝试捕获缩略图，同时运行的截图进程数受捕获池限制
+            async with self.capture_semaphore:
+                thumbnail_path = await self._capture_thumbnail(stream_url, recording)
             
             # 成功捕获
             if thumbnail_path:
@@ -379,6 +481,7 @@ class ThumbnailManager:
                     logger.error(f"缩略图文件创建但为空(0字节): {thumbnail_path}")
                     return None
                     
+                self._register_thumbnail(rec_id, thumbnail_path)
                 logger.info(f"成功为直播间 {recording.streamer_name} 捕获缩略图: {thumbnail_path} (大小: {file_size} 字节)")
                 return thumbnail_path
             
@@ -387,35 +490,81 @@ class ThumbnailManager:
             logger.error(f"捕获缩略图过程中发生错误: {e}\n{traceback.format_exc()}")
             return None
     
-    async def _cleanup_old_thumbnails(self, recording: Recording):
-        """清理旧的缩略图，保持每个直播间最多只有指定数量的缩略图"""
-        rec_id = recording.rec_id
+    @staticmethod
+    def _parse_thumbnail_name(filename: str) -> Optional[Tuple[str, int]]:
+        """从 "{rec_id}_{时间戳}.jpg" 中解析出直播间ID和时间戳"""
+        if not filename.endswith(".jpg"):
+            return None
+        rec_id, sep, timestamp = filename[:-4].rpartition("_")
+        if not sep or not rec_id or not timestamp.isdigit():
+            return None
+        return rec_id, int(timestamp)
+
+    def _build_index(self):
+        """启动时扫描一次缩略图目录建立索引，超出保留数量的旧文件加入待删除列表"""
+        rooms: Dict[str, List[Tuple[int, str]]] = {}
         try:
-            # 使用目录锁保护目录扫描操作
-            with self.dir_lock:
-                # 查找该直播间的所有缩略图
-                thumbnails = []
-                for filename in os.listdir(self.thumbnail_dir):
-                    if filename.startswith(f"{rec_id}_") and filename.endswith(".jpg"):
-                        file_path = os.path.join(self.thumbnail_dir, filename)
-                        thumbnails.append((file_path, os.path.getmtime(file_path)))
-                
-                # 按修改时间排序（最新的在后面）
-                thumbnails.sort(key=lambda x: x[1])
-            
-            # 删除多余的缩略图（保留最新的N个）
-            if len(thumbnails) > self.max_thumbnails_per_room:
-                for i in range(len(thumbnails) - self.max_thumbnails_per_room):
-                    # 使用文件锁保护文件删除操作
-                    with FileLock.acquire(thumbnails[i][0]):
-                        try:
-                            if os.path.exists(thumbnails[i][0]):  # 再次检查文件是否存在
-                                os.remove(thumbnails[i][0])
-                                logger.debug(f"删除旧缩略图: {thumbnails[i][0]}")
-                        except Exception as e:
-                            logger.error(f"删除旧缩略图失败: {e}")
+            with os.scandir(self.thumbnail_dir) as entries:
+                for entry in entries:
+                    parsed = self._parse_thumbnail_name(entry.name)
+                    if parsed and entry.is_file():
+                        rec_id, timestamp = parsed
+                        rooms.setdefault(rec_id, []).append((timestamp, entry.path))
+        except OSError as e:
+            logger.error(f"扫描缩略图目录失败: {e}")
+            return
+
+        with self.dir_lock:
+            self.thumbnail_index.clear()
+            for rec_id, thumbnails in rooms.items():
+                thumbnails.sort()
+                self.pending_deletes.extend(path for _, path in thumbnails[:-self.max_thumbnails_per_room])
+                self.thumbnail_index[rec_id] = deque(thumbnails[-self.max_thumbnails_per_room:])
+        logger.info(f"缩略图索引已建立: {len(rooms)} 个直播间, 待清理 {len(self.pending_deletes)} 个旧文件")
+
+    def _register_thumbnail(self, rec_id: str, thumbnail_path: str):
+        """记录新捕获的缩略图，超出保留数量时最旧的一张加入待删除列表"""
+        parsed = self._parse_thumbnail_name(os.path.basename(thumbnail_path))
+        timestamp = parsed[1] if parsed else int(time.time())
+        with self.dir_lock:
+            thumbnails = self.thumbnail_index.setdefault(rec_id, deque())
+            if thumbnails and thumbnails[-1][1] == thumbnail_path:
+                # 同一秒内重复捕获会覆盖同名文件
+                return
+            thumbnails.append((timestamp, thumbnail_path))
+            while len(thumbnails) > self.max_thumbnails_per_room:
+                self.pending_deletes.append(thumbnails.popleft()[1])
+
+    @staticmethod
+    def _delete_files(file_paths: List[str]) -> int:
+        deleted_count = 0
+        for file_path in file_paths:
+            try:
+                os.remove(file_path)
+                deleted_count += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"删除缩略图文件失败: {file_path}, 错误: {e}")
+        return deleted_count
+
+    def _take_pending_deletes(self) -> List[str]:
+        with self.dir_lock:
+            file_paths, self.pending_deletes = self.pending_deletes, []
+        return file_paths
+
+    async def _cleanup_old_thumbnails(self, recording: Recording = None):
+        """批量删除被挤出索引的旧缩略图"""
+        file_paths = self._take_pending_deletes()
+        if not file_paths:
+            return 0
+        try:
+            deleted_count = await asyncio.to_thread(self._delete_files, file_paths)
+            logger.debug(f"批量删除旧缩略图: {deleted_count} 个")
+            return deleted_count
         except Exception as e:
             logger.error(f"清理旧缩略图过程中发生错误: {e}")
+            return 0
     
     async def _update_ui_thumbnail(self, recording: Recording, thumbnail_path: str):
         """更新UI中的缩略图"""
@@ -429,31 +578,13 @@ class ThumbnailManager:
     
     def get_latest_thumbnail(self, recording: Recording) -> Optional[str]:
         """获取指定直播间的最新缩略图路径"""
-        rec_id = recording.rec_id
-        try:
-            # 使用目录锁保护目录扫描操作
-            with self.dir_lock:
-                # 查找该直播间的所有缩略图
-                thumbnails = []
-                for filename in os.listdir(self.thumbnail_dir):
-                    if filename.startswith(f"{rec_id}_") and filename.endswith(".jpg"):
-                        file_path = os.path.join(self.thumbnail_dir, filename)
-                        # 检查文件是否可读
-                        try:
-                            if os.path.exists(file_path) and os.access(file_path, os.R_OK):
-                                thumbnails.append((file_path, os.path.getmtime(file_path)))
-                        except Exception as e:
-                            logger.warning(f"检查缩略图文件访问权限时出错: {e}")
-                
-                # 按修改时间排序
-                thumbnails.sort(key=lambda x: x[1])
-                
-                # 返回最新的缩略图路径
-                if thumbnails:
-                    return thumbnails[-1][0]
-        except Exception as e:
-            logger.error(f"获取最新缩略图路径过程中发生错误: {e}")
-        
+        with self.dir_lock:
+            thumbnails = self.thumbnail_index.get(recording.rec_id)
+            candidates = [path for _, path in reversed(thumbnails)] if thumbnails else []
+        # 文件可能已被外部删除，依次回退到较早的缩略图
+        for file_path in candidates:
+            if os.access(file_path, os.R_OK):
+                return file_path
         return None
     
     def delete_thumbnails_for_recording(self, rec_id: str) -> int:
@@ -466,28 +597,17 @@ class ThumbnailManager:
             int: 删除的文件数量
         """
         try:
-            # 使用目录锁保护目录扫描操作
             with self.dir_lock:
-                # 查找该直播间的所有缩略图
-                thumbnail_files = []
-                for filename in os.listdir(self.thumbnail_dir):
-                    if filename.startswith(f"{rec_id}_") and filename.endswith(".jpg"):
-                        file_path = os.path.join(self.thumbnail_dir, filename)
-                        thumbnail_files.append(file_path)
-            
-            # 删除所有找到的缩略图
-            deleted_count = 0
-            for file_path in thumbnail_files:
-                # 使用文件锁保护文件删除操作
-                with FileLock.acquire(file_path):
-                    try:
-                        if os.path.exists(file_path):  # 再次检查文件是否存在
-                            os.remove(file_path)
-                            deleted_count += 1
-                            #logger.debug(f"删除缩略图: {file_path}")
-                    except Exception as e:
-                        logger.error(f"删除缩略图文件失败: {file_path}, 错误: {e}")
+                thumbnails = self.thumbnail_index.pop(rec_id, None) or ()
+                thumbnail_files = [path for _, path in thumbnails]
             
+            live_snapshot = os.path.join(self.live_snapshot_dir, f"{rec_id}.jpg")
+            if os.path.exists(live_snapshot):
+                thumbnail_files.append(live_snapshot)
+            self.snapshot_started.pop(rec_id, None)
+            self.snapshot_collected.pop(rec_id, None)
+
+            deleted_count = self._delete_files(thumbnail_files)
             if deleted_count > 0:
                 logger.info(f"已删除直播间 {rec_id} 的 {deleted_count} 个缩略图文件")
             
@@ -524,35 +644,20 @@ class ThumbnailManager:
             int: 删除的文件数量
         """
         try:
-            now = time.time()
-            max_age_seconds = max_age_days * 24 * 60 * 60
-            cutoff_time = now - max_age_seconds
+            cutoff_time = time.time() - max_age_days * 24 * 60 * 60
             
-            # 使用目录锁保护目录扫描操作
+            # 按索引中的时间戳找出过期的缩略图，与待删除的旧文件一起批量删除
             with self.dir_lock:
-                # 查找所有过期的缩略图
                 thumbnails_to_delete = []
-                for filename in os.listdir(self.thumbnail_dir):
-                    if filename.endswith(".jpg"):
-                        file_path = os.path.join(self.thumbnail_dir, filename)
-                        try:
-                            file_mod_time = os.path.getmtime(file_path)
-                            if file_mod_time < cutoff_time:
-                                thumbnails_to_delete.append(file_path)
-                        except Exception as e:
-                            logger.warning(f"获取文件修改时间失败: {file_path}, 错误: {e}")
+                for rec_id in list(self.thumbnail_index):
+                    thumbnails = self.thumbnail_index[rec_id]
+                    while thumbnails and thumbnails[0][0] < cutoff_time:
+                        thumbnails_to_delete.append(thumbnails.popleft()[1])
+                    if not thumbnails:
+                        del self.thumbnail_index[rec_id]
+            thumbnails_to_delete.extend(self._take_pending_deletes())
             
-            # 删除所有过期的缩略图
-            deleted_count = 0
-            for file_path in thumbnails_to_delete:
-                # 使用文件锁保护文件删除操作
-                with FileLock.acquire(file_path):
-                    try:
-                        if os.path.exists(file_path):  # 再次检查文件是否存在
-                            os.remove(file_path)
-                            deleted_count += 1
-                    except Exception as e:
-                        logger.error(f"删除过期缩略图文件失败: {file_path}, 错误: {e}")
+            deleted_count = await asyncio.to_thread(self._delete_files, thumbnails_to_delete)
             
             if deleted_count > 0:
                 logger.info(f"已清理 {deleted_count} 个超过 {max_age_days} 天的缩略图文件")
@@ -560,4 +665,4 @@ class ThumbnailManager:
             return deleted_count
         except Exception as e:
             logger.error(f"清理过期缩略图过程中发生错误: {e}")
-            return 0 
\ No newline at end of file
+            return 0
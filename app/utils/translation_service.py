@@ -3,19 +3,201 @@ import httpx
 import re
 import hashlib
 import random
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
 from typing import Optional, Dict, Any
+from ..utils.http_client import get_http_client
 from ..utils.logger import logger
 
+REQUEST_TIMEOUT = 10.0
+
+# 内存中保留的翻译结果数量
+CACHE_MEMORY_ENTRIES = 2048
+# 磁盘缓存保留的翻译结果数量，超出时删除最久未使用的条目
+CACHE_DISK_ENTRIES = 50000
+# 收集同一目标语言待翻译标题的等待时间（秒），窗口内的标题合并为一次请求
+BATCH_WINDOW = 0.05
+# 单次请求合并的最大标题数和最大字符数，百度单次请求的文本长度上限约为6000字节
+BATCH_MAX_TITLES = 20
+BATCH_MAX_CHARS = 1800
+
+
+def normalize_text(text: str) -> str:
+    """合并连续空白，作为缓存键和实际提交翻译的文本"""
+    return " ".join(text.split())
+
+
+class TranslationCache:
+    """翻译结果缓存
+
+    以 (翻译提供商, 规范化文本, 目标语言) 为键，内存中按LRU保留最近使用的条目，
+    同时写入SQLite，程序重启后重复出现的直播标题不必重新请求翻译接口。
+    db_path 为空时只使用内存缓存。
+    """
+
+    def __init__(self, db_path: str | None = None, max_entries: int = CACHE_MEMORY_ENTRIES,
+                 max_disk_entries: int = CACHE_DISK_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._unsaved: dict[tuple, str] = {}
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def open(self):
+        with self._lock:
+            if self._conn is not None or not self.db_path:
+                return
+            try:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "provider TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, "
+                    "translated TEXT NOT NULL, used_at REAL NOT NULL, "
+                    "PRIMARY KEY (provider, source, target))"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS translations_used_at ON translations (used_at)")
+                # 预加载最近使用的条目
+                rows = conn.execute(
+                    "SELECT provider, source, target, translated FROM translations ORDER BY used_at DESC LIMIT ?",
+                    (self.max_entries,),
+                ).fetchall()
+                for provider, source, target, translated in reversed(rows):
+                    self._entries[(provider, source, target)] = translated
+                self._conn = conn
+            except Exception as e:
+                logger.error(f"打开翻译缓存数据库失败: {self.db_path}, {e}")
+                # 数据库不可用时退化为内存缓存
+                self.db_path = None
+
+    def close(self):
+        self.save()
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
+
+    def get(self, key: tuple) -> Optional[str]:
+        translated = self._get_memory(key)
+        if translated is not None:
+            return translated
+        return self._on_loaded(key, self._load(key))
+
+    async def get_async(self, key: tuple) -> Optional[str]:
+        """内存未命中时在工作线程中查询SQLite，避免磁盘读取阻塞事件循环"""
+        translated = self._get_memory(key)
+        if translated is not None:
+            return translated
+        if self._conn is None:
+            return self._on_loaded(key, None)
+        return self._on_loaded(key, await asyncio.to_thread(self._load, key))
+
+    def _get_memory(self, key: tuple) -> Optional[str]:
+        translated = self._entries.get(key)
+        if translated is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return translated
+
+    def _on_loaded(self, key: tuple, translated: Optional[str]) -> Optional[str]:
+        if translated is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, translated)
+        return translated
+
+    def put(self, key: tuple, translated: str):
+        self._remember(key, translated)
+        if self.db_path:
+            self._unsaved[key] = translated
+
+    def _remember(self, key: tuple, translated: str):
+        self._entries[key] = translated
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT translated FROM translations WHERE provider = ? AND source = ? AND target = ?", key
+                ).fetchone()
+            except Exception as e:
+                logger.error(f"读取翻译缓存失败: {e}")
+                return None
+        return row[0] if row else None
+
+    def take_unsaved(self) -> dict:
+        """取出尚未写入磁盘的条目，需要在事件循环线程中调用"""
+        rows, self._unsaved = self._unsaved, {}
+        return rows
+
+    def save(self, rows: dict | None = None) -> int:
+        """写入新增的翻译结果，返回写入的条目数；可以在工作线程中调用"""
+        if rows is None:
+            rows = self.take_unsaved()
+        if not rows:
+            return 0
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                return 0
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(
+                    "INSERT INTO translations (provider, source, target, translated, used_at) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT(provider, source, target) "
+                    "DO UPDATE SET translated = excluded.translated, used_at = excluded.used_at",
+                    [(*key, translated, now) for key, translated in rows.items()],
+                )
+                self._conn.execute(
+                    "DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations "
+                    "ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.error(f"写入翻译缓存失败: {e}")
+                return 0
+        return len(rows)
+
+    def get_stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
 
 class TranslationService:
     """翻译服务类，支持多种翻译提供商"""
     
-    def __init__(self, provider: str = "google", baidu_app_id: str = "", baidu_secret_key: str = ""):
+    def __init__(self, provider: str = "google", baidu_app_id: str = "", baidu_secret_key: str = "",
+                 cache: TranslationCache | None = None):
         self.session = None
         self.provider = provider
         self.baidu_app_id = baidu_app_id
         self.baidu_secret_key = baidu_secret_key
+        self.cache = cache if cache is not None else TranslationCache()
+
+        # 正在翻译的文本，相同的并发请求共用同一个结果
+        self.pending: dict[tuple, asyncio.Future] = {}
+        # 目标语言 -> 等待合并提交的文本列表
+        self.batches: dict[str, list[str]] = {}
+        self.batch_tasks = set()
+        self.requests_sent = 0
         
         # Google翻译API配置
         self.google_base_url = "https://translate.googleapis.com/translate_a/single"
@@ -43,13 +225,12 @@ class TranslationService:
         
     async def __aenter__(self):
         """异步上下文管理器入口"""
-        self.session = httpx.AsyncClient(timeout=10.0)
+        self.session = get_http_client()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """异步上下文管理器出口"""
-        if self.session:
-            await self.session.aclose()
+        """异步上下文管理器出口，共享客户端由应用退出时统一关闭"""
+        self.session = None
     
     def is_chinese(self, text: str) -> bool:
         """判断文本是否为中文"""
@@ -94,7 +275,7 @@ class TranslationService:
         """使用Google翻译API进行翻译"""
         try:
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=10.0)
+                self.session = get_http_client()
             
             # 构建请求参数
             params = {
@@ -106,7 +287,7 @@ class TranslationService:
             }
             
             # 发送请求
-            response = await self.session.get(self.google_base_url, params=params)
+            response = await self.session.get(self.google_base_url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             
             # 解析响应
@@ -148,7 +329,7 @@ class TranslationService:
                 return None
                 
             if not self.session:
-                self.session = httpx.AsyncClient(timeout=10.0)
+                self.session = get_http_client()
             
             # 生成随机数和签名
             salt = str(int(time.time() * 1000))
@@ -165,7 +346,7 @@ class TranslationService:
             }
             
             # 发送请求
-            response = await self.session.get(self.baidu_base_url, params=params)
+            response = await self.session.get(self.baidu_base_url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             
             # 解析响应
@@ -175,7 +356,8 @@ class TranslationService:
                 return None
                 
             if result.get('trans_result'):
-                translated_text = result['trans_result'][0]['dst']
+                # 多行文本按行返回翻译结果
+                translated_text = '\n'.join(item['dst'] for item in result['trans_result'])
                 if translated_text and translated_text.strip():
                     return translated_text.strip()
                 else:
@@ -198,7 +380,10 @@ class TranslationService:
     async def translate_text(self, text: str, target_language: str) -> Optional[str]:
         """
         将文本翻译为指定语言
-        
+
+        先查询翻译缓存；未命中时加入该目标语言的待提交批次，与同一时间窗口内的其他标题
+        合并为一次请求。相同文本的并发请求共用同一个结果。
+
         Args:
             text: 要翻译的文本
             target_language: 目标语言代码 (zh, en)
@@ -215,12 +400,23 @@ class TranslationService:
         # 如果源语言与目标语言相同，不需要翻译
         if source_language == target_language:
             return text
-            
-        # 根据配置的翻译提供商进行翻译
-        if self.provider == "baidu":
-            translated_text = await self._translate_with_baidu(text, target_language)
-        else:  # 默认使用Google翻译
-            translated_text = await self._translate_with_google(text, target_language)
+
+        normalized_text = normalize_text(text)
+        if not normalized_text:
+            return text
+
+        key = (self.provider, normalized_text, target_language)
+        translated_text = await self.cache.get_async(key)
+        if translated_text is not None:
+            return translated_text
+
+        future = self.pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[key] = future
+            self._enqueue(normalized_text, target_language)
+        # 单个调用方被取消时不影响共用同一结果的其他调用方
+        translated_text = await asyncio.shield(future)
         
         if translated_text:
             #logger.debug(f"翻译成功 ({self.provider}): '{text}' -> '{translated_text}' ({source_language} -> {target_language})")
@@ -228,6 +424,87 @@ class TranslationService:
         else:
             logger.warning(f"翻译失败 ({self.provider}): '{text}'")
             return None
+
+    def _enqueue(self, text: str, target_language: str):
+        batch = self.batches.get(target_language)
+        if batch is not None:
+            batch.append(text)
+            return
+        self.batches[target_language] = [text]
+        task = asyncio.create_task(self._run_batch(target_language))
+        self.batch_tasks.add(task)
+        task.add_done_callback(self.batch_tasks.discard)
+
+    async def _run_batch(self, target_language: str):
+        await asyncio.sleep(BATCH_WINDOW)
+        texts = self.batches.pop(target_language, [])
+        try:
+            await asyncio.gather(*(
+                self._translate_chunk(chunk, target_language) for chunk in self._split_batch(texts)
+            ))
+        finally:
+            # 异常或取消时也要唤醒等待中的调用方
+            for text in texts:
+                future = self.pending.pop((self.provider, text, target_language), None)
+                if future is not None and not future.done():
+                    future.set_result(None)
+        if self.cache.db_path:
+            await asyncio.to_thread(self.cache.save, self.cache.take_unsaved())
+
+    @staticmethod
+    def _split_batch(texts: list[str]) -> list[list[str]]:
+        chunks = []
+        chunk = []
+        chunk_chars = 0
+        for text in texts:
+            if chunk and (len(chunk) >= BATCH_MAX_TITLES or chunk_chars + len(text) > BATCH_MAX_CHARS):
+                chunks.append(chunk)
+                chunk = []
+                chunk_chars = 0
+            chunk.append(text)
+            chunk_chars += len(text) + 1
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    async def _translate_chunk(self, texts: list[str], target_language: str):
+        try:
+            results = await self._translate_batch(texts, target_language)
+        except Exception as e:
+            logger.error(f"批量翻译请求异常 ({self.provider}): {e}")
+            results = [None] * len(texts)
+
+        for text, translated_text in zip(texts, results):
+            key = (self.provider, text, target_language)
+            if translated_text:
+                self.cache.put(key, translated_text)
+            future = self.pending.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(translated_text)
+
+    async def _translate_batch(self, texts: list[str], target_language: str) -> list[Optional[str]]:
+        """把多个标题按行合并为一次请求，返回与 texts 一一对应的翻译结果"""
+        if len(texts) == 1:
+            return [await self._request_translation(texts[0], target_language)]
+
+        translated_text = await self._request_translation("\n".join(texts), target_language)
+        if translated_text is None:
+            return [None] * len(texts)
+        lines = translated_text.split("\n")
+        if len(lines) == len(texts):
+            return [line.strip() or None for line in lines]
+
+        # 翻译结果的行数与提交的标题数不一致时无法对应，改为逐条翻译
+        logger.debug(f"批量翻译结果行数不匹配 ({len(lines)}/{len(texts)})，改为逐条翻译")
+        return list(await asyncio.gather(*(self._request_translation(text, target_language) for text in texts)))
+
+    async def _request_translation(self, text: str, target_language: str) -> Optional[str]:
+        self.requests_sent += 1
+        # 根据配置的翻译提供商进行翻译
+        if self.provider == "baidu":
+            return await self._translate_with_baidu(text, target_language)
+        # 默认使用Google翻译
+        return await self._translate_with_google(text, target_language)
     
     async def translate_to_chinese(self, text: str) -> Optional[str]:
         """
@@ -283,70 +560,89 @@ class TranslationService:
         if not live_title:
             return {}
             
-        results = {}
-        
         # 检测源语言
         source_language = self.detect_language(live_title)
-        
-        # 为每种目标语言进行翻译
-        for target_lang in target_languages:
+
+        async def translate(target_lang):
             # 如果源语言与目标语言相同，不需要翻译
             if source_language == target_lang:
-                results[target_lang] = live_title
-                continue
-                
-            # 翻译为目标语言
+                return live_title
             translated = await self.translate_text(live_title, target_lang)
-            if translated and translated != live_title:
-                results[target_lang] = translated
-            else:
-                # 翻译失败，使用原标题
-                results[target_lang] = live_title
-                
-        return results
+            # 翻译失败时使用原标题
+            return translated or live_title
+
+        # 各目标语言同时翻译
+        results = await asyncio.gather(*(translate(target_lang) for target_lang in target_languages))
+        return dict(zip(target_languages, results))
 
 
 # 全局翻译服务实例
 _translation_service = None
+# 全局翻译缓存，切换翻译提供商后继续使用
+_translation_cache = None
+_translation_cache_lock = threading.Lock()
+
+
+def get_translation_cache(config_manager=None) -> TranslationCache:
+    """获取翻译缓存实例，首次调用时打开磁盘缓存并预加载最近使用的条目"""
+    global _translation_cache
+
+    with _translation_cache_lock:
+        if _translation_cache is None:
+            _translation_cache = TranslationCache(getattr(config_manager, "translation_cache_db_path", None))
+            _translation_cache.open()
+    return _translation_cache
 
 
-async def get_translation_service(config_manager=None) -> TranslationService:
-    """获取翻译服务实例"""
+def close_translation_cache():
+    """写入尚未保存的翻译结果并关闭缓存数据库"""
+    if _translation_cache is not None:
+        _translation_cache.close()
+
+
+async def get_translation_service(config_manager=None, user_config: dict | None = None) -> TranslationService:
+    """
+    获取翻译服务实例
+
+    Args:
+        config_manager: 配置管理器，用于确定翻译缓存的存放位置
+        user_config: 当前的用户配置快照，用于获取翻译设置，不再每次读取配置文件
+    """
     global _translation_service
-    
-    if config_manager:
-        # 从配置中获取翻译设置
-        user_config = config_manager.load_user_config()
-        provider = user_config.get("translation_provider", "google")
-        baidu_app_id = user_config.get("baidu_translation_app_id", "")
-        baidu_secret_key = user_config.get("baidu_translation_secret_key", "")
-        
-        # 检查是否需要重新创建实例
-        if (_translation_service is None or 
-            _translation_service.provider != provider or
-            _translation_service.baidu_app_id != baidu_app_id or
-            _translation_service.baidu_secret_key != baidu_secret_key):
-            
-            _translation_service = TranslationService(
-                provider=provider,
-                baidu_app_id=baidu_app_id,
-                baidu_secret_key=baidu_secret_key
-            )
-    elif _translation_service is None:
-        # 默认使用Google翻译
-        _translation_service = TranslationService()
+
+    user_config = user_config or {}
+    provider = user_config.get("translation_provider", "google")
+    baidu_app_id = user_config.get("baidu_translation_app_id", "")
+    baidu_secret_key = user_config.get("baidu_translation_secret_key", "")
+
+    # 检查是否需要重新创建实例
+    if (_translation_service is None or
+        _translation_service.provider != provider or
+        _translation_service.baidu_app_id != baidu_app_id or
+        _translation_service.baidu_secret_key != baidu_secret_key):
+
+        # 首次打开磁盘缓存时在工作线程中建表和预加载
+        cache = _translation_cache or await asyncio.to_thread(get_translation_cache, config_manager)
+        _translation_service = TranslationService(
+            provider=provider,
+            baidu_app_id=baidu_app_id,
+            baidu_secret_key=baidu_secret_key,
+            cache=cache
+        )
     
     return _translation_service
 
 
-async def translate_live_title(live_title: str, app_language_code: str = 'zh_CN', config_manager=None) -> str:
+async def translate_live_title(live_title: str, app_language_code: str = 'zh_CN', config_manager=None,
+                               user_config: dict | None = None) -> str:
     """
     翻译直播标题的便捷函数（支持国际化）
     
     Args:
         live_title: 直播标题
         app_language_code: 程序语言代码
-        config_manager: 配置管理器，用于获取翻译设置
+        config_manager: 配置管理器，用于确定翻译缓存的存放位置
+        user_config: 当前的用户配置快照，用于获取翻译设置
         
     Returns:
         翻译后的标题
@@ -356,7 +652,7 @@ async def translate_live_title(live_title: str, app_language_code: str = 'zh_CN'
         
     try:
         # 获取翻译服务实例
-        service = await get_translation_service(config_manager)
+        service = await get_translation_service(config_manager, user_config)
         result = await service.translate_live_title(live_title, app_language_code)
         return result if result else live_title
     except Exception as e:
@@ -364,14 +660,16 @@ async def translate_live_title(live_title: str, app_language_code: str = 'zh_CN'
         return live_title
 
 
-async def translate_live_title_to_multiple_languages(live_title: str, target_languages: list, config_manager=None) -> dict:
+async def translate_live_title_to_multiple_languages(live_title: str, target_languages: list, config_manager=None,
+                                                     user_config: dict | None = None) -> dict:
     """
     将直播标题翻译为多种语言的便捷函数
     
     Args:
         live_title: 直播标题
         target_languages: 目标语言列表，如 ['zh', 'en']
-        config_manager: 配置管理器，用于获取翻译设置
+        config_manager: 配置管理器，用于确定翻译缓存的存放位置
+        user_config: 当前的用户配置快照，用于获取翻译设置
         
     Returns:
         dict: 语言代码到翻译结果的映射
@@ -381,7 +679,7 @@ async def translate_live_title_to_multiple_languages(live_title: str, target_lan
         
     try:
         # 获取翻译服务实例
-        service = await get_translation_service(config_manager)
+        service = await get_translation_service(config_manager, user_config)
         result = await service.translate_live_title_to_multiple_languages(live_title, target_languages)
         return result
     except Exception as e:
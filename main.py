@@ -1,24 +1,27 @@
 import argparse
+import asyncio
 import multiprocessing
 import os
 import sys
 import platform as sys_platform
+from typing import TYPE_CHECKING
 
-import flet as ft
 from dotenv import load_dotenv
-from screeninfo import get_monitors
 
-from app.app_manager import App, execute_dir
-from app.auth.auth_manager import AuthManager
-from app.lifecycle.app_close_handler import handle_app_close
-from app.ui.components.save_progress_overlay import SaveProgressOverlay
-from app.ui.views.login_view import LoginPage
+from app import execute_dir
 from app.utils.logger import logger
 from app.utils.window_constants import (
     DEFAULT_WIDTH, DEFAULT_HEIGHT, MIN_WIDTH, MIN_HEIGHT,
     SCALE_2K, SCALE_4K, WINDOW_MARGIN
 )
 
+# 界面相关模块只在桌面和Web模式下导入，无界面模式及其工作进程不加载flet
+if TYPE_CHECKING:
+    import flet as ft
+
+    from app.app_manager import App
+    from app.ui.components.save_progress_overlay import SaveProgressOverlay
+
 # 服务器配置常量
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 6006
@@ -45,7 +48,9 @@ def get_scale_factor():
     return 1.0
 
 
-def setup_window(page: ft.Page, is_web: bool, user_config: dict = None) -> None:
+def setup_window(page: "ft.Page", is_web: bool, user_config: dict = None) -> None:
+    from screeninfo import get_monitors
+
     try:
         page.window.icon = os.path.join(execute_dir, ASSETS_DIR, "icon.ico")
         page.window.to_front()
@@ -136,10 +141,12 @@ def get_route_handler() -> dict[str, str]:
     }
 
 
-def handle_route_change(page: ft.Page, app: App) -> callable:
+def handle_route_change(page: "ft.Page", app: "App") -> callable:
+    import flet as ft
+
     route_map = get_route_handler()
 
-    def route_change(e: ft.RouteChangeEvent) -> None:
+    def route_change(e: "ft.RouteChangeEvent") -> None:
         logger.debug(f"路由变更事件: {e.route}")
         tr = ft.TemplateRoute(e.route)
         page_name = route_map.get(tr.route)
@@ -170,28 +177,29 @@ def handle_route_change(page: ft.Page, app: App) -> callable:
     return route_change
 
 
-def handle_window_event(page: ft.Page, app: App, save_progress_overlay: 'SaveProgressOverlay') -> callable:
+def handle_window_event(page: "ft.Page", app: "App", save_progress_overlay: "SaveProgressOverlay") -> callable:
+    from app.lifecycle.app_close_handler import handle_app_close
 
-    async def on_window_event(e: ft.ControlEvent) -> None:
+    async def on_window_event(e: "ft.ControlEvent") -> None:
         if e.data == "close":
             await handle_app_close(page, app, save_progress_overlay)
 
     return on_window_event
 
 
-def handle_disconnect(page: ft.Page) -> callable:
+def handle_disconnect(page: "ft.Page") -> callable:
     """Handle disconnection for web mode."""
 
-    def disconnect(_: ft.ControlEvent) -> None:
+    def disconnect(_: "ft.ControlEvent") -> None:
         page.pubsub.unsubscribe_all()
 
     return disconnect
 
 
-def handle_window_resize(page: ft.Page, app: App) -> callable:
+def handle_window_resize(page: "ft.Page", app: "App") -> callable:
     """处理窗口大小调整事件，更新窗口大小到用户配置但不保存"""
     
-    def on_window_resize(e: ft.ControlEvent) -> None:
+    def on_window_resize(e: "ft.ControlEvent") -> None:
         # 获取当前窗口大小
         width = page.window.width
         height = page.window.height
@@ -213,7 +221,14 @@ def handle_window_resize(page: ft.Page, app: App) -> callable:
     return on_window_resize
 
 
-async def main(page: ft.Page) -> None:
+async def main(page: "ft.Page") -> None:
+    import flet as ft
+
+    from app.app_manager import App
+    from app.auth.auth_manager import AuthManager
+    from app.ui.components.save_progress_overlay import SaveProgressOverlay
+    from app.ui.views.login_view import LoginPage
+
     # 使用模块级变量
     global _args, _platform
     
@@ -302,7 +317,7 @@ async def main(page: ft.Page) -> None:
         logger.error(f"应用初始化过程中发生错误: {e}")
 
 
-def create_app(page: ft.Page) -> App:
+def create_app(page: "ft.Page") -> "App":
     """创建并返回一个App实例，用于测试或单独使用
     
     Args:
@@ -311,6 +326,11 @@ def create_app(page: ft.Page) -> App:
     Returns:
         App: 应用实例
     """
+    import flet as ft
+
+    from app.app_manager import App
+    from app.ui.components.save_progress_overlay import SaveProgressOverlay
+
     try:
         app = App(page)
         app.is_web_mode = False
@@ -358,6 +378,15 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Run the Flet app with optional web mode.")
     parser.add_argument("--web", action="store_true", help="Run the app in web mode")
+    parser.add_argument(
+        "--headless", action="store_true", help="Run only the recording engine without any UI (for servers)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WORKERS", 1)),
+        help="Number of recording worker processes in headless mode (default: 1)",
+    )
     parser.add_argument("--host", type=str, default=default_host, help=f"Host address (default: {default_host})")
     parser.add_argument("--port", type=int, default=default_port, help=f"Port number (default: {default_port})")
     args = parser.parse_args()
@@ -367,7 +396,22 @@ if __name__ == "__main__":
     _platform = platform
 
     multiprocessing.freeze_support()
-    if args.web or platform == "web":
+    if args.headless or platform == "headless":
+        logger.debug("Running in headless mode")
+        try:
+            if args.workers > 1:
+                from app.sharding import run_sharded
+
+                asyncio.run(run_sharded(args.workers))
+            else:
+                from app.headless import run_headless
+
+                asyncio.run(run_headless())
+        except KeyboardInterrupt:
+            pass
+    elif args.web or platform == "web":
+        import flet as ft
+
         logger.debug("Running in web mode on http://" + args.host + ":" + str(args.port))
         ft.app(
             target=main,
@@ -378,4 +422,6 @@ if __name__ == "__main__":
             use_color_emoji=True,
         )
     else:
+        import flet as ft
+
         ft.app(target=main, assets_dir=ASSETS_DIR)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""
+StreamCap HLS录制基准测试脚本
+在本地启动一个模拟直播的HLS服务器，同时录制多个直播间，
+对比原生HLS录制器与每个直播间一个ffmpeg进程时的内存（RSS）和CPU占用
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+
+import psutil
+
+# 确保能够导入StreamCap的模块
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from app.core.ffmpeg_builders import create_builder
+from app.core.hls_recorder import HlsRecorder
+from app.utils.http_client import create_http_client
+
+# 播放列表中保留的分片数
+WINDOW_SEGMENTS = 5
+
+
+def create_segment(segment_duration, bitrate_kbps):
+    """生成一个分片的内容，有ffmpeg时生成真实的测试视频，否则使用空的TS包"""
+    if shutil.which("ffmpeg"):
+        result = subprocess.run(
+            [
+                "ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc2=size=1280x720:rate=25",
+                "-f", "lavfi", "-i", "sine=frequency=440", "-t", str(segment_duration),
+                "-c:v", "libx264", "-preset", "ultrafast", "-b:v", f"{bitrate_kbps}k", "-c:a", "aac",
+                "-f", "mpegts", "pipe:1",
+            ],
+            capture_output=True,
+        )
+        if result.returncode == 0 and result.stdout:
+            return result.stdout
+    null_packet = b"\x47\x1f\xff\x10" + b"\xff" * 184
+    return null_packet * (bitrate_kbps * 1000 // 8 * segment_duration // len(null_packet))
+
+
+def run_server(port, segment_duration, segment, ready):
+    """模拟直播的HLS服务器，所有直播间按当前时间滑动播放列表"""
+    start_time = time.time()
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                path = request.split(b" ", 2)[1].decode()
+                if path.endswith(".m3u8"):
+                    current = int((time.time() - start_time) / segment_duration)
+                    first = max(0, current - WINDOW_SEGMENTS + 1)
+                    lines = ["#EXTM3U", f"#EXT-X-TARGETDURATION:{segment_duration}", f"#EXT-X-MEDIA-SEQUENCE:{first}"]
+                    for sequence in range(first, current + 1):
+                        lines += [f"#EXTINF:{segment_duration}.0,", f"seg{sequence}.ts"]
+                    body = "\n".join(lines).encode()
+                    content_type = b"application/vnd.apple.mpegurl"
+                else:
+                    body = segment
+                    content_type = b"video/mp2t"
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: " + content_type
+                    + b"\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", port, backlog=1024)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def sample(processes):
+    """返回一组进程的总RSS（字节）和总CPU时间（秒）"""
+    rss = 0
+    cpu = 0.0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+            times = process.cpu_times()
+            cpu += times.user + times.system
+        except psutil.NoSuchProcess:
+            pass
+    return rss, cpu
+
+
+async def bench_native(urls, output_dir, duration):
+    current = psutil.Process()
+    rss_before, cpu_before = sample([current])
+    client = create_http_client()
+    recorders = [
+        HlsRecorder(url, os.path.join(output_dir, f"native_{index}.ts"), client=client)
+        for index, url in enumerate(urls)
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*(recorder.start() for recorder in recorders))
+    peak_rss = 0
+    while time.perf_counter() - start < duration:
+        await asyncio.sleep(1)
+        peak_rss = max(peak_rss, sample([current])[0])
+    for recorder in recorders:
+        recorder.terminate()
+    await asyncio.gather(*(recorder.wait() for recorder in recorders))
+    elapsed = time.perf_counter() - start
+    cpu = sample([current])[1] - cpu_before
+    await client.aclose()
+    written = sum(recorder.bytes_written for recorder in recorders)
+    return peak_rss - rss_before, cpu / elapsed * 100, written
+
+
+def bench_ffmpeg(urls, output_dir, duration):
+    processes = []
+    for index, url in enumerate(urls):
+        command = create_builder("ts", record_url=url, full_path=os.path.join(output_dir, f"ffmpeg_{index}.ts"))
+        processes.append(subprocess.Popen(
+            command.build_command(), stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ))
+    watched = [psutil.Process(process.pid) for process in processes]
+    start = time.perf_counter()
+    peak_rss = 0
+    while time.perf_counter() - start < duration:
+        time.sleep(1)
+        peak_rss = max(peak_rss, sample(watched)[0])
+    elapsed = time.perf_counter() - start
+    cpu = sample(watched)[1]
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    written = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir)
+                  if name.startswith("ffmpeg_"))
+    return peak_rss, cpu / elapsed * 100, written
+
+
+def print_result(name, count, result):
+    rss, cpu, written = result
+    print(f"  {name}:")
+    print(f"    内存: 共 {rss / 1024 / 1024:8.1f} MB，每个直播间 {rss / count / 1024 / 1024:6.2f} MB")
+    print(f"    CPU:  {cpu:6.1f}%")
+    print(f"    写入: {written / 1024 / 1024:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StreamCap HLS录制基准测试")
+    parser.add_argument("--rooms", type=int, default=100, help="同时录制的直播间数量")
+    parser.add_argument("--duration", type=int, default=30, help="每种方式录制的时长（秒）")
+    parser.add_argument("--segment-duration", type=int, default=2, help="分片时长（秒）")
+    parser.add_argument("--bitrate", type=int, default=2000, help="模拟直播流的码率（kbps）")
+    parser.add_argument("--port", type=int, default=18080, help="本地HLS服务器端口")
+    parser.add_argument("--skip-ffmpeg", action="store_true", help="只测试原生录制")
+    args = parser.parse_args()
+
+    segment = create_segment(args.segment_duration, args.bitrate)
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=run_server, args=(args.port, args.segment_duration, segment, ready), daemon=True
+    )
+    server.start()
+    ready.wait(10)
+
+    urls = [f"http://127.0.0.1:{args.port}/live/{index}/index.m3u8" for index in range(args.rooms)]
+    print(f"\n同时录制 {args.rooms} 个直播间 {args.duration} 秒，分片 {args.segment_duration} 秒，"
+          f"分片大小 {len(segment) / 1024:.0f} KB")
+    output_dir = tempfile.mkdtemp(prefix="streamcap_hls_bench_")
+    try:
+        print_result("原生HLS录制（单进程）", args.rooms, asyncio.run(bench_native(urls, output_dir, args.duration)))
+        if not args.skip_ffmpeg:
+            if shutil.which("ffmpeg"):
+                print_result("每个直播间一个ffmpeg进程", args.rooms, bench_ffmpeg(urls, output_dir, args.duration))
+            else:
+                print("  未找到ffmpeg，跳过ffmpeg录制对比")
+    finally:
+        server.terminate()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+StreamCap HTTP客户端基准测试脚本
+在本地启动一个模拟的HTTPS服务器，对比每次请求新建客户端与共享连接池客户端的单次请求延迟
+"""
+
+import os
+import sys
+import ssl
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 确保能够导入StreamCap的模块
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+import httpx
+from app.utils.http_client import HTTP2_AVAILABLE, create_http_client
+
+
+class BenchmarkHandler(BaseHTTPRequestHandler):
+    """返回固定JSON内容，模拟推送或平台接口"""
+
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分两次写入，关闭Nagle算法避免延迟确认带来的固定等待
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = b'{"code": 0, "data": {"live_status": 1}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def generate_certificate(cert_dir):
+    """使用openssl生成自签名证书"""
+    cert_file = os.path.join(cert_dir, "cert.pem")
+    key_file = os.path.join(cert_dir, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key_file, "-out", cert_file, "-days", "1",
+            "-subj", "/CN=localhost", "-addext", "subjectAltName=IP:127.0.0.1,DNS:localhost",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert_file, key_file
+
+
+def start_tls_server(cert_file, key_file):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BenchmarkHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_file, key_file)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"https://127.0.0.1:{server.server_address[1]}/"
+
+
+def summarize(name, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(
+        f"{name:<16} 平均: {statistics.mean(latencies) * 1000:7.2f} ms  "
+        f"中位数: {statistics.median(latencies) * 1000:7.2f} ms  P95: {p95 * 1000:7.2f} ms"
+    )
+    return statistics.mean(latencies)
+
+
+async def bench_new_client(url, verify, requests):
+    """原有方式：每次请求都新建并关闭客户端"""
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=10.0, verify=verify) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def bench_shared_client(url, verify, requests):
+    """共享客户端：连接在请求之间保持复用"""
+    latencies = []
+    client = create_http_client(verify=verify)
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(url)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await client.aclose()
+    return latencies
+
+
+async def run_benchmark(requests):
+    with tempfile.TemporaryDirectory() as cert_dir:
+        cert_file, key_file = generate_certificate(cert_dir)
+        server, url = start_tls_server(cert_file, key_file)
+        verify = ssl.create_default_context(cafile=cert_file)
+        try:
+            print(f"本地TLS服务器: {url}  请求次数: {requests}  HTTP/2可用: {HTTP2_AVAILABLE}")
+            new_avg = summarize("每次新建客户端", await bench_new_client(url, verify, requests))
+            shared_avg = summarize("共享客户端", await bench_shared_client(url, verify, requests))
+            print(f"单次请求平均延迟降低: {(1 - shared_avg / new_avg) * 100:.1f}%")
+        finally:
+            server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StreamCap HTTP客户端基准测试")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="每种方式的请求次数")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+StreamCap 日志路由基准测试脚本
+模拟大量直播间检测循环产生的日志，对比逐条正则匹配过滤器与按分类路由过滤器的日志吞吐量
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+
+# 确保能够导入StreamCap的模块
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from loguru import logger
+from app.utils.log_routing import (
+    MEMORY_CLEANUP_PATTERNS,
+    MEMORY_LOG_CATEGORY,
+    is_memory_cleanup_log,
+    not_memory_cleanup_log,
+)
+
+LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}"
+
+
+def legacy_is_memory_cleanup_log(record):
+    """原有实现：每条日志依次对所有未编译的模式执行 re.search"""
+    message = record["message"]
+    return any(re.search(pattern, message) for pattern in MEMORY_CLEANUP_PATTERNS)
+
+
+def legacy_not_memory_cleanup_log(record):
+    return not legacy_is_memory_cleanup_log(record)
+
+
+def setup_sinks(log_dir, memory_filter, general_filter):
+    """按应用中的配置添加内存清理日志和常规日志两个文件输出"""
+    logger.remove()
+    logger.add(os.path.join(log_dir, "memory_clean.log"), level="DEBUG", format=LOG_FORMAT,
+               filter=memory_filter, encoding="utf-8")
+    logger.add(os.path.join(log_dir, "streamget.log"), level="DEBUG", format=LOG_FORMAT,
+               filter=lambda i: i["level"].name != "STREAM" and general_filter(i), encoding="utf-8")
+
+
+def run_check_loop(rooms, rounds, tagged):
+    """每轮检测为每个直播间输出若干条常规日志，并附带少量内存统计日志"""
+    memory_log = logger.bind(category=MEMORY_LOG_CATEGORY) if tagged else logger
+    count = 0
+    for round_index in range(rounds):
+        for room in range(rooms):
+            logger.debug(f"开始检测直播间: https://live.douyin.com/{room}")
+            logger.info(f"直播间 主播{room} 状态: {'直播中' if room % 7 == 0 else '未开播'}")
+            logger.debug(f"下次检测时间: {300 + room % 60}秒后")
+            count += 3
+            if room % 100 == 0:
+                memory_log.info(f"当前活跃进程数: {room // 100}/{rooms // 100}")
+                count += 1
+        memory_log.info(f"系统统计 - 录制任务数: {rooms}, 第{round_index + 1}轮检测完成")
+        count += 1
+    return count
+
+
+def measure(log_dir, memory_filter, general_filter, rooms, rounds, tagged):
+    setup_sinks(log_dir, memory_filter, general_filter)
+    start = time.perf_counter()
+    count = run_check_loop(rooms, rounds, tagged)
+    elapsed = time.perf_counter() - start
+    logger.remove()
+    return count, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StreamCap 日志路由基准测试")
+    parser.add_argument("-r", "--rooms", type=int, default=1000, help="模拟的直播间数量")
+    parser.add_argument("-n", "--rounds", type=int, default=5, help="检测循环轮数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        legacy_count, legacy_time = measure(
+            log_dir, legacy_is_memory_cleanup_log, legacy_not_memory_cleanup_log, args.rooms, args.rounds, False
+        )
+        routed_count, routed_time = measure(
+            log_dir, is_memory_cleanup_log, not_memory_cleanup_log, args.rooms, args.rounds, True
+        )
+        untagged_count, untagged_time = measure(
+            log_dir, is_memory_cleanup_log, not_memory_cleanup_log, args.rooms, args.rounds, False
+        )
+
+    print(f"直播间数: {args.rooms}  检测轮数: {args.rounds}  匹配模式数: {len(MEMORY_CLEANUP_PATTERNS)}")
+    for name, count, elapsed in (
+        ("逐条正则匹配（原实现）", legacy_count, legacy_time),
+        ("分类路由", routed_count, routed_time),
+        ("分类路由（未标记日志）", untagged_count, untagged_time),
+    ):
+        print(f"{name:<14} 日志数: {count}  耗时: {elapsed * 1000:8.1f} ms  吞吐量: {count / elapsed:9.0f} 条/秒")
+    print(f"吞吐量提升: {legacy_time / routed_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+StreamCap 平台解析基准测试脚本
+对比逐条子串/正则扫描与预编译解析器在大量URL上的耗时，并校验两者结果一致
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+# 确保能够导入StreamCap的模块
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from app.core.platform_handlers import (
+    PLATFORM_RULES,
+    PlatformHandler,
+    _resolve_platform,
+    get_recording_platform_info,
+    resolve_platform,
+)
+from app.models.recording_model import Recording
+
+# 各平台的示例直播间地址，%d 处替换为随机房间号
+URL_TEMPLATES = [
+    "https://live.douyin.com/%d",
+    "https://www.tiktok.com/@user%d/live",
+    "https://live.kuaishou.com/u/user%d",
+    "https://www.huya.com/%d",
+    "https://www.douyu.com/%d",
+    "https://live.bilibili.com/%d",
+    "https://www.twitch.tv/streamer%d",
+    "https://www.youtube.com/watch?v=abc%d",
+    "https://play.sooplive.co.kr/user%d",
+    "https://cc.163.com/%d/",
+    "https://chzzk.naver.com/live/%d",
+    "https://twitcasting.tv/user%d",
+    "https://v.6.cn/%d",
+    "https://example.com/live/%d.m3u8",
+    "https://unknown-site.example/room/%d",
+]
+
+
+def legacy_get_platform_info(record_url):
+    """原有实现：每次构建映射并逐个做子串匹配"""
+    platform_map = {rule[0]: (rule[1], rule[2]) for rule in PLATFORM_RULES}
+    for key, value in platform_map.items():
+        if key in record_url:
+            return value[0], value[1]
+    return None, None
+
+
+def legacy_get_handler_class(live_url):
+    """原有实现：逐个注册模式执行 re.search"""
+    for pattern, handler_class in PlatformHandler.get_registered_patterns().items():
+        if re.search(pattern, live_url):
+            return handler_class
+    return None
+
+
+def generate_urls(count):
+    rng = random.Random(42)
+    return [rng.choice(URL_TEMPLATES) % rng.randint(1, 10_000_000) for _ in range(count)]
+
+
+def create_recording(index, url):
+    return Recording(
+        f"rec_{index}", url, f"主播{index}", "OD", False, True, 1800,
+        False, None, None, None, False,
+    )
+
+
+def timed(func, urls):
+    start = time.perf_counter()
+    results = [func(url) for url in urls]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StreamCap 平台解析基准测试")
+    parser.add_argument("-n", "--count", type=int, default=10000, help="测试URL数量")
+    args = parser.parse_args()
+
+    urls = generate_urls(args.count)
+
+    legacy_time, legacy_results = timed(
+        lambda url: (*legacy_get_platform_info(url), legacy_get_handler_class(url)), urls
+    )
+
+    # 绕过URL缓存，单独衡量合并表达式本身的开销
+    registry_version = PlatformHandler.get_registry_version()
+    compiled_time, compiled_results = timed(
+        lambda url: _resolve_platform.__wrapped__(url, registry_version), urls
+    )
+
+    _resolve_platform.cache_clear()
+    cold_time, cold_results = timed(resolve_platform, urls)
+    warm_time, _ = timed(resolve_platform, urls)
+
+    recordings = [create_recording(index, url) for index, url in enumerate(urls)]
+    for recording in recordings:
+        get_recording_platform_info(recording)
+    start = time.perf_counter()
+    for recording in recordings:
+        get_recording_platform_info(recording)
+    memo_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b, c in zip(legacy_results, compiled_results, cold_results) if not (a == b == c))
+
+    print(f"URL数量: {len(urls)}  注册模式数: {len(PlatformHandler.get_registered_patterns())}  "
+          f"平台规则数: {len(PLATFORM_RULES)}")
+    print(f"逐条扫描（原实现）:     {legacy_time * 1000:8.2f} ms")
+    print(f"预编译解析（无缓存）:   {compiled_time * 1000:8.2f} ms")
+    print(f"resolve_platform 首次:  {cold_time * 1000:8.2f} ms")
+    print(f"resolve_platform 缓存:  {warm_time * 1000:8.2f} ms")
+    print(f"录制项缓存（筛选时）:   {memo_time * 1000:8.2f} ms")
+    print(f"结果不一致数: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
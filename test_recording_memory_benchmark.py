@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+StreamCap 录制项内存基准测试脚本
+统计大量直播间时每个录制项占用的内存，对比原有的 __dict__ 存储方式与 __slots__ 存储方式，
+并对比每次保存都重新生成全部字典与只重新生成已修改录制项的耗时
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import tracemalloc
+
+# 确保能够导入StreamCap的模块
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from app.models.recording_model import PERSISTED_FIELDS, RUNTIME_FIELDS, Recording
+
+
+class LegacyRecording:
+    """原有实现：所有字段都保存在实例的 __dict__ 中"""
+
+    def __init__(self, recording):
+        for name in sorted(PERSISTED_FIELDS | RUNTIME_FIELDS):
+            setattr(self, name, getattr(recording, name))
+
+
+def create_recording(index):
+    return Recording(
+        f"rec_{index:06d}", f"https://live.bilibili.com/{100000 + index}", f"主播{index}", "OD", False, True,
+        "1800", False, None, None, None, False,
+    )
+
+
+def create_saved_recording(index):
+    """创建录制项并生成一次保存用的字典，统计时包含增量保存需要保留的状态"""
+    recording = create_recording(index)
+    recording.snapshot()
+    return recording
+
+
+def measure(factory, count):
+    """返回创建 count 个对象后新增的内存（字节）"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objects, after - before
+
+
+def run_memory(count):
+    # 先创建参照用的录制项，再只统计目标对象本身的分配
+    templates = [create_recording(i) for i in range(count)]
+    _, slotted = measure(create_saved_recording, count)
+    _, legacy = measure(lambda i: LegacyRecording(templates[i]), count)
+    # LegacyRecording 复用了参照录制项的字段值，只包含对象和 __dict__ 本身，需要加上字段值的占用
+    values = slotted - sys.getsizeof(templates[0]) * count
+
+    print(f"\n录制项数量: {count}")
+    print(f"  __slots__ 存储:  {slotted / count:8.1f} 字节/个  共 {slotted / 1024 / 1024:7.2f} MB")
+    print(f"  __dict__ 存储:   {(legacy + values) / count:8.1f} 字节/个  共 {(legacy + values) / 1024 / 1024:7.2f} MB")
+    legacy_object = LegacyRecording(templates[0])
+    legacy_size = sys.getsizeof(legacy_object) + sys.getsizeof(legacy_object.__dict__)
+    print(f"  单个对象本身: __slots__ {sys.getsizeof(templates[0])} 字节, __dict__ {legacy_size} 字节")
+    return templates
+
+
+def run_persist(recordings, changed_ratio):
+    for recording in recordings:
+        recording.snapshot()
+    changed = max(1, int(len(recordings) * changed_ratio))
+    for recording in recordings[:changed]:
+        recording.status_info = "recording"
+        recording.live_title = f"新标题 {time.time()}"
+
+    start = time.perf_counter()
+    full = [json.dumps(recording.to_dict(), ensure_ascii=False) for recording in recordings]
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    incremental = []
+    for recording in recordings:
+        data, is_changed = recording.snapshot()
+        if is_changed:
+            incremental.append(json.dumps(data, ensure_ascii=False))
+    incremental_time = time.perf_counter() - start
+
+    print(f"  保存 {len(recordings)} 个录制项（{changed} 个修改）:")
+    print(f"    全部重新生成并序列化: {full_time * 1000:8.2f} ms ({len(full)} 个)")
+    print(f"    只处理已修改的录制项: {incremental_time * 1000:8.2f} ms ({len(incremental)} 个)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StreamCap 录制项内存基准测试")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10000, 50000], help="录制项数量")
+    parser.add_argument("--changed-ratio", type=float, default=0.01, help="每次保存时已修改录制项的比例")
+    args = parser.parse_args()
+
+    for count in args.counts:
+        recordings = run_memory(count)
+        run_persist(recordings, args.changed_ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+StreamCap 视频接口负载测试脚本
+在临时目录生成一组录制文件并启动视频接口服务，模拟多个播放器并发拖动进度条（随机Range请求），
+统计请求延迟、吞吐量、热点缓存命中率以及服务进程的内存占用，并校验返回内容
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+import statistics
+
+# 确保能够导入StreamCap的模块
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+import httpx
+import psutil
+
+# 校验响应内容时截取的循环数据，覆盖最大2MB的区间
+PATTERN = bytes(range(256)) * 8192
+
+def create_file_set(video_dir, file_count, file_size_mb):
+    """生成测试文件，内容由文件序号和偏移量决定，便于校验"""
+    files = []
+    block = bytes(range(256)) * 4096
+    for index in range(file_count):
+        name = f"room_{index}.{('ts', 'flv', 'mp4', 'mkv')[index % 4]}"
+        path = os.path.join(video_dir, name)
+        with open(path, "wb") as file:
+            file.writelines(block for _ in range(file_size_mb))
+        files.append((name, file_size_mb * len(block)))
+    return files
+
+
+def expected_bytes(start, end):
+    """文件内容按256字节循环，直接从预先生成的循环数据中截取"""
+    offset = start % 256
+    return PATTERN[offset:offset + end - start + 1]
+
+
+def start_server(port):
+    import uvicorn
+    from app.api import video_stream_service
+
+    config = uvicorn.Config(video_stream_service.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, video_stream_service
+
+
+async def seeker(client, base_url, files, seeks, range_size, latencies, errors, rng):
+    """模拟一个播放器：随机选择文件并在随机位置请求一段数据，偶尔请求文件头尾"""
+    for _ in range(seeks):
+        name, size = rng.choice(files)
+        choice = rng.random()
+        if choice < 0.2:
+            start, end, header = 0, range_size - 1, f"bytes=0-{range_size - 1}"
+        elif choice < 0.3:
+            start, end, header = size - range_size, size - 1, f"bytes=-{range_size}"
+        else:
+            start = rng.randrange(0, size - range_size)
+            end = start + range_size - 1
+            header = f"bytes={start}-{end}"
+
+        begin = time.perf_counter()
+        try:
+            response = await client.get(base_url, params={"filename": name}, headers={"Range": header})
+            if response.status_code != 206 or response.content != expected_bytes(start, end):
+                errors.append(f"{name} {header}: {response.status_code}")
+        except httpx.HTTPError as e:
+            errors.append(f"{name} {header}: {e}")
+        latencies.append(time.perf_counter() - begin)
+
+
+async def run_load(port, files, clients, seeks, range_size, seed):
+    base_url = f"http://127.0.0.1:{port}/api/videos"
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            seeker(client, base_url, files, seeks, range_size, latencies, errors, random.Random(seed + index))
+            for index in range(clients)
+        ))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StreamCap 视频接口负载测试")
+    parser.add_argument("-f", "--files", type=int, default=8, help="测试文件数量")
+    parser.add_argument("-s", "--size", type=int, default=64, help="每个文件大小（MB）")
+    parser.add_argument("-c", "--clients", type=int, default=50, help="并发播放器数量")
+    parser.add_argument("-n", "--seeks", type=int, default=40, help="每个播放器的拖动次数")
+    parser.add_argument("-r", "--range-kb", type=int, default=512, help="每次请求的数据量（KB，不超过2047）")
+    parser.add_argument("-p", "--port", type=int, default=16007, help="测试服务端口")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as video_dir:
+        # 视频接口在导入时读取目录配置
+        os.environ["CUSTOM_VIDEO_ROOT_DIR"] = video_dir
+        files = create_file_set(video_dir, args.files, args.size)
+        server, thread, service = start_server(args.port)
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        try:
+            latencies, errors, elapsed = asyncio.run(
+                run_load(args.port, files, args.clients, args.seeks, args.range_kb * 1024, args.seed)
+            )
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+        rss_after = process.memory_info().rss
+
+    latencies.sort()
+    total = len(latencies)
+    transferred = total * args.range_kb / 1024
+    cache_stats = service.HOT_BLOCK_CACHE.get_stats()
+    print(f"文件: {args.files} x {args.size}MB  并发: {args.clients}  请求数: {total}  每次: {args.range_kb}KB")
+    print(f"总耗时: {elapsed:.2f} s  请求速率: {total / elapsed:.1f} 次/秒  吞吐量: {transferred / elapsed:.1f} MB/s")
+    print(
+        f"延迟 平均: {statistics.mean(latencies) * 1000:.1f} ms  中位数: {statistics.median(latencies) * 1000:.1f} ms  "
+        f"P95: {latencies[max(0, int(total * 0.95) - 1)] * 1000:.1f} ms  最大: {latencies[-1] * 1000:.1f} ms"
+    )
+    print(
+        f"热点缓存: {cache_stats['bytes'] / 1024 / 1024:.1f}/{cache_stats['max_bytes'] / 1024 / 1024:.0f} MB  "
+        f"命中率: {cache_stats['hit_rate'] * 100:.1f}%  淘汰: {cache_stats['evictions']}"
+    )
+    print(f"进程内存增长: {(rss_after - rss_before) / 1024 / 1024:.1f} MB")
+    print(f"错误数: {len(errors)}")
+    for error in errors[:10]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
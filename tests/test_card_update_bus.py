@@ -0,0 +1,122 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.ui.components.card_update_bus import CardUpdateBus
+
+
+class FakeCardManager:
+    def __init__(self, mounted):
+        self.cards_obj = {rec_id: {} for rec_id in mounted}
+        self.updated = []
+
+    async def update_card(self, recording, push_update=True):
+        assert not push_update
+        self.updated.append(recording.rec_id)
+
+
+def create_bus(mounted, max_flushes_per_second=4):
+    tasks = []
+    sent = []
+    counters = {"page_update": 0, "apply_filter": 0}
+
+    async def apply_filter():
+        counters["apply_filter"] += 1
+
+    def page_update():
+        counters["page_update"] += 1
+
+    page = SimpleNamespace(
+        run_task=lambda func, *args: tasks.append(asyncio.ensure_future(func(*args))),
+        update=page_update,
+        pubsub=SimpleNamespace(send_others_on_topic=lambda topic, recording: sent.append(recording.rec_id)),
+    )
+    app = SimpleNamespace(
+        page=page,
+        record_card_manager=FakeCardManager(mounted),
+        current_page=SimpleNamespace(apply_filter=apply_filter),
+        settings=SimpleNamespace(user_config={}),
+    )
+    return CardUpdateBus(app, max_flushes_per_second), app, tasks, sent, counters
+
+
+async def drain(tasks):
+    while not all(task.done() for task in tasks):
+        await asyncio.gather(*tasks)
+
+
+async def test_changes_to_one_card_are_coalesced():
+    bus, app, tasks, sent, counters = create_bus(["room"])
+    room = SimpleNamespace(rec_id="room")
+    for _ in range(10):
+        bus.mark_dirty(room, refilter=True, broadcast=True)
+    assert len(tasks) == 1
+
+    await drain(tasks)
+    assert app.record_card_manager.updated == ["room"]
+    assert sent == ["room"]
+    assert counters == {"page_update": 1, "apply_filter": 1}
+    stats = bus.get_stats()
+    assert stats["requested"] == 10
+    assert stats["coalesced"] == 9
+    assert stats["sent"] == 1
+    assert stats["flushes"] == 1
+    assert stats["pending"] == 0
+
+
+async def test_off_page_cards_are_skipped_but_still_broadcast():
+    bus, app, tasks, sent, counters = create_bus(["room0", "room1"])
+    for i in range(100):
+        bus.mark_dirty(SimpleNamespace(rec_id=f"room{i}"), broadcast=i % 2 == 0)
+
+    await drain(tasks)
+    assert app.record_card_manager.updated == ["room0", "room1"]
+    assert len(sent) == 50
+    assert counters == {"page_update": 1, "apply_filter": 0}
+    assert bus.get_stats()["skipped"] == 98
+
+    # 没有挂载的卡片变化时不执行 page.update
+    bus.mark_dirty(SimpleNamespace(rec_id="room50"))
+    await drain(tasks)
+    assert counters["page_update"] == 1
+
+
+async def test_flush_rate_is_limited():
+    bus, app, tasks, _, counters = create_bus(["room"], max_flushes_per_second=20)
+    room = SimpleNamespace(rec_id="room")
+    flush_times = []
+    flush = bus.flush
+
+    async def timed_flush():
+        flush_times.append(time.monotonic())
+        await flush()
+        # 刷新过程中到达的变化留到下一个周期
+        if len(flush_times) == 1:
+            bus.mark_dirty(room)
+
+    bus.flush = timed_flush
+    bus.mark_dirty(room)
+    await drain(tasks)
+    assert len(flush_times) == 2
+    assert flush_times[1] - flush_times[0] >= 0.05 - 0.005
+    assert counters["page_update"] == 2
+
+
+async def test_unchanged_recordings_are_not_redrawn():
+    bus, app, tasks, _, counters = create_bus(["room"])
+    room = SimpleNamespace(rec_id="room", revision=1)
+    app.record_card_manager.cards_obj["room"]["revision"] = 1
+
+    bus.mark_dirty(room)
+    await drain(tasks)
+    assert app.record_card_manager.updated == []
+    assert counters["page_update"] == 0
+    assert bus.get_stats()["unchanged"] == 1
+
+    # 设置变化等需要强制刷新的情况
+    bus.mark_dirty(room, force=True)
+    await drain(tasks)
+    room.revision = 2
+    bus.mark_dirty(room)
+    await drain(tasks)
+    assert app.record_card_manager.updated == ["room", "room"]
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+from app.models.recording_model import Recording
+from app.models.recording_status_model import RecordingStatus
+from app.ui.components.recording_card import RecordingCardManager
+
+
+def create_recording(rec_id):
+    return Recording(rec_id, f"https://live.example.com/{rec_id}", "主播", "OD", False, True, "1800",
+                     False, None, None, None, False)
+
+
+def create_manager(monkeypatch, recording_enabled=True):
+    checked = []
+    started = []
+
+    def run_task(func, *args):
+        started.append("ticker")
+        return object()
+
+    app = SimpleNamespace(
+        language_manager=SimpleNamespace(add_observer=lambda observer: None, language={}),
+        page=SimpleNamespace(pubsub=SimpleNamespace(subscribe_topic=lambda *args: None), run_task=run_task),
+        record_manager=SimpleNamespace(request_live_check=checked.append),
+        recording_enabled=recording_enabled,
+        settings=SimpleNamespace(user_config={}),
+    )
+    manager = RecordingCardManager(app)
+    built = []
+
+    def fake_components(recording):
+        built.append(recording.rec_id)
+        return {"card": SimpleNamespace(key=recording.rec_id)}
+
+    monkeypatch.setattr(manager, "_create_card_components", fake_components)
+    return manager, built, checked, started
+
+
+def test_only_current_page_is_materialized_and_cards_are_recycled(monkeypatch):
+    manager, built, _, _ = create_manager(monkeypatch)
+    recordings = [create_recording(f"room{i}") for i in range(2000)]
+
+    cards, reused = manager.mount_page_cards(recordings[:12], pool_size=24)
+    assert [card.key for card in cards] == [f"room{i}" for i in range(12)]
+    assert len(built) == 12
+    assert reused == []
+
+    manager.mount_page_cards(recordings[12:24], pool_size=24)
+    assert list(manager.cards_obj) == [f"room{i}" for i in range(12, 24)]
+    assert len(manager.card_pool) == 12
+
+    # 翻回上一页时直接复用回收池中的卡片
+    first_card = manager.card_pool["room0"]["card"]
+    cards, reused = manager.mount_page_cards(recordings[:12], pool_size=24)
+    assert cards[0] is first_card
+    assert [recording.rec_id for recording in reused] == [f"room{i}" for i in range(12)]
+    assert len(built) == 24
+
+    # 回收池超出容量时丢弃最早离开页面的卡片
+    for start in range(24, 96, 12):
+        manager.mount_page_cards(recordings[start:start + 12], pool_size=24)
+    assert len(manager.cards_obj) == 12
+    assert list(manager.card_pool) == [f"room{i}" for i in range(60, 84)]
+
+
+def test_register_triggers_first_live_check_once(monkeypatch):
+    manager, built, checked, _ = create_manager(monkeypatch)
+    recordings = [create_recording(f"room{i}") for i in range(3)]
+
+    assert manager.register_recordings(recordings) == recordings
+    assert manager.register_recordings(recordings + [create_recording("room3")])[0].rec_id == "room3"
+    assert [recording.rec_id for recording in checked] == ["room0", "room1", "room2", "room3"]
+    assert built == []
+
+    disabled, _, disabled_checked, _ = create_manager(monkeypatch, recording_enabled=False)
+    recording = create_recording("room4")
+    disabled.register_recordings([recording])
+    assert disabled_checked == []
+    assert recording.status_info == RecordingStatus.NOT_RECORDING_SPACE
+
+
+def test_release_returns_cards_to_pool_and_starts_one_ticker(monkeypatch):
+    manager, built, _, started = create_manager(monkeypatch)
+    recordings = [create_recording(f"room{i}") for i in range(4)]
+
+    manager.mount_page_cards(recordings, pool_size=4)
+    manager.release_cards()
+    assert manager.cards_obj == {}
+    assert list(manager.card_pool) == [f"room{i}" for i in range(4)]
+
+    _, reused = manager.mount_page_cards(recordings[:2], pool_size=4)
+    assert len(reused) == 2
+    assert len(built) == 4
+    # 所有卡片共用一个时长刷新任务
+    assert started == ["ticker"]
@@ -0,0 +1,139 @@
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import disk_space_service as service_module
+from app.core.disk_space_service import GB, DiskSpaceService
+from app.core.record_manager import RecordingManager
+
+
+@pytest.fixture
+def volumes(monkeypatch, tmp_path):
+    """tmp_path 下的 a、b 两个目录模拟两个卷"""
+    usage = {}
+    calls = []
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        usage[str(tmp_path / name)] = [100 * GB, 50 * GB]
+
+    def fake_disk_usage(path):
+        calls.append(path)
+        total, free = usage[path]
+        return shutil._ntuple_diskusage(total, total - free, free)
+
+    def fake_mount_point(path):
+        for mount_point in usage:
+            if path.startswith(mount_point):
+                return mount_point
+        raise AssertionError(path)
+
+    monkeypatch.setattr(service_module.shutil, "disk_usage", fake_disk_usage)
+    monkeypatch.setattr(DiskSpaceService, "find_mount_point", staticmethod(fake_mount_point))
+    return tmp_path, usage, calls
+
+
+def test_probes_are_cached_per_mount_point(volumes):
+    tmp_path, usage, calls = volumes
+    service = DiskSpaceService(None, probe_ttl=60)
+
+    status = service.probe(str(tmp_path / "a" / "room1"))
+    assert status.mount_point == str(tmp_path / "a")
+    assert status.free_gb == 50
+    service.probe(str(tmp_path / "a" / "room2" / "x.ts"))
+    service.probe(str(tmp_path / "b"))
+    assert calls == [str(tmp_path / "a"), str(tmp_path / "b")]
+
+    usage[str(tmp_path / "a")][1] = 10 * GB
+    assert service.probe(str(tmp_path / "a")).free_gb == 50
+    service.invalidate(str(tmp_path / "a"))
+    assert service.probe(str(tmp_path / "a")).free_gb == 10
+
+
+def test_write_rates_are_summed_per_volume(volumes):
+    tmp_path, _, _ = volumes
+    service = DiskSpaceService(None)
+    service.update_write_rate(1, str(tmp_path / "a"), 2 * 1024 * 1024)
+    service.update_write_rate(2, str(tmp_path / "a" / "room"), 3 * 1024 * 1024)
+    service.update_write_rate(3, str(tmp_path / "b"), 1024 * 1024)
+
+    status = service.probe(str(tmp_path / "a"))
+    assert status.write_rate == 5 * 1024 * 1024
+    # 剩余50GB、阈值2GB，每秒写入5MB
+    assert status.seconds_until(2) == pytest.approx(48 * 1024 / 5)
+    assert status.seconds_until(60) == 0
+    assert service.probe(str(tmp_path / "b")).write_rate == 1024 * 1024
+
+    # 写入进程停止后预测随之解除
+    service.remove_writer(1)
+    service.remove_writer(2)
+    assert service.get_write_rate(str(tmp_path / "a")) == 0
+    assert service.probe(str(tmp_path / "a")).seconds_until(2) is None
+
+
+def test_mount_point_cache_is_bounded(volumes, monkeypatch):
+    tmp_path, _, _ = volumes
+    monkeypatch.setattr(service_module, "MOUNT_POINT_CACHE_SIZE", 4)
+    service = DiskSpaceService(None)
+    for i in range(10):
+        assert service.get_mount_point(str(tmp_path / "a" / f"room_{i}.ts")) == str(tmp_path / "a")
+    assert len(service.mount_points) == 4
+
+
+async def test_forecast_pauses_only_the_affected_volume(volumes):
+    tmp_path, usage, _ = volumes
+    notifications = []
+    messages = []
+    stopped = []
+
+    async def send_disk_space_notification(threshold, free_space):
+        notifications.append((threshold, free_space))
+
+    app = SimpleNamespace(recording_enabled=True, disk_space_service=DiskSpaceService(None),
+                          snack_bar=SimpleNamespace(show_snack_bar=None),
+                          recorder_supervisor=SimpleNamespace(request_stop_all=lambda: stopped.append(True)),
+                          page=SimpleNamespace(run_task=lambda handler, message, **kwargs: messages.append(message)))
+    manager = SimpleNamespace(
+        app=app,
+        settings=SimpleNamespace(
+            user_config={"recording_space_threshold": "2.0", "disk_space_forecast_minutes": "10"},
+            get_video_save_path=lambda: str(tmp_path / "a"),
+        ),
+        low_space_volumes=set(),
+        send_disk_space_notification=send_disk_space_notification,
+        _={"not_disk_space_tip": "below", "disk_space_forecast_tip": "[mount_point] [minutes]"},
+    )
+    manager._notify_disk_space_forecast = lambda *args: RecordingManager._notify_disk_space_forecast(manager, *args)
+    usage[str(tmp_path / "a")][1] = 5 * GB
+    usage[str(tmp_path / "b")][1] = 5 * GB
+
+    assert await RecordingManager.check_free_space(manager)
+    assert await RecordingManager.check_free_space(manager, str(tmp_path / "b" / "room"))
+
+    # 单独设置的录制目录所在卷预计在10分钟内降到阈值，只暂停该卷的录制
+    app.disk_space_service.update_write_rate(1, str(tmp_path / "b"), 10 * 1024 * 1024)
+    assert not await RecordingManager.check_free_space(manager, str(tmp_path / "b" / "room"))
+    assert app.recording_enabled
+    assert manager.low_space_volumes == {str(tmp_path / "b")}
+
+    # 默认录制卷预计写满时同样只暂停该卷的录制，提示预计剩余时间而不是空间不足
+    app.disk_space_service.update_write_rate(2, str(tmp_path / "a"), 10 * 1024 * 1024)
+    assert not await RecordingManager.check_free_space(manager)
+    assert not await RecordingManager.check_free_space(manager)
+    assert app.recording_enabled
+    assert stopped == []
+    assert notifications == []
+    assert messages == [f"{tmp_path / 'b'} 5.1", f"{tmp_path / 'a'} 5.1"]
+
+    # 写入速度下降后预测立即解除
+    app.disk_space_service.remove_writer(2)
+    assert await RecordingManager.check_free_space(manager)
+    assert manager.low_space_volumes == {str(tmp_path / "b")}
+
+    # 默认录制卷实际低于阈值时停用全部录制
+    usage[str(tmp_path / "a")][1] = GB
+    app.disk_space_service.invalidate()
+    assert not await RecordingManager.check_free_space(manager)
+    assert not app.recording_enabled
+    assert stopped == [True]
+    assert notifications == [(2.0, 1.0)]
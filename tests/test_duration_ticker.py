@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from app.ui.components.duration_ticker import DurationTicker
+
+
+def create_ticker(rooms):
+    updates = []
+    durations = {}
+    cards_obj = {
+        rec_id: {"recording": SimpleNamespace(rec_id=rec_id, recording=recording),
+                 "duration_label": SimpleNamespace(value="")}
+        for rec_id, recording in rooms.items()
+    }
+    app = SimpleNamespace(
+        page=SimpleNamespace(update=lambda *controls: updates.append(controls), run_task=None),
+        record_card_manager=SimpleNamespace(cards_obj=cards_obj),
+        record_manager=SimpleNamespace(get_duration=lambda recording: durations.get(recording.rec_id, "00:00:00")),
+    )
+    return DurationTicker(app, interval=0.01), cards_obj, durations, updates
+
+
+def test_tick_only_touches_recording_cards_in_one_update():
+    ticker, cards_obj, durations, updates = create_ticker({"a": True, "b": False, "c": True})
+
+    assert ticker.tick() == 2
+    assert len(updates) == 1
+    assert len(updates[0]) == 2
+    assert cards_obj["b"]["duration_label"].value == ""
+
+    # 文本没有变化时不推送更新
+    assert ticker.tick() == 0
+    assert len(updates) == 1
+    durations["c"] = "00:00:01"
+    assert ticker.tick() == 1
+    assert updates[-1] == (cards_obj["c"]["duration_label"],)
+
+
+async def test_paused_ticker_does_not_wake_until_resumed_from_tray_thread():
+    ticker, _, durations, updates = create_ticker({"a": True})
+    task = asyncio.ensure_future(ticker.run())
+    await asyncio.sleep(0.03)
+    assert len(updates) == 1
+
+    ticker.pause()
+    await asyncio.sleep(0.02)
+    paused_count = len(updates)
+    durations["a"] = "00:00:05"
+    await asyncio.sleep(0.05)
+    assert len(updates) == paused_count
+
+    # 托盘菜单在独立线程中恢复窗口
+    thread = threading.Thread(target=ticker.resume)
+    thread.start()
+    thread.join()
+    await asyncio.sleep(0.03)
+    assert len(updates) == paused_count + 1
+    task.cancel()
@@ -0,0 +1,131 @@
+import os
+
+import httpx
+import pytest
+
+from app.api.file_ranges import (
+    BLOCK_SIZE,
+    ByteBudgetLRU,
+    RangeNotSatisfiableError,
+    build_multipart_parts,
+    get_media_type,
+    iter_file_range,
+    iter_multipart_ranges,
+    parse_range_header,
+)
+
+
+@pytest.fixture
+def video_api(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    monkeypatch.setenv("CUSTOM_VIDEO_ROOT_DIR", str(tmp_path))
+    from app.api import video_stream_service
+
+    monkeypatch.setattr(video_stream_service, "VIDEO_DIR", tmp_path)
+    video_stream_service.VIDEO_META_CACHE.clear()
+    transport = httpx.ASGITransport(app=video_stream_service.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def test_parse_range_header():
+    assert parse_range_header("bytes=0-", 1000) == [(0, 999)]
+    assert parse_range_header("bytes=-100", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=900-5000", 1000) == [(900, 999)]
+    # 重叠和相邻的区间会被合并
+    assert parse_range_header("bytes=500-599, 0-99,100-199,550-700", 1000) == [(0, 199), (500, 700)]
+    # 格式错误时忽略Range，返回完整内容
+    assert parse_range_header("items=0-1", 1000) is None
+    assert parse_range_header("bytes=10-5", 1000) is None
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range_header("bytes=1000-", 1000)
+    assert get_media_type("a.TS") == "video/mp2t"
+    assert get_media_type("a.flv") == "video/x-flv"
+    assert get_media_type("a.mkv") == "video/x-matroska"
+
+
+def test_lru_is_bounded_by_bytes():
+    cache = ByteBudgetLRU(max_bytes=10, max_item_bytes=6)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")
+    cache.put("big", b"x" * 7)
+
+    assert cache.total_bytes == 8
+    assert cache.get("b") is None
+    assert cache.get("big") is None
+    assert cache.evictions == 1
+
+
+async def test_range_reads_match_file_and_use_cache(tmp_path):
+    data = os.urandom(BLOCK_SIZE * 3 + 123)
+    path = tmp_path / "video.ts"
+    path.write_bytes(data)
+    cache = ByteBudgetLRU(max_bytes=BLOCK_SIZE * 8)
+    version = (1, len(data))
+
+    async def read(start, end):
+        return b"".join([chunk async for chunk in iter_file_range(str(path), start, end, cache, version)])
+
+    assert await read(BLOCK_SIZE - 10, BLOCK_SIZE + 10) == data[BLOCK_SIZE - 10:BLOCK_SIZE + 11]
+    assert await read(BLOCK_SIZE, BLOCK_SIZE + 5) == data[BLOCK_SIZE:BLOCK_SIZE + 6]
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert await read(0, len(data) - 1) == data
+
+    ranges = [(0, 9), (BLOCK_SIZE * 3, len(data) - 1)]
+    parts, closing, content_length = build_multipart_parts(ranges, len(data), "video/mp2t", "sep")
+    body = b"".join([chunk async for chunk in iter_multipart_ranges(str(path), parts, closing, cache, version)])
+    assert len(body) == content_length
+    assert data[:10] in body
+    assert body.endswith(b"--sep--\r\n")
+
+
+async def test_growing_file_keeps_cached_blocks(tmp_path):
+    data = os.urandom(BLOCK_SIZE + 100)
+    path = tmp_path / "live.ts"
+    path.write_bytes(data)
+    cache = ByteBudgetLRU(max_bytes=BLOCK_SIZE * 8)
+    file_id = (0, 1)
+
+    async def read(start, end):
+        return b"".join([chunk async for chunk in iter_file_range(str(path), start, end, cache, file_id)])
+
+    assert await read(0, BLOCK_SIZE + 99) == data
+    appended = os.urandom(200)
+    with open(path, "ab") as file:
+        file.write(appended)
+    data += appended
+
+    # 文件增长后完整的块仍然命中缓存，只有末尾块重新读取
+    assert await read(BLOCK_SIZE - 10, BLOCK_SIZE + 250) == data[BLOCK_SIZE - 10:BLOCK_SIZE + 251]
+    assert cache.get((str(path), file_id, 0)) is not None
+    assert len(cache.get((str(path), file_id, 1))) == 300
+    # 末尾块已缓存的部分仍可直接使用
+    assert await read(BLOCK_SIZE, BLOCK_SIZE + 50) == data[BLOCK_SIZE:BLOCK_SIZE + 51]
+
+
+async def test_video_endpoint_serves_ranges(tmp_path, video_api):
+    data = os.urandom(BLOCK_SIZE * 2 + 77)
+    (tmp_path / "room.ts").write_bytes(data)
+    params = {"filename": "room.ts"}
+
+    async with video_api as client:
+        response = await client.get("/api/videos", params=params, headers={"Range": f"bytes={BLOCK_SIZE - 5}-"})
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes {BLOCK_SIZE - 5}-{len(data) - 1}/{len(data)}"
+        assert response.content == data[BLOCK_SIZE - 5:]
+
+        response = await client.get("/api/videos", params=params, headers={"Range": "bytes=0-9,-10"})
+        assert response.status_code == 206
+        assert response.headers["content-type"].startswith("multipart/byteranges")
+        assert data[:10] in response.content
+        assert data[-10:] in response.content
+
+        response = await client.get("/api/videos", params=params, headers={"Range": f"bytes={len(data)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(data)}"
+
+        response = await client.get("/api/videos", params=params)
+        assert response.status_code == 200
+        assert response.content == data
@@ -0,0 +1,45 @@
+from app.core.platform_handlers import BilibiliHandler, HuyaHandler, PlatformHandler
+from app.core.platform_handlers.base import HandlerInstanceCache
+
+
+def test_key_includes_handler_class(monkeypatch):
+    monkeypatch.setattr(PlatformHandler, "_instance_cache", HandlerInstanceCache(max_size=8, ttl=300))
+    bilibili = PlatformHandler.get_handler_instance("https://live.bilibili.com/1001", record_quality="OD")
+    huya = PlatformHandler.get_handler_instance("https://www.huya.com/111", record_quality="OD")
+
+    assert isinstance(bilibili, BilibiliHandler)
+    assert isinstance(huya, HuyaHandler)
+    assert PlatformHandler.get_handler_instance("https://live.bilibili.com/2002", record_quality="OD") is bilibili
+
+    stats = PlatformHandler.get_instance_stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = HandlerInstanceCache(max_size=2, ttl=300)
+    cache.get_or_create("a", object)
+    b = cache.get_or_create("b", object)
+    a = cache.get_or_create("a", object)
+    cache.get_or_create("c", object)
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.get_or_create("a", object) is a
+    assert cache.get_or_create("b", object) is not b
+
+
+def test_expired_instances_are_purged(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.platform_handlers.base.time.monotonic", lambda: now[0])
+    cache = HandlerInstanceCache(max_size=8, ttl=300)
+    first = cache.get_or_create("a", object)
+    cache.get_or_create("b", object)
+
+    now[0] += 200
+    cache.get_or_create("b", object)
+    now[0] += 200
+
+    assert cache.purge_expired() == 1
+    assert len(cache) == 1
+    assert cache.get_or_create("a", object) is not first
@@ -0,0 +1,70 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app import headless
+from app.core.record_manager import GlobalRecordingState, RecordingManager
+from app.core.recordings_store import RecordingsStore
+from app.models.recording_model import Recording
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def run_path(tmp_path, monkeypatch):
+    shutil.copytree(PROJECT_DIR / "locales", tmp_path / "locales")
+    (tmp_path / "config").mkdir()
+    for name in ("default_settings.json", "language.json"):
+        shutil.copy(PROJECT_DIR / "config" / name, tmp_path / "config" / name)
+    monkeypatch.setattr(headless, "execute_dir", str(tmp_path))
+    monkeypatch.setattr(GlobalRecordingState, "recordings", [])
+    return tmp_path
+
+
+def save_recordings(run_path, count):
+    store = RecordingsStore(str(run_path / "config" / "recordings.db"))
+    recordings = [
+        Recording(f"room{i}", f"https://live.example.com/{i}", f"主播{i}", "OD", False, i % 2 == 0, "1800",
+                  False, None, None, None, False)
+        for i in range(count)
+    ]
+    store.save([recording.to_dict() for recording in recordings])
+    store.close()
+
+
+async def test_engine_starts_monitoring_without_ui(run_path, monkeypatch):
+    save_recordings(run_path, 4)
+    checked = []
+    monkeypatch.setattr(RecordingManager, "request_live_check", lambda self, recording, **kwargs: checked.append(recording.rec_id))
+
+    app = headless.HeadlessApp()
+    await app.start()
+    assert [recording.rec_id for recording in app.record_manager.recordings] == ["room0", "room1", "room2", "room3"]
+    assert checked == ["room0", "room1", "room2", "room3"]
+    await asyncio.sleep(0)
+    assert app.current_page is None
+    assert app.record_manager.periodic_task_started
+
+    app.stop()
+    await app.cleanup()
+    assert all(task.done() for task in app.page.tasks)
+
+
+async def test_state_changes_are_published_to_subscribers(run_path):
+    app = headless.HeadlessApp()
+    received = []
+
+    async def on_update(topic, recording):
+        received.append((topic, recording))
+
+    recording = object()
+    app.record_card_manager.request_update(recording, refilter=True, broadcast=True)
+    app.page.pubsub.subscribe_topic("update", on_update)
+    app.page.pubsub.subscribe_topic("delete", lambda topic, recordings: received.append((topic, recordings)))
+    app.record_card_manager.request_update(recording)
+    app.page.pubsub.send_others_on_topic("delete", [recording])
+    await asyncio.sleep(0)
+    assert received == [("delete", [recording]), ("update", recording)]
+    await app.cleanup()
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_headless_entry_does_not_import_ui_modules():
+    # 在独立进程中导入，避免受其他测试已导入的模块影响
+    code = (
+        "import sys, main, app.headless, app.sharding; "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('flet', 'screeninfo') or m.startswith('app.ui')))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
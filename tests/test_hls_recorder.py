@@ -0,0 +1,123 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.hls_recorder import HlsPlaylist, HlsRecorder, HlsUnsupportedError
+from app.process_manager import AsyncProcessManager
+
+
+def media_playlist(first_sequence, count, discontinuity_at=None, ended=False, extra=""):
+    lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:0.01", f"#EXT-X-MEDIA-SEQUENCE:{first_sequence}", extra]
+    for sequence in range(first_sequence, first_sequence + count):
+        if sequence == discontinuity_at:
+            lines.append("#EXT-X-DISCONTINUITY")
+        lines += ["#EXTINF:2.0,", f"seg{sequence}.ts"]
+    if ended:
+        lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines)
+
+
+class BrokenStream(httpx.AsyncByteStream):
+    """先返回部分数据，然后连接中断"""
+
+    async def __aiter__(self):
+        yield b"5a"
+        raise httpx.ReadError("connection reset")
+
+
+def test_parse_master_and_media_playlists():
+    master = HlsPlaylist.parse(
+        "#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=800000\nlow/index.m3u8\n"
+        "#EXT-X-STREAM-INF:BANDWIDTH=4000000,RESOLUTION=1920x1080\nhigh/index.m3u8\n",
+        "https://cdn.example.com/live/master.m3u8",
+    )
+    assert master.best_variant() == "https://cdn.example.com/live/high/index.m3u8"
+
+    media = HlsPlaylist.parse(media_playlist(10, 3, discontinuity_at=12, ended=True), "https://cdn.example.com/a/b.m3u8")
+    assert [(segment.sequence, segment.discontinuity) for segment in media.segments] == [
+        (10, False), (11, False), (12, True)
+    ]
+    assert media.segments[0].uri == "https://cdn.example.com/a/seg10.ts"
+    assert media.ended
+
+    encrypted = HlsPlaylist.parse(media_playlist(0, 1, extra='#EXT-X-KEY:METHOD=AES-128,URI="key"'), "https://a/b")
+    assert encrypted.unsupported
+    with pytest.raises(ValueError, match="m3u8"):
+        HlsPlaylist.parse("<html></html>", "https://a/b")
+
+
+async def test_records_live_playlist_with_discontinuity_and_resume(tmp_path):
+    playlists = [media_playlist(0, 5), media_playlist(3, 4, discontinuity_at=6, ended=True)]
+    requests = []
+
+    def handler(request):
+        name = request.url.path.rsplit("/", 1)[-1]
+        requests.append((name, request.headers.get("range")))
+        if name == "index.m3u8":
+            return httpx.Response(200, text=playlists.pop(0) if len(playlists) > 1 else playlists[0])
+        if name == "seg5.ts" and request.headers.get("range") is None:
+            return httpx.Response(200, stream=BrokenStream())
+        if name == "seg5.ts":
+            return httpx.Response(206, content=b"b")
+        return httpx.Response(200, content=name[3:-3].encode())
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    recorder = HlsRecorder("https://cdn.example.com/live/index.m3u8", str(tmp_path / "room.ts"), client=client)
+    await recorder.start()
+    assert await recorder.wait() == 0
+
+    # 首次从倒数第3个分片开始，断流的分片从已收到的位置续传，推流中断后写入新文件
+    assert recorder.files == [str(tmp_path / "room.ts"), str(tmp_path / "room_part1.ts")]
+    assert (tmp_path / "room.ts").read_bytes() == b"2345ab"
+    assert (tmp_path / "room_part1.ts").read_bytes() == b"6"
+    assert ("seg5.ts", "bytes=2-") in requests
+    assert recorder.bytes_written == 7
+    assert recorder.missed_segments == 0
+    await client.aclose()
+
+
+async def test_unsupported_playlist_and_stop(tmp_path):
+    def handler(request):
+        if request.url.path.endswith("encrypted.m3u8"):
+            return httpx.Response(200, text=media_playlist(0, 2, extra='#EXT-X-KEY:METHOD=AES-128,URI="key"'))
+        if request.url.path.endswith(".m3u8"):
+            return httpx.Response(200, text=media_playlist(0, 1))
+        return httpx.Response(200, content=b"x")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with pytest.raises(HlsUnsupportedError):
+        await HlsRecorder("https://a/encrypted.m3u8", str(tmp_path / "a.ts"), client=client).start()
+
+    recorder = HlsRecorder("https://a/live.m3u8", str(tmp_path / "b_%03d.ts"), segment_record=True, client=client)
+    await recorder.start()
+    await asyncio.sleep(0.05)
+    assert recorder.returncode is None
+    recorder.terminate()
+    assert await asyncio.wait_for(recorder.wait(), 1) == 0
+    assert recorder.files == [str(tmp_path / "b_000.ts")]
+    stdout, stderr = await recorder.communicate()
+    assert stderr == b""
+    await client.aclose()
+
+
+async def test_process_manager_tracks_and_stops_native_recorders(tmp_path):
+    def handler(request):
+        if request.url.path.endswith(".m3u8"):
+            return httpx.Response(200, text=media_playlist(0, 1))
+        return httpx.Response(200, content=b"x")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    recorder = HlsRecorder("https://a/live.m3u8", str(tmp_path / "room.ts"), client=client)
+    await recorder.start()
+    process_manager = AsyncProcessManager()
+    await process_manager.add_process(recorder)
+    assert process_manager.ffmpeg_processes == [recorder]
+    assert await process_manager.get_active_processes_count() == 1
+    assert [info["pid"] for info in await process_manager.get_running_processes_info()] == [recorder.pid]
+
+    # 退出时与ffmpeg进程一起停止
+    await asyncio.wait_for(process_manager.cleanup(), 2)
+    assert recorder.returncode == 0
+    assert (tmp_path / "room.ts").read_bytes() == b"x"
+    await client.aclose()
@@ -0,0 +1,60 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.utils.http_client import HttpClientRegistry, close_http_clients, get_http_client
+
+
+class CookieHandler(BaseHTTPRequestHandler):
+    """/login 设置Cookie，其他路径返回收到的Cookie请求头"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = (self.headers.get("Cookie") or "").encode()
+        self.send_response(200)
+        if self.path == "/login":
+            self.send_header("Set-Cookie", "session=platform-a; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CookieHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+async def test_clients_are_shared_per_proxy_and_closed_on_shutdown():
+    client = get_http_client()
+    assert get_http_client(None) is client
+    assert get_http_client("") is client
+    proxied = get_http_client("http://127.0.0.1:7890")
+    assert proxied is not client
+    assert HttpClientRegistry.get_client_count() >= 2
+
+    await close_http_clients()
+    assert client.is_closed
+    assert proxied.is_closed
+    # 关闭后再次获取时创建新的客户端
+    new_client = get_http_client()
+    assert new_client is not client
+    await close_http_clients()
+
+
+async def test_shared_client_does_not_leak_cookies(server_url):
+    client = get_http_client()
+    response = await client.get(f"{server_url}/login")
+    assert response.cookies["session"] == "platform-a"
+    assert len(client.cookies) == 0
+
+    # 其他平台的请求不会带上前一个响应设置的Cookie，需要Cookie时通过请求头传入
+    assert (await client.get(f"{server_url}/status")).text == ""
+    response = await client.get(f"{server_url}/status", headers={"Cookie": "token=b"})
+    assert response.text == "token=b"
+    await close_http_clients()
@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core import live_check_scheduler
+from app.core.live_check_scheduler import LiveCheckScheduler
+from app.models.recording_model import Recording
+
+
+def create_recording(rec_id, url):
+    return Recording(rec_id, url, rec_id, "OD", False, True, "1800", False, None, None, None, False)
+
+
+class FakeRecordManager:
+    def __init__(self, batch_size=0, check_time=0.0, **config):
+        self.app = SimpleNamespace(settings=SimpleNamespace(user_config=config), recording_enabled=True)
+        self.loop_time_seconds = 300
+        self.batch_size = batch_size
+        self.check_time = check_time
+        self.checked = []
+        self.batches = []
+        self.active = 0
+        self.peak = 0
+
+    def find_recording_by_id(self, rec_id):
+        return None
+
+    def get_poll_interval(self, recording):
+        return 300
+
+    def get_live_check_batch_size(self, recording):
+        return self.batch_size if "bilibili" in recording.url else 0
+
+    async def check_if_live(self, recording):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.checked.append(recording.rec_id)
+        await asyncio.sleep(self.check_time)
+        self.active -= 1
+
+    async def check_if_live_batch(self, recordings):
+        self.batches.append([recording.rec_id for recording in recordings])
+        return []
+
+
+async def wait_until(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("等待超时")
+
+
+async def test_dispatches_in_due_order():
+    manager = FakeRecordManager()
+    scheduler = LiveCheckScheduler(manager)
+    for rec_id, delay in (("c", 0.06), ("a", 0.0), ("b", 0.03)):
+        scheduler.submit(create_recording(rec_id, f"https://www.douyu.com/{rec_id}"), delay=delay)
+    # 更早的到期时间覆盖原来的条目，更晚的则被忽略
+    scheduler.submit(create_recording("c", "https://www.douyu.com/c"), delay=0.01)
+    scheduler.submit(create_recording("a", "https://www.douyu.com/a"), delay=5)
+
+    await wait_until(lambda: len(manager.checked) == 3)
+    assert manager.checked == ["a", "c", "b"]
+    assert scheduler.get_metrics()["dispatched"] == 3
+    await scheduler.shutdown()
+
+
+async def test_batches_due_rooms_of_one_platform():
+    manager = FakeRecordManager(batch_size=3)
+    scheduler = LiveCheckScheduler(manager)
+    for i in range(4):
+        scheduler.submit(create_recording(f"bili{i}", f"https://live.bilibili.com/{i}"), delay=i * 0.001)
+    scheduler.submit(create_recording("douyu", "https://www.douyu.com/1"))
+    scheduler.submit(create_recording("far", "https://live.bilibili.com/99"), delay=60)
+
+    await wait_until(lambda: sum(map(len, manager.batches)) == 4 and manager.checked)
+    # 每批最多3个房间，只合并同一平台即将到期的房间
+    assert manager.batches[0] == ["bili0", "bili1", "bili2"]
+    assert manager.batches[1:] == [["bili3"]]
+    assert manager.checked == ["douyu"]
+    assert scheduler.is_scheduled(create_recording("far", "https://live.bilibili.com/99"))
+    await scheduler.shutdown()
+
+
+async def test_concurrency_bound_follows_setting(monkeypatch):
+    # 放开平台限速，只验证全局并发上限
+    monkeypatch.setattr(live_check_scheduler, "DEFAULT_PLATFORM_BURST", 100)
+    manager = FakeRecordManager(check_time=0.05, live_check_max_concurrency="2")
+    scheduler = LiveCheckScheduler(manager)
+    for i in range(6):
+        scheduler.submit(create_recording(f"room{i}", f"https://www.douyu.com/{i}"))
+    await wait_until(lambda: len(manager.checked) == 6)
+    assert manager.peak == 2
+
+    # 修改设置后无需重启调度器即可生效
+    manager.app.settings.user_config["live_check_max_concurrency"] = "4"
+    await asyncio.sleep(0.06)
+    manager.peak = 0
+    for i in range(6, 14):
+        scheduler.submit(create_recording(f"room{i}", f"https://www.douyu.com/{i}"))
+    await wait_until(lambda: len(manager.checked) == 14)
+    assert manager.peak == 4
+    await scheduler.shutdown()
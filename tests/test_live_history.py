@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+
+from app.core.live_history import HOURS_PER_WEEK, LiveHistoryManager
+
+
+class MockRecording:
+    def __init__(self, rec_id="room1", is_live=False):
+        self.rec_id = rec_id
+        self.is_live = is_live
+
+
+@pytest.fixture
+def history():
+    app = Mock()
+    app.settings.user_config = {
+        "adaptive_polling_enabled": True,
+        "adaptive_poll_min_seconds": 20,
+        "adaptive_poll_max_seconds": 1800,
+    }
+    app.config_manager.load_live_history_config.return_value = {}
+    return LiveHistoryManager(app)
+
+
+def test_no_history_keeps_base_interval(history):
+    assert history.get_poll_interval(MockRecording(), 300) == 300
+
+
+def test_regular_schedule_polls_fast_and_backs_off(history):
+    recording = MockRecording()
+    # 连续4个周一 20:xx 开播
+    for day in (1, 8, 15, 22):
+        history.record_live_start(recording, datetime(2024, 1, day, 20, 5))
+
+    assert history.histograms["room1"][20] == 4
+    assert len(history.histograms["room1"]) == HOURS_PER_WEEK
+    # 周一 19:40，临近常规开播时间
+    assert history.get_poll_interval(recording, 300, datetime(2024, 1, 29, 19, 40)) == 20
+    # 周一凌晨 4 点，从未开播过的时段
+    assert history.get_poll_interval(recording, 300, datetime(2024, 1, 29, 4, 0)) == 1200
+
+
+def test_live_room_keeps_base_interval(history):
+    recording = MockRecording()
+    for day in (1, 8, 15):
+        history.record_live_start(recording, datetime(2024, 1, day, 20, 5))
+    recording.is_live = True
+    assert history.get_poll_interval(recording, 300, datetime(2024, 1, 29, 4, 0)) == 300
@@ -0,0 +1,175 @@
+import os
+import time
+
+import httpx
+import pytest
+
+from app.api.live_hls import PTS_WRAP, LivePlaylist, TsFileIndex, split_series_name
+
+VIDEO_PID = 0x100
+AUDIO_PID = 0x101
+PMT_PID = 0x1000
+
+
+def ts_packet(pid, payload, unit_start=False, random_access=False):
+    header = bytes([0x47, (0x40 if unit_start else 0) | (pid >> 8), pid & 0xFF])
+    if random_access:
+        adaptation = bytes([0x40]) + b"\xff" * (183 - 1 - len(payload))
+        body = bytes([len(adaptation)]) + adaptation + payload
+        return header + bytes([0x30]) + body
+    return header + bytes([0x10]) + payload.ljust(184, b"\xff")
+
+
+def psi_packet(pid, table):
+    section_length = len(table) - 3 + 4
+    table = table[:1] + bytes([0xB0 | (section_length >> 8), section_length & 0xFF]) + table[3:]
+    return ts_packet(pid, b"\x00" + table + b"\x00\x00\x00\x00", unit_start=True)
+
+
+def header_packets():
+    pat = bytes([0x00, 0, 0, 0x00, 0x01, 0xC1, 0, 0, 0x00, 0x01, 0xE0 | (PMT_PID >> 8), PMT_PID & 0xFF])
+    pmt = bytes([0x02, 0, 0, 0x00, 0x01, 0xC1, 0, 0, 0xE0 | (VIDEO_PID >> 8), VIDEO_PID & 0xFF, 0xF0, 0x00,
+                 0x1B, 0xE0 | (VIDEO_PID >> 8), VIDEO_PID & 0xFF, 0xF0, 0x00,
+                 0x0F, 0xE0 | (AUDIO_PID >> 8), AUDIO_PID & 0xFF, 0xF0, 0x00])
+    return psi_packet(0, pat) + psi_packet(PMT_PID, pmt)
+
+
+def pes_header(pts):
+    pts %= PTS_WRAP
+    encoded = bytes([
+        0x21 | ((pts >> 29) & 0x0E), (pts >> 22) & 0xFF, 0x01 | ((pts >> 14) & 0xFE),
+        (pts >> 7) & 0xFF, 0x01 | ((pts << 1) & 0xFE),
+    ])
+    return b"\x00\x00\x01\xe0\x00\x00\x80\x80\x05" + encoded
+
+
+def frames(count, start_pts=0, fps=25, gop=50):
+    """每帧一个视频PES起始包、一个续包和一个音频包，每 gop 帧一个关键帧"""
+    data = b""
+    for i in range(count):
+        pts = start_pts + i * 90000 // fps
+        data += ts_packet(VIDEO_PID, pes_header(pts), unit_start=True, random_access=i % gop == 0)
+        data += ts_packet(VIDEO_PID, b"\x00" * 184)
+        data += ts_packet(AUDIO_PID, pes_header(pts), unit_start=True)
+    return data
+
+
+def test_incremental_tail_matches_full_parse(tmp_path):
+    path = tmp_path / "room_000.ts"
+    content = header_packets() + frames(25 * 20, start_pts=PTS_WRAP - 90000 * 3)
+    split = len(content) // 2 + 100  # 故意不按TS包对齐
+
+    path.write_bytes(content[:split])
+    growing = TsFileIndex(str(path))
+    assert growing.update()
+    assert growing.parsed_offset % 188 == 0
+    with open(path, "ab") as file:
+        file.write(content[split:])
+    assert growing.update()
+    assert not growing.update()
+
+    full = TsFileIndex(str(path))
+    full.update()
+    assert growing.segments == full.segments
+    assert growing.map_length == 2 * 188
+    # 关键帧每2秒一个，目标4秒，跨越PTS回绕时时长仍然正确
+    assert [round(duration, 3) for _, _, duration in full.segments] == [4.0] * 4
+    for offset, length, _ in full.segments:
+        assert content[offset + 5] & 0x40
+        assert (content[offset + 1] & 0x1F) << 8 | content[offset + 2] == VIDEO_PID
+        assert length % 188 == 0
+
+
+def test_playlist_rolls_files_and_expires_old_segments(tmp_path):
+    first = tmp_path / "room_000.ts"
+    first.write_bytes(header_packets() + frames(25 * 20))
+    playlist = LivePlaylist(str(tmp_path), "room_", window_size=3, refresh_interval=0)
+    playlist.refresh()
+    text = playlist.render(lambda name: f"/api/videos?filename={name}")
+    assert "#EXT-X-MEDIA-SEQUENCE:1" in text
+    assert text.count("#EXTINF") == 3
+    assert '#EXT-X-MAP:URI="/api/videos?filename=room_000.ts",BYTERANGE="376@0"' in text
+    assert "#EXT-X-ENDLIST" not in text
+
+    (tmp_path / "room_001.ts").write_bytes(header_packets() + frames(25 * 12))
+    playlist.refresh()
+    text = playlist.render(lambda name: f"/api/videos?filename={name}")
+    # 第一个文件写入结束，末尾剩余部分成为最后一个分片，之后插入不连续标记切换到新文件
+    lines = text.splitlines()
+    assert lines.count("#EXT-X-DISCONTINUITY") == 1
+    assert lines[lines.index("#EXT-X-DISCONTINUITY") + 1].endswith('filename=room_001.ts",BYTERANGE="376@0"')
+    assert "#EXT-X-MEDIA-SEQUENCE:4" in text
+    assert "#EXT-X-DISCONTINUITY-SEQUENCE:0" in text
+
+    with open(tmp_path / "room_001.ts", "ab") as file:
+        file.write(frames(25 * 16, start_pts=25 * 12 * 3600))
+    playlist.refresh()
+    text = playlist.render(lambda name: f"/api/videos?filename={name}")
+    # 旧文件的分片全部过期后，媒体序号和不连续序号继续累加
+    assert len(playlist.files) == 1
+    assert "room_000.ts" not in text
+    assert "#EXT-X-MEDIA-SEQUENCE:8" in text
+    assert "#EXT-X-DISCONTINUITY-SEQUENCE:1" in text
+
+
+def test_playlist_ends_after_recording_stops(tmp_path):
+    path = tmp_path / "anchor_2024-01-01_12-00-00.ts"
+    path.write_bytes(header_packets() + frames(25 * 9))
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    assert split_series_name(path.name) == ("anchor_2024-01-01_12-00-00", ".ts")
+    assert split_series_name("anchor_%03d.ts") == ("anchor_", ".ts")
+    assert split_series_name("anchor.flv") is None
+
+    playlist = LivePlaylist(str(tmp_path), "anchor_2024-01-01_12-00-00", idle_timeout=15)
+    playlist.refresh()
+    text = playlist.render(lambda name: name)
+    assert text.rstrip().endswith("#EXT-X-ENDLIST")
+    assert text.count("#EXTINF") == 3
+    assert "#EXTINF:0.960," in text
+
+
+def test_native_recorder_part_files_form_one_series(tmp_path):
+    (tmp_path / "room.ts").write_bytes(header_packets() + frames(25 * 12))
+    (tmp_path / "room_part1.ts").write_bytes(header_packets() + frames(25 * 12))
+    (tmp_path / "room2.ts").write_bytes(b"")
+    assert split_series_name("room_part1.ts") == ("room", ".ts")
+
+    playlist = LivePlaylist(str(tmp_path), "room", window_size=10, refresh_interval=0)
+    assert playlist._list_series() == ["room.ts", "room_part1.ts"]
+    playlist.refresh()
+    assert [name for name, _ in playlist.files] == ["room_part1.ts"]
+
+    # 文件被截断后重新建立索引
+    index = playlist.files[0][1]
+    (tmp_path / "room_part1.ts").write_bytes(header_packets() + frames(25 * 6))
+    assert index.update()
+    assert index.file_size == os.path.getsize(tmp_path / "room_part1.ts")
+    assert index.map_length == 2 * 188
+
+
+async def test_live_playlist_endpoint(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    monkeypatch.setenv("CUSTOM_VIDEO_ROOT_DIR", str(tmp_path))
+    from app.api import video_stream_service
+
+    monkeypatch.setattr(video_stream_service, "VIDEO_DIR", tmp_path)
+    video_stream_service.LIVE_PLAYLISTS.clear()
+    (tmp_path / "anchor").mkdir()
+    (tmp_path / "anchor" / "room_000.ts").write_bytes(header_packets() + frames(25 * 20))
+
+    transport = httpx.ASGITransport(app=video_stream_service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        params = {"filename": "room_%03d.ts", "subfolder": "anchor"}
+        response = await client.get("/api/live/playlist.m3u8", params=params)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apple.mpegurl"
+        assert "/api/videos?filename=room_000.ts&subfolder=anchor" in response.text
+        assert response.text.count("#EXTINF") == 4
+
+        response = await client.get("/api/live/playlist.m3u8", params={"filename": "room.flv"})
+        assert response.status_code == 400
+        response = await client.get("/api/live/playlist.m3u8", params={"filename": "missing.ts"})
+        assert response.status_code == 404
+        response = await client.get("/api/live/playlist.m3u8", params={"filename": "a.ts", "subfolder": ".."})
+        assert response.status_code == 400
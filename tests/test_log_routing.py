@@ -0,0 +1,35 @@
+from app.utils import log_routing
+from app.utils.log_routing import (
+    GENERAL_LOG_CATEGORY,
+    MEMORY_LOG_CATEGORY,
+    get_log_category,
+    is_memory_cleanup_log,
+    not_memory_cleanup_log,
+)
+
+
+def make_record(message, **extra):
+    return {"message": message, "extra": extra}
+
+
+def test_bound_category_skips_message_matching(monkeypatch):
+    monkeypatch.setattr(log_routing, "_MEMORY_CLEANUP_REGEX", None)
+
+    assert is_memory_cleanup_log(make_record("任意内容", category=MEMORY_LOG_CATEGORY))
+    assert not_memory_cleanup_log(make_record("完整清理", category="stream"))
+
+
+def test_untagged_messages_fall_back_to_patterns():
+    assert is_memory_cleanup_log(make_record("执行完整清理任务 - 当前内存使用率: 50.0%"))
+    assert is_memory_cleanup_log(make_record("系统中发现 3 个FFmpeg进程"))
+    assert not is_memory_cleanup_log(make_record("直播间 主播1 正在直播中"))
+
+
+def test_category_is_cached_for_other_sinks():
+    record = make_record("添加ffmpeg进程: PID=1")
+    assert get_log_category(record) == MEMORY_LOG_CATEGORY
+    assert record["extra"]["category"] == MEMORY_LOG_CATEGORY
+
+    record = make_record("普通日志")
+    assert not_memory_cleanup_log(record)
+    assert record["extra"]["category"] == GENERAL_LOG_CATEGORY
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+from app.messages.delivery_engine import ChannelPolicy, NotificationDeliveryEngine
+from app.messages.message_pusher import MessagePusher
+from app.messages.notification_service import NotificationService, SmtpConnectionPool
+
+
+class BarkHandler(BaseHTTPRequestHandler):
+    """模拟Bark接口，前 fail_count 次请求返回500"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        server.requests.append(body)
+        if len(server.requests) <= server.fail_count:
+            payload, status = b'{"code": 500, "message": "busy"}', 500
+        else:
+            payload, status = b'{"code": 200}', 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    """只实现发送邮件所需命令的最小SMTP服务器"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost ESMTP")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(" ", 1)[0].upper()
+            if command == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN")
+            elif command == "AUTH":
+                self.reply("235 OK")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                lines = []
+                while (data_line := self.rfile.readline().decode()) not in (".\r\n", ""):
+                    lines.append(data_line)
+                self.server.messages.append("".join(lines))
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+def start_server(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_bark_server(fail_count=0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BarkHandler)
+    server.requests = []
+    server.fail_count = fail_count
+    return start_server(server), f"http://127.0.0.1:{server.server_address[1]}/push"
+
+
+def start_smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SmtpHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = []
+    return start_server(server)
+
+
+async def test_retries_with_backoff_until_delivered():
+    server, url = start_bark_server(fail_count=2)
+    notifier = NotificationService()
+    engine = NotificationDeliveryEngine({"bark": ChannelPolicy(base_delay=0.01)})
+    try:
+        result = await engine.submit(
+            "bark", lambda title, content: notifier.send_to_bark(api=url, title=title, content=content), "开播", "A"
+        )
+        assert result["success"] == [url]
+        assert len(server.requests) == 3
+        assert engine.get_stats()["retried"] == 2
+    finally:
+        await engine.close()
+        server.shutdown()
+
+
+async def test_digest_folds_burst_per_channel():
+    server, url = start_bark_server()
+    settings = Mock()
+    settings.user_config = {
+        "bark_enabled": True,
+        "bark_webhook_url": url,
+        "push_digest_enabled": True,
+        "push_digest_window": 0.1,
+    }
+    pusher = MessagePusher(settings)
+    try:
+        futures = []
+        for i in range(40):
+            futures.extend(await pusher.push_messages("直播状态", f"主播{i} 正在直播中"))
+        results = await asyncio.gather(*futures)
+
+        assert len(server.requests) == 1
+        assert server.requests[0]["body"].splitlines() == [f"主播{i} 正在直播中" for i in range(40)]
+        assert all(result["success"] == [url] for result in results)
+    finally:
+        await MessagePusher.shutdown()
+        server.shutdown()
+
+
+async def test_email_reuses_connection_without_blocking_loop(monkeypatch):
+    server = start_smtp_server()
+    host, port = server.server_address
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    ticker_task = asyncio.create_task(ticker())
+    pool = SmtpConnectionPool()
+    monkeypatch.setattr("app.messages.notification_service.smtp_pool", pool)
+    try:
+        start = time.monotonic()
+        for i in range(3):
+            result = await NotificationService.send_to_email(
+                host, "user", "pass", "sender@example.com", "StreamCap", "to@example.com",
+                f"标题{i}", "内容", smtp_port=str(port), open_ssl=False,
+            )
+            assert result == {"success": ["to@example.com"], "error": []}
+        elapsed = time.monotonic() - start
+
+        assert len(server.messages) == 3
+        assert pool.connects == 1
+        assert server.connections == 1
+        # 邮件在线程中发送，期间事件循环仍在运行
+        assert ticks > 0
+        assert elapsed < 5
+    finally:
+        ticker_task.cancel()
+        await asyncio.to_thread(pool.close_all)
+        server.shutdown()
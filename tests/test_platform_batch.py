@@ -0,0 +1,147 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.core.platform_handlers import BilibiliHandler, DouyuHandler, HuyaHandler, PlatformHandler, TwitchHandler
+
+
+class FakePlatformHandler(BaseHTTPRequestHandler):
+    """本地模拟的各平台状态接口"""
+
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        FakePlatformHandler.requests.append(parsed.path)
+
+        if parsed.path == "/bilibili":
+            rooms = {
+                "1001": {"room_id": 1001, "short_id": 0, "live_status": 1, "uname": "B站主播", "title": "直播中"},
+                "1002": {"room_id": 1002, "short_id": 0, "live_status": 0, "uname": "离线主播", "title": ""},
+                "2001": {"room_id": 2001, "short_id": 6, "live_status": 2, "uname": "轮播主播", "title": ""},
+            }
+            requested = {room_id: rooms[room_id] for room_id in query.get("room_ids", []) if room_id in rooms}
+            # 短号查询时接口以长号为键返回
+            if "6" in query.get("room_ids", []):
+                requested["2001"] = rooms["2001"]
+            self._send_json({"code": 0, "data": {"by_room_ids": requested}})
+        elif parsed.path == "/huya":
+            status = {"111": "ON", "222": "OFF", "333": "REPLAY"}.get(query["roomid"][0])
+            data = {"liveStatus": status, "profileInfo": {"nick": "虎牙主播"}} if status else ""
+            self._send_json({"status": 200, "data": data})
+        elif parsed.path.startswith("/douyu/"):
+            room_id = parsed.path.rsplit("/", 1)[-1]
+            if room_id == "404":
+                self._send_json({"error": 101, "data": "房间未找到"})
+            else:
+                room_status = "1" if room_id == "555" else "2"
+                self._send_json({"error": 0, "data": {"room_status": room_status, "owner_name": "斗鱼主播"}})
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def do_POST(self):
+        FakePlatformHandler.requests.append(self.path)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        users = []
+        for login in ("streamer_a", "streamer_b"):
+            if login in payload["query"]:
+                stream = {"id": "1", "title": "Playing"} if login == "streamer_a" else None
+                users.append({"login": login, "displayName": login.upper(), "stream": stream})
+        users.append(None)
+        self._send_json({"data": {"users": users}})
+
+
+@pytest.fixture(scope="module")
+def fake_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePlatformHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def reset_requests():
+    FakePlatformHandler.requests.clear()
+
+
+async def test_bilibili_batch_single_request(fake_server, monkeypatch):
+    monkeypatch.setattr(BilibiliHandler, "batch_status_api", f"{fake_server}/bilibili")
+    urls = [
+        "https://live.bilibili.com/1001",
+        "https://live.bilibili.com/1002?spm=abc",
+        "https://live.bilibili.com/6",
+        "https://live.bilibili.com/9999",
+    ]
+    results = await BilibiliHandler().get_stream_info_batch(urls)
+
+    assert FakePlatformHandler.requests == ["/bilibili"]
+    assert results[urls[0]].is_live is True
+    assert results[urls[0]].anchor_name == "B站主播"
+    assert results[urls[1]].is_live is False
+    assert results[urls[2]].is_live is False
+    # 接口未返回的房间状态未知，需要完整检测
+    assert urls[3] not in results
+
+
+async def test_twitch_batch_single_request(fake_server, monkeypatch):
+    monkeypatch.setattr(TwitchHandler, "batch_status_api", f"{fake_server}/gql")
+    urls = ["https://www.twitch.tv/streamer_a", "https://www.twitch.tv/Streamer_B", "https://www.twitch.tv/unknown"]
+    results = await TwitchHandler().get_stream_info_batch(urls)
+
+    assert FakePlatformHandler.requests == ["/gql"]
+    assert results[urls[0]].is_live is True
+    assert results[urls[0]].title == "Playing"
+    assert results[urls[1]].is_live is False
+    assert urls[2] not in results
+
+
+async def test_huya_probes(fake_server, monkeypatch):
+    monkeypatch.setattr(HuyaHandler, "batch_status_api", f"{fake_server}/huya")
+    urls = [
+        "https://www.huya.com/111",
+        "https://www.huya.com/222",
+        "https://www.huya.com/333",
+        "https://www.huya.com/444",
+        "https://www.huya.com/custom_alias",
+    ]
+    results = await HuyaHandler().get_stream_info_batch(urls)
+
+    assert results[urls[0]].is_live is True
+    assert results[urls[1]].is_live is False
+    assert results[urls[2]].is_live is False
+    assert urls[3] not in results
+    assert urls[4] not in results
+    assert len(FakePlatformHandler.requests) == 4
+
+
+async def test_douyu_probes(fake_server, monkeypatch):
+    monkeypatch.setattr(DouyuHandler, "batch_status_api", f"{fake_server}/douyu")
+    urls = ["https://www.douyu.com/555", "https://www.douyu.com/topic/abc?rid=666", "https://www.douyu.com/404"]
+    results = await DouyuHandler().get_stream_info_batch(urls)
+
+    assert results[urls[0]].is_live is True
+    assert results[urls[1]].is_live is False
+    assert urls[2] not in results
+
+
+def test_batch_size_lookup():
+    assert PlatformHandler.get_batch_size("https://live.bilibili.com/1001") == BilibiliHandler.batch_size
+    assert PlatformHandler.get_batch_size("https://www.twitch.tv/streamer_a") == TwitchHandler.batch_size
+    assert PlatformHandler.get_batch_size("https://live.douyin.com/123") == 0
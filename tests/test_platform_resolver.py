@@ -0,0 +1,48 @@
+from app.core.platform_handlers import (
+    PLATFORM_RULES,
+    BilibiliHandler,
+    HuyaHandler,
+    get_platform_info,
+    get_recording_platform_info,
+    resolve_platform,
+)
+from app.models.recording_model import Recording
+
+
+def legacy_get_platform_info(record_url):
+    for key, name, platform_key in PLATFORM_RULES:
+        if key in record_url:
+            return name, platform_key
+    return None, None
+
+
+def test_matches_rule_priority():
+    urls = [
+        "https://live.bilibili.com/1001",
+        "https://v.douyin.com/abc/",
+        "https://cdn.example.com/live.m3u8?from=weibo.com/",
+        "https://example.com/a.3.cn/tb.cn",
+        "https://v.6.cn/123",
+        "https://www.youtube.com/watch?v=1",
+        "https://unknown.example/room",
+    ]
+    for url in urls:
+        assert get_platform_info(url) == legacy_get_platform_info(url), url
+    assert get_platform_info("") == (None, None)
+
+
+def test_resolves_handler_class():
+    assert resolve_platform("https://live.bilibili.com/1001") == ("B站直播", "bilibili", BilibiliHandler)
+    assert resolve_platform("https://www.huya.com/111")[2] is HuyaHandler
+    assert resolve_platform("https://unknown.example/room") == (None, None, None)
+
+
+def test_recording_memo_invalidated_on_url_change():
+    recording = Recording("rec1", "https://live.bilibili.com/1001", "主播", "OD", False, True, 1800,
+                          False, None, None, None, False)
+    assert get_recording_platform_info(recording) == ("B站直播", "bilibili")
+    assert recording.platform_resolution is not None
+
+    recording.update({"url": "https://www.huya.com/111"})
+    assert recording.platform_resolution is None
+    assert get_recording_platform_info(recording) == ("虎牙直播", "huya")
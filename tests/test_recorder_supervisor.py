@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core.record_manager import RecordingManager
+from app.core.recorder_supervisor import RecorderSupervisor
+from app.models.recording_model import Recording
+
+
+class FakeRecorder:
+    """模拟原生录制器，自行统计写入字节数"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.bytes_written = 0
+
+
+class FakeDiskSpaceService:
+    def __init__(self):
+        self.rates = {}
+
+    def update_write_rate(self, pid, path, bytes_per_sec):
+        self.rates[pid] = (path, bytes_per_sec)
+
+    def remove_writer(self, pid):
+        self.rates.pop(pid, None)
+
+
+def create_app():
+    return SimpleNamespace(
+        recording_enabled=True,
+        disk_space_service=FakeDiskSpaceService(),
+        settings=SimpleNamespace(user_config={"show_recording_speed": False}),
+    )
+
+
+def create_recording(rec_id):
+    recording = Recording(rec_id, f"https://live.example.com/{rec_id}", rec_id, "OD", False, True, "1800",
+                          False, None, None, None, False)
+    recording.recording = True
+    recording.live_file_path = f"/records/{rec_id}/a.ts"
+    return recording
+
+
+async def test_stop_requests_trigger_only_the_affected_recorder():
+    app = create_app()
+    supervisor = RecorderSupervisor(app)
+    app.recorder_supervisor = supervisor
+    manager = SimpleNamespace(app=app)
+    first, second = create_recording("room1"), create_recording("room2")
+    first_stop = supervisor.register(FakeRecorder("hls-1"), first)
+    second_stop = supervisor.register(FakeRecorder("hls-2"), second)
+    assert not first_stop.is_set()
+
+    # 停止录制时立即触发停止事件，不依赖监管循环的采样周期
+    RecordingManager.stop_recording(manager, first, manually_stopped=True)
+    assert first_stop.is_set()
+    assert not second_stop.is_set()
+
+    supervisor.request_stop_all()
+    assert second_stop.is_set()
+
+    # 登记前已经停止的录制立即收到停止事件
+    third = create_recording("room3")
+    third.recording = False
+    assert supervisor.register(FakeRecorder("hls-3"), third).is_set()
+    await supervisor.shutdown()
+
+
+async def test_samples_write_speed_and_goes_idle_without_recorders(monkeypatch):
+    monkeypatch.setattr("app.core.recorder_supervisor.SAMPLE_INTERVAL", 0.01)
+    app = create_app()
+    supervisor = RecorderSupervisor(app)
+    recorder = FakeRecorder("hls-1")
+    recording = create_recording("room1")
+    supervisor.register(recorder, recording)
+
+    for _ in range(50):
+        recorder.bytes_written += 20 * 1024
+        await asyncio.sleep(0.01)
+        if recording.speed.endswith("MB/s"):
+            break
+    assert recording.speed.endswith("MB/s")
+    path, rate = app.disk_space_service.rates["hls-1"]
+    assert path == "/records/room1"
+    assert rate > 1024 * 1024
+
+    supervisor.unregister(recorder)
+    assert recording.speed == "0 KB/s"
+    assert app.disk_space_service.rates == {}
+    assert not supervisor._has_recorders.is_set()
+    await supervisor.shutdown()
+
+
+async def test_wait_stopped_returns_after_the_recorder_is_unregistered():
+    app = create_app()
+    supervisor = RecorderSupervisor(app)
+    recorder = FakeRecorder("hls-1")
+    recording = create_recording("room1")
+    supervisor.register(recorder, recording)
+
+    waiter = asyncio.create_task(supervisor.wait_stopped(recording))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    # 录制进程收尾完成、移出监管后才结束等待
+    supervisor.unregister(recorder)
+    await asyncio.wait_for(waiter, timeout=1)
+
+    # 没有对应录制进程时直接返回
+    await asyncio.wait_for(supervisor.wait_stopped(create_recording("room2")), timeout=1)
+    await supervisor.shutdown()
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from app.core.recordings_store import RecordingsStore
+from app.models.recording_model import Recording
+
+
+def create_recording(rec_id="room"):
+    return Recording(rec_id, f"https://live.example.com/{rec_id}", "主播", "OD", False, True, "1800",
+                     False, None, None, None, False)
+
+
+def test_setters_record_only_real_changes():
+    recording = create_recording()
+    assert recording.revision == 0
+    assert recording.dirty_fields == set()
+    with pytest.raises(AttributeError):
+        recording.unknown_attribute = True
+
+    # 运行时状态只增加 revision，不影响保存
+    recording.status_info = "monitoring"
+    recording.speed = "1 MB/s"
+    assert recording.revision == 2
+    assert recording.dirty_fields == set()
+
+    # 值没有变化时不算修改，属性字段按规范化后的值比较
+    recording.quality = "OD"
+    recording.record_format = "ts"
+    assert recording.revision == 2
+
+    recording.quality = "HD"
+    recording.set_translated_title_for_language("zh", " 标题 ")
+    assert recording.dirty_fields == {"quality", "multi_language_titles"}
+    assert recording.revision == 4
+
+
+def test_snapshot_is_regenerated_only_when_persisted_fields_change():
+    recording = create_recording()
+    data, changed = recording.snapshot()
+    assert changed
+    assert data == recording.to_dict()
+
+    # 未修改时不保留也不重新生成完整的字典
+    recording.is_live = True
+    assert recording.snapshot() == ({"rec_id": "room"}, False)
+
+    recording.remark = "备注"
+    data, changed = recording.snapshot()
+    assert changed
+    assert data["remark"] == "备注"
+    assert recording.dirty_fields == set()
+
+    recording.discard_snapshot()
+    assert recording.snapshot()[1]
+
+
+def test_store_skips_serializing_unchanged_recordings(tmp_path, monkeypatch):
+    store = RecordingsStore(str(tmp_path / "recordings.db"))
+    recordings = [create_recording(f"room{i}") for i in range(3)]
+    assert store.save([recording.snapshot()[0] for recording in recordings]) == 3
+
+    dumped = []
+    dumps = json.dumps
+    monkeypatch.setattr("app.core.recordings_store.json.dumps",
+                        lambda data, **kwargs: dumped.append(data["rec_id"]) or dumps(data, **kwargs))
+    recordings[1].monitor_status = False
+    unchanged_ids = set()
+    records = []
+    for recording in recordings:
+        data, changed = recording.snapshot()
+        records.append(data)
+        if not changed:
+            unchanged_ids.add(recording.rec_id)
+
+    assert store.save(records, unchanged_ids) == 1
+    assert dumped == ["room1"]
+    assert [record["monitor_status"] for record in store.load()] == [True, False, True]
+    assert store.load()[0] == recordings[0].to_dict()
+    store.close()
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import sqlite3
+from unittest.mock import Mock
+
+from app.core.record_manager import RecordingManager
+from app.core.recordings_store import RecordingsStore
+
+
+def make_records(count):
+    return [{"rec_id": f"rec{i}", "url": f"https://www.huya.com/{i}", "streamer_name": f"主播{i}"} for i in range(count)]
+
+
+def test_migrates_json_and_keeps_backup(tmp_path):
+    json_path = tmp_path / "recordings.json"
+    json_path.write_text(json.dumps(make_records(3), ensure_ascii=False), encoding="utf-8")
+    store = RecordingsStore(str(tmp_path / "recordings.db"))
+
+    assert store.migrate_from_json(str(json_path)) == 3
+    assert not json_path.exists()
+    assert (tmp_path / "recordings.json.migrated").exists()
+    store.close()
+
+    reopened = RecordingsStore(str(tmp_path / "recordings.db"))
+    assert reopened.load() == make_records(3)
+    assert reopened._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_save_writes_only_changed_rows(tmp_path):
+    store = RecordingsStore(str(tmp_path / "recordings.db"))
+    records = make_records(100)
+    assert store.save(records) == 100
+    assert store.save(records) == 0
+
+    records[10]["streamer_name"] = "新名字"
+    del records[50]
+    records.append({"rec_id": "rec_new", "url": "https://www.douyu.com/1"})
+    assert store.save(records) == 3
+
+    # 调整顺序只重写位置需要变化的行
+    records.append(records.pop(20))
+    assert store.save(records) == 1
+    records.insert(0, records.pop(30))
+    assert store.save(records) == len(records) - 1
+    store.close()
+
+    assert RecordingsStore(str(tmp_path / "recordings.db")).load() == records
+
+
+def test_failed_transaction_keeps_previous_rows(tmp_path):
+    store = RecordingsStore(str(tmp_path / "recordings.db"))
+    store.save(make_records(5))
+    store._conn.execute("CREATE TRIGGER fail BEFORE DELETE ON recordings BEGIN SELECT RAISE(ABORT, 'fail'); END")
+
+    try:
+        store.save(make_records(3))
+    except sqlite3.DatabaseError:
+        pass
+
+    assert len(store.load()) == 5
+
+
+async def test_persist_coalesces_burst(monkeypatch):
+    saved = []
+
+    async def save_recordings_config(data, unchanged_ids=None):
+        saved.append(len(data))
+        await asyncio.sleep(0.01)
+        return True
+
+    manager = RecordingManager.__new__(RecordingManager)
+    manager.app = Mock()
+    manager.app.config_manager.save_recordings_config = save_recordings_config
+    manager._persist_waiter = None
+    manager._persist_task = None
+    monkeypatch.setattr("app.core.record_manager.GlobalRecordingState.recordings", [])
+
+    await asyncio.gather(*(manager.persist_recordings() for _ in range(20)))
+    assert saved == [0]
+
+    first = asyncio.create_task(manager.persist_recordings())
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    await asyncio.gather(*(manager.persist_recordings() for _ in range(20)), first)
+    # 写入进行中到达的请求合并为一次后续写入
+    assert saved == [0, 0, 0]
+    await manager.flush_recordings()
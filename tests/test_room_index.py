@@ -0,0 +1,92 @@
+import asyncio
+import time
+from unittest.mock import Mock
+
+from app.models.recording_model import Recording
+from app.utils.room_checker import RoomChecker, RoomIndex
+
+
+def create_recording(rec_id, url, streamer_name):
+    return Recording(rec_id, url, streamer_name, "OD", False, True, "1800", False, None, None, "test_output", False)
+
+
+def create_app(recordings):
+    app = Mock()
+    app.record_manager.recordings = recordings
+    app.record_manager.room_index = RoomIndex.from_recordings(recordings)
+    return app
+
+
+def test_index_tracks_add_update_remove():
+    recording = create_recording("rec1", "https://www.huya.com/52333", "虎牙主播")
+    index = RoomIndex.from_recordings([recording])
+
+    assert index.find_duplicate("https://www.huya.com/52333?from=share", "huya", None, "52333") == (
+        "duplicate_reason_same_room_id"
+    )
+    assert index.find_duplicate("https://www.huya.com/1", "huya", "虎牙主播", "1") == "duplicate_reason_same_streamer"
+    # 不同平台的相同房间号不算重复
+    assert index.find_duplicate("https://www.douyu.com/52333", "douyu", None, "52333") is None
+
+    recording.streamer_name = "新名字"
+    index.sync([recording])
+    assert not index.has_streamer("huya", "虎牙主播")
+    assert index.has_streamer("huya", "新名字")
+
+    index.remove("rec1")
+    assert len(index) == 0
+    assert not index.contains_url("https://www.huya.com/52333")
+
+
+async def test_check_uses_maintained_index_without_resync(monkeypatch):
+    existing = [create_recording(f"rec{i}", f"https://www.huya.com/{i}", f"主播{i}") for i in range(100)]
+    app = create_app(existing)
+
+    def fail_sync(self, recordings):
+        raise AssertionError("去重检查不应遍历录制列表")
+
+    monkeypatch.setattr(RoomIndex, "sync", fail_sync)
+    assert await RoomChecker.check_duplicate_room(app, "https://www.huya.com/42") == (
+        True, "duplicate_reason_identical_url"
+    )
+
+
+async def test_batch_check_uses_index_and_filters_within_batch():
+    existing = [create_recording(f"rec{i}", f"https://www.huya.com/{i}", f"主播{i}") for i in range(3000)]
+    app = create_app(existing)
+    urls = [f"https://www.huya.com/{i}" for i in range(2990, 3010)] + ["https://www.huya.com/3005?from=share"]
+    names = [f"新主播{i}" for i in range(len(urls))]
+
+    valid, filtered = await RoomChecker.batch_check_duplicate_rooms(app, urls, names)
+
+    assert valid == [f"https://www.huya.com/{i}" for i in range(3000, 3010)]
+    assert [reason for _, reason in filtered].count("duplicate_reason_identical_url") == 10
+    assert filtered[-1] == ("https://www.huya.com/3005?from=share", "duplicate_reason_same_room_id")
+    # 批量检查不修改录制管理器维护的索引
+    assert len(app.record_manager.room_index) == 3000
+
+
+async def test_batch_anchor_lookups_run_concurrently(monkeypatch):
+    app = create_app([create_recording("rec1", "https://www.huya.com/1", "已存在主播")])
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_anchor_name(app, live_url, platform, platform_key, streamer_name):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return "已存在主播" if live_url.endswith("/2") else f"主播{live_url}"
+
+    monkeypatch.setattr(RoomChecker, "_get_real_anchor_name", staticmethod(fake_anchor_name))
+    urls = [f"https://www.huya.com/{i}" for i in range(2, 22)]
+
+    start = time.monotonic()
+    valid, filtered = await RoomChecker.batch_check_duplicate_rooms(app, urls)
+    elapsed = time.monotonic() - start
+
+    assert filtered == [("https://www.huya.com/2", "duplicate_reason_same_streamer")]
+    assert len(valid) == 19
+    assert max_in_flight == RoomChecker.NETWORK_LOOKUP_CONCURRENCY
+    assert elapsed < 0.05 * len(urls) / 2
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import multiprocessing
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app import sharding
+from app.core.record_manager import RecordingManager
+from app.core.recorder_supervisor import RecorderSupervisor
+from app.core.recordings_store import RecordingsStore
+from app.models.recording_model import Recording
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+class FakeProcess:
+    def join(self, timeout=None):
+        pass
+
+    @staticmethod
+    def is_alive():
+        return False
+
+
+@pytest.fixture
+def run_path(tmp_path):
+    (tmp_path / "config").mkdir()
+    for name in ("default_settings.json", "language.json"):
+        shutil.copy(PROJECT_DIR / "config" / name, tmp_path / "config" / name)
+    return tmp_path
+
+
+def save_recordings(run_path, count):
+    store = RecordingsStore(str(run_path / "config" / "recordings.db"))
+    store.save([
+        Recording(f"room{i}", f"https://live.example.com/{i}", f"主播{i}", "OD", False, True, "1800",
+                  False, None, None, None, False).to_dict()
+        for i in range(count)
+    ])
+    store.close()
+
+
+async def receive(conn):
+    for _ in range(100):
+        if conn.poll():
+            return conn.recv()
+        await asyncio.sleep(0.01)
+    raise AssertionError("没有收到消息")
+
+
+def test_ring_moves_only_rooms_of_the_new_worker():
+    ring = sharding.ShardRing()
+    for worker_id in range(4):
+        ring.add_worker(worker_id)
+    rec_ids = [f"room{i}" for i in range(4000)]
+    before = {rec_id: ring.get_worker(rec_id) for rec_id in rec_ids}
+    counts = [list(before.values()).count(worker_id) for worker_id in range(4)]
+    assert all(700 < count < 1300 for count in counts)
+
+    ring.add_worker(4)
+    moved = [rec_id for rec_id in rec_ids if ring.get_worker(rec_id) != before[rec_id]]
+    assert all(ring.get_worker(rec_id) == 4 for rec_id in moved)
+    assert 500 < len(moved) < 1100
+
+    ring.remove_worker(4)
+    assert {rec_id: ring.get_worker(rec_id) for rec_id in rec_ids} == before
+
+
+async def test_coordinator_routes_state_and_rebalances(run_path, monkeypatch):
+    save_recordings(run_path, 40)
+    workers = {}
+
+    def spawn_process(self, shard_id, rec_ids):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        workers[shard_id] = (child_conn, rec_ids)
+        return FakeProcess(), parent_conn
+
+    monkeypatch.setattr(sharding.ShardCoordinator, "_spawn_process", spawn_process)
+    coordinator = sharding.ShardCoordinator(2, run_path=str(run_path))
+    await coordinator.start()
+    assert sorted(workers[0][1] + workers[1][1]) == sorted(f"room{i}" for i in range(40))
+
+    updates = []
+    coordinator.page.pubsub.subscribe_topic("update", lambda topic, recording: updates.append(recording.rec_id))
+    conn, rec_ids = workers[0]
+    conn.send(("state", {rec_ids[0]: {"is_live": True, "status_info": "recording"}}))
+    await asyncio.sleep(0.05)
+    assert updates == [rec_ids[0]]
+    assert coordinator.recordings[rec_ids[0]].is_live
+
+    coordinator.set_monitor(rec_ids[0], False)
+    assert await receive(conn) == ("monitor", (rec_ids[0], False))
+
+    # 新增工作进程后，原进程释放归属变化的直播间，确认后再交给新进程
+    new_shard = coordinator.add_worker()
+    moving = dict(coordinator.moving)
+    assert moving
+    assert set(moving.values()) == {new_shard}
+    for shard_id in (0, 1):
+        released = [rec_id for rec_id in moving if coordinator.owners[rec_id] == shard_id]
+        if released:
+            conn = workers[shard_id][0]
+            assert await receive(conn) == ("release", released)
+            conn.send(("save", [dict(coordinator.recordings[released[0]].to_dict(), remark="迁移")]))
+            conn.send(("released", released))
+    added = []
+    while len(added) < len(moving):
+        kind, records = await receive(workers[new_shard][0])
+        assert kind == "add"
+        added.extend(record["rec_id"] for record in records)
+    assert sorted(added) == sorted(moving)
+    assert not coordinator.moving
+    assert all(coordinator.owners[rec_id] == new_shard for rec_id in moving)
+
+    await coordinator.shutdown()
+    remarks = [record["remark"] for record in RecordingsStore(str(run_path / "config" / "recordings.db")).load()]
+    assert remarks.count("迁移") >= 1
+    assert len(remarks) == 40
+
+
+async def test_only_the_coordinator_writes_user_config(run_path, monkeypatch):
+    user_settings = run_path / "config" / "user_settings.json"
+    default_settings = json.loads((run_path / "config" / "default_settings.json").read_text(encoding="utf-8"))
+    user_settings.write_text(json.dumps(dict(default_settings, video_format="AVI")), encoding="utf-8")
+    monkeypatch.setattr(sharding.ShardCoordinator, "_spawn_process",
+                        lambda self, shard_id, rec_ids: (FakeProcess(), multiprocessing.Pipe()[0]))
+    coordinator = sharding.ShardCoordinator(1, run_path=str(run_path))
+    await coordinator.start()
+    # 工作进程启动前由协调进程修复无效的配置
+    assert json.loads(user_settings.read_text(encoding="utf-8"))["video_format"] == "TS"
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    config_manager = sharding.ShardConfigManager(str(run_path), 0, sharding.ShardChannel(child_conn), [])
+    assert config_manager.translation_cache_db_path.endswith("translation_cache.shard0.db")
+    # 工作进程保存用户配置时交给协调进程写入
+    await config_manager.save_user_config(dict(coordinator.settings.user_config, audio_format="AAC"))
+    kind, payload = await receive(parent_conn)
+    assert kind == "user_config"
+    assert json.loads(user_settings.read_text(encoding="utf-8"))["audio_format"] != "AAC"
+
+    coordinator.on_message(0, kind, payload)
+    await asyncio.gather(*coordinator.page.tasks)
+    assert json.loads(user_settings.read_text(encoding="utf-8"))["audio_format"] == "AAC"
+    await coordinator.shutdown()
+
+
+async def test_release_waits_for_the_recorder_to_exit():
+    recording = Recording("room1", "https://live.example.com/1", "主播1", "OD", False, True, "1800",
+                          False, None, None, None, False)
+    recording.recording = True
+    removed = []
+
+    async def remove_recording(target):
+        removed.append(target.rec_id)
+
+    app = SimpleNamespace(
+        recording_enabled=True,
+        disk_space_service=SimpleNamespace(remove_writer=lambda pid: None),
+        config_manager=SimpleNamespace(owned_ids={"room1"}),
+    )
+    app.recorder_supervisor = RecorderSupervisor(app)
+    manager = SimpleNamespace(app=app)
+    app.record_manager = SimpleNamespace(
+        find_recording_by_id=lambda rec_id: recording if rec_id == "room1" else None,
+        stop_recording=lambda target, manually_stopped: RecordingManager.stop_recording(manager, target,
+                                                                                        manually_stopped),
+        remove_recording=remove_recording,
+    )
+    recorder = SimpleNamespace(pid="hls-1", bytes_written=0)
+    stop_event = app.recorder_supervisor.register(recorder, recording)
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    worker = sharding.ShardWorker(0, child_conn, ["room1"], "")
+    worker.app = app
+    release = asyncio.create_task(worker.release_recordings(["room1"]))
+    await asyncio.sleep(0.05)
+    # 录制进程收到停止请求但尚未退出时，不交回配置
+    assert stop_event.is_set()
+    assert not parent_conn.poll()
+    assert not release.done()
+
+    app.recorder_supervisor.unregister(recorder)
+    await asyncio.wait_for(release, timeout=1)
+    kind, records = await receive(parent_conn)
+    assert kind == "save"
+    assert records[0]["rec_id"] == "room1"
+    assert await receive(parent_conn) == ("released", ["room1"])
+    assert removed == ["room1"]
+    assert not app.config_manager.owned_ids
+    await app.recorder_supervisor.shutdown()
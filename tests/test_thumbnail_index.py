@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+from app.utils.thumbnail_manager import ThumbnailManager
+
+
+def create_manager(monkeypatch, tmp_path, files=()):
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+    monkeypatch.setattr(sys, "executable", str(tmp_path / "StreamCap.exe"))
+    thumbnail_dir = tmp_path / "Live preview image"
+    thumbnail_dir.mkdir(exist_ok=True)
+    for name in files:
+        (thumbnail_dir / name).write_bytes(b"jpg")
+    settings = SimpleNamespace(user_config={"show_live_thumbnail": True})
+    return ThumbnailManager(SimpleNamespace(settings=settings)), thumbnail_dir
+
+
+def no_directory_scan(*args, **kwargs):
+    raise AssertionError("缩略图目录不应被重复扫描")
+
+
+async def test_startup_index_keeps_latest_and_reclaims_rest_in_batch(monkeypatch, tmp_path):
+    now = int(time.time())
+    files = [f"room_a_{now - i}.jpg" for i in range(5)] + [f"room_b_{now}.jpg", "cover.jpg", "x_y.png"]
+    manager, thumbnail_dir = create_manager(monkeypatch, tmp_path, files)
+
+    assert [path for _, path in manager.thumbnail_index["room_a"]] == [
+        str(thumbnail_dir / f"room_a_{now - i}.jpg") for i in (2, 1, 0)
+    ]
+    assert len(manager.pending_deletes) == 2
+
+    monkeypatch.setattr(os, "listdir", no_directory_scan)
+    monkeypatch.setattr(os, "scandir", no_directory_scan)
+    assert await manager._cleanup_old_thumbnails() == 2
+    assert manager.get_latest_thumbnail(SimpleNamespace(rec_id="room_b")) == str(thumbnail_dir / f"room_b_{now}.jpg")
+    assert manager.get_latest_thumbnail(SimpleNamespace(rec_id="room_c")) is None
+
+    monkeypatch.undo()
+    assert sorted(os.path.basename(p) for p in thumbnail_dir.glob("*.jpg")) == sorted(
+        [f"room_a_{now - i}.jpg" for i in range(3)] + [f"room_b_{now}.jpg", "cover.jpg"]
+    )
+
+
+async def test_ring_buffer_rotates_on_capture(monkeypatch, tmp_path):
+    manager, thumbnail_dir = create_manager(monkeypatch, tmp_path)
+    monkeypatch.setattr(os, "listdir", no_directory_scan)
+    room = SimpleNamespace(rec_id="room")
+    paths = []
+    for timestamp in range(1000, 1005):
+        path = str(thumbnail_dir / f"room_{timestamp}.jpg")
+        with open(path, "wb") as f:
+            f.write(b"jpg")
+        manager._register_thumbnail("room", path)
+        paths.append(path)
+    manager._register_thumbnail("room", paths[-1])
+
+    assert [path for _, path in manager.thumbnail_index["room"]] == paths[2:]
+    assert manager.pending_deletes == paths[:2]
+    assert await manager._cleanup_old_thumbnails(room) == 2
+
+    # 最新的文件被外部删除时回退到上一张
+    os.remove(paths[-1])
+    assert manager.get_latest_thumbnail(room) == paths[-2]
+    assert manager.delete_thumbnails_for_recording("room") == 2
+    assert "room" not in manager.thumbnail_index
+
+
+async def test_age_cleanup_uses_index_timestamps(monkeypatch, tmp_path):
+    now = int(time.time())
+    old = now - 3 * 24 * 3600
+    manager, thumbnail_dir = create_manager(monkeypatch, tmp_path, [f"a_{old}.jpg", f"a_{now}.jpg", f"b_{old}.jpg"])
+    monkeypatch.setattr(os, "listdir", no_directory_scan)
+
+    assert await manager.cleanup_old_thumbnails(max_age_days=1) == 2
+    assert sorted(p.name for p in thumbnail_dir.glob("*.jpg")) == [f"a_{now}.jpg"]
+    assert list(manager.thumbnail_index) == ["a"]
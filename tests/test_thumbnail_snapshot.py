@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+from app.core import ffmpeg_builders
+from app.models.recording_model import Recording
+from app.utils.thumbnail_manager import ThumbnailManager
+
+JPEG = b"\xff\xd8" + b"\x00" * 64 + b"\xff\xd9"
+
+
+def create_recording(rec_id):
+    return Recording(rec_id, f"https://live.example.com/{rec_id}", "主播", "OD", False, True, "1800",
+                     False, None, None, None, False)
+
+
+def create_manager(monkeypatch, tmp_path, **config):
+    # 打包环境下缩略图目录位于可执行文件所在目录，借此把目录放到临时目录中
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+    monkeypatch.setattr(sys, "executable", str(tmp_path / "StreamCap.exe"))
+    settings = SimpleNamespace(user_config={"show_live_thumbnail": True, **config})
+    return ThumbnailManager(SimpleNamespace(settings=settings))
+
+
+def test_snapshot_is_secondary_output_of_recorder():
+    plain = ffmpeg_builders.create_builder("ts", record_url="http://example.com/live.flv",
+                                           segment_record=True, segment_time="1800", full_path="/d/a_%03d.ts")
+    command = ffmpeg_builders.create_builder(
+        "ts", record_url="http://example.com/live.flv", segment_record=True, segment_time="1800",
+        full_path="/d/a_%03d.ts", snapshot_path="/t/live/1.jpg", snapshot_interval=60,
+    ).build_command()
+
+    # 录制部分的参数不变，缩略图输出追加在录制输出之后，只解码关键帧
+    assert command[command.index("-i") - 2:command.index("-i")] == ["-skip_frame", "nokey"]
+    recording_part = command[:command.index("/d/a_%03d.ts") + 1]
+    assert [arg for arg in recording_part if arg not in ("-skip_frame", "nokey")] == plain.build_command()
+    assert command[-1] == "/t/live/1.jpg"
+    assert "fps=1/60,scale=230:120" in command
+
+    audio = ffmpeg_builders.create_builder("mp3", record_url="http://example.com/live.flv",
+                                           full_path="/d/a.mp3", snapshot_path="/t/live/1.jpg").build_command()
+    assert audio[-1] == "/d/a.mp3"
+    assert "/t/live/1.jpg" not in audio
+
+
+async def test_collects_recorder_snapshot_once_per_update(monkeypatch, tmp_path):
+    manager = create_manager(monkeypatch, tmp_path)
+    recording = create_recording("room1")
+    recording.live_snapshot_path = manager.get_live_snapshot_path(recording)
+
+    # 录制进程尚未输出缩略图时等待，不回退到拉流截图
+    assert await manager._collect_recorder_snapshot(recording) == (None, True)
+
+    with open(recording.live_snapshot_path, "wb") as f:
+        f.write(JPEG[:-2])
+    assert await manager._collect_recorder_snapshot(recording) == (None, True)
+
+    with open(recording.live_snapshot_path, "wb") as f:
+        f.write(JPEG)
+    thumbnail_path, pending = await manager._collect_recorder_snapshot(recording)
+    assert pending
+    with open(thumbnail_path, "rb") as f:
+        assert f.read() == JPEG
+    assert manager.get_latest_thumbnail(recording) == thumbnail_path
+    assert await manager._collect_recorder_snapshot(recording) == (None, True)
+
+    # 缩略图长时间未更新时回退到拉流截图
+    old = os.path.getmtime(recording.live_snapshot_path) - 3600
+    os.utime(recording.live_snapshot_path, (old, old))
+    assert await manager._collect_recorder_snapshot(recording) == (None, False)
+
+    assert manager.delete_thumbnails_for_recording("room1") == 2
+    assert not os.path.exists(recording.live_snapshot_path)
+
+
+async def test_capture_pool_limits_concurrent_ffmpeg(monkeypatch, tmp_path):
+    manager = create_manager(monkeypatch, tmp_path, thumbnail_max_concurrent_captures=3)
+    running = peak = 0
+
+    async def fake_capture(stream_url, recording):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return f"{recording.rec_id}.jpg"
+
+    monkeypatch.setattr(manager, "_capture_thumbnail", fake_capture)
+    recordings = [create_recording(f"room{i}") for i in range(20)]
+    results = await asyncio.gather(*(
+        manager._capture_thumbnail_with_retry("http://example.com/live.flv", recording) for recording in recordings
+    ))
+
+    assert [path for path, _ in results] == [f"room{i}.jpg" for i in range(20)]
+    assert peak == 3
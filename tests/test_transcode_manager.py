@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core import transcode_manager
+from app.core.transcode_manager import TranscodeManager, TranscodeStatus
+
+
+class FakeConfigManager:
+    def __init__(self, saved=None):
+        self.saved = saved or []
+
+    def load_transcode_queue_config(self):
+        return self.saved
+
+    async def save_transcode_queue_config(self, jobs):
+        self.saved = [dict(job) for job in jobs]
+
+
+def create_manager(saved=None, **config):
+    app = SimpleNamespace(
+        config_manager=FakeConfigManager(saved),
+        settings=SimpleNamespace(user_config=config),
+        subprocess_start_up_info=None,
+    )
+    return TranscodeManager(app)
+
+
+async def wait_finished(manager):
+    await asyncio.wait_for(manager.queue.join(), 2)
+
+
+async def test_runs_jobs_with_bounded_workers_and_deletes_original(tmp_path, monkeypatch):
+    manager = create_manager(transcode_max_workers="2")
+    running = []
+    peak = []
+
+    async def convert(self, job):
+        running.append(job["id"])
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.remove(job["id"])
+        with open(job["target"], "wb") as f:
+            f.write(b"mp4")
+        return True
+
+    monkeypatch.setattr(TranscodeManager, "_convert", convert)
+    sources = []
+    for i in range(5):
+        source = tmp_path / f"room{i}.ts"
+        source.write_bytes(b"ts")
+        sources.append(source)
+        await manager.submit(str(source))
+    # 同一文件重复提交时返回已有任务
+    assert await manager.submit(str(sources[0])) == next(iter(manager.jobs))
+
+    await manager.start()
+    await wait_finished(manager)
+    assert max(peak) == 2
+    assert all(not source.exists() and source.with_suffix(".mp4").exists() for source in sources)
+    assert manager.get_stats()[TranscodeStatus.COMPLETED] == 5
+    assert manager.config_manager.saved == []
+    await manager.shutdown()
+
+
+async def test_restores_pending_jobs_and_waits_for_locked_original(tmp_path, monkeypatch):
+    source = tmp_path / "room.ts"
+    source.write_bytes(b"ts")
+    saved = [
+        {"id": "a", "source": str(source), "target": str(tmp_path / "room.mp4"), "delete_original": True,
+         "status": TranscodeStatus.RUNNING, "progress": 0.5},
+        {"id": "b", "source": str(tmp_path / "done.ts"), "status": TranscodeStatus.COMPLETED},
+    ]
+    manager = create_manager(saved)
+    assert list(manager.jobs) == ["a"]
+    assert manager.jobs["a"]["status"] == TranscodeStatus.PENDING
+
+    async def convert(self, job):
+        return True
+
+    # 原文件前两次删除时仍被占用，释放后立即删除
+    remove = transcode_manager.os.remove
+    attempts = []
+
+    def locked_remove(path):
+        attempts.append(path)
+        if len(attempts) < 3:
+            raise PermissionError(path)
+        remove(path)
+
+    monkeypatch.setattr(TranscodeManager, "_convert", convert)
+    monkeypatch.setattr(transcode_manager, "REMOVE_RETRY_INTERVAL", 0.01)
+    monkeypatch.setattr(transcode_manager.os, "remove", locked_remove)
+    await manager.start()
+    await wait_finished(manager)
+    assert len(attempts) == 3
+    assert not source.exists()
+    assert manager.get_job("a")["status"] == TranscodeStatus.COMPLETED
+    await manager.shutdown()
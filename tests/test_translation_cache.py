@@ -0,0 +1,96 @@
+import asyncio
+
+from app.utils import translation_service
+from app.utils.translation_service import TranslationCache, TranslationService
+
+
+def create_service(cache=None):
+    service = TranslationService(cache=cache)
+    requests = []
+
+    async def request_translation(text, target_language):
+        requests.append((text, target_language))
+        await asyncio.sleep(0)
+        return "\n".join(f"{target_language}:{line}" for line in text.split("\n"))
+
+    service._request_translation = request_translation
+    return service, requests
+
+
+async def test_titles_are_batched_and_deduplicated():
+    service, requests = create_service()
+    titles = ["Title  one", "Title one", "Title two", "标题三"]
+
+    results = await asyncio.gather(*(
+        service.translate_live_title_to_multiple_languages(title, ["zh", "en"]) for title in titles
+    ))
+    assert results[0] == {"zh": "zh:Title one", "en": "Title  one"}
+    assert results[1]["zh"] == "zh:Title one"
+    assert results[2]["zh"] == "zh:Title two"
+    assert results[3] == {"zh": "标题三", "en": "en:标题三"}
+    # 每个目标语言只发送一次请求，重复的标题只提交一次
+    assert sorted(requests) == [("Title one\nTitle two", "zh"), ("标题三", "en")]
+
+    await service.translate_live_title_to_multiple_languages("Title two", ["zh"])
+    assert len(requests) == 2
+    assert service.cache.get_stats()["hits"] == 1
+
+
+async def test_mismatched_batch_falls_back_to_single_requests():
+    service, requests = create_service()
+    translations = {"A title\nB title": "merged", "A title": "甲", "B title": "乙"}
+
+    async def request_translation(text, target_language):
+        requests.append(text)
+        return translations[text]
+
+    service._request_translation = request_translation
+    results = await asyncio.gather(service.translate_text("A title", "zh"), service.translate_text("B title", "zh"))
+    assert results == ["甲", "乙"]
+    assert requests == ["A title\nB title", "A title", "B title"]
+
+
+async def test_cache_persists_across_restarts(tmp_path):
+    db_path = str(tmp_path / "translation_cache.db")
+    cache = TranslationCache(db_path)
+    cache.open()
+    service, requests = create_service(cache)
+    assert await service.translate_text("Hello world", "zh") == "zh:Hello world"
+    cache.close()
+
+    reopened = TranslationCache(db_path, max_entries=1)
+    reopened.open()
+    service, requests = create_service(reopened)
+    assert await service.translate_text("Hello   world", "zh") == "zh:Hello world"
+    assert requests == []
+    # 其他提供商的翻译结果不共用
+    assert reopened.get(("baidu", "Hello world", "zh")) is None
+    reopened.close()
+
+
+async def test_disk_lookup_runs_in_worker_thread(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "translation_cache.db")
+    cache = TranslationCache(db_path)
+    cache.open()
+    cache.put(("google", "Old title", "zh"), "旧标题")
+    cache.save()
+    cache.put(("google", "New title", "zh"), "新标题")
+    monkeypatch.setattr(translation_service.time, "time", lambda: 4102444800.0)
+    cache.close()
+
+    # 内存中只预加载最近使用的一条，其余条目从磁盘读取
+    reopened = TranslationCache(db_path, max_entries=1)
+    reopened.open()
+    threads = []
+    to_thread = asyncio.to_thread
+
+    async def record_to_thread(func, *args):
+        threads.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", record_to_thread)
+    assert await reopened.get_async(("google", "Old title", "zh")) == "旧标题"
+    assert await reopened.get_async(("google", "Old title", "zh")) == "旧标题"
+    assert await reopened.get_async(("google", "Missing", "zh")) is None
+    assert threads == ["_load", "_load"]
+    reopened.close()